@@ -8,105 +8,117 @@ GitHub: apemoonspin
 Twitter: @apemoonspin
 """
 import sqlite3
-import pandas as pd
-from datetime import datetime, timedelta
-from config import DB_LOG_FILE, CSV_LOG_FILE
+import csv
+import gzip
+import time
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Optional, List, Iterable, Iterator, TextIO
+from config import DB_LOG_FILE, CSV_LOG_FILE, LOG_PARTITION
+from data_logger import ROW_COLUMNS, SCHEMA_VERSION, schema_version, window_start_ms
+from partitions import (
+    partition_store,
+    window_files,
+    window_statistics,
+    hourly_distribution,
+    episode_statistics,
+    hourly_episodes,
+    top_episode_markets
+)
 import os
 
 
-def analyze_arbitrage_opportunities(hours: int = 24):
-    """Analyze arbitrage opportunities"""
+def _open_db():
+    """Open the log DB, or explain why it cannot be analyzed"""
     if not os.path.exists(DB_LOG_FILE):
         print(f"[✗] Database file not found: {DB_LOG_FILE}")
         print("[*] Please run the bot first to collect data.")
-        return
+        return None
     
     conn = sqlite3.connect(DB_LOG_FILE)
+    version = schema_version(conn)
+    if version not in (0, SCHEMA_VERSION):
+        print(f"[✗] {DB_LOG_FILE} uses the v{version} schema.")
+        print(f"[*] Run 'python3 migrate_db.py {DB_LOG_FILE}' to upgrade it.")
+        conn.close()
+        return None
+    return conn
+
+
+def _open_sources(since_ms: int, until_ms: Optional[int] = None) -> Optional[List[sqlite3.Connection]]:
+    """Connections covering a window: the overlapping partitions (newest first) or the single log DB"""
+    store = partition_store(DB_LOG_FILE, LOG_PARTITION)
+    if store is None:
+        conn = _open_db()
+        return None if conn is None else [conn]
+    return store.open_window(since_ms, until_ms)
+
+
+def analyze_arbitrage_opportunities(hours: int = 24):
+    """Analyze arbitrage opportunities"""
+    since_ms = window_start_ms(hours)
+    conns = _open_sources(since_ms)
+    if conns is None:
+        return
     
-    # Query data from last N hours
-    query = '''
-        SELECT 
-            COUNT(*) as total_records,
-            SUM(CASE WHEN arbitrage_opportunity = 1 THEN 1 ELSE 0 END) as opportunities,
-            AVG(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit ELSE NULL END) as avg_profit,
-            MAX(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit ELSE NULL END) as max_profit,
-            MIN(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit ELSE NULL END) as min_profit,
-            COUNT(DISTINCT CASE WHEN arbitrage_opportunity = 1 THEN market_id ELSE NULL END) as unique_markets,
-            AVG(total_cost) as avg_total_cost,
-            MIN(total_cost) as min_total_cost
-        FROM price_data
-        WHERE timestamp >= datetime('now', '-' || ? || ' hours')
-    '''
-    
-    cursor = conn.cursor()
-    cursor.execute(query, (hours,))
-    result = cursor.fetchone()
+    # Record counts and prices are answered from the per-minute/per-hour rollups
+    # plus the raw partial minute, opportunities from the episode table (one row
+    # per opportunity, however many ticks it lasted), opening only the
+    # partitions the window overlaps
+    stats = window_statistics(conns, since_ms)
+    episodes = episode_statistics(conns, since_ms)
     
     print("="*60)
     print(f"📊 Arbitrage Opportunity Analysis (Last {hours} hours)")
     print("="*60)
     
-    if result and result[0] > 0:
-        total_records, opportunities, avg_profit, max_profit, min_profit, unique_markets, avg_cost, min_cost = result
+    if stats['total_records'] > 0:
+        total_records = stats['total_records']
+        opportunity_ticks = stats['opportunities']
+        opportunities = episodes['episodes']
         
         print(f"\n📈 Overall Statistics:")
         print(f"    Total records: {total_records:,}")
-        print(f"    Arbitrage opportunities: {opportunities:,} ({opportunities/total_records*100:.2f}%)")
+        print(f"    Arbitrage opportunities: {opportunities:,}")
+        print(f"    Records during an opportunity: {opportunity_ticks:,} ({opportunity_ticks/total_records*100:.2f}%)")
         
         if opportunities > 0:
-            print(f"\n💰 Profit Analysis:")
-            print(f"    Average profit rate: {avg_profit*100:.4f}%")
-            print(f"    Maximum profit rate: {max_profit*100:.4f}%")
-            print(f"    Minimum profit rate: {min_profit*100:.4f}%")
-            print(f"    Unique markets: {unique_markets}")
+            print(f"\n💰 Profit Analysis (peak profit per opportunity):")
+            print(f"    Average profit rate: {episodes['avg_peak_profit']*100:.4f}%")
+            print(f"    Maximum profit rate: {episodes['max_peak_profit']*100:.4f}%")
+            print(f"    Minimum profit rate: {episodes['min_peak_profit']*100:.4f}%")
+            print(f"    Unique markets: {episodes['unique_markets']}")
+            
+            print(f"\n⏱️  Duration Analysis:")
+            print(f"    Average duration: {episodes['avg_duration']:.1f}s")
+            print(f"    Longest opportunity: {episodes['max_duration']:.1f}s")
+            print(f"    Total time with an opportunity: {episodes['total_duration']:.1f}s")
+            if episodes['avg_depth_at_peak'] is not None:
+                print(f"    Average depth at peak: {episodes['avg_depth_at_peak']:,.2f} shares each side")
         
         print(f"\n💵 Price Analysis:")
-        print(f"    Average total cost: ${avg_cost:.4f}")
-        print(f"    Minimum total cost: ${min_cost:.4f}")
+        print(f"    Average total cost: ${stats['avg_total_cost']:.4f}")
+        print(f"    Minimum total cost: ${stats['min_total_cost']:.4f}")
         
         # Hourly distribution analysis
         print(f"\n⏰ Hourly Distribution:")
-        time_query = '''
-            SELECT 
-                strftime('%H', timestamp) as hour,
-                COUNT(*) as count,
-                SUM(CASE WHEN arbitrage_opportunity = 1 THEN 1 ELSE 0 END) as opportunities
-            FROM price_data
-            WHERE timestamp >= datetime('now', '-' || ? || ' hours')
-            GROUP BY hour
-            ORDER BY hour
-        '''
-        cursor.execute(time_query, (hours,))
-        time_results = cursor.fetchall()
-        
-        for hour, count, opps in time_results:
+        started = hourly_episodes(conns, since_ms)
+        for hour, count, _ in hourly_distribution(conns, since_ms):
             if count > 0:
-                print(f"    {hour:>2}:00: {opps:>4} opportunities / {count:>6} records ({opps/count*100:>5.2f}%)")
+                print(f"    {hour:>2}:00: {started.get(hour, 0):>4} opportunities / {count:>6} records")
         
         # Top markets analysis
         print(f"\n🏆 Markets with Most Arbitrage Opportunities (Top 10):")
-        market_query = '''
-            SELECT 
-                market_id,
-                market_question,
-                COUNT(*) as opportunities,
-                AVG(potential_profit) as avg_profit,
-                MAX(potential_profit) as max_profit
-            FROM price_data
-            WHERE arbitrage_opportunity = 1
-            AND timestamp >= datetime('now', '-' || ? || ' hours')
-            GROUP BY market_id, market_question
-            ORDER BY opportunities DESC
-            LIMIT 10
-        '''
-        cursor.execute(market_query, (hours,))
-        market_results = cursor.fetchall()
+        market_results = top_episode_markets(conns, since_ms, limit=10)
         
         if market_results:
-            for i, (market_id, question, opps, avg_p, max_p) in enumerate(market_results, 1):
+            for i, (market_id, question, opps, avg_p, max_p, duration) in enumerate(market_results, 1):
                 question_short = (question[:50] + '...') if question and len(question) > 50 else (question or market_id)
                 print(f"    {i:>2}. {question_short}")
-                print(f"        Opportunities: {opps} | Avg profit: {avg_p*100:.4f}% | Max profit: {max_p*100:.4f}%")
+                print(f"        Opportunities: {opps} | Avg peak profit: {avg_p*100:.4f}% | "
+                      f"Max profit: {max_p*100:.4f}% | Total duration: {duration:.1f}s")
         else:
             print("    No arbitrage opportunities found.")
     
@@ -114,60 +126,245 @@ def analyze_arbitrage_opportunities(hours: int = 24):
         print("\n[!] No data to analyze.")
         print(f"[*] No records found in the last {hours} hours.")
     
-    conn.close()
+    for conn in conns:
+        conn.close()
     print("\n" + "="*60)
 
 
-def export_to_csv(output_file: str = None, hours: int = 24):
-    """Export SQLite DB data to CSV"""
-    if not os.path.exists(DB_LOG_FILE):
-        print(f"[✗] Database file not found: {DB_LOG_FILE}")
+EXPORT_QUERY = '''
+    SELECT 
+        strftime('%Y-%m-%dT%H:%M:%f', p.ts_ms / 1000.0, 'unixepoch', 'localtime') as timestamp,
+        m.market_id,
+        m.market_question,
+        p.yes_price,
+        p.no_price,
+        p.total_cost,
+        p.arbitrage_opportunity,
+        p.potential_profit,
+        p.yes_ask_price,
+        p.no_ask_price,
+        p.yes_bid_price,
+        p.no_bid_price
+    FROM price_data p
+    JOIN markets m ON m.market_pk = p.market_pk
+    WHERE p.ts_ms >= ? AND p.ts_ms < ?
+    ORDER BY p.ts_ms DESC
+'''
+
+EXPORT_CHUNK_SIZE = 10000
+DAY_MS = 24 * 3600 * 1000
+
+
+def iter_export_rows(
+    conn: sqlite3.Connection,
+    since_ms: int,
+    until_ms: int,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[List[tuple]]:
+    """Yield export rows for [since_ms, until_ms) newest first, chunk_size rows at a time"""
+    cursor = conn.execute(EXPORT_QUERY, (since_ms, until_ms))
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def _open_output(path: str, compress: bool) -> TextIO:
+    if compress:
+        return gzip.open(path, 'wt', newline='', encoding='utf-8', compresslevel=6)
+    return open(path, 'w', newline='', encoding='utf-8')
+
+
+def write_rows(
+    path: str,
+    chunks: Iterable[List[tuple]],
+    compress: bool = False,
+    header: bool = True,
+    progress=None
+) -> int:
+    """Write row chunks to a (optionally gzipped) CSV file, returning the row count"""
+    rows_written = 0
+    with _open_output(path, compress) as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(ROW_COLUMNS)
+        for rows in chunks:
+            writer.writerows(rows)
+            rows_written += len(rows)
+            if progress:
+                progress(len(rows))
+    return rows_written
+
+
+def iter_window_rows(
+    conns: List[sqlite3.Connection],
+    since_ms: int,
+    until_ms: int,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[List[tuple]]:
+    """Chain iter_export_rows over several sources (pass them newest first)"""
+    for conn in conns:
+        yield from iter_export_rows(conn, since_ms, until_ms, chunk_size)
+
+
+def _export_part(db_files: List[str], since_ms: int, until_ms: int, path: str, compress: bool, chunk_size: int) -> int:
+    """Process pool worker: export one time slice to its own part file"""
+    conns = [sqlite3.connect(f"file:{db_file}?mode=ro", uri=True) for db_file in db_files]
+    try:
+        return write_rows(path, iter_window_rows(conns, since_ms, until_ms, chunk_size), compress, header=False)
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+class _Progress:
+    """Prints rows exported and rows/sec at most once per interval"""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self.rows = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def __call__(self, rows: int):
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            print(f"[*] Exported {self.rows:,} rows ({self.rate():,.0f} rows/s)")
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+def export_to_csv(
+    output_file: str = None,
+    hours: int = 24,
+    compress: bool = False,
+    workers: int = 1,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+):
+    """
+    Export SQLite DB data to CSV with bounded memory
+
+    Rows are streamed from a cursor in chunks of chunk_size. With workers > 1
+    the window is split into per-day slices exported by a process pool into
+    part files, which are then concatenated newest day first (gzip members
+    concatenate into a valid gzip file).
+    """
+    until_ms = int(time.time() * 1000) + 1
+    since_ms = window_start_ms(hours, until_ms - 1)
+    conns = _open_sources(since_ms, until_ms)
+    if conns is None:
         return
     
     if output_file is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = f"./logs/export_{timestamp}.csv"
-    
-    conn = sqlite3.connect(DB_LOG_FILE)
+        output_file = os.path.join(
+            os.path.dirname(DB_LOG_FILE),
+            f"export_{timestamp}.csv" + (".gz" if compress else "")
+        )
     
-    query = '''
-        SELECT 
-            timestamp,
-            market_id,
-            market_question,
-            yes_price,
-            no_price,
-            total_cost,
-            arbitrage_opportunity,
-            potential_profit,
-            yes_ask_price,
-            no_ask_price,
-            yes_bid_price,
-            no_bid_price
-        FROM price_data
-        WHERE timestamp >= datetime('now', '-' || ? || ' hours')
-        ORDER BY timestamp DESC
-    '''
+    progress = _Progress()
     
-    df = pd.read_sql_query(query, conn, params=(hours,))
-    df.to_csv(output_file, index=False, encoding='utf-8')
+    if workers <= 1:
+        try:
+            total = write_rows(
+                output_file,
+                iter_window_rows(conns, since_ms, until_ms, chunk_size),
+                compress,
+                progress=progress
+            )
+        finally:
+            for conn in conns:
+                conn.close()
+    else:
+        for conn in conns:
+            conn.close()
+        total = _export_parallel(output_file, since_ms, until_ms, compress, workers, chunk_size, progress)
     
     print(f"[✓] Data exported to CSV: {output_file}")
-    print(f"    Total {len(df)} records")
-    
-    conn.close()
+    print(f"    Total {total:,} records ({progress.rate():,.0f} rows/s)")
 
 
-if __name__ == "__main__":
-    import sys
+def _export_parallel(
+    output_file: str,
+    since_ms: int,
+    until_ms: int,
+    compress: bool,
+    workers: int,
+    chunk_size: int,
+    progress: _Progress
+) -> int:
+    """Export per-day slices in a process pool and concatenate them newest first"""
+    slices = []
+    end = until_ms
+    while end > since_ms:
+        start = max(since_ms, end - DAY_MS)
+        slices.append((start, end))
+        end = start
     
-    if len(sys.argv) > 1:
-        hours = int(sys.argv[1])
-    else:
-        hours = 24
+    part_files = [f"{output_file}.part{i:04d}" for i in range(len(slices))]
+    total = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    _export_part,
+                    window_files(DB_LOG_FILE, LOG_PARTITION, start, end)[::-1],
+                    start, end, path, compress, chunk_size
+                ): path
+                for (start, end), path in zip(slices, part_files)
+            }
+            for future in as_completed(futures):
+                rows = future.result()
+                total += rows
+                progress(rows)
+                if rows:
+                    print(f"[*] Day slice done: {rows:,} rows ({progress.rows:,} total, {progress.rate():,.0f} rows/s)")
+        
+        write_rows(output_file, (), compress)
+        with open(output_file, 'ab') as out:
+            for path in part_files:
+                with open(path, 'rb') as part:
+                    shutil.copyfileobj(part, out, 1 << 20)
+    finally:
+        for path in part_files:
+            if os.path.exists(path):
+                os.remove(path)
     
-    analyze_arbitrage_opportunities(hours)
+    return total
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Analyze stored price data and optionally export it to CSV")
+    parser.add_argument("hours", nargs="?", type=int, default=24, help="Window size in hours (default: 24)")
+    parser.add_argument("--export", action="store_true", help="Export the window to CSV after the analysis")
+    parser.add_argument("--output", help="Export file path (default: logs/export_<timestamp>.csv[.gz])")
+    parser.add_argument("--gzip", action="store_true", help="Gzip-compress the export")
+    parser.add_argument("--workers", type=int, default=1, help="Export per-day slices in N processes")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Rows fetched per chunk")
+    parser.add_argument("--no-analysis", action="store_true", help="Skip the report (export only)")
+    args = parser.parse_args(argv)
+    
+    if not args.no_analysis:
+        analyze_arbitrage_opportunities(args.hours)
     
     # CSV export option
-    if len(sys.argv) > 2 and sys.argv[2] == "--export":
-        export_to_csv(hours=hours)
+    if args.export:
+        export_to_csv(
+            args.output,
+            hours=args.hours,
+            compress=args.gzip,
+            workers=args.workers,
+            chunk_size=max(1, args.chunk_size)
+        )
+
+
+if __name__ == "__main__":
+    main()
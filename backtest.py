@@ -0,0 +1,386 @@
+"""
+Polymarket Arbitrage Backtest
+Replays logged price data through the bot's detection and execute_trade path
+on a simulated clock, with parameter sweeps across a process pool
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import os
+import io
+import sys
+import time
+import sqlite3
+import argparse
+import itertools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, Iterator, NamedTuple
+
+# Replayed prices must never be written back into the live logs, and paper
+# trading must never touch a real wallet
+os.environ["ENABLE_DATA_LOGGING"] = "false"
+os.environ["PRIVATE_KEY"] = ""
+
+import numpy as np
+
+from config import DB_LOG_FILE, LOG_PARTITION, MIN_PROFIT_MARGIN, MAX_SLIPPAGE, SCAN_INTERVAL
+from data_logger import window_start_ms
+from partitions import window_files
+from bot import PolyArbitrageBot
+
+REPLAY_QUERY = '''
+    SELECT
+        p.ts_ms, m.market_id, m.market_question,
+        p.yes_price, p.no_price,
+        p.yes_ask_price, p.no_ask_price, p.yes_bid_price, p.no_bid_price
+    FROM price_data p
+    JOIN markets m ON m.market_pk = p.market_pk
+    WHERE p.ts_ms >= ? AND p.ts_ms < ?
+    ORDER BY p.ts_ms
+'''
+
+REPLAY_CHUNK_SIZE = 10000
+
+
+class BacktestConfig(NamedTuple):
+    """One parameter set to replay"""
+    min_profit_margin: float = MIN_PROFIT_MARGIN
+    max_slippage: float = MAX_SLIPPAGE
+    latency: float = 0.0        # Simulated seconds between detection and fill
+    trade_size: float = 100.0   # Shares per leg when the detection path gives no size
+    cooldown: float = 0.0       # Minimum simulated seconds between trades in one market
+    mode: str = 'update'        # 'update': check on every row, 'sweep': vectorized pass every scan_interval
+    scan_interval: float = SCAN_INTERVAL
+
+
+class SimulatedClock:
+    """Replay time in epoch seconds, advanced by the replayed rows"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+
+def iter_replay_rows(
+    db_files: List[str],
+    since_ms: int,
+    until_ms: int,
+    chunk_size: int = REPLAY_CHUNK_SIZE
+) -> Iterator[tuple]:
+    """Stream (ts_ms, market_id, question, yes, no, yes_ask, no_ask, yes_bid, no_bid) oldest first"""
+    for db_file in db_files:
+        conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(REPLAY_QUERY, (since_ms, until_ms))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+
+class BacktestBot(PolyArbitrageBot):
+    """PolyArbitrageBot whose execute_trade paper-trades against the replayed prices
+
+    Orders are filled at the first replayed asks at or after detection time +
+    latency, provided yes_ask + no_ask has not moved above the detected cost by
+    more than max_slippage. Each filled pair is held to resolution and pays $1.
+    """
+
+    def __init__(self, config: BacktestConfig):
+        super().__init__(market_ids=[])
+        self.config = config
+        self.min_profit_margin = config.min_profit_margin
+        self.max_slippage = config.max_slippage
+        self.scan_interval = config.scan_interval
+
+        self.clock = SimulatedClock()
+        self.price_table.clock = self.clock.time
+
+        self._asks: Dict[str, tuple] = {}
+        self._pending: Dict[str, List[tuple]] = {}
+        self._last_trade: Dict[str, float] = {}
+        self._episode_start: Dict[str, float] = {}
+        self._detected: set = set()
+
+        self.detections = 0
+        self.trades_attempted = 0
+        self.trades_filled = 0
+        self.trades_skipped = 0
+        self.shares = 0.0
+        self.cost = 0.0
+        self.pnl = 0.0
+        self.durations: List[float] = []
+
+    def trading_enabled(self) -> bool:
+        return True
+
+    def execute_trade(
+        self,
+        market_id: str,
+        yes_price: float,
+        no_price: float,
+        size: Optional[float] = None,
+        signal_time: Optional[float] = None
+    ) -> bool:
+        """Paper-trade: queue the order to fill after the simulated latency
+
+        signal_time (perf_counter at detection) adds the bot's real
+        detection-to-submit time to the configured latency.
+        """
+        now = self.clock.now
+        latency = self.config.latency
+        if signal_time is not None:
+            latency += max(0.0, time.perf_counter() - signal_time)
+        last = self._last_trade.get(market_id)
+        if last is not None and now - last < self.config.cooldown:
+            self.trades_skipped += 1
+            return False
+
+        self._last_trade[market_id] = now
+        self.trades_attempted += 1
+        order = (now + latency, yes_price + no_price, size or self.config.trade_size)
+        if self.config.latency <= 0:
+            self._try_fill(market_id, order)
+        else:
+            self._pending.setdefault(market_id, []).append(order)
+        return True
+
+    def _try_fill(self, market_id: str, order: tuple):
+        _, detected_cost, size = order
+        yes_ask, no_ask = self._asks[market_id]
+        fill_cost = yes_ask + no_ask
+        if fill_cost <= detected_cost + self.max_slippage:
+            self.trades_filled += 1
+            self.shares += size
+            self.cost += size * fill_cost
+            self.pnl += size * (1.0 - fill_cost)
+
+    def _handle_price_opportunity(
+        self,
+        market_id: str,
+        yes_price: float,
+        no_price: float,
+        market_question: str = ""
+    ) -> bool:
+        found = super()._handle_price_opportunity(market_id, yes_price, no_price, market_question)
+        if found:
+            self.detections += 1
+            self._detected.add(market_id)
+            self._episode_start.setdefault(market_id, self.clock.now)
+        return found
+
+    def _end_episode(self, market_id: str):
+        self.durations.append(self.clock.now - self._episode_start.pop(market_id))
+
+    def _end_episodes(self, still_open):
+        """Close episodes of markets no longer detected"""
+        for market_id in [m for m in self._episode_start if m not in still_open]:
+            self._end_episode(market_id)
+
+    def replay_row(self, row: tuple):
+        ts_ms, market_id, question, yes_price, no_price, yes_ask, no_ask, yes_bid, no_bid = row
+        self.clock.now = ts_ms / 1000
+        self._asks[market_id] = (yes_ask, no_ask)
+
+        # Orders due by now fill (or miss) against this market's latest asks
+        pending = self._pending.get(market_id)
+        if pending:
+            while pending and pending[0][0] <= self.clock.now:
+                self._try_fill(market_id, pending.pop(0))
+
+        prices = {
+            'yes_price': yes_price,
+            'no_price': no_price,
+            'yes_ask': yes_ask,
+            'no_ask': no_ask,
+            'yes_bid': yes_bid,
+            'no_bid': no_bid
+        }
+        if self.config.mode == 'sweep':
+            self.record_prices(market_id, prices, question)
+            return
+
+        self._detected.discard(market_id)
+        self.handle_prices(market_id, prices, question)
+        if market_id not in self._detected and market_id in self._episode_start:
+            self._end_episode(market_id)
+
+    def sweep(self):
+        """One vectorized detection pass over the price table (sweep mode)"""
+        self._detected = set()
+        self.detect_opportunities()
+        # Detection skips rows it already handled; those still clearing the threshold keep their episode open
+        still_open = {
+            candidate.market_id for candidate in self.price_table.top_opportunities(
+                max_pair_cost=1.0 - self.min_profit_margin,
+                max_age=self.price_max_age
+            )
+        }
+        self._end_episodes(self._detected | still_open)
+
+
+def run_backtest(
+    config: BacktestConfig,
+    db_files: List[str],
+    since_ms: int = 0,
+    until_ms: int = 2 ** 62
+) -> Dict[str, Any]:
+    """Replay one configuration and return its report"""
+    bot = BacktestBot(config)
+    rows = 0
+    first_ts = last_ts = None
+    next_sweep = None
+    wall_start = time.perf_counter()
+
+    # Opportunity banners are not useful at replay speed
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        for row in iter_replay_rows(db_files, since_ms, until_ms):
+            ts = row[0] / 1000
+            if config.mode == 'sweep':
+                if next_sweep is None:
+                    next_sweep = ts + config.scan_interval
+                while ts >= next_sweep:
+                    bot.clock.now = next_sweep
+                    bot.sweep()
+                    next_sweep += config.scan_interval
+            bot.replay_row(row)
+            rows += 1
+            if first_ts is None:
+                first_ts = ts
+            last_ts = ts
+            if rows % 10000 == 0:
+                sink.seek(0)
+                sink.truncate()
+
+        if config.mode == 'sweep' and rows:
+            bot.sweep()
+        bot._end_episodes(())
+
+    wall = time.perf_counter() - wall_start
+    bot.http.close()
+    simulated = (last_ts - first_ts) if rows else 0.0
+    durations = np.array(bot.durations) if bot.durations else np.zeros(0)
+    return {
+        'config': config._asdict(),
+        'rows': rows,
+        'simulated_seconds': simulated,
+        'wall_seconds': wall,
+        'speedup': simulated / wall if wall > 0 else 0.0,
+        'detections': bot.detections,
+        'opportunities': len(bot.durations),
+        'trades_attempted': bot.trades_attempted,
+        'trades_filled': bot.trades_filled,
+        'trades_skipped': bot.trades_skipped,
+        'fill_rate': bot.trades_filled / bot.trades_attempted if bot.trades_attempted else 0.0,
+        'shares': bot.shares,
+        'cost': bot.cost,
+        'pnl': bot.pnl,
+        'roi': bot.pnl / bot.cost if bot.cost else 0.0,
+        'duration_mean': float(durations.mean()) if durations.size else 0.0,
+        'duration_median': float(np.median(durations)) if durations.size else 0.0,
+        'duration_p90': float(np.percentile(durations, 90)) if durations.size else 0.0,
+        'duration_max': float(durations.max()) if durations.size else 0.0
+    }
+
+
+def sweep_configs(
+    margins: List[float],
+    slippages: List[float],
+    latencies: List[float],
+    **common
+) -> List[BacktestConfig]:
+    """Cartesian product of the swept parameters"""
+    return [
+        BacktestConfig(min_profit_margin=margin, max_slippage=slippage, latency=latency, **common)
+        for margin, slippage, latency in itertools.product(margins, slippages, latencies)
+    ]
+
+
+def run_sweep(
+    configs: List[BacktestConfig],
+    db_files: List[str],
+    since_ms: int = 0,
+    until_ms: int = 2 ** 62,
+    workers: int = 1
+) -> List[Dict[str, Any]]:
+    """Replay every configuration, one process per configuration at a time"""
+    if workers <= 1 or len(configs) == 1:
+        return [run_backtest(config, db_files, since_ms, until_ms) for config in configs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_backtest, config, db_files, since_ms, until_ms) for config in configs]
+        return [future.result() for future in futures]
+
+
+def print_report(results: List[Dict[str, Any]]):
+    """Per-configuration P&L, fill rate and opportunity duration table, best P&L first"""
+    if not results:
+        print("[!] No configurations were replayed.")
+        return
+
+    first = results[0]
+    print("=" * 112)
+    print(f"📈 Backtest: {first['rows']:,} rows, {first['simulated_seconds'] / 3600:,.1f} simulated hours")
+    print("=" * 112)
+    print(f"{'margin':>7} {'slip':>6} {'lat(s)':>6} │ {'opps':>6} {'trades':>7} {'fill%':>6} "
+          f"{'cost $':>11} {'P&L $':>10} {'ROI%':>6} │ {'dur med':>8} {'dur p90':>8} │ {'speedup':>9}")
+    print("-" * 112)
+    for r in sorted(results, key=lambda r: r['pnl'], reverse=True):
+        c = r['config']
+        print(f"{c['min_profit_margin']:>7.3f} {c['max_slippage']:>6.3f} {c['latency']:>6.2f} │ "
+              f"{r['opportunities']:>6,} {r['trades_attempted']:>7,} {r['fill_rate'] * 100:>5.1f}% "
+              f"{r['cost']:>11,.2f} {r['pnl']:>10,.2f} {r['roi'] * 100:>5.2f}% │ "
+              f"{r['duration_median']:>7.1f}s {r['duration_p90']:>7.1f}s │ {r['speedup']:>8,.0f}x")
+    print("=" * 112)
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(',') if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay logged prices through the arbitrage bot")
+    parser.add_argument("--db", default=DB_LOG_FILE, help="Log DB (partition files are found next to it)")
+    parser.add_argument("--partition", default=LOG_PARTITION, help="none, daily or hourly (default: LOG_PARTITION)")
+    parser.add_argument("--hours", type=float, help="Replay only the last N hours")
+    parser.add_argument("--margins", type=_float_list, default=[MIN_PROFIT_MARGIN], help="Comma-separated MIN_PROFIT_MARGIN values")
+    parser.add_argument("--slippages", type=_float_list, default=[MAX_SLIPPAGE], help="Comma-separated MAX_SLIPPAGE values")
+    parser.add_argument("--latencies", type=_float_list, default=[0.0], help="Comma-separated fill latencies (simulated seconds)")
+    parser.add_argument("--size", type=float, default=100.0, help="Shares per leg per trade")
+    parser.add_argument("--cooldown", type=float, default=0.0, help="Minimum seconds between trades in one market")
+    parser.add_argument("--mode", choices=("update", "sweep"), default="update", help="Check on every row or in periodic vectorized sweeps")
+    parser.add_argument("--scan-interval", type=float, default=SCAN_INTERVAL, help="Simulated seconds between sweeps (sweep mode)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for parameter sweeps")
+    args = parser.parse_args(argv)
+
+    since_ms = window_start_ms(args.hours) if args.hours else 0
+    db_files = window_files(args.db, args.partition, since_ms)
+    if not db_files:
+        print(f"[✗] No price data found for {args.db}")
+        return 1
+
+    configs = sweep_configs(
+        args.margins,
+        args.slippages,
+        args.latencies,
+        trade_size=args.size,
+        cooldown=args.cooldown,
+        mode=args.mode,
+        scan_interval=args.scan_interval
+    )
+    print(f"[*] Replaying {len(db_files)} file(s) with {len(configs)} configuration(s) on {min(args.workers, len(configs))} process(es)...")
+    results = run_sweep(configs, db_files, since_ms, workers=args.workers)
+    print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
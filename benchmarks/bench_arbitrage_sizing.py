@@ -0,0 +1,76 @@
+"""
+Benchmark: depth-aware arbitrage sizing vs scalar price check
+
+Usage:
+    python3 benchmarks/bench_arbitrage_sizing.py [markets] [levels]
+"""
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ENABLE_DATA_LOGGING", "false")
+
+from bot import PolyArbitrageBot
+from orderbook import OrderBook
+
+
+def random_book(rng: random.Random, best_ask: float, levels: int) -> OrderBook:
+    asks = [
+        {'price': f"{min(0.99, best_ask + 0.01 * i):.2f}", 'size': f"{rng.uniform(5, 500):.2f}"}
+        for i in range(levels)
+    ]
+    bids = [
+        {'price': f"{max(0.01, best_ask - 0.01 * (i + 1)):.2f}", 'size': f"{rng.uniform(5, 500):.2f}"}
+        for i in range(levels)
+    ]
+    return OrderBook.from_snapshot(bids, asks)
+
+
+def main(num_markets: int = 500, levels: int = 20, repeat: int = 5):
+    rng = random.Random(42)
+    bot = PolyArbitrageBot(market_ids=["bench"])
+
+    markets = []
+    for _ in range(num_markets):
+        yes_ask = round(rng.uniform(0.05, 0.95), 2)
+        # About 1 in 10 markets is priced below the threshold
+        gap = rng.choice((0.03, 0.02, 0.01, 0.0, -0.01, -0.01, -0.02, -0.02, -0.03, -0.04))
+        no_ask = round(min(0.99, max(0.01, 1.0 - yes_ask - gap)), 2)
+        markets.append({
+            'Yes': random_book(rng, yes_ask, levels),
+            'No': random_book(rng, no_ask, levels)
+        })
+
+    def scalar_pass():
+        for books in markets:
+            bot.check_arbitrage(books['Yes'].best_ask(), books['No'].best_ask())
+
+    def depth_pass():
+        for books in markets:
+            bot.check_executable_arbitrage(books)
+
+    print("=" * 60)
+    print(f"Arbitrage check benchmark ({num_markets} markets, {levels} levels per side)")
+    print("=" * 60)
+
+    results = {}
+    for name, func in (("Scalar check_arbitrage", scalar_pass), ("Depth-aware sizing", depth_pass)):
+        best = min(timeit.repeat(func, number=20, repeat=repeat)) / 20
+        per_check_us = best / num_markets * 1e6
+        results[name] = per_check_us
+        print(f"{name:<24} {per_check_us:>8.2f} us/check   {num_markets / best:>12,.0f} checks/sec")
+
+    opportunities = [bot.check_executable_arbitrage(books) for books in markets]
+    found = [o for o in opportunities if o is not None]
+    print("-" * 60)
+    print(f"Depth-aware overhead: {results['Depth-aware sizing'] / results['Scalar check_arbitrage']:.1f}x scalar")
+    print(f"Opportunities sized: {len(found)} | Total expected profit: ${sum(o.profit for o in found):,.2f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    )
@@ -0,0 +1,140 @@
+"""
+Benchmark: multi-outcome (neg-risk) event basket scanning
+
+Starts the local fake Gamma/CLOB server with simulated neg-risk events and
+sweeps every event's outcome books with EventScanner, once with one /books
+request per event and once with fixed-size batches across events. Reports
+sweep time, events per second, requests per sweep, the threshold pass per
+event (vectorized reduceat vs a per-event Python loop) and the depth sizing
+cost per event that clears it.
+
+Usage:
+    python3 benchmarks/bench_events.py [--events N] [--mispricing F] [--latency S] [--batch-size B] [--sweeps N]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+from typing import Dict, Any, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ENABLE_DATA_LOGGING", "false")
+os.environ["PRIVATE_KEY"] = ""
+os.environ.setdefault("GAMMA_RATE_LIMIT", "0")
+os.environ.setdefault("CLOB_RATE_LIMIT", "0")
+
+from bot import PolyArbitrageBot
+from events import EventScanner
+from fake_polymarket import FakePolymarketHTTPServer
+
+
+class PerEventScanner(EventScanner):
+    """One /books request per event (the unbatched baseline)"""
+
+    def _batches(self) -> List[List[str]]:
+        return [list(event.token_ids) for event in self.events]
+
+
+def loop_detect(scanner: EventScanner, asks: np.ndarray, max_basket_cost: float) -> int:
+    """Per-event Python loop over the same flat arrays (reference for the vectorized pass)"""
+    hits = 0
+    for start, count in zip(scanner.starts.tolist(), scanner.counts.tolist()):
+        total = 0.0
+        for i in range(start, start + count):
+            total += asks[i]
+        if total < max_basket_cost:
+            hits += 1
+    return hits
+
+
+def run_sweeps(api: FakePolymarketHTTPServer, scanner_class, batch_size: int, concurrency: int, sweeps: int) -> Dict[str, Any]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = PolyArbitrageBot(market_ids=["0"], enable_logging=False)
+        bot.gamma_url = api.url
+        bot.clob_url = api.url
+        scanner = scanner_class(bot, batch_size=batch_size, concurrency=concurrency)
+        scanner.refresh_events()
+        try:
+            times = []
+            found = 0
+            for _ in range(sweeps):
+                start = time.perf_counter()
+                found = len(scanner.sweep())
+                times.append(time.perf_counter() - start)
+            asks, sizes, snapshots = scanner.fetch_quotes()
+        finally:
+            bot.http.close()
+
+    max_basket_cost = 1.0 - bot.min_profit_margin - bot.max_slippage
+    start = time.perf_counter()
+    for _ in range(20):
+        hits = scanner.candidates(asks, sizes)[0]
+    vectorized = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for _ in range(20):
+        loop_detect(scanner, asks, max_basket_cost)
+    loop = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    scanner.detect(asks, sizes, snapshots)
+    sizing = (time.perf_counter() - start) / max(1, len(hits))
+
+    sweep_time = sorted(times)[len(times) // 2]
+    events = len(scanner.events)
+    return {
+        'events': events,
+        'markets': len(scanner.tokens),
+        'sweep_time': sweep_time,
+        'events_per_sec': events / sweep_time,
+        'requests': len(scanner._batches()),
+        'found': found,
+        'detect_us': vectorized / events * 1e6,
+        'loop_us': loop / events * 1e6,
+        'sizing_us': sizing * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neg-risk event basket scanning benchmark")
+    parser.add_argument('--events', type=int, default=2000, help='Simulated neg-risk events (default: 2000)')
+    parser.add_argument('--mispricing', type=float, default=0.02, help='Fraction of events priced as basket arbitrages (default: 0.02)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Server delay per request in seconds (default: 0.02)')
+    parser.add_argument('--batch-size', type=int, default=200, help='Books per batched /books request (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=4, help='/books requests in flight (default: 4)')
+    parser.add_argument('--sweeps', type=int, default=3, help='Timed sweeps per mode, median reported (default: 3)')
+    args = parser.parse_args()
+
+    api = FakePolymarketHTTPServer(
+        num_markets=0,
+        latency=args.latency,
+        seed=42,
+        num_events=args.events,
+        event_mispricing=args.mispricing
+    )
+    api.start()
+
+    print("=" * 106)
+    print(f"Neg-risk basket sweep ({args.events} events, {args.latency*1000:.0f}ms latency, "
+          f"{args.concurrency} requests in flight)")
+    print("=" * 106)
+    print(f"{'Mode':<22} {'Markets':>8} {'Requests':>9} {'Sweep (s)':>10} {'Events/s':>10} "
+          f"{'Found':>6} {'Detect/event':>13} {'Loop/event':>11} {'Sizing/hit':>11}")
+    print("-" * 106)
+    try:
+        for name, scanner_class in (("per-event requests", PerEventScanner), (f"batched ({args.batch_size})", EventScanner)):
+            result = run_sweeps(api, scanner_class, args.batch_size, args.concurrency, args.sweeps)
+            print(f"{name:<22} {result['markets']:>8} {result['requests']:>9} {result['sweep_time']:>10.2f} "
+                  f"{result['events_per_sec']:>10,.0f} {result['found']:>6} {result['detect_us']:>11.2f}us "
+                  f"{result['loop_us']:>9.2f}us {result['sizing_us']:>9.0f}us")
+    finally:
+        api.stop()
+    print("-" * 106)
+    print("Detect/event: vectorized reduceat threshold pass | Loop/event: the same check as a per-event Python loop")
+    print("Sizing/hit: order books and depth-aware basket sizing per event that clears the threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: two-leg order execution against the local mock matching engine
+
+Executes Yes/No parity trades through ExecutionEngine against the fake CLOB
+order API with server-side latency: legs one after the other, legs
+concurrently with orders signed on trigger, and legs concurrently with
+orders pre-signed before the trigger. Trade sizes vary as depth-sized
+trades do. Reports signal-to-submit (order construction and signing) and
+signal-to-fill latency percentiles, the gap between the two legs'
+responses, the pre-signed order hit rate, and how often a rejected leg had
+to be unwound when the server rejects a fraction of orders.
+
+Usage:
+    python3 benchmarks/bench_execution.py [--trades N] [--latency S] [--jitter S] [--order-error-rate R] [--size SHARES]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+from typing import Dict, Any, List
+
+from eth_account import Account
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ENABLE_DATA_LOGGING", "false")
+# Throwaway key: orders are only ever sent to the local mock
+os.environ["PRIVATE_KEY"] = Account.create().key.hex()
+
+from bot import PolyArbitrageBot
+from execution import ExecutionEngine, OrderSigner
+from fake_polymarket import FakePolymarketHTTPServer
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def run_trades(api: FakePolymarketHTTPServer, trades: int, size: float, concurrent: bool, presign: bool) -> Dict[str, Any]:
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = PolyArbitrageBot(market_ids=list(api.markets), enable_logging=False)
+        bot.clob_url = api.url
+        for market_id, market in api.markets.items():
+            bot.market_tokens[market_id] = {'Yes': market.yes_token, 'No': market.no_token}
+        engine = ExecutionEngine(
+            bot, OrderSigner(bot.account), concurrent=concurrent, max_shares=size, presign_markets=5 if presign else 0
+        )
+        markets = list(api.markets.values())
+        try:
+            for i in range(trades):
+                market = markets[i % len(markets)]
+                with market.lock:
+                    # Fresh depth every trade so fills only fail when the server rejects an order
+                    market._reprice(market.yes_token, 0.48)
+                    market._reprice(market.no_token, 0.48)
+                if presign:
+                    # What the background pre-signing pass does for markets near the threshold
+                    engine.warm_market(market.market_id, 0.49, 0.49)
+                # Depth-sized trades: anywhere from 30% to 100% of the cap
+                trade_size = round(size * (0.3 + 0.7 * (i * 37 % 100) / 99), 2)
+                signal_time = time.perf_counter()
+                results.append(engine.execute(
+                    market.market_id, 0.49, 0.49, size=trade_size, signal_time=signal_time
+                ))
+        finally:
+            engine.close()
+            bot.http.close()
+
+    fills = [r.signal_to_fill for r in results]
+    submits = [r.signal_to_submit for r in results]
+    return {
+        'submit_p50': percentile(submits, 0.50),
+        'submit_p99': percentile(submits, 0.99),
+        'p50': percentile(fills, 0.50),
+        'p99': percentile(fills, 0.99),
+        'skew': percentile([r.leg_skew for r in results], 0.50),
+        'filled': engine.stats['filled'] / trades,
+        'hit_rate': engine.preparer.hit_rate(),
+        'unwinds': sum(1 for r in results if r.unwind is not None) / trades,
+        'unhedged': engine.stats['unhedged']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Two-leg order execution benchmark against the mock CLOB")
+    parser.add_argument('--trades', type=int, default=200, help='Trades per mode (default: 200)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Server delay per request in seconds (default: 0.02)')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Additional random server delay in seconds (default: 0.01)')
+    parser.add_argument('--order-error-rate', type=float, default=0.05, help='Fraction of orders rejected (default: 0.05)')
+    parser.add_argument('--size', type=float, default=20.0, help='Shares per leg (default: 20)')
+    args = parser.parse_args()
+
+    api = FakePolymarketHTTPServer(
+        num_markets=50,
+        latency=args.latency,
+        jitter=args.jitter,
+        volatility=0.0,
+        seed=42,
+        order_error_rate=args.order_error_rate
+    )
+    api.start()
+
+    print("=" * 110)
+    print(f"Two-leg execution ({args.trades} trades, {args.size:g} shares per leg, "
+          f"{args.latency*1000:.0f}+{args.jitter*1000:.0f}ms latency, "
+          f"{args.order_error_rate*100:.0f}% orders rejected)")
+    print("=" * 110)
+    print(f"{'Mode':<12} {'Submit p50':>11} {'Submit p99':>11} {'Fill p50':>10} {'Fill p99':>10} "
+          f"{'Leg skew':>10} {'Filled':>9} {'Presigned':>10} {'Unwinds':>9} {'Unhedged':>9}")
+    print("-" * 110)
+    try:
+        for name, concurrent, presign in (("sequential", False, False), ("concurrent", True, False), ("presigned", True, True)):
+            result = run_trades(api, args.trades, args.size, concurrent, presign)
+            print(f"{name:<12} {result['submit_p50']*1000:>9.2f}ms {result['submit_p99']*1000:>9.2f}ms "
+                  f"{result['p50']*1000:>8.1f}ms {result['p99']*1000:>8.1f}ms "
+                  f"{result['skew']*1000:>8.1f}ms {result['filled']*100:>8.1f}% {result['hit_rate']*100:>9.1f}% "
+                  f"{result['unwinds']*100:>8.1f}% {result['unhedged']:>9}")
+    finally:
+        api.stop()
+    print("-" * 110)
+    print("Submit: signal until both orders are built and signed | Fill: signal to the later leg's response (p50/p99) | Leg skew: p50 gap between the legs' responses")
+    print("Presigned: share of orders sent pre-signed (pre-signed mode rounds sizes down to the EXECUTION_PRESIGN_RUNGS ladder)")
+    stats = api.get_stats()
+    print(f"Orders: {stats['orders']} | Filled: {stats['filled_orders']} | Rejected: {stats['rejected_orders']}")
+
+
+if __name__ == "__main__":
+    main()
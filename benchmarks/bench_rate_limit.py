@@ -0,0 +1,150 @@
+"""
+Benchmark: client rate limiting against a throttling API
+
+Runs async sweeps against the local fake Gamma/CLOB server with a server-side
+rate limit and compares: no limiter, retries only, a fixed limiter set above
+the server limit, and the adaptive (AIMD) limiter. Reports markets refreshed
+per second, HTTP 429s received and markets lost per sweep after retries.
+
+Usage:
+    python3 benchmarks/bench_rate_limit.py [--markets N] [--server-limit R] [--ceiling C] [--duration S]
+"""
+import io
+import os
+import sys
+import time
+import asyncio
+import argparse
+import contextlib
+from typing import Dict, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ENABLE_DATA_LOGGING", "false")
+os.environ["PRIVATE_KEY"] = ""
+
+from bot import PolyArbitrageBot
+from scanner import AsyncScanner
+from http_client import HttpClient
+from rate_limiter import AdaptiveRateLimiter, RetryQueue
+from fake_polymarket import FakePolymarketHTTPServer
+
+# name -> (limiter ceiling multiplier (None = no limiter), adaptive, retries)
+STRATEGIES = {
+    "none": (None, False, 0),
+    "retry": (None, False, 3),
+    "static": (1.0, False, 3),
+    "adaptive": (1.0, True, 3)
+}
+
+
+class CountingBot(PolyArbitrageBot):
+    """Bot that counts recorded market updates"""
+
+    def __init__(self, market_ids, api_url: str):
+        super().__init__(market_ids=market_ids)
+        self.gamma_url = api_url
+        self.clob_url = api_url
+        self.updates = 0
+
+    def record_prices(self, market_id, prices, market_question="", orderbook=None):
+        self.updates += 1
+        super().record_prices(market_id, prices, market_question, orderbook)
+
+
+async def run_sweeps(bot: CountingBot, seconds: float, concurrency: int) -> Dict[str, Any]:
+    questions = {market_id: "" for market_id in bot.market_ids}
+    scanner = AsyncScanner(bot, max_concurrency=concurrency)
+    try:
+        # Warm-up sweep learns token IDs (not timed)
+        await scanner.sweep(bot.market_ids, questions)
+        bot.updates = 0
+        sweeps = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            await scanner.sweep(bot.market_ids, questions)
+            sweeps += 1
+        return {'sweeps': sweeps, 'elapsed': time.perf_counter() - start}
+    finally:
+        scanner.close()
+
+
+def run_strategy(name: str, args, api: FakePolymarketHTTPServer) -> Dict[str, Any]:
+    multiplier, adaptive, retries = STRATEGIES[name]
+    bot = CountingBot(list(api.markets), api.url)
+    bot.http.close()
+    bot.http = HttpClient(pool_maxsize=args.concurrency, rate_limits={})
+    if multiplier is not None:
+        # Each API gets the full ceiling, as when the limits are configured from the docs
+        bot.http.limiters = {
+            endpoint: AdaptiveRateLimiter(endpoint, args.ceiling * multiplier, adaptive=adaptive)
+            for endpoint in ('gamma', 'clob')
+        }
+    bot.retry_queue = RetryQueue(max_attempts=retries)
+
+    before = api.get_stats()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = asyncio.run(run_sweeps(bot, args.duration, args.concurrency))
+    after = api.get_stats()
+    bot.http.close()
+
+    expected = run['sweeps'] * len(bot.market_ids)
+    requests_sent = after['total_requests'] - before['total_requests']
+    return {
+        'markets_per_sec': bot.updates / run['elapsed'],
+        'sweep_time': run['elapsed'] / run['sweeps'] if run['sweeps'] else 0.0,
+        'requests_per_sec': requests_sent / run['elapsed'],
+        'throttled': after['throttled'] - before['throttled'],
+        'throttle_rate': (after['throttled'] - before['throttled']) / requests_sent if requests_sent else 0.0,
+        'lost_per_sweep': (expected - bot.updates) / run['sweeps'] if run['sweeps'] else 0.0,
+        'final_rates': {endpoint: limiter.rate for endpoint, limiter in bot.http.limiters.items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter benchmark against a throttling fake API")
+    parser.add_argument('--markets', type=int, default=200, help='Simulated markets (default: 200)')
+    parser.add_argument('--server-limit', type=float, default=150, help='Server requests per second before 429 (default: 150)')
+    parser.add_argument('--ceiling', type=float, default=200, help='Client limiter ceiling per API (default: 200)')
+    parser.add_argument('--latency', type=float, default=0.01, help='Server delay per request in seconds (default: 0.01)')
+    parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight (default: 50)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Timed sweeps per strategy in seconds (default: 10)')
+    parser.add_argument('--strategies', default=",".join(STRATEGIES), help='Comma-separated strategies to run')
+    args = parser.parse_args()
+
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategy(s): {', '.join(unknown)}")
+
+    print("=" * 88)
+    print(f"Rate limit benchmark ({args.markets} markets, server limit {args.server_limit:.0f} req/s, "
+          f"client ceiling {args.ceiling:.0f}/s per API, concurrency {args.concurrency})")
+    print("=" * 88)
+    print(f"{'Strategy':<10} {'Markets/s':>10} {'Sweep (s)':>10} {'Req/s':>8} {'429s':>8} "
+          f"{'429 rate':>9} {'Lost/sweep':>11} {'Final rate':>12}")
+    print("-" * 88)
+
+    for name in strategies:
+        # Fresh server per strategy so throttling state does not carry over
+        api = FakePolymarketHTTPServer(
+            num_markets=args.markets,
+            latency=args.latency,
+            seed=42,
+            rate_limit=args.server_limit
+        )
+        api.start()
+        try:
+            result = run_strategy(name, args, api)
+        finally:
+            api.stop()
+        rates = "/".join(f"{rate:.0f}" for rate in result['final_rates'].values()) or "-"
+        print(f"{name:<10} {result['markets_per_sec']:>10,.1f} {result['sweep_time']:>10.2f} "
+              f"{result['requests_per_sec']:>8.1f} {result['throttled']:>8} {result['throttle_rate']*100:>8.1f}% "
+              f"{result['lost_per_sweep']:>11.1f} {rates:>12}")
+
+    print("-" * 88)
+    print("Final rate: gamma/clob limiter rate after the run (cost units per second)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Benchmark: scan mode throughput against the local fake Gamma/CLOB servers
+
+Runs serial, async, bulk, priority and stream scans over the same simulated
+markets and reports sweep time, markets/sec, p50/p99 per-market latency and
+the data logger ingest rate. Polling latency runs from the first request for
+a market to its prices being recorded; stream latency runs from the server
+event timestamp to the record. Priority mode runs for --duration seconds
+under POLL_BUDGET and also prints its per-tier refresh rates.
+
+Usage:
+    python3 benchmarks/bench_scan_modes.py [--markets N] [--latency S] [--error-rate F] [--modes serial,async,bulk,priority,stream]
+"""
+import io
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="bench_scan_"))
+os.environ.setdefault("ENABLE_DATA_LOGGING", "true")
+os.environ["PRIVATE_KEY"] = ""
+# Scan modes are compared unthrottled (see bench_rate_limit.py for the limiter)
+os.environ.setdefault("GAMMA_RATE_LIMIT", "0")
+os.environ.setdefault("CLOB_RATE_LIMIT", "0")
+
+from bot import PolyArbitrageBot
+from scanner import AsyncScanner
+from ws_feed import MarketFeed
+from data_logger import DataLogger
+from config import CSV_LOG_FILE, DB_LOG_FILE, MAX_CONCURRENT_REQUESTS, BULK_PAGE_SIZE
+from fake_polymarket import FakeMarketChannelServer, FakePolymarketHTTPServer
+from scheduler import PollScheduler, TICK_INTERVAL
+
+MODES = ("serial", "async", "bulk", "priority", "stream")
+
+
+class BenchBot(PolyArbitrageBot):
+    """Bot that records per-market latency between the first request and record_prices"""
+
+    def __init__(self, market_ids: List[str], api_url: str):
+        super().__init__(market_ids=market_ids)
+        self.gamma_url = api_url
+        self.clob_url = api_url
+        self.latencies: List[float] = []
+        self.warmup_rows = 0
+        self._started: Dict[str, float] = {}
+
+    def get_market_data(self, market_id: str) -> Optional[Dict[str, Any]]:
+        self._started[market_id] = time.perf_counter()
+        return super().get_market_data(market_id)
+
+    def get_markets_by_ids(self, market_ids: List[str]) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        for market_id in market_ids:
+            self._started[market_id] = start
+        return super().get_markets_by_ids(market_ids)
+
+    def record_prices(self, market_id, prices, market_question="", orderbook=None):
+        if self.scan_mode == "stream":
+            timestamp = max(orderbook['Yes'].timestamp, orderbook['No'].timestamp)
+            self.latencies.append(time.time() - timestamp / 1000)
+        else:
+            start = self._started.pop(market_id, None)
+            if start is not None:
+                self.latencies.append(time.perf_counter() - start)
+        super().record_prices(market_id, prices, market_question, orderbook)
+
+
+async def run_polling(bot: BenchBot, mode: str, sweeps: int, concurrency: int) -> List[float]:
+    """Warm-up sweep (learns token IDs) followed by timed sweeps"""
+    questions = {market_id: "" for market_id in bot.market_ids}
+    scanner = AsyncScanner(bot, max_concurrency=concurrency)
+    try:
+        sweep_times = []
+        for i in range(sweeps + 1):
+            start = time.perf_counter()
+            if mode == "serial":
+                for market_id in bot.market_ids:
+                    bot.monitor_market(market_id)
+            elif mode == "bulk":
+                await scanner.bulk_sweep(bot.market_ids, questions)
+            else:
+                await scanner.sweep(bot.market_ids, questions)
+            if i == 0:
+                bot.latencies.clear()
+                if bot.logger:
+                    bot.logger.flush()
+                    bot.warmup_rows = bot.logger.get_writer_stats()['rows_written']
+            else:
+                sweep_times.append(time.perf_counter() - start)
+        return sweep_times
+    finally:
+        scanner.close()
+
+
+async def run_priority(bot: BenchBot, seconds: float, concurrency: int):
+    """Scheduler-driven polling for a fixed duration"""
+    bot.scheduler = PollScheduler(threshold=1.0 - bot.min_profit_margin)
+    for market_id in bot.market_ids:
+        bot.scheduler.add(market_id)
+    scanner = AsyncScanner(bot, max_concurrency=concurrency)
+    deadline = time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            start = time.monotonic()
+            due = bot.scheduler.take()
+            if due:
+                await scanner.sweep(due, {})
+            await asyncio.sleep(max(0.0, TICK_INTERVAL - (time.monotonic() - start)))
+    finally:
+        scanner.close()
+
+
+async def run_stream(bot: BenchBot, channel: FakeMarketChannelServer, seconds: float):
+    await channel.start()
+    try:
+        feed = MarketFeed(bot, channel.market_tokens, url=channel.url, snapshot_fetcher=channel.book_snapshot)
+        await feed.run(duration=seconds)
+    finally:
+        await channel.stop()
+
+
+def run_mode(mode: str, args, api: FakePolymarketHTTPServer, channel: FakeMarketChannelServer) -> Dict[str, Any]:
+    bot = BenchBot(list(api.markets), api.url)
+    bot.scan_mode = mode
+    bot.bulk_page_size = args.page_size
+    requests_before = api.get_stats()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "stream":
+            asyncio.run(run_stream(bot, channel, args.duration))
+            sweep_times = []
+        elif mode == "priority":
+            asyncio.run(run_priority(bot, args.duration, args.concurrency))
+            sweep_times = []
+        else:
+            sweep_times = asyncio.run(run_polling(bot, mode, args.sweeps, args.concurrency))
+        elapsed = time.perf_counter() - start
+        if bot.logger:
+            bot.logger.close()
+    bot.http.close()
+
+    requests_after = api.get_stats()
+    # Rows from the warm-up sweep are not part of the timed run
+    rows = bot.logger.get_writer_stats()['rows_written'] - bot.warmup_rows if bot.logger else 0
+    timed = sum(sweep_times) if sweep_times else elapsed
+    updates = len(bot.latencies)
+    latencies = np.array(bot.latencies) * 1000 if bot.latencies else np.zeros(1)
+
+    return {
+        'mode': mode,
+        'tiers': bot.scheduler.tier_stats() if bot.scheduler is not None else None,
+        'sweep_time': float(np.mean(sweep_times)) if sweep_times else None,
+        'markets_per_sec': updates / timed if timed else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'requests': requests_after['total_requests'] - requests_before['total_requests'],
+        'errors': requests_after['errors'] - requests_before['errors'],
+        'rows_per_sec': rows / timed if timed else 0.0
+    }
+
+
+def bench_logger_ingest(rows: int) -> Dict[str, float]:
+    """Enqueue rate and write-through rate of a standalone DataLogger"""
+    logger = DataLogger(CSV_LOG_FILE, DB_LOG_FILE, queue_size=rows + 1)
+    start = time.perf_counter()
+    for i in range(rows):
+        yes = 0.3 + (i % 40) / 100
+        logger.log_price_data(
+            market_id=str(500000 + i % 1000),
+            market_question="",
+            yes_price=yes,
+            no_price=1.0 - yes - 0.005,
+            yes_ask=yes + 0.01,
+            no_ask=1.0 - yes,
+            yes_bid=yes - 0.01,
+            no_bid=1.0 - yes - 0.02
+        )
+    enqueued = time.perf_counter() - start
+    logger.close()
+    written = time.perf_counter() - start
+    return {'enqueue_rate': rows / enqueued, 'write_rate': rows / written}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan mode throughput benchmark")
+    parser.add_argument('--markets', type=int, default=200, help='Simulated markets (default: 200)')
+    parser.add_argument('--latency', type=float, default=0.01, help='Server delay per request in seconds (default: 0.01)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Additional random server delay in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--sweeps', type=int, default=3, help='Timed sweeps per polling mode (default: 3)')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENT_REQUESTS, help='Requests in flight for async/bulk')
+    parser.add_argument('--page-size', type=int, default=BULK_PAGE_SIZE, help='Markets per listing request in bulk mode')
+    parser.add_argument('--duration', type=float, default=5.0, help='Priority and stream mode duration in seconds (default: 5)')
+    parser.add_argument('--update-interval', type=float, default=0.001, help='Delay between stream events (default: 0.001)')
+    parser.add_argument('--modes', default=",".join(MODES), help='Comma-separated modes to run')
+    parser.add_argument('--ingest-rows', type=int, default=100000, help='Rows for the logger ingest benchmark (0 = skip)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    channel = FakeMarketChannelServer(num_markets=args.markets, update_interval=args.update_interval, seed=args.seed)
+    api = FakePolymarketHTTPServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        markets=channel.markets
+    )
+    api.start()
+
+    print("=" * 92)
+    print(f"Scan mode benchmark ({args.markets} markets, {args.latency*1000:.0f}ms latency, "
+          f"{args.error_rate*100:.1f}% errors, concurrency {args.concurrency})")
+    print("=" * 92)
+    print(f"{'Mode':<8} {'Sweep (s)':>10} {'Markets/s':>11} {'p50 (ms)':>10} {'p99 (ms)':>10} "
+          f"{'Requests':>10} {'Errors':>8} {'Rows/s logged':>14}")
+    print("-" * 92)
+
+    tiers = None
+    try:
+        for mode in modes:
+            result = run_mode(mode, args, api, channel)
+            sweep = f"{result['sweep_time']:.3f}" if result['sweep_time'] is not None else "-"
+            print(f"{mode:<8} {sweep:>10} {result['markets_per_sec']:>11,.0f} {result['p50_ms']:>10.2f} "
+                  f"{result['p99_ms']:>10.2f} {result['requests']:>10} {result['errors']:>8} {result['rows_per_sec']:>14,.0f}")
+            tiers = result['tiers'] or tiers
+    finally:
+        api.stop()
+
+    if tiers:
+        print("-" * 92)
+        print("Priority refresh rate by tier (per market): " + " | ".join(
+            f"{tier} {stats['markets']} markets {stats['effective_rate']:.2f}/s (target {stats['target_rate']:.2f}/s)"
+            for tier, stats in tiers.items()
+        ))
+
+    if args.ingest_rows > 0:
+        ingest = bench_logger_ingest(args.ingest_rows)
+        print("-" * 92)
+        print(f"Logger ingest ({args.ingest_rows:,} rows): {ingest['enqueue_rate']:,.0f} rows/sec enqueued, "
+              f"{ingest['write_rate']:,.0f} rows/sec written")
+    print(f"Logs: {os.path.dirname(DB_LOG_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
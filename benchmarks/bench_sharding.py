@@ -0,0 +1,131 @@
+"""
+Benchmark: sharded scanning across local worker processes
+
+Starts the local fake Gamma/CLOB server, a ShardCoordinator and N local
+worker processes, and reports markets refreshed per second at the
+coordinator for each worker count. Also reports how evenly the consistent
+hash ring spreads markets and what fraction moves when a worker joins.
+
+Usage:
+    python3 benchmarks/bench_sharding.py [--markets N] [--latency S] [--workers 1,2,4] [--duration S]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from typing import Dict, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="bench_shard_"))
+os.environ.setdefault("ENABLE_DATA_LOGGING", "false")
+os.environ["PRIVATE_KEY"] = ""
+os.environ.setdefault("GAMMA_RATE_LIMIT", "0")
+os.environ.setdefault("CLOB_RATE_LIMIT", "0")
+
+from bot import PolyArbitrageBot
+from sharding import HashRing, ShardCoordinator
+from fake_polymarket import FakePolymarketHTTPServer
+
+
+def ring_balance(keys: int, nodes: int, replicas: int) -> Dict[str, float]:
+    """Largest share relative to a perfect split, and keys moved when one node joins"""
+    ring = HashRing([f"worker-{i}" for i in range(nodes)], replicas=replicas)
+    ids = [str(500000 + i) for i in range(keys)]
+    before = {key: ring.node_for(key) for key in ids}
+    counts = [len(owned) for owned in ring.assign(ids).values()]
+    ring.add(f"worker-{nodes}")
+    moved = sum(1 for key in ids if ring.node_for(key) != before[key])
+    return {
+        'max_share': max(counts) / (keys / nodes),
+        'moved': moved / keys,
+        'ideal_moved': 1 / (nodes + 1)
+    }
+
+
+def run_workers(api: FakePolymarketHTTPServer, workers: int, seconds: float) -> Dict[str, Any]:
+    bot = PolyArbitrageBot(market_ids=list(api.markets))
+    bot.gamma_url = api.url
+    bot.clob_url = api.url
+    coordinator = ShardCoordinator(bot, address="127.0.0.1:0")
+    with contextlib.redirect_stdout(io.StringIO()):
+        coordinator.start()
+        coordinator.spawn(workers)
+        try:
+            # Wait for every worker to join and finish its first (token-learning) sweep
+            deadline = time.monotonic() + 120
+            while time.monotonic() < deadline:
+                coordinator.poll()
+                stats = coordinator.get_worker_stats()
+                if len(stats) == workers and all(s['sweeps'] > 0 for s in stats.values()):
+                    break
+
+            rows_before = coordinator.stats['rows']
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                coordinator.poll(timeout=0.1)
+            elapsed = time.perf_counter() - start
+            rows = coordinator.stats['rows'] - rows_before
+            stats = coordinator.get_worker_stats()
+        finally:
+            coordinator.stop()
+            bot.http.close()
+    return {
+        'markets_per_sec': rows / elapsed,
+        'sweep_time': max((s['last_sweep_time'] for s in stats.values()), default=0.0),
+        'joined': len(stats)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded scanning benchmark with local worker processes")
+    parser.add_argument('--markets', type=int, default=400, help='Simulated markets (default: 400)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Server delay per request in seconds (default: 0.02)')
+    parser.add_argument('--workers', default="1,2,4", help='Comma-separated worker counts (default: 1,2,4)')
+    parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight per worker (default: 10)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Timed seconds per worker count (default: 10)')
+    parser.add_argument('--replicas', type=int, default=100, help='Virtual nodes per worker for the ring report (default: 100)')
+    args = parser.parse_args()
+
+    counts = [int(n) for n in args.workers.split(",") if n.strip()]
+
+    print("=" * 64)
+    print(f"Consistent hash ring ({args.markets} markets, {args.replicas} virtual nodes per worker)")
+    print("=" * 64)
+    print(f"{'Workers':>8} {'Max share':>12} {'Moved on join':>15} {'Ideal':>8}")
+    for n in counts:
+        balance = ring_balance(args.markets, n, args.replicas)
+        print(f"{n:>8} {balance['max_share']:>11.2f}x {balance['moved']*100:>14.1f}% {balance['ideal_moved']*100:>7.1f}%")
+
+    api = FakePolymarketHTTPServer(num_markets=args.markets, latency=args.latency, seed=42)
+    api.start()
+    # Spawned workers read their settings from the environment
+    os.environ["GAMMA_API_URL"] = api.url
+    os.environ["CLOB_API_URL"] = api.url
+    os.environ["MAX_CONCURRENT_REQUESTS"] = str(args.concurrency)
+    os.environ["SCAN_INTERVAL"] = "0"
+
+    print()
+    print("=" * 64)
+    print(f"Sharded scan ({args.markets} markets, {args.latency*1000:.0f}ms latency, "
+          f"{args.concurrency} requests in flight per worker)")
+    print("=" * 64)
+    print(f"{'Workers':>8} {'Markets/s':>12} {'Sweep (s)':>12} {'Speedup':>10}")
+    print("-" * 64)
+    baseline = None
+    try:
+        for n in counts:
+            result = run_workers(api, n, args.duration)
+            baseline = baseline or result['markets_per_sec']
+            print(f"{n:>8} {result['markets_per_sec']:>12,.1f} {result['sweep_time']:>12.2f} "
+                  f"{result['markets_per_sec'] / baseline:>9.2f}x")
+    finally:
+        api.stop()
+    print("-" * 64)
+    print("Sweep: slowest worker's last sweep over its share")
+
+
+if __name__ == "__main__":
+    main()
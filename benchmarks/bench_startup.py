@@ -0,0 +1,97 @@
+"""
+Benchmark: startup time, peak RSS and heavy imports per entry point
+
+Starts a fresh interpreter per entry point and measures the time to import
+it and build the bot (where there is one), the peak resident set size, and
+which heavy optional dependencies (web3, eth_account, pandas) got loaded.
+With --check it exits non-zero if a data-only entry point loads a trading
+dependency or an entry point exceeds --max-ms, so it can guard against
+import regressions.
+
+Usage:
+    python3 benchmarks/bench_startup.py [--repeat N] [--check] [--max-ms MS]
+"""
+import os
+import sys
+import json
+import secrets
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('web3', 'eth_account', 'pandas')
+
+# name -> (code to time, data-only (must not load trading dependencies), needs a wallet key)
+ENTRY_POINTS = {
+    "collect": ("import collect; collect.PolyArbitrageBot(enable_logging=False, connect_wallet=False)", True, False),
+    "bot (no key)": ("import bot; bot.PolyArbitrageBot(enable_logging=False)", True, False),
+    "shard worker": ("import sharding; sharding.ShardBot()", True, False),
+    "analyze_data": ("import analyze_data", True, False),
+    "bot (wallet)": ("import bot; bot.PolyArbitrageBot(enable_logging=False)", False, True)
+}
+
+CHILD = """
+import sys, time, json, resource
+start = time.perf_counter()
+exec({code!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'ms': elapsed * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy': [m for m in {heavy!r} if m in sys.modules]
+}}))
+"""
+
+
+def measure(code: str, wallet: bool) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.update({
+        'PRIVATE_KEY': '0x' + secrets.token_hex(32) if wallet else '',
+        'ENABLE_DATA_LOGGING': 'false',
+        'LOG_DIR': tempfile.gettempdir(),
+        'PYTHONDONTWRITEBYTECODE': '1'
+    })
+    child = CHILD.format(code=code, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, '-c', child], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # The bot prints status lines; the measurement is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time / RSS benchmark per entry point")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per entry point, median reported (default: 3)')
+    parser.add_argument('--check', action='store_true', help='Fail on trading imports in data-only entry points')
+    parser.add_argument('--max-ms', type=float, default=0.0, help='With --check, fail above this startup time (0 = no limit)')
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print(f"Startup cost per entry point (median of {args.repeat} fresh interpreters)")
+    print("=" * 72)
+    print(f"{'Entry point':<14} {'Startup':>10} {'Peak RSS':>10}  Heavy modules loaded")
+    print("-" * 72)
+    failures = []
+    for name, (code, data_only, wallet) in ENTRY_POINTS.items():
+        runs = sorted((measure(code, wallet) for _ in range(args.repeat)), key=lambda r: r['ms'])
+        result = runs[len(runs) // 2]
+        print(f"{name:<14} {result['ms']:>8.0f}ms {result['rss_mb']:>8.1f}MB  {', '.join(result['heavy']) or '-'}")
+        if data_only and result['heavy']:
+            failures.append(f"{name} loads {', '.join(result['heavy'])}")
+        if args.max_ms and result['ms'] > args.max_ms:
+            failures.append(f"{name} starts in {result['ms']:.0f}ms (limit {args.max_ms:.0f}ms)")
+    print("-" * 72)
+
+    if args.check:
+        for failure in failures:
+            print(f"[✗] {failure}")
+        if failures:
+            sys.exit(1)
+        print("[✓] Data-only entry points load no trading dependencies")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,11 @@ GitHub: apemoonspin
 Twitter: @apemoonspin
 """
 import time
-import requests
+import json
 import asyncio
-from typing import Optional, List, Dict, Any
+from queue import Queue, Empty
+from typing import Optional, List, Dict, Any, Tuple, Set
 from datetime import datetime
-from web3 import Web3
-from eth_account import Account
 
 from config import (
     GAMMA_API_URL,
@@ -21,114 +20,335 @@ from config import (
     MIN_PROFIT_MARGIN,
     SCAN_INTERVAL,
     MAX_MARKETS_TO_MONITOR,
+    SCAN_MODE,
+    MAX_CONCURRENT_REQUESTS,
+    BULK_PAGE_SIZE,
+    NEAR_THRESHOLD_BAND,
+    PRICE_MAX_AGE,
     PRIVATE_KEY,
     POLYGON_RPC_URL,
     ENABLE_DATA_LOGGING,
     CSV_LOG_FILE,
     DB_LOG_FILE,
     MIN_TRADE_SIZE,
-    MAX_SLIPPAGE
+    MAX_SLIPPAGE,
+    METRICS_HOST,
+    METRICS_PORT,
+    STATS_REPORT_INTERVAL,
+    SHARD_WORKERS,
+    HTTP_READ_TIMEOUT
 )
 from data_logger import DataLogger
+from orderbook import OrderBook, ArbitrageSize, size_parity_arbitrage
+from price_table import PriceTable
+from http_client import HttpClient
+from rate_limiter import RetryQueue
+from scanner import AsyncScanner
+from metrics import BotMetrics, MetricsServer, PeriodicReporter
+from scheduler import PollScheduler, parse_end_date, TICK_INTERVAL
+from discovery import MarketDiscovery
+from market_cache import MarketIndex
+from events import EventScanner, EventOpportunity
 
 
 class PolyArbitrageBot:
     """Polymarket Arbitrage Bot"""
     
-    def __init__(self, market_ids: Optional[List[str]] = None):
+    def __init__(
+        self,
+        market_ids: Optional[List[str]] = None,
+        enable_logging: bool = ENABLE_DATA_LOGGING,
+        connect_wallet: bool = True
+    ):
         """
         Args:
             market_ids: List of market IDs to monitor. If None, automatically discovers active markets
+            enable_logging: Save price data (defaults to ENABLE_DATA_LOGGING)
+            connect_wallet: Connect the PRIVATE_KEY wallet for trading
         """
         self.market_ids = market_ids or []
         self.min_profit_margin = MIN_PROFIT_MARGIN
+        self.max_slippage = MAX_SLIPPAGE
         self.scan_interval = SCAN_INTERVAL
+        self.scan_mode = SCAN_MODE
+        self.max_concurrent_requests = MAX_CONCURRENT_REQUESTS
+        self.bulk_page_size = BULK_PAGE_SIZE
+        self.near_threshold_band = NEAR_THRESHOLD_BAND
+        
+        # market_id -> {'Yes': token_id, 'No': token_id}, learned from Gamma market data
+        self.market_tokens: Dict[str, Dict[str, str]] = {}
+        self.market_questions: Dict[str, str] = {}
+        # Markets traded on the neg-risk exchange (orders are signed for it)
+        self.neg_risk_markets: Set[str] = set()
+        # market_id -> integer handle used on the logging path
+        self.markets = MarketIndex()
+        
+        # Latest prices for every market (vectorized detection) and the books they came from
+        self.price_table = PriceTable(capacity=max(len(self.market_ids), MAX_MARKETS_TO_MONITOR))
+        self.orderbooks: Dict[str, Dict[str, OrderBook]] = {}
+        self.price_max_age = PRICE_MAX_AGE
+        
+        # Refresh priorities (SCAN_MODE=priority only)
+        self.scheduler: Optional[PollScheduler] = None
+        
+        # Worker coordination (SCAN_MODE=sharded only)
+        self.coordinator = None
+        
+        # Shared keep-alive HTTP client for all API calls
+        self.http = HttpClient()
+        self.gamma_url = GAMMA_API_URL
+        self.clob_url = CLOB_API_URL
+        
+        # Markets (or listing pages) re-polled within a sweep after a throttled/failed request
+        self.retry_queue = RetryQueue()
+        
+        # Market universe listing; background refreshes queue (added, removed) diffs
+        self.discovery = MarketDiscovery(self)
+        self._universe_updates: Queue = Queue()
+        
+        # Neg-risk multi-outcome events scanned as baskets (EVENT_SCAN_INTERVAL > 0)
+        self.events = EventScanner(self)
         
         # Initialize data logger
         self.logger = None
-        if ENABLE_DATA_LOGGING:
-            self.logger = DataLogger(CSV_LOG_FILE, DB_LOG_FILE)
+        if enable_logging:
+            self.logger = DataLogger(CSV_LOG_FILE, DB_LOG_FILE, markets=self.markets)
+        
+        # Per-stage latency histograms and counters (served on METRICS_PORT)
+        self.metrics = BotMetrics()
+        self._register_metrics()
         
-        # Initialize Web3 (for actual trading)
-        self.web3 = None
+        # Initialize wallet (for actual trading); the Web3 provider is created on first use.
+        # eth_account/web3 are only imported here so data-only runs never load them
+        self._web3 = None
         self.account = None
-        if PRIVATE_KEY:
+        self.execution = None
+        if PRIVATE_KEY and connect_wallet:
             try:
-                self.web3 = Web3(Web3.HTTPProvider(POLYGON_RPC_URL))
+                from eth_account import Account
+                from execution import ExecutionEngine, OrderSigner
+                
                 self.account = Account.from_key(PRIVATE_KEY)
+                self.execution = ExecutionEngine(self, OrderSigner(self.account))
                 print(f"[✓] Wallet connected: {self.account.address}")
             except Exception as e:
                 print(f"[!] Web3 initialization failed: {e}")
                 print("[!] Running in data logging mode only.")
     
+    @property
+    def web3(self):
+        """Polygon RPC client (web3.Web3) over the shared keep-alive HTTP session (None without a wallet)"""
+        if self._web3 is None and self.account is not None:
+            from web3 import Web3
+            
+            self._web3 = Web3(Web3.HTTPProvider(
+                POLYGON_RPC_URL,
+                session=self.http.requests_session(),
+                request_kwargs={'timeout': HTTP_READ_TIMEOUT}
+            ))
+        return self._web3
+    
+    def _register_metrics(self):
+        """Expose update ages, logger and HTTP counters alongside the stage metrics"""
+        self.metrics.update_age.collector = lambda: {
+            (market_id,): age for market_id, age in self.price_table.ages().items()
+        }
+        self.metrics.registry.gauge(
+            'polymarket_scheduler_refresh_rate', 'Effective refreshes per second per market by priority tier', ('tier',)
+        ).collector = lambda: {
+            (tier,): stats['effective_rate'] for tier, stats in self.scheduler.tier_stats().items()
+        } if self.scheduler is not None else {}
+        self.metrics.gauge(
+            'polymarket_monitored_markets', 'Markets in the scan set',
+            lambda: len(self.market_ids)
+        )
+        self.metrics.registry.gauge(
+            'polymarket_shard_markets', 'Markets assigned per shard worker', ('worker',)
+        ).collector = lambda: {
+            (name,): stats['markets'] for name, stats in self.coordinator.get_worker_stats().items()
+        } if self.coordinator is not None else {}
+        self.metrics.gauge(
+            'polymarket_http_requests_total', 'HTTP requests sent',
+            lambda: self.http.get_stats()['requests']
+        )
+        self.metrics.registry.gauge(
+            'polymarket_rate_limit', 'Current rate limit by API (cost units per second)', ('endpoint',)
+        ).collector = lambda: {(name,): limiter.rate for name, limiter in self.http.limiters.items()}
+        self.metrics.registry.counter(
+            'polymarket_throttled_total', 'Throttled responses (HTTP 429) by API', ('endpoint',)
+        ).collector = lambda: {(name,): limiter.throttled for name, limiter in self.http.limiters.items()}
+        self.metrics.registry.counter(
+            'polymarket_retries_total', 'Sweep retries by outcome', ('result',)
+        ).collector = lambda: {
+            ('recovered',): self.retry_queue.recovered,
+            ('dropped',): self.retry_queue.dropped
+        }
+        if self.logger:
+            self.metrics.gauge(
+                'polymarket_log_rows_written_total', 'Rows written by the data logger',
+                lambda: self.logger.get_writer_stats()['rows_written']
+            )
+            self.metrics.gauge(
+                'polymarket_log_rows_dropped_total', 'Rows dropped by the data logger (queue full)',
+                lambda: self.logger.get_writer_stats()['rows_dropped']
+            )
+            self.metrics.gauge(
+                'polymarket_log_queue_depth', 'Rows waiting for the data logger',
+                lambda: self.logger.get_writer_stats()['queue_depth']
+            )
+    
     def get_active_markets(self, limit: int = MAX_MARKETS_TO_MONITOR) -> List[Dict[str, Any]]:
-        """Query active market list"""
+        """Query active markets: every listing page, filtered and ranked by volume (see discovery.py)"""
+        self.discovery.max_markets = limit
+        markets = self.discovery.discover()
+        if markets and self.discovery.warm_start:
+            print(f"[✓] Loaded {self.discovery.stats['listed']} active markets from the market cache "
+                  f"({self.discovery.cache.age():.0f}s old), monitoring {len(markets)}")
+        elif markets:
+            print(f"[✓] Found {self.discovery.stats['listed']} active markets, monitoring {len(markets)}")
+        return markets
+    
+    def get_markets_by_ids(self, market_ids: List[str]) -> List[Dict[str, Any]]:
+        """Query one page of full Gamma market listings (including prices) for the given IDs"""
         try:
-            # Query active markets via Gamma API
             params = {
-                'active': 'true',
-                'closed': 'false',
-                'limit': limit
+                'id': market_ids,
+                'limit': len(market_ids)
             }
-            response = requests.get(f"{GAMMA_API_URL}/markets", params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            with self.metrics.stage('http_listing'):
+                response = self.http.get(f"{self.gamma_url}/markets", params=params, timeout=10, endpoint='gamma')
+                response.raise_for_status()
+            with self.metrics.stage('json'):
+                data = response.json()
             
             # API response may be returned directly as a list
             if isinstance(data, dict):
-                market_list = data.get('data', [])
-            else:
-                market_list = data
-            
-            markets = []
-            for market in market_list:
-                # Handle default values if active and closed fields are missing
-                is_active = market.get('active', True)
-                is_closed = market.get('closed', False)
-                
-                if is_active and not is_closed:
-                    markets.append({
-                        'id': str(market.get('id', '')),
-                        'question': market.get('question', ''),
-                        'slug': market.get('slug', '')
-                    })
-            
-            print(f"[✓] Found {len(markets)} active markets")
-            return markets[:limit]
+                return data.get('data', [])
+            return data
         
         except Exception as e:
-            print(f"[✗] Failed to query market list: {e}")
+            self.metrics.error('http_listing')
+            print(f"[✗] Failed to query market listing page ({len(market_ids)} markets): {e}")
             return []
     
-    def get_market_orderbook(self, market_id: str) -> Optional[Dict[str, Any]]:
-        """Query market orderbook data (CLOB API)"""
+    def get_market_orderbook(
+        self,
+        market_id: str,
+        token_ids: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, OrderBook]]:
+        """Query Yes/No orderbooks for a market in one request (CLOB API)"""
+        token_ids = token_ids or self.market_tokens.get(market_id)
+        if not token_ids or 'Yes' not in token_ids or 'No' not in token_ids:
+            return None
+        
         try:
-            # Query orderbook via CLOB API
-            response = requests.get(
-                f"{CLOB_API_URL}/book",
-                params={'market': market_id},
-                timeout=5
-            )
-            response.raise_for_status()
-            return response.json()
+            # Query both outcome books via CLOB batch endpoint
+            with self.metrics.stage('http_books'):
+                response = self.http.post(
+                    f"{self.clob_url}/books",
+                    json=[{'token_id': token_ids['Yes']}, {'token_id': token_ids['No']}],
+                    timeout=5,
+                    endpoint='clob',
+                    cost=2
+                )
+                response.raise_for_status()
+            with self.metrics.stage('json'):
+                snapshots = {str(book.get('asset_id')): book for book in response.json()}
+            
+            books = {}
+            for outcome in ('Yes', 'No'):
+                snapshot = snapshots.get(token_ids[outcome])
+                if snapshot is None:
+                    return None
+                books[outcome] = OrderBook.from_snapshot(
+                    snapshot.get('bids') or [],
+                    snapshot.get('asks') or [],
+                    int(snapshot.get('timestamp') or 0)
+                )
+            return books
         
         except Exception as e:
+            self.metrics.error('http_books')
             print(f"[✗] Failed to query orderbook ({market_id}): {e}")
             return None
     
+    def get_token_orderbook(self, token_id: str) -> Optional[Dict[str, Any]]:
+        """Query orderbook snapshot for a single outcome token (CLOB API)"""
+        try:
+            with self.metrics.stage('http_book'):
+                response = self.http.get(
+                    f"{self.clob_url}/book",
+                    params={'token_id': token_id},
+                    timeout=5,
+                    endpoint='clob'
+                )
+                response.raise_for_status()
+            with self.metrics.stage('json'):
+                return response.json()
+        
+        except Exception as e:
+            self.metrics.error('http_book')
+            print(f"[✗] Failed to query orderbook (token {token_id}): {e}")
+            return None
+    
+    def get_market_data(self, market_id: str) -> Optional[Dict[str, Any]]:
+        """Query market information (Gamma API)"""
+        try:
+            with self.metrics.stage('http_market'):
+                response = self.http.get(
+                    f"{self.gamma_url}/markets/{market_id}",
+                    timeout=5,
+                    endpoint='gamma'
+                )
+                response.raise_for_status()
+            with self.metrics.stage('json'):
+                return response.json()
+        
+        except Exception as e:
+            self.metrics.error('http_market')
+            print(f"[✗] Failed to query prices ({market_id}): {e}")
+            return None
+    
     def get_market_prices(self, market_id: str) -> Optional[Dict[str, float]]:
         """Query Yes/No ticket prices for a market"""
+        with self.metrics.stage('fetch'):
+            prices, _ = self.get_market_snapshot(market_id)
+        return prices
+    
+    def get_market_snapshot(
+        self,
+        market_id: str
+    ) -> Tuple[Optional[Dict[str, float]], Optional[Dict[str, OrderBook]]]:
+        """Query Yes/No ticket prices together with the Yes/No orderbooks"""
+        market_data = self.get_market_data(market_id)
+        if market_data is None:
+            return None, None
+        
+        # Also query orderbook data (token IDs come from market data)
+        token_ids = self.market_tokens.get(market_id) or self.parse_token_ids(market_data)
+        orderbook = self.get_market_orderbook(market_id, token_ids)
+        
+        with self.metrics.stage('parse'):
+            return self.parse_market_prices(market_id, market_data, orderbook), orderbook
+    
+    def parse_market_prices(
+        self,
+        market_id: str,
+        market_data: Dict[str, Any],
+        orderbook: Optional[Dict[str, OrderBook]] = None
+    ) -> Optional[Dict[str, float]]:
+        """Extract Yes/No ticket prices from Gamma market data and CLOB orderbooks"""
         try:
-            # Query market information via Gamma API
-            response = requests.get(
-                f"{GAMMA_API_URL}/markets/{market_id}",
-                timeout=5
-            )
-            response.raise_for_status()
-            market_data = response.json()
+            # Cache token IDs so later orderbook queries can run alongside market data
+            if market_id not in self.market_tokens:
+                token_ids = self.parse_token_ids(market_data)
+                if 'Yes' in token_ids and 'No' in token_ids:
+                    self.market_tokens[market_id] = token_ids
+                if market_data.get('negRisk'):
+                    self.neg_risk_markets.add(market_id)
             
-            # Also query orderbook data
-            orderbook = self.get_market_orderbook(market_id)
+            if self.scheduler is not None and market_data.get('endDate'):
+                self.scheduler.set_end_date(market_id, parse_end_date(market_data['endDate']))
             
             # Extract Yes/No ticket prices
             # May need adjustment based on actual API response structure
@@ -141,7 +361,6 @@ class PolyArbitrageBot:
             
             # Try extracting prices from Gamma API
             if 'outcomePrices' in market_data and 'outcomes' in market_data:
-                import json
                 # Parse if outcomePrices and outcomes are JSON strings
                 prices_raw = market_data['outcomePrices']
                 outcomes_raw = market_data['outcomes']
@@ -164,11 +383,12 @@ class PolyArbitrageBot:
                         elif outcome == 'No' and i < len(prices):
                             no_price = float(prices[i])
             
-            # Try extracting orderbook from CLOB API
+            # Best bid/ask from CLOB orderbooks
             if orderbook:
-                # Parsing needed based on actual CLOB API response structure
-                # Example structure written here
-                pass
+                yes_ask = orderbook['Yes'].best_ask()
+                yes_bid = orderbook['Yes'].best_bid()
+                no_ask = orderbook['No'].best_ask()
+                no_bid = orderbook['No'].best_bid()
             
             # Use default values if prices are missing (error handling needed in production)
             if yes_price is None or no_price is None:
@@ -184,19 +404,60 @@ class PolyArbitrageBot:
             if yes_price is None or no_price is None:
                 return None
             
+            if orderbook:
+                # An empty book side has no tradable price: leave it None (not executable)
+                # rather than substituting the Gamma mid price
+                return {
+                    'yes_price': yes_price,
+                    'no_price': no_price,
+                    'yes_ask': yes_ask,
+                    'no_ask': no_ask,
+                    'yes_bid': yes_bid,
+                    'no_bid': no_bid
+                }
+            
+            # Listing only (bulk sweeps): listing prices stand in until books are fetched
             return {
                 'yes_price': yes_price,
                 'no_price': no_price,
-                'yes_ask': yes_ask or yes_price,
-                'no_ask': no_ask or no_price,
-                'yes_bid': yes_bid or yes_price,
-                'no_bid': no_bid or no_price
+                'yes_ask': yes_price,
+                'no_ask': no_price,
+                'yes_bid': yes_price,
+                'no_bid': no_price
             }
         
         except Exception as e:
+            self.metrics.error('parse')
             print(f"[✗] Failed to query prices ({market_id}): {e}")
             return None
     
+    def parse_token_ids(self, market_data: Dict[str, Any]) -> Dict[str, str]:
+        """Map 'Yes'/'No' outcomes to CLOB token IDs from Gamma market data"""
+        token_ids = {}
+        
+        outcomes = market_data.get('outcomes')
+        clob_token_ids = market_data.get('clobTokenIds')
+        if outcomes and clob_token_ids:
+            if isinstance(outcomes, str):
+                outcomes = json.loads(outcomes)
+            if isinstance(clob_token_ids, str):
+                clob_token_ids = json.loads(clob_token_ids)
+            for outcome, token_id in zip(outcomes, clob_token_ids):
+                if outcome in ('Yes', 'No'):
+                    token_ids[outcome] = str(token_id)
+        
+        # Alternative: CLOB-style token list
+        for token in market_data.get('tokens') or []:
+            if token.get('outcome') in ('Yes', 'No') and token.get('token_id'):
+                token_ids.setdefault(token['outcome'], str(token['token_id']))
+        
+        return token_ids
+    
+    def is_near_threshold(self, prices: Dict[str, float]) -> bool:
+        """Whether listing prices are close enough to the threshold to need a per-market check"""
+        total_cost = prices['yes_price'] + prices['no_price']
+        return total_cost < (1.0 - self.min_profit_margin + self.near_threshold_band)
+    
     def check_arbitrage(self, yes_price: float, no_price: float) -> tuple[bool, float]:
         """
         Check for arbitrage opportunity
@@ -210,74 +471,238 @@ class PolyArbitrageBot:
             return True, profit
         return False, 0.0
     
-    def execute_trade(self, market_id: str, yes_price: float, no_price: float) -> bool:
+    def check_executable_arbitrage(self, orderbook: Dict[str, OrderBook]) -> Optional[ArbitrageSize]:
+        """
+        Check for arbitrage opportunity against orderbook depth
+        
+        Walks the Yes and No ask ladders together while
+        yes_ask + no_ask < 1 - min_profit_margin - max_slippage
+        
+        Returns:
+            Fillable size, VWAPs and expected dollar profit, or None
+        """
+        sizing = size_parity_arbitrage(
+            orderbook['Yes'],
+            orderbook['No'],
+            1.0 - self.min_profit_margin - self.max_slippage
+        )
+        if sizing is None or sizing.cost < MIN_TRADE_SIZE:
+            return None
+        return sizing
+    
+    def trading_enabled(self) -> bool:
+        """Whether detected opportunities are passed to execute_trade"""
+        return bool(self.account)
+    
+    def execute_trade(
+        self,
+        market_id: str,
+        yes_price: float,
+        no_price: float,
+        size: Optional[float] = None,
+        signal_time: Optional[float] = None
+    ) -> bool:
         """
         Execute arbitrage trade
         
-        For actual implementation:
-        1. Sign and send orders via CLOB API
-        2. Send transactions via Web3
-        3. Check order status and slippage
+        Signs a Yes and a No buy order and submits both legs concurrently via
+        the CLOB order API. If only one leg fills (or the fills differ), the
+        excess is sold back so the position stays hedged.
+        
+        Args:
+            yes_price / no_price: Expected (VWAP) prices
+            size: Shares per leg (None = EXECUTION_MAX_SHARES)
+            signal_time: perf_counter time the opportunity was detected
         
-        Currently in simulation mode
+        Returns:
+            True if both legs filled completely
         """
-        if not self.account or not self.web3:
+        if not self.account or self.execution is None:
             print("[!] Wallet not connected. Cannot execute trades.")
             return False
         
         try:
-            # Actual implementation example:
-            # 1. Create Yes ticket buy order
-            # 2. Create No ticket buy order
-            # 3. Send both orders simultaneously (Atomic Arbitrage)
-            # 4. Check order status
-            
-            print(f"[*] Trade execution simulation:")
-            print(f"    Market ID: {market_id}")
-            print(f"    Yes ticket buy: ${yes_price:.4f}")
-            print(f"    No ticket buy: ${no_price:.4f}")
-            print(f"    Total cost: ${yes_price + no_price:.4f}")
-            print(f"    Expected profit: ${1.0 - (yes_price + no_price):.4f}")
-            
-            # Add CLOB API call code here for actual implementation
-            # from py_clob_client.client import ClobClient
-            # client = ClobClient(...)
-            # client.create_order(...)
+            result = self.execution.execute(market_id, yes_price, no_price, size=size, signal_time=signal_time)
+            if result is None:
+                return False
             
-            return True
+            print(f"[{'✓' if result.success else '✗'}] Trade execution ({market_id}):")
+            for leg in (result.yes, result.no):
+                detail = f" - {leg.error}" if leg.error else ""
+                print(f"    {leg.outcome} {leg.side}: {leg.filled:.2f}/{leg.requested:.2f} shares "
+                      f"@ ${leg.avg_price:.4f} [{leg.status}] ({leg.latency*1000:.1f}ms){detail}")
+            print(f"    Hedged: {result.hedged:.2f} shares | Signal to fill: {result.signal_to_fill*1000:.1f}ms | "
+                  f"Leg skew: {result.leg_skew*1000:.1f}ms")
+            return result.success
         
         except Exception as e:
             print(f"[✗] Trade execution failed: {e}")
             return False
     
+    def _execute_trade_timed(
+        self,
+        market_id: str,
+        yes_price: float,
+        no_price: float,
+        size: Optional[float] = None,
+        signal_time: Optional[float] = None
+    ) -> bool:
+        """execute_trade with its latency and result recorded in the metrics"""
+        with self.metrics.stage('execute'):
+            success = self.execute_trade(market_id, yes_price, no_price, size=size, signal_time=signal_time)
+        self.metrics.trades.labels('success' if success else 'failed').inc()
+        return success
+    
     def monitor_market(self, market_id: str, market_question: str = ""):
         """Monitor single market"""
-        prices = self.get_market_prices(market_id)
+        with self.metrics.stage('market'):
+            with self.metrics.stage('fetch'):
+                prices, orderbook = self.get_market_snapshot(market_id)
+            
+            if not prices:
+                return False
+            
+            return self.handle_prices(market_id, prices, market_question, orderbook)
+    
+    def handle_prices(
+        self,
+        market_id: str,
+        prices: Dict[str, float],
+        market_question: str = "",
+        orderbook: Optional[Dict[str, OrderBook]] = None
+    ) -> bool:
+        """Log fetched prices and act on any arbitrage opportunity
         
-        if not prices:
-            return False
+        With orderbooks the check is depth-aware, otherwise it compares prices only.
+        """
+        self.record_prices(market_id, prices, market_question, orderbook)
+        
+        # Check for arbitrage opportunity
+        with self.metrics.stage('detect'):
+            if orderbook:
+                return self._handle_orderbook_opportunity(market_id, orderbook, market_question)
+            
+            return self._handle_price_opportunity(market_id, prices['yes_price'], prices['no_price'], market_question)
+    
+    def record_prices(
+        self,
+        market_id: str,
+        prices: Dict[str, float],
+        market_question: str = "",
+        orderbook: Optional[Dict[str, OrderBook]] = None
+    ):
+        """Log fetched prices and store them in the price table (no detection)
         
+        A None ask (empty book side) is stored as NaN, so the market is not
+        executable until the side has liquidity again.
+        """
         yes_price = prices['yes_price']
         no_price = prices['no_price']
+        yes_ask = prices.get('yes_ask', yes_price)
+        no_ask = prices.get('no_ask', no_price)
+        
+        self.metrics.price_updates.inc()
         
         # Data logging
         if self.logger:
-            self.logger.log_price_data(
-                market_id=market_id,
-                market_question=market_question,
-                yes_price=yes_price,
-                no_price=no_price,
-                yes_ask=prices.get('yes_ask'),
-                no_ask=prices.get('no_ask'),
-                yes_bid=prices.get('yes_bid'),
-                no_bid=prices.get('no_bid'),
-                min_profit_margin=self.min_profit_margin
+            with self.metrics.stage('log'):
+                # Depth is only needed on opportunity ticks (it is kept for the episode's peak)
+                depth = None
+                if orderbook and yes_price + no_price < 1.0 - self.min_profit_margin:
+                    sizing = size_parity_arbitrage(orderbook['Yes'], orderbook['No'], 1.0 - self.min_profit_margin)
+                    depth = sizing.size if sizing is not None else 0.0
+                self.logger.log_price_data(
+                    market_id=self.markets.handle(market_id, market_question),
+                    market_question=market_question,
+                    yes_price=yes_price,
+                    no_price=no_price,
+                    yes_ask=prices.get('yes_ask'),
+                    no_ask=prices.get('no_ask'),
+                    yes_bid=prices.get('yes_bid'),
+                    no_bid=prices.get('no_bid'),
+                    min_profit_margin=self.min_profit_margin,
+                    depth=depth
+                )
+        
+        self.price_table.update(
+            market_id,
+            prices.get('yes_bid', yes_price),
+            yes_ask,
+            prices.get('no_bid', no_price),
+            no_ask
+        )
+        
+        if self.scheduler is not None:
+            # NaN (a missing ask) is ignored by the scheduler
+            self.scheduler.observe(
+                market_id,
+                yes_ask + no_ask if yes_ask is not None and no_ask is not None else float('nan')
             )
         
-        # Check for arbitrage opportunity
+        # Keep only books from this update so detection never sizes against old depth
+        if orderbook:
+            self.orderbooks[market_id] = orderbook
+        else:
+            self.orderbooks.pop(market_id, None)
+        
+        if market_question and market_id not in self.market_questions:
+            self.market_questions[market_id] = market_question
+    
+    def detect_opportunities(self, market_ids: Optional[List[str]] = None) -> int:
+        """
+        Vectorized opportunity pass over the whole price table (or market_ids only)
+        
+        Markets whose asks clear the threshold and whose prices are fresh are
+        handled best first; those with orderbooks are sized against depth.
+        Each price update is handled once: a market whose refresh failed keeps
+        its old row, which is not traded again until new prices arrive.
+        
+        Args:
+            market_ids: Restrict detection to these markets (a priority batch)
+        
+        Returns:
+            Number of arbitrage opportunities found
+        """
+        with self.metrics.stage('detect_sweep'):
+            candidates = self.price_table.top_opportunities(
+                max_pair_cost=1.0 - self.min_profit_margin,
+                max_age=self.price_max_age,
+                unhandled_only=True,
+                market_ids=market_ids
+            )
+        
+        opportunities_found = 0
+        for candidate in candidates:
+            market_id = candidate.market_id
+            self.price_table.mark_handled(market_id)
+            question = self.market_questions.get(market_id, "")
+            orderbook = self.orderbooks.get(market_id)
+            try:
+                if orderbook:
+                    found = self._handle_orderbook_opportunity(market_id, orderbook, question)
+                else:
+                    found = self._handle_price_opportunity(market_id, candidate.yes_ask, candidate.no_ask, question)
+                if found:
+                    opportunities_found += 1
+            except Exception as e:
+                self.metrics.error('trade')
+                print(f"[✗] Trade handling error ({market_id}): {e}")
+        
+        return opportunities_found
+    
+    def _handle_price_opportunity(
+        self,
+        market_id: str,
+        yes_price: float,
+        no_price: float,
+        market_question: str = ""
+    ) -> bool:
+        """Compare prices only and act on any opportunity"""
+        signal_time = time.perf_counter()
         has_opportunity, profit = self.check_arbitrage(yes_price, no_price)
         
         if has_opportunity:
+            self.metrics.opportunities.inc()
             print(f"\n{'='*60}")
             print(f"[🎯] Arbitrage opportunity found!")
             print(f"    Market: {market_question or market_id}")
@@ -288,11 +713,115 @@ class PolyArbitrageBot:
             print(f"{'='*60}\n")
             
             # Execute trade
-            if self.account:
-                self.execute_trade(market_id, yes_price, no_price)
+            if self.trading_enabled():
+                self._execute_trade_timed(market_id, yes_price, no_price, signal_time=signal_time)
         
         return has_opportunity
     
+    def _handle_orderbook_opportunity(
+        self,
+        market_id: str,
+        orderbook: Dict[str, OrderBook],
+        market_question: str = ""
+    ) -> bool:
+        """Size the opportunity against orderbook depth and act on it"""
+        signal_time = time.perf_counter()
+        sizing = self.check_executable_arbitrage(orderbook)
+        if sizing is None:
+            return False
+        
+        self.metrics.opportunities.inc()
+        print(f"\n{'='*60}")
+        print(f"[🎯] Arbitrage opportunity found!")
+        print(f"    Market: {market_question or market_id}")
+        print(f"    Fillable size: {sizing.size:.2f} shares each side")
+        print(f"    Yes VWAP: ${sizing.yes_vwap:.4f}")
+        print(f"    No VWAP: ${sizing.no_vwap:.4f}")
+        print(f"    Total cost: ${sizing.cost:.2f}")
+        print(f"    Expected profit: ${sizing.profit:.2f} ({sizing.profit/sizing.cost*100:.2f}%)")
+        print(f"{'='*60}\n")
+        
+        # Execute trade
+        if self.trading_enabled():
+            self._execute_trade_timed(
+                market_id, sizing.yes_vwap, sizing.no_vwap, size=sizing.size, signal_time=signal_time
+            )
+        
+        return True
+    
+    def _handle_event_opportunity(self, opportunity: EventOpportunity):
+        """Report a multi-outcome basket whose asks sum below the threshold (not traded)"""
+        event = opportunity.event
+        sizing = opportunity.sizing
+        self.metrics.opportunities.inc()
+        print(f"\n{'='*60}")
+        print(f"[🎯] Multi-outcome arbitrage opportunity found!")
+        print(f"    Event: {event.title or event.event_id} ({len(event.market_ids)} outcomes)")
+        print(f"    Sum of Yes asks: ${opportunity.ask_sum:.4f}")
+        if sizing is not None:
+            print(f"    Fillable size: {sizing.size:.2f} shares of each outcome")
+            print(f"    Total cost: ${sizing.cost:.2f}")
+            print(f"    Expected profit: ${sizing.profit:.2f} ({sizing.profit/sizing.cost*100:.2f}%)")
+            legs = sorted(zip(event.outcomes, sizing.vwaps), key=lambda leg: leg[1], reverse=True)
+        else:
+            print(f"    Thinnest leg at best ask: {opportunity.top_size:.2f} shares (depth does not clear slippage)")
+            legs = []
+        for outcome, vwap in legs[:5]:
+            print(f"    {outcome}: ${vwap:.4f}")
+        if len(legs) > 5:
+            print(f"    ... {len(legs) - 5} more outcomes")
+        print(f"{'='*60}\n")
+    
+    def queue_universe_update(self, added: List[Dict[str, Any]], removed: List[str]):
+        """Hand a discovery diff to the scan loop (thread-safe)"""
+        self._universe_updates.put((added, removed))
+    
+    def apply_universe_updates(self) -> List[Tuple[List[Dict[str, Any]], List[str]]]:
+        """
+        Apply queued discovery diffs to the scan set (call from the scan loop between sweeps)
+        
+        Returns:
+            The (added markets, removed market IDs) diffs that were applied
+        """
+        applied = []
+        while True:
+            try:
+                added, removed = self._universe_updates.get_nowait()
+            except Empty:
+                return applied
+            
+            removed_ids = set(removed)
+            for market_id in removed:
+                self.price_table.remove(market_id)
+                self.orderbooks.pop(market_id, None)
+                self.market_tokens.pop(market_id, None)
+                self.market_questions.pop(market_id, None)
+                self.neg_risk_markets.discard(market_id)
+                if self.scheduler is not None:
+                    self.scheduler.remove(market_id)
+            
+            known = set(self.market_ids) - removed_ids
+            new_ids = []
+            for market in added:
+                market_id = market['id']
+                self.markets.handle(market_id, market.get('question', ''))
+                if market.get('neg_risk'):
+                    self.neg_risk_markets.add(market_id)
+                if market.get('question'):
+                    self.market_questions[market_id] = market['question']
+                tokens = market.get('tokens') or {}
+                if 'Yes' in tokens and 'No' in tokens:
+                    self.market_tokens[market_id] = tokens
+                if self.scheduler is not None:
+                    self.scheduler.add(market_id, parse_end_date(market.get('end_date')))
+                if market_id not in known:
+                    known.add(market_id)
+                    new_ids.append(market_id)
+            
+            # Swap in a new list so a sweep holding the old one is unaffected
+            self.market_ids = [m for m in self.market_ids if m not in removed_ids] + new_ids
+            applied.append((added, removed))
+    
     def run(self):
         """Bot execution main loop"""
         print("="*60)
@@ -300,60 +829,317 @@ class PolyArbitrageBot:
         print("="*60)
         
         # Get market list
-        if not self.market_ids:
+        discovered = not self.market_ids
+        if discovered:
             print("[*] Searching for active markets...")
             markets = self.get_active_markets()
             self.market_ids = [m['id'] for m in markets]
             market_questions = {m['id']: m['question'] for m in markets}
+            market_end_dates = {m['id']: m['end_date'] for m in markets}
+            for market in markets:
+                self.markets.handle(market['id'], market['question'])
+                if market['neg_risk']:
+                    self.neg_risk_markets.add(market['id'])
+                if 'Yes' in market['tokens'] and 'No' in market['tokens']:
+                    self.market_tokens[market['id']] = market['tokens']
         else:
             market_questions = {mid: "" for mid in self.market_ids}
+            market_end_dates = {}
         
         if not self.market_ids:
             print("[✗] No markets to monitor.")
             return
         
+        self.market_questions.update({mid: q for mid, q in market_questions.items() if q})
+        
         print(f"[✓] Starting to monitor {len(self.market_ids)} markets")
         print(f"[*] Minimum profit rate: {self.min_profit_margin*100:.1f}%")
         print(f"[*] Scan interval: {self.scan_interval} seconds")
-        print(f"[*] Data logging: {'Enabled' if ENABLE_DATA_LOGGING else 'Disabled'}")
+        print(f"[*] Data logging: {'Enabled' if self.logger else 'Disabled'}")
+        print(f"[*] Scan mode: {self.scan_mode}")
+        
+        if self.scan_mode == "priority":
+            self.scheduler = PollScheduler(threshold=1.0 - self.min_profit_margin)
+            for market_id in self.market_ids:
+                self.scheduler.add(market_id, parse_end_date(market_end_dates.get(market_id)))
+            print(f"[*] Refresh budget: {self.scheduler.budget:.1f} markets/sec "
+                  f"(interval {self.scheduler.min_interval}-{self.scheduler.max_interval}s per market)")
+        
+        # Metrics endpoint and periodic statistics run off the scan path
+        metrics_server = None
+        if METRICS_PORT:
+            try:
+                metrics_server = MetricsServer(self.metrics.registry, METRICS_HOST, METRICS_PORT)
+                metrics_server.start()
+                print(f"[*] Metrics endpoint: {metrics_server.url}")
+            except OSError as e:
+                metrics_server = None
+                print(f"[!] Metrics endpoint unavailable ({METRICS_HOST}:{METRICS_PORT}): {e}")
+        if self.execution is not None:
+            # Keep orders for the markets nearest the threshold signed ahead of time
+            self.execution.start()
+        reporter = PeriodicReporter(self._print_periodic_statistics, STATS_REPORT_INTERVAL)
+        reporter.start()
+        
+        # New and closed markets are applied to the scan set between sweeps
+        if discovered and self.discovery.interval > 0:
+            self.discovery.start()
+            print(f"[*] Market discovery refresh: every {self.discovery.interval:.0f} seconds")
+        if self.events.interval > 0:
+            self.events.start()
+            print(f"[*] Multi-outcome event scan: every {self.events.interval:g} seconds")
         print("-"*60)
         
         try:
-            while True:
-                opportunities_found = 0
-                
+            if self.scan_mode in ("async", "bulk"):
+                asyncio.run(self._run_async(self.market_questions))
+            elif self.scan_mode == "priority":
+                asyncio.run(self._run_priority(self.market_questions))
+            elif self.scan_mode == "stream":
+                asyncio.run(self._run_stream(self.market_questions))
+            elif self.scan_mode == "sharded":
+                self._run_sharded()
+            else:
+                self._run_serial(self.market_questions)
+        
+        except KeyboardInterrupt:
+            print("\n\n[*] Shutting down bot...")
+            self.discovery.stop()
+            self.events.stop()
+            if self.coordinator is not None:
+                self.coordinator.stop()
+            reporter.stop()
+            if metrics_server is not None:
+                metrics_server.stop()
+            if self.logger:
+                # Write out every queued row before reading statistics
+                self.logger.close()
+                self._print_logger_statistics()
+                stats = self.logger.get_arbitrage_statistics(hours=24)
+                print(f"\n[📊] Final statistics:")
+                print(f"    Arbitrage opportunities: {stats['total_opportunities']}")
+                print(f"    Average peak profit rate: {stats['avg_profit']*100:.2f}%")
+                print(f"    Average duration: {stats['avg_duration']:.1f}s (longest {stats['max_duration']:.1f}s)")
+            self._print_http_statistics()
+            self._print_stage_statistics()
+            if self.discovery.stats['refreshes'] > 1:
+                self._print_discovery_statistics()
+            if self.scheduler is not None:
+                self._print_scheduler_statistics()
+            if self.coordinator is not None:
+                self._print_shard_statistics()
+            if self.events.stats['sweeps']:
+                self._print_event_statistics()
+            if self.execution is not None:
+                if self.execution.stats['trades']:
+                    self._print_execution_statistics()
+                self.execution.close()
+            self.http.close()
+            print("[✓] Bot shutdown complete")
+    
+    def _run_serial(self, market_questions: Dict[str, str]):
+        """Scan markets one at a time"""
+        while True:
+            self.apply_universe_updates()
+            with self.metrics.stage('sweep'):
                 for market_id in self.market_ids:
                     try:
-                        if self.monitor_market(market_id, market_questions.get(market_id, "")):
-                            opportunities_found += 1
+                        self.monitor_market(market_id, market_questions.get(market_id, ""))
                     except KeyboardInterrupt:
                         raise
                     except Exception as e:
+                        self.metrics.error('monitor')
                         print(f"[✗] Market monitoring error ({market_id}): {e}")
                         continue
+            
+            time.sleep(self.scan_interval)
+    
+    async def _run_async(self, market_questions: Dict[str, str]):
+        """Scan all markets concurrently, one sweep per scan interval"""
+        scanner = AsyncScanner(self, max_concurrency=self.max_concurrent_requests)
+        try:
+            while True:
+                self.apply_universe_updates()
+                if self.scan_mode == "bulk":
+                    await scanner.bulk_sweep(self.market_ids, market_questions)
+                else:
+                    await scanner.sweep(self.market_ids, market_questions)
+                self.metrics.stage_seconds.labels('sweep').observe(scanner.last_sweep_time)
                 
-                # Output statistics (periodically)
-                if self.logger and opportunities_found == 0:
-                    # Output statistics every 10 minutes
-                    if int(time.time()) % 600 == 0:
-                        stats = self.logger.get_arbitrage_statistics(hours=24)
-                        if stats['total_opportunities'] > 0:
-                            print(f"\n[📊] Last 24 hours statistics:")
-                            print(f"    Arbitrage opportunities: {stats['total_opportunities']}")
-                            print(f"    Average profit rate: {stats['avg_profit']*100:.2f}%")
-                            print(f"    Maximum profit rate: {stats['max_profit']*100:.2f}%")
-                            print(f"    Unique markets: {stats['unique_markets']}\n")
-                
-                time.sleep(self.scan_interval)
+                # Scan interval is measured from the start of the sweep
+                await asyncio.sleep(max(0.0, self.scan_interval - scanner.last_sweep_time))
+        finally:
+            scanner.close()
+    
+    async def _run_priority(self, market_questions: Dict[str, str]):
+        """Poll markets as the scheduler makes them due, within the refresh budget"""
+        scanner = AsyncScanner(self, max_concurrency=self.max_concurrent_requests)
+        try:
+            while True:
+                start = time.monotonic()
+                self.apply_universe_updates()
+                due = self.scheduler.take()
+                if due:
+                    await scanner.sweep(due, market_questions, detect_all=False)
+                    self.metrics.stage_seconds.labels('sweep').observe(scanner.last_sweep_time)
+                await asyncio.sleep(max(0.0, TICK_INTERVAL - (time.monotonic() - start)))
+        finally:
+            scanner.close()
+    
+    async def _run_stream(self, market_questions: Dict[str, str]):
+        """Drive arbitrage checks from the WebSocket market feed"""
+        from ws_feed import MarketFeed
         
-        except KeyboardInterrupt:
-            print("\n\n[*] Shutting down bot...")
-            if self.logger:
-                stats = self.logger.get_arbitrage_statistics(hours=24)
-                print(f"\n[📊] Final statistics:")
+        # Resolve Yes/No token IDs for the monitored markets (discovery already knows most)
+        market_tokens = {mid: self.market_tokens[mid] for mid in self.market_ids if mid in self.market_tokens}
+        missing = [mid for mid in self.market_ids if mid not in market_tokens]
+        for i in range(0, len(missing), self.bulk_page_size):
+            for market in self.get_markets_by_ids(missing[i:i + self.bulk_page_size]):
+                token_ids = self.parse_token_ids(market)
+                if 'Yes' in token_ids and 'No' in token_ids:
+                    market_tokens[str(market.get('id', ''))] = token_ids
+        
+        if not market_tokens:
+            print("[✗] No CLOB token IDs found for the monitored markets.")
+            return
+        
+        print(f"[✓] Streaming {len(market_tokens)} markets ({len(market_tokens) * 2} order books)")
+        feed = MarketFeed(self, market_tokens, market_questions)
+        watcher = asyncio.create_task(self._apply_universe_to_feed(feed))
+        try:
+            await feed.run()
+        finally:
+            watcher.cancel()
+    
+    def _run_sharded(self):
+        """Coordinate worker processes that each scan a consistent-hash share of the markets"""
+        from sharding import ShardCoordinator
+        
+        self.coordinator = ShardCoordinator(self)
+        self.coordinator.start()
+        print(f"[*] Shard coordinator listening on {self.coordinator.address}")
+        if SHARD_WORKERS > 0:
+            self.coordinator.spawn(SHARD_WORKERS)
+            print(f"[*] Started {SHARD_WORKERS} local shard workers")
+        if not self.coordinator.remote_workers:
+            print("[*] Set SHARD_AUTHKEY to let remote workers join")
+        self.coordinator.run()
+    
+    async def _apply_universe_to_feed(self, feed):
+        """Subscribe to discovered markets and unsubscribe from removed ones on the live feed"""
+        while True:
+            await asyncio.sleep(1.0)
+            for added, removed in self.apply_universe_updates():
+                tokens = {m['id']: m['tokens'] for m in added if 'Yes' in m['tokens'] and 'No' in m['tokens']}
+                await feed.update_markets(tokens, removed)
+    
+    def _print_logger_statistics(self):
+        """Output background writer statistics"""
+        stats = self.logger.get_writer_stats()
+        print(f"\n[💾] Data logger statistics:")
+        print(f"    Rows written: {stats['rows_written']} in {stats['batches_written']} batches (avg {stats['avg_batch_size']:.1f} rows)")
+        print(f"    Rows dropped: {stats['rows_dropped']} | Queue high water: {stats['queue_high_water']}/{stats['queue_capacity']}")
+        print(f"    Opportunity episodes written: {stats['episodes_written']} | "
+              f"Mid-episode ticks summarized (no price row): {stats['ticks_summarized']}")
+    
+    def _print_http_statistics(self):
+        """Output connection pool statistics"""
+        stats = self.http.get_stats()
+        print(f"\n[🔌] HTTP connection statistics ({'HTTP/2' if stats['http2'] else 'HTTP/1.1'}):")
+        print(f"    Requests: {stats['requests']} | Handshakes: {stats['handshakes']} | Reuse rate: {stats['reuse_rate']*100:.1f}%")
+        for host, host_stats in stats['hosts'].items():
+            print(f"    {host}: {host_stats['requests']} requests, {host_stats['handshakes']} handshakes")
+        for name, limit in stats['rate_limits'].items():
+            print(f"    Rate limit {name}: {limit['rate']:.1f}/{limit['ceiling']:.1f} per sec | "
+                  f"Throttled: {limit['throttled']} ({limit['decreases']} backoffs) | Waited: {limit['wait_time']:.1f}s")
+        retries = self.retry_queue.get_stats()
+        if retries['retried']:
+            print(f"    Retries: {retries['retried']} | Recovered: {retries['recovered']} | Dropped: {retries['dropped']}")
+    
+    def _print_stage_statistics(self):
+        """Output per-stage latency percentiles, error counts and update ages"""
+        stages = self.metrics.stage_percentiles()
+        if stages:
+            print(f"\n[⏱️] Stage latency (ms):")
+            print(f"    {'Stage':<16} {'Count':>9} {'p50':>9} {'p90':>9} {'p99':>9}")
+            for stage, stats in stages.items():
+                print(f"    {stage:<16} {stats['count']:>9} {stats['p50']*1000:>9.2f} {stats['p90']*1000:>9.2f} {stats['p99']*1000:>9.2f}")
+        
+        errors = self.metrics.error_counts()
+        if errors:
+            print(f"    Errors: " + ", ".join(f"{stage}={count}" for stage, count in errors.items()))
+        
+        ages = sorted(self.price_table.ages().values())
+        if ages:
+            print(f"    Update age: median {ages[len(ages) // 2]:.1f}s, max {ages[-1]:.1f}s ({len(ages)} markets)")
+    
+    def _print_discovery_statistics(self):
+        """Output market universe refresh statistics"""
+        stats = self.discovery.stats
+        print(f"\n[🔭] Market discovery statistics:")
+        print(f"    Refreshes: {stats['refreshes']} ({stats['failed_refreshes']} failed) | Last: {stats['last_duration']:.2f}s, "
+              f"{stats['listed']} listed, {stats['selected']} selected")
+        print(f"    Markets added: {stats['added']} | Removed: {stats['removed']} | Monitoring: {len(self.market_ids)}")
+        print(f"    Listing pages: {stats['pages']} ({stats['not_modified']} not modified) | Warm starts: {stats['warm_starts']}")
+    
+    def _print_shard_statistics(self):
+        """Output per-worker throughput and coordinator dedup counters"""
+        stats = self.coordinator.stats
+        print(f"\n[🧩] Shard statistics:")
+        print(f"    Workers: {len(self.coordinator.workers)} ({stats['joins']} joined, {stats['leaves']} left) | "
+              f"Rebalances: {stats['rebalances']}, {stats['moved']} markets moved")
+        print(f"    Price rows: {stats['rows']} | Opportunities reported: {stats['reported']}, "
+              f"handled: {stats['handled']} ({stats['duplicates']} duplicates, {stats['stale']} stale)")
+        for name, worker in self.coordinator.get_worker_stats().items():
+            print(f"    {name}: {worker['markets']} markets, {worker['sweeps']} sweeps, "
+                  f"last sweep {worker['last_sweep_time']:.2f}s")
+    
+    def _print_execution_statistics(self):
+        """Output two-leg execution outcomes"""
+        stats = self.execution.stats
+        print(f"\n[💱] Order execution statistics:")
+        print(f"    Trades: {stats['trades']} | Filled: {stats['filled']} | Partial: {stats['partial']} | "
+              f"Failed: {stats['failed']}")
+        print(f"    Unwinds: {stats['unwound']} completed, {stats['unhedged']} left unhedged")
+        presign = self.execution.preparer.stats
+        print(f"    Pre-signed orders: {presign['presigned']} signed | Used: {presign['hits']} | "
+              f"Signed on trigger: {presign['misses']} | Hit rate: {self.execution.preparer.hit_rate()*100:.1f}% | "
+              f"Expired: {presign['expired']}")
+    
+    def _print_event_statistics(self):
+        """Output multi-outcome event sweep counters"""
+        stats = self.events.stats
+        print(f"\n[🧺] Multi-outcome event statistics:")
+        print(f"    Events: {stats['events']} ({len(self.events.tokens)} outcome markets) | Sweeps: {stats['sweeps']} | "
+              f"Last sweep: {stats['last_sweep_time']:.2f}s (detection {stats['last_detect_time']*1000:.2f}ms)")
+        print(f"    Book requests: {stats['requests']} ({stats['failed_batches']} failed) | Books: {stats['books']} | "
+              f"Incomplete baskets skipped: {stats['skipped']} | Opportunities: {stats['opportunities']}")
+    
+    def _print_scheduler_statistics(self, reset: bool = False):
+        """Output target and effective refresh rates per priority tier"""
+        print(f"\n[🗂️] Refresh rate by tier (per market):")
+        print(f"    {'Tier':<6} {'Markets':>8} {'Target/s':>10} {'Actual/s':>10} {'Budget':>8}")
+        for tier, stats in self.scheduler.tier_stats(reset=reset).items():
+            print(f"    {tier:<6} {stats['markets']:>8} {stats['target_rate']:>10.3f} "
+                  f"{stats['effective_rate']:>10.3f} {stats['budget_share']*100:>7.1f}%")
+    
+    def _print_periodic_statistics(self):
+        """Output statistics (called every STATS_REPORT_INTERVAL seconds by the reporter thread)"""
+        self._print_stage_statistics()
+        if self.scheduler is not None:
+            self._print_scheduler_statistics(reset=True)
+        
+        if self.logger:
+            stats = self.logger.get_arbitrage_statistics(hours=24)
+            if stats['total_opportunities'] > 0:
+                print(f"\n[📊] Last 24 hours statistics:")
                 print(f"    Arbitrage opportunities: {stats['total_opportunities']}")
-                print(f"    Average profit rate: {stats['avg_profit']*100:.2f}%")
-            print("[✓] Bot shutdown complete")
+                print(f"    Average peak profit rate: {stats['avg_profit']*100:.2f}%")
+                print(f"    Maximum profit rate: {stats['max_profit']*100:.2f}%")
+                print(f"    Average duration: {stats['avg_duration']:.1f}s (longest {stats['max_duration']:.1f}s)")
+                print(f"    Unique markets: {stats['unique_markets']}")
+                http_stats = self.http.get_stats()
+                print(f"    HTTP connection reuse rate: {http_stats['reuse_rate']*100:.1f}% ({http_stats['handshakes']} handshakes)\n")
 
 
 if __name__ == "__main__":
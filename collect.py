@@ -0,0 +1,28 @@
+"""
+Polymarket Price Data Collector
+Data-only entry point: records prices without a wallet or trading dependencies
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import argparse
+
+from bot import PolyArbitrageBot
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Record Polymarket prices to CSV/SQLite without trading (PRIVATE_KEY is ignored)"
+    )
+    parser.add_argument('market_ids', nargs='*', help='Markets to monitor (default: discover active markets)')
+    args = parser.parse_args()
+
+    # No wallet: web3, eth_account and the order execution module are never imported
+    bot = PolyArbitrageBot(market_ids=args.market_ids or None, enable_logging=True, connect_wallet=False)
+    bot.run()
+
+
+if __name__ == "__main__":
+    main()
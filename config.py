@@ -12,18 +12,74 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # API endpoints
-GAMMA_API_URL = "https://gamma-api.polymarket.com"
-CLOB_API_URL = "https://clob.polymarket.com"
+GAMMA_API_URL = os.getenv("GAMMA_API_URL", "https://gamma-api.polymarket.com")
+CLOB_API_URL = os.getenv("CLOB_API_URL", "https://clob.polymarket.com")
 DATA_API_URL = "https://data-api.polymarket.com"
 
 # WebSocket endpoints (for real-time data)
-WS_CLOB_URL = "wss://clob-ws.polymarket.com"
+WS_CLOB_URL = os.getenv("WS_CLOB_URL", "wss://clob-ws.polymarket.com")
 
 # Bot settings
 MIN_PROFIT_MARGIN = float(os.getenv("MIN_PROFIT_MARGIN", "0.01"))  # Minimum 1% profit margin
 SCAN_INTERVAL = float(os.getenv("SCAN_INTERVAL", "1.0"))  # Scan interval (seconds)
 MAX_MARKETS_TO_MONITOR = int(os.getenv("MAX_MARKETS_TO_MONITOR", "100"))  # Number of markets to monitor simultaneously
 
+# Scan engine settings
+SCAN_MODE = os.getenv("SCAN_MODE", "async").lower()  # "async" (concurrent sweep), "bulk" (paged listing refresh), "priority" (budgeted adaptive polling), "stream" (WebSocket feed), "sharded" (worker processes) or "serial" (one market at a time)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "20"))  # Maximum HTTP requests in flight during an async sweep
+BULK_PAGE_SIZE = int(os.getenv("BULK_PAGE_SIZE", "100"))  # Markets per Gamma listing request in bulk mode
+NEAR_THRESHOLD_BAND = float(os.getenv("NEAR_THRESHOLD_BAND", "0.01"))  # Bulk mode re-checks markets within this distance of the threshold per market
+PRICE_MAX_AGE = float(os.getenv("PRICE_MAX_AGE", "10.0"))  # Prices older than this are ignored by sweep detection (seconds)
+
+# Market discovery settings (used when no market IDs are given)
+DISCOVERY_INTERVAL = float(os.getenv("DISCOVERY_INTERVAL", "300"))  # Seconds between market universe refreshes (0 = discover once at startup)
+DISCOVERY_PAGE_SIZE = int(os.getenv("DISCOVERY_PAGE_SIZE", "100"))  # Markets per Gamma listing page
+DISCOVERY_CONCURRENCY = int(os.getenv("DISCOVERY_CONCURRENCY", "4"))  # Listing pages fetched in parallel
+DISCOVERY_MIN_VOLUME = float(os.getenv("DISCOVERY_MIN_VOLUME", "0"))  # Minimum market volume (USDC)
+DISCOVERY_MIN_LIQUIDITY = float(os.getenv("DISCOVERY_MIN_LIQUIDITY", "0"))  # Minimum market liquidity (USDC)
+DISCOVERY_MIN_HOURS_TO_END = float(os.getenv("DISCOVERY_MIN_HOURS_TO_END", "0"))  # Skip markets resolving sooner than this (hours)
+DISCOVERY_MAX_DAYS_TO_END = float(os.getenv("DISCOVERY_MAX_DAYS_TO_END", "0"))  # Skip markets resolving later than this (days, 0 = no limit)
+
+# Multi-outcome event scanning (neg-risk baskets, runs alongside any SCAN_MODE)
+EVENT_SCAN_INTERVAL = float(os.getenv("EVENT_SCAN_INTERVAL", "0"))  # Seconds between event basket sweeps (0 = disabled)
+EVENT_PAGE_SIZE = int(os.getenv("EVENT_PAGE_SIZE", "100"))  # Events per Gamma /events listing request
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "200"))  # Outcome books per CLOB /books request
+EVENT_CONCURRENCY = int(os.getenv("EVENT_CONCURRENCY", "4"))  # /books requests in flight during an event sweep
+EVENT_MAX_EVENTS = int(os.getenv("EVENT_MAX_EVENTS", "0"))  # Events scanned per sweep (0 = all active neg-risk events)
+
+# Priority scheduler settings (SCAN_MODE=priority)
+POLL_BUDGET = float(os.getenv("POLL_BUDGET", "20"))  # Market refreshes per second across all markets (2 API requests each)
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "0.5"))  # Shortest refresh interval for any market (seconds)
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", "60"))  # Longest refresh interval for any market (seconds)
+
+# Sharded scanning settings (SCAN_MODE=sharded)
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "4"))  # Local worker processes started by the coordinator (0 = remote workers only)
+SHARD_LISTEN = os.getenv("SHARD_LISTEN", "127.0.0.1:7300")  # Coordinator address workers connect to (host:port)
+SHARD_AUTHKEY = os.getenv("SHARD_AUTHKEY", "")  # Shared secret for worker connections (required for remote workers; random if empty)
+SHARD_REPLICAS = int(os.getenv("SHARD_REPLICAS", "100"))  # Virtual nodes per worker on the consistent hash ring
+
+# WebSocket feed settings (SCAN_MODE=stream)
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "10.0"))  # Heartbeat interval (seconds)
+WS_STALE_TIMEOUT = float(os.getenv("WS_STALE_TIMEOUT", "30.0"))  # Reconnect if no message arrives for this long (seconds)
+WS_SNAPSHOT_TIMEOUT = float(os.getenv("WS_SNAPSHOT_TIMEOUT", "5.0"))  # Fetch a REST snapshot if a subscribed book has not arrived by then (seconds)
+WS_RECONNECT_DELAY = float(os.getenv("WS_RECONNECT_DELAY", "1.0"))  # Initial reconnect backoff (seconds, doubles up to 30s)
+
+# HTTP client settings
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # Number of per-host connection pools to keep
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", str(MAX_CONCURRENT_REQUESTS)))  # Keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.0"))  # TCP/TLS connect timeout (seconds)
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "5.0"))  # Default response read timeout (seconds)
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30.0"))  # Idle keep-alive expiry (seconds, HTTP/2 only)
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"  # Use HTTP/2 (requires httpx[http2])
+
+# Rate limiter settings (per API, 0 = unlimited)
+GAMMA_RATE_LIMIT = float(os.getenv("GAMMA_RATE_LIMIT", "30"))  # Gamma API requests per second ceiling
+CLOB_RATE_LIMIT = float(os.getenv("CLOB_RATE_LIMIT", "50"))  # CLOB API cost units per second ceiling (a /books batch costs one per book)
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "1.0"))  # Bucket capacity in seconds of the current rate
+RATE_LIMIT_ADAPTIVE = os.getenv("RATE_LIMIT_ADAPTIVE", "true").lower() == "true"  # Halve the rate on HTTP 429 and probe back up to the ceiling
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))  # Retries per sweep for markets that were throttled or failed in transit
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))  # First retry delay (seconds, doubles per attempt)
+
 # Web3 settings (for actual trading)
 PRIVATE_KEY = os.getenv("PRIVATE_KEY", "")  # Wallet private key (loaded from environment variable)
 POLYGON_RPC_URL = os.getenv("POLYGON_RPC_URL", "https://polygon-rpc.com")
@@ -33,7 +89,39 @@ ENABLE_DATA_LOGGING = os.getenv("ENABLE_DATA_LOGGING", "true").lower() == "true"
 LOG_DIR = os.getenv("LOG_DIR", "./logs")
 CSV_LOG_FILE = os.path.join(LOG_DIR, "price_data.csv")
 DB_LOG_FILE = os.path.join(LOG_DIR, "price_data.db")
+MARKET_CACHE_FILE = os.getenv("MARKET_CACHE_FILE", os.path.join(LOG_DIR, "market_cache.json"))  # Discovered market metadata for warm restarts
+MARKET_CACHE_TTL = float(os.getenv("MARKET_CACHE_TTL", "3600"))  # Restart from the cached listing if it is younger than this (seconds, 0 = disabled)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "100000"))  # Rows buffered for the background writer before dropping
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "500"))  # Rows per DB transaction
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))  # Maximum delay before queued rows are written (seconds)
+LOG_PARTITION = os.getenv("LOG_PARTITION", "none").lower()  # Log partitioning: "none" (single file), "daily" or "hourly" (UTC)
+LOG_RETENTION_DAYS = float(os.getenv("LOG_RETENTION_DAYS", "0"))  # Delete partitions older than this (0 = keep forever)
+LOG_COMPACT_INTERVAL = float(os.getenv("LOG_COMPACT_INTERVAL", "300"))  # Seconds between compaction/retention passes
+EPISODE_MAX_GAP = float(os.getenv("EPISODE_MAX_GAP", str(2 * POLL_MAX_INTERVAL)))  # Close an open opportunity episode after this long without a price update (seconds, default: 2 x POLL_MAX_INTERVAL)
+LOG_OPPORTUNITY_TICKS = os.getenv("LOG_OPPORTUNITY_TICKS", "false").lower() == "true"  # Write a price row for every tick of an open episode (needed for tick-accurate backtests)
+
+# Metrics settings
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Prometheus-style /metrics endpoint port (0 = disabled)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")  # Metrics endpoint bind address
+STATS_REPORT_INTERVAL = float(os.getenv("STATS_REPORT_INTERVAL", "600"))  # Seconds between periodic statistics reports (0 = disabled)
 
 # Trading settings
 MIN_TRADE_SIZE = float(os.getenv("MIN_TRADE_SIZE", "0.01"))  # Minimum trade amount
 MAX_SLIPPAGE = float(os.getenv("MAX_SLIPPAGE", "0.01"))  # Maximum slippage (1%)
+
+# Order execution settings (CLOB order API)
+CLOB_API_KEY = os.getenv("CLOB_API_KEY", "")  # CLOB L2 API credentials (from py-clob-client create_or_derive_api_creds)
+CLOB_API_SECRET = os.getenv("CLOB_API_SECRET", "")
+CLOB_API_PASSPHRASE = os.getenv("CLOB_API_PASSPHRASE", "")
+CLOB_FUNDER = os.getenv("CLOB_FUNDER", "")  # Proxy wallet holding the funds (empty = the PRIVATE_KEY address)
+CLOB_SIGNATURE_TYPE = int(os.getenv("CLOB_SIGNATURE_TYPE", "0"))  # 0 = EOA, 1 = Polymarket proxy, 2 = Gnosis Safe
+CLOB_NONCE = int(os.getenv("CLOB_NONCE", "0"))  # CTF Exchange nonce orders are signed with (raise after an on-chain incrementNonce cancel-all)
+EXECUTION_ORDER_TYPE = os.getenv("EXECUTION_ORDER_TYPE", "FOK").upper()  # FOK (each leg fills completely or not at all) or FAK (fills what is available)
+EXECUTION_MAX_SHARES = float(os.getenv("EXECUTION_MAX_SHARES", "100"))  # Shares per leg cap (also the size for price-only opportunities)
+EXECUTION_UNWIND_SLIPPAGE = float(os.getenv("EXECUTION_UNWIND_SLIPPAGE", "0.05"))  # Price given up when selling back an unmatched leg
+EXECUTION_TIMEOUT = float(os.getenv("EXECUTION_TIMEOUT", "2.0"))  # Order request timeout (seconds)
+EXECUTION_PRESIGN_MARKETS = int(os.getenv("EXECUTION_PRESIGN_MARKETS", "5"))  # Markets closest to the threshold kept pre-signed (0 = sign on trigger)
+EXECUTION_PRESIGN_BAND = float(os.getenv("EXECUTION_PRESIGN_BAND", "0.02"))  # Pre-sign markets whose ask sum is within this of the threshold
+EXECUTION_PRESIGN_TTL = float(os.getenv("EXECUTION_PRESIGN_TTL", "10"))  # Seconds a pre-signed order stays usable
+EXECUTION_PRESIGN_INTERVAL = float(os.getenv("EXECUTION_PRESIGN_INTERVAL", "0.5"))  # Seconds between pre-signing passes
+EXECUTION_PRESIGN_RUNGS = int(os.getenv("EXECUTION_PRESIGN_RUNGS", "4"))  # Pre-signed sizes per leg: max shares in this many equal steps (trade sizes round down to one)
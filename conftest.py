@@ -0,0 +1,12 @@
+"""
+Shared pytest setup: keep test runs offline and away from the real logs/ and wallet
+"""
+import os
+import tempfile
+
+# config.py reads the environment at import time, so this must run before any test imports it
+os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="polyarb-test-")
+os.environ["ENABLE_DATA_LOGGING"] = "false"
+os.environ["PRIVATE_KEY"] = ""
+os.environ["METRICS_PORT"] = "0"
+os.environ["STATS_REPORT_INTERVAL"] = "0"
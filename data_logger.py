@@ -10,89 +10,252 @@ Twitter: @apemoonspin
 import csv
 import sqlite3
 import os
+import time
+import queue
+import atexit
+import threading
 from datetime import datetime
-from typing import Optional, Dict, Any
-import json
+from typing import Optional, Dict, Any, List, Union
+
+from config import (
+    LOG_QUEUE_SIZE,
+    LOG_BATCH_SIZE,
+    LOG_FLUSH_INTERVAL,
+    LOG_PARTITION,
+    LOG_RETENTION_DAYS,
+    LOG_COMPACT_INTERVAL,
+    EPISODE_MAX_GAP,
+    LOG_OPPORTUNITY_TICKS
+)
+from log_rollups import SCHEMA_ROLLUP_TABLES, update_rollups
+from episodes import SCHEMA_EPISODE_TABLES, INSERT_EPISODES, Episode, EpisodeTracker, episode_row
+from partitions import PartitionStore, PartitionCompactor, episode_statistics
+from market_cache import MarketIndex
+
+# CSV column order (queued rows carry one market handle in place of market_id and market_question)
+ROW_COLUMNS = (
+    'timestamp',
+    'market_id',
+    'market_question',
+    'yes_price',
+    'no_price',
+    'total_cost',
+    'arbitrage_opportunity',
+    'potential_profit',
+    'yes_ask_price',
+    'no_ask_price',
+    'yes_bid_price',
+    'no_bid_price'
+)
+
+_STOP = object()
+
+# Longest pause between attempts to reopen a log file that failed to open
+SINK_RETRY_MAX = 30.0
+
+SCHEMA_VERSION = 4
+
+# v2 schema: market text lives once in a dimension table, timestamps are
+# UTC epoch milliseconds, and indexes follow the statistics/report queries
+SCHEMA_V2_TABLES = (
+    '''
+    CREATE TABLE IF NOT EXISTS markets (
+        market_pk INTEGER PRIMARY KEY,
+        market_id TEXT NOT NULL UNIQUE,
+        market_question TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS price_data (
+        id INTEGER PRIMARY KEY,
+        ts_ms INTEGER NOT NULL,
+        market_pk INTEGER NOT NULL REFERENCES markets(market_pk),
+        yes_price REAL,
+        no_price REAL,
+        total_cost REAL,
+        arbitrage_opportunity INTEGER NOT NULL,
+        potential_profit REAL,
+        yes_ask_price REAL,
+        no_ask_price REAL,
+        yes_bid_price REAL,
+        no_bid_price REAL
+    )
+    '''
+)
+
+SCHEMA_V2_INDEXES = (
+    # Window scans: overall statistics, hourly distribution, export
+    '''
+    CREATE INDEX IF NOT EXISTS idx_price_ts
+    ON price_data(ts_ms)
+    ''',
+    # Opportunity-only queries: covering partial index
+    '''
+    CREATE INDEX IF NOT EXISTS idx_price_opportunity
+    ON price_data(ts_ms, market_pk, potential_profit)
+    WHERE arbitrage_opportunity = 1
+    '''
+)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Schema version of a log DB (1 = legacy text-timestamp schema, 2 = no rollups, 3 = no episodes, 0 = empty)"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version:
+        return version
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(price_data)')]
+    return 1 if 'timestamp' in columns else 0
+
+
+def init_schema(conn: sqlite3.Connection):
+    """Create v2 tables and indexes plus the v3 rollup and v4 episode tables"""
+    for statement in SCHEMA_V2_TABLES + SCHEMA_V2_INDEXES + SCHEMA_ROLLUP_TABLES + SCHEMA_EPISODE_TABLES:
+        conn.execute(statement)
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    conn.commit()
+
+
+def window_start_ms(hours: float, now_ms: Optional[int] = None) -> int:
+    """Epoch ms of the start of the last N hours"""
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    return now_ms - int(hours * 3600 * 1000)
+
+
+class _LogSink:
+    """Writer-thread handles for one DB/CSV file pair"""
+    
+    def __init__(self, db_file: str, csv_file: str, init: bool = False):
+        new_csv = not os.path.exists(csv_file)
+        self.conn = sqlite3.connect(db_file)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        if init:
+            init_schema(self.conn)
+        self.csv_handle = open(csv_file, 'a', newline='', encoding='utf-8', buffering=1 << 16)
+        self.csv_writer = csv.writer(self.csv_handle)
+        if new_csv:
+            self.csv_writer.writerow(ROW_COLUMNS)
+        # market handle -> markets.market_pk
+        self.market_pks: Dict[int, int] = {}
+    
+    def close(self):
+        self.csv_handle.close()
+        self.conn.close()
 
 
 class DataLogger:
-    """Class for saving price data to CSV and SQLite DB"""
+    """Class for saving price data to CSV and SQLite DB
+    
+    log_price_data only enqueues the row. A background writer thread owns one
+    WAL-mode SQLite connection and one buffered CSV handle and writes rows in
+    batches of batch_size or every flush_interval seconds, whichever comes first.
+    When the queue is full, rows are dropped and counted instead of blocking the scan.
+    
+    With partition set to 'daily' or 'hourly', rows are routed by timestamp to
+    per-partition DB/CSV files next to db_file (see partitions.PartitionStore)
+    and a background compactor applies retention and compacts closed partitions.
+    
+    Markets are queued by their MarketIndex handle; the ID and question
+    strings are only looked up when a sink first writes the market.
     
-    def __init__(self, csv_file: str, db_file: str):
+    An EpisodeTracker turns the per-tick opportunity flag into one
+    opportunity_episodes record per opportunity (start, end, duration, peak
+    profit, depth at peak), queued alongside the price rows when it closes.
+    Unless log_opportunity_ticks is set, opportunity ticks that only extend
+    an open episode are not written as price rows (the episode summarizes
+    them); the opening and closing ticks always are.
+    """
+    
+    def __init__(
+        self,
+        csv_file: str,
+        db_file: str,
+        queue_size: int = LOG_QUEUE_SIZE,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        partition: str = LOG_PARTITION,
+        retention_days: float = LOG_RETENTION_DAYS,
+        compact_interval: float = LOG_COMPACT_INTERVAL,
+        markets: Optional[MarketIndex] = None,
+        episode_max_gap: float = EPISODE_MAX_GAP,
+        log_opportunity_ticks: bool = LOG_OPPORTUNITY_TICKS
+    ):
         self.csv_file = csv_file
         self.db_file = db_file
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.markets = markets if markets is not None else MarketIndex()
+        self.episodes = EpisodeTracker(episode_max_gap)
+        self.log_opportunity_ticks = log_opportunity_ticks
         
         # Create log directory
         os.makedirs(os.path.dirname(csv_file), exist_ok=True)
         os.makedirs(os.path.dirname(db_file), exist_ok=True)
         
-        # Initialize CSV file
-        self._init_csv()
+        self.store: Optional[PartitionStore] = None
+        self.compactor: Optional[PartitionCompactor] = None
+        if partition and partition != 'none':
+            self.store = PartitionStore(
+                os.path.dirname(db_file),
+                partition,
+                prefix=os.path.splitext(os.path.basename(db_file))[0]
+            )
+            self.compactor = PartitionCompactor(
+                self.store,
+                retention_days,
+                compact_interval,
+                grace=max(60.0, 10 * flush_interval)
+            )
+            self.compactor.start()
+        else:
+            # Initialize CSV file
+            self._init_csv()
+            
+            # Initialize DB
+            self._init_db()
         
-        # Initialize DB
-        self._init_db()
+        # Background writer
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self.rows_written = 0
+        self.episodes_written = 0
+        self.rows_dropped = 0
+        self.ticks_summarized = 0
+        self.batches_written = 0
+        self.queue_high_water = 0
+        self.write_errors = 0
+        
+        self._writer = threading.Thread(target=self._writer_loop, name="data-logger", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
     
     def _init_csv(self):
         """Initialize CSV file header"""
         if not os.path.exists(self.csv_file):
             with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp',
-                    'market_id',
-                    'market_question',
-                    'yes_price',
-                    'no_price',
-                    'total_cost',
-                    'arbitrage_opportunity',
-                    'potential_profit',
-                    'yes_ask_price',
-                    'no_ask_price',
-                    'yes_bid_price',
-                    'no_bid_price'
-                ])
+                writer.writerow(ROW_COLUMNS)
     
     def _init_db(self):
-        """Initialize SQLite DB table"""
+        """Initialize SQLite DB tables"""
         conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS price_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                market_id TEXT NOT NULL,
-                market_question TEXT,
-                yes_price REAL,
-                no_price REAL,
-                total_cost REAL,
-                arbitrage_opportunity INTEGER,
-                potential_profit REAL,
-                yes_ask_price REAL,
-                no_ask_price REAL,
-                yes_bid_price REAL,
-                no_bid_price REAL,
-                raw_data TEXT
-            )
-        ''')
-        
-        # Create indexes (improve search performance)
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_market_timestamp 
-            ON price_data(market_id, timestamp)
-        ''')
-        
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_arbitrage 
-            ON price_data(arbitrage_opportunity, timestamp)
-        ''')
-        
-        conn.commit()
-        conn.close()
+        try:
+            version = schema_version(conn)
+            if version not in (0, SCHEMA_VERSION):
+                raise RuntimeError(
+                    f"{self.db_file} uses the v{version} schema. "
+                    f"Run 'python3 migrate_db.py {self.db_file}' to upgrade it."
+                )
+            conn.execute('PRAGMA journal_mode=WAL')
+            init_schema(conn)
+        finally:
+            conn.close()
     
     def log_price_data(
         self,
-        market_id: str,
+        market_id: Union[str, int],
         market_question: str,
         yes_price: float,
         no_price: float,
@@ -100,19 +263,27 @@ class DataLogger:
         no_ask: Optional[float] = None,
         yes_bid: Optional[float] = None,
         no_bid: Optional[float] = None,
-        min_profit_margin: float = 0.01
+        min_profit_margin: float = 0.01,
+        depth: Optional[float] = None
     ):
-        """Save price data to CSV and DB"""
-        timestamp = datetime.now().isoformat()
+        """Queue price data for saving to CSV and DB (non-blocking)
+        
+        market_id may also be a handle from self.markets (market_question is then ignored).
+        depth is the size fillable each side at the asks when this tick is an
+        opportunity; it is kept for the episode's peak tick.
+        """
+        if isinstance(market_id, int):
+            handle = market_id
+        else:
+            handle = self.markets.handle(market_id, market_question)
+        ts_ms = int(time.time() * 1000)
         total_cost = yes_price + no_price
         arbitrage_opportunity = 1 if total_cost < (1.0 - min_profit_margin) else 0
         potential_profit = max(0, 1.0 - total_cost) if arbitrage_opportunity else 0
         
-        # Save to CSV
-        self._write_csv([
-            timestamp,
-            market_id,
-            market_question,
+        row = (
+            ts_ms,
+            handle,
             yes_price,
             no_price,
             total_cost,
@@ -122,90 +293,286 @@ class DataLogger:
             no_ask or no_price,
             yes_bid or yes_price,
             no_bid or no_price
-        ])
-        
-        # Save to DB
-        self._write_db({
-            'timestamp': timestamp,
-            'market_id': market_id,
-            'market_question': market_question,
-            'yes_price': yes_price,
-            'no_price': no_price,
-            'total_cost': total_cost,
-            'arbitrage_opportunity': arbitrage_opportunity,
-            'potential_profit': potential_profit,
-            'yes_ask_price': yes_ask or yes_price,
-            'no_ask_price': no_ask or no_price,
-            'yes_bid_price': yes_bid or yes_price,
-            'no_bid_price': no_bid or no_price
-        })
+        )
+        
+        if self._closed:
+            self._record_drop()
+        else:
+            closed = self.episodes.observe(handle, ts_ms, arbitrage_opportunity == 1, potential_profit, depth)
+            if (
+                arbitrage_opportunity
+                and not self.log_opportunity_ticks
+                and self.episodes.started_at(handle) not in (None, ts_ms)
+            ):
+                # Mid-episode tick: counted in the episode, no price row
+                with self._stats_lock:
+                    self.ticks_summarized += 1
+            else:
+                self._enqueue(row)
+            for episode in closed:
+                self._enqueue(episode)
         
         return arbitrage_opportunity == 1
     
-    def _write_csv(self, row: list):
-        """Write data to CSV file"""
-        with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
+    def _enqueue(self, item: tuple):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._record_drop()
     
-    def _write_db(self, data: Dict[str, Any]):
-        """Write data to SQLite DB"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO price_data 
-            (timestamp, market_id, market_question, yes_price, no_price, 
-             total_cost, arbitrage_opportunity, potential_profit,
-             yes_ask_price, no_ask_price, yes_bid_price, no_bid_price, raw_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['timestamp'],
-            data['market_id'],
-            data['market_question'],
-            data['yes_price'],
-            data['no_price'],
-            data['total_cost'],
-            data['arbitrage_opportunity'],
-            data['potential_profit'],
-            data['yes_ask_price'],
-            data['no_ask_price'],
-            data['yes_bid_price'],
-            data['no_bid_price'],
-            json.dumps(data)
-        ))
-        
-        conn.commit()
-        conn.close()
+    def _record_drop(self):
+        with self._stats_lock:
+            self.rows_dropped += 1
+            dropped = self.rows_dropped
+        if dropped == 1 or dropped % 10000 == 0:
+            print(f"[!] Data logger queue full: {dropped} rows dropped so far")
+    
+    def _writer_loop(self):
+        """Drain the queue in batches until the stop marker arrives"""
+        # One sink per open partition (key None when unpartitioned)
+        sinks: Dict[Optional[int], _LogSink] = {}
+        
+        try:
+            stopping = False
+            backoff = 0.0
+            while not stopping:
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        self._queue.task_done()
+                        break
+                    batch.append(item)
+                
+                if batch:
+                    try:
+                        self._write_routed(sinks, batch)
+                        backoff = 0.0
+                    except Exception as e:
+                        # Opening a DB/CSV file failed (disk full, permissions, ...): drop
+                        # the batch, back off and try a fresh sink with the next one
+                        self._close_sinks(sinks, keep=())
+                        with self._stats_lock:
+                            self.write_errors += 1
+                        print(f"[✗] Data logger could not open log files ({len(batch)} rows dropped): {e}")
+                        backoff = min(SINK_RETRY_MAX, max(0.1, backoff * 2))
+                        if not stopping:
+                            time.sleep(backoff)
+                    finally:
+                        for _ in batch:
+                            self._queue.task_done()
+                elif self.store is not None:
+                    # Idle: release partition files so they can be compacted
+                    self._close_sinks(sinks, keep=())
+        finally:
+            self._close_sinks(sinks, keep=())
+    
+    def _write_routed(self, sinks: Dict[Optional[int], '_LogSink'], batch: List[tuple]):
+        """Write a batch to the single log or split it across partitions"""
+        with self._stats_lock:
+            self.queue_high_water = max(self.queue_high_water, len(batch) + self._queue.qsize())
+        
+        if self.store is None:
+            if None not in sinks:
+                sinks[None] = _LogSink(self.db_file, self.csv_file)
+            self._write_batch(sinks[None], batch)
+            return
+        
+        routed: Dict[int, List[tuple]] = {}
+        for row in batch:
+            routed.setdefault(self.store.partition_start(row[0]), []).append(row)
+        
+        # Keep only the partitions this batch touches open
+        self._close_sinks(sinks, keep=routed)
+        for start_ms, rows in routed.items():
+            sink = sinks.get(start_ms)
+            if sink is None:
+                with self.store.lock:
+                    self.store.open_partitions.add(start_ms)
+                sink = sinks[start_ms] = _LogSink(
+                    self.store.db_file(start_ms),
+                    self.store.csv_file(start_ms),
+                    init=True
+                )
+            self._write_batch(sink, rows)
+    
+    def _close_sinks(self, sinks: Dict[Optional[int], '_LogSink'], keep):
+        for key in [key for key in sinks if key not in keep]:
+            try:
+                sinks.pop(key).close()
+            except Exception as e:
+                print(f"[✗] Data logger could not close log files: {e}")
+            if self.store is not None:
+                with self.store.lock:
+                    self.store.open_partitions.discard(key)
+    
+    def _write_batch(self, sink: '_LogSink', batch: List[tuple]):
+        """Write one batch to CSV and DB in a single transaction"""
+        conn = sink.conn
+        market_pks = sink.market_pks
+        ids = self.markets.ids
+        questions = self.markets.questions
+        
+        # Closed episodes share the queue with price rows (both start with ts_ms, handle)
+        rows = []
+        episodes = []
+        for item in batch:
+            (episodes if type(item) is Episode else rows).append(item)
+        
+        try:
+            # Save to CSV (human-readable local timestamp)
+            sink.csv_writer.writerows(
+                (datetime.fromtimestamp(row[0] / 1000).isoformat(), ids[row[1]], questions[row[1]]) + row[2:]
+                for row in rows
+            )
+            sink.csv_handle.flush()
+            
+            # Save to DB
+            db_rows = []
+            for row in rows:
+                market_pk = market_pks.get(row[1])
+                if market_pk is None:
+                    market_pk = market_pks[row[1]] = self._market_pk(conn, ids[row[1]], questions[row[1]])
+                db_rows.append((row[0], market_pk) + row[2:])
+            
+            episode_rows = []
+            for episode in episodes:
+                market_pk = market_pks.get(episode.market)
+                if market_pk is None:
+                    market_pk = market_pks[episode.market] = self._market_pk(
+                        conn, ids[episode.market], questions[episode.market]
+                    )
+                episode_rows.append(episode_row(episode, market_pk))
+            
+            conn.executemany('''
+                INSERT INTO price_data 
+                (ts_ms, market_pk, yes_price, no_price, 
+                 total_cost, arbitrage_opportunity, potential_profit,
+                 yes_ask_price, no_ask_price, yes_bid_price, no_bid_price)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', db_rows)
+            update_rollups(conn, db_rows)
+            conn.executemany(INSERT_EPISODES, episode_rows)
+            conn.commit()
+            
+            with self._stats_lock:
+                self.rows_written += len(rows)
+                self.episodes_written += len(episodes)
+                self.batches_written += 1
+        
+        except Exception as e:
+            conn.rollback()
+            # Market rows created in this transaction were rolled back too
+            market_pks.clear()
+            with self._stats_lock:
+                self.write_errors += 1
+            print(f"[✗] Data logger write failed ({len(batch)} rows): {e}")
+    
+    @staticmethod
+    def _market_pk(conn: sqlite3.Connection, market_id: str, market_question: str) -> int:
+        """Look up (or create) a market's row in the markets dimension table"""
+        conn.execute('''
+            INSERT INTO markets (market_id, market_question) VALUES (?, ?)
+            ON CONFLICT(market_id) DO UPDATE SET market_question = excluded.market_question
+            WHERE excluded.market_question != ''
+        ''', (market_id, market_question))
+        return conn.execute(
+            'SELECT market_pk FROM markets WHERE market_id = ?', (market_id,)
+        ).fetchone()[0]
+    
+    def _check_writer(self):
+        if not self._writer.is_alive():
+            raise RuntimeError("Data logger writer thread is not running; queued rows cannot be written")
+    
+    def flush(self):
+        """Block until every queued row has been written
+        
+        Raises:
+            RuntimeError: If the writer thread died with rows still queued
+        """
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                self._check_writer()
+                self._queue.all_tasks_done.wait(0.5)
+    
+    def _put(self, item):
+        """Blocking enqueue that gives up if the writer thread is gone"""
+        while True:
+            self._check_writer()
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+    
+    def close(self):
+        """Close open episodes, write all queued rows and stop the writer thread
+        
+        Raises:
+            RuntimeError: If the writer thread died with rows still queued
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            for episode in self.episodes.close_all():
+                self._put(episode)
+            self._put(_STOP)
+            self._writer.join()
+        finally:
+            if self.compactor is not None:
+                self.compactor.stop()
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Background writer throughput and backpressure counters"""
+        with self._stats_lock:
+            return {
+                'rows_written': self.rows_written,
+                'episodes_written': self.episodes_written,
+                'episodes_open': self.episodes.open_count(),
+                'rows_dropped': self.rows_dropped,
+                'ticks_summarized': self.ticks_summarized,
+                'batches_written': self.batches_written,
+                'avg_batch_size': self.rows_written / self.batches_written if self.batches_written else 0.0,
+                'queue_depth': self._queue.qsize(),
+                'queue_high_water': self.queue_high_water,
+                'queue_capacity': self._queue.maxsize,
+                'write_errors': self.write_errors
+            }
     
     def get_arbitrage_statistics(self, hours: int = 24) -> Dict[str, Any]:
-        """Query arbitrage opportunity statistics for specified time period"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        # Query data from last N hours
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_opportunities,
-                AVG(potential_profit) as avg_profit,
-                MAX(potential_profit) as max_profit,
-                MIN(potential_profit) as min_profit,
-                COUNT(DISTINCT market_id) as unique_markets
-            FROM price_data
-            WHERE arbitrage_opportunity = 1
-            AND timestamp >= datetime('now', '-' || ? || ' hours')
-        ''', (hours,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result and result[0] > 0:
+        """Query arbitrage opportunity statistics for specified time period
+        
+        Each opportunity counts once however many ticks it lasted: counts,
+        profits (peak profit per opportunity) and durations come from the
+        opportunity_episodes table. Episodes still open are not included.
+        """
+        since_ms = window_start_ms(hours)
+        if self.store is not None:
+            conns = self.store.open_window(since_ms)
+        else:
+            conns = [sqlite3.connect(self.db_file)]
+        try:
+            stats = episode_statistics(conns, since_ms)
+        finally:
+            for conn in conns:
+                conn.close()
+        
+        if stats['episodes'] > 0:
             return {
-                'total_opportunities': result[0],
-                'avg_profit': result[1],
-                'max_profit': result[2],
-                'min_profit': result[3],
-                'unique_markets': result[4],
+                'total_opportunities': stats['episodes'],
+                'avg_profit': stats['avg_peak_profit'],
+                'max_profit': stats['max_peak_profit'],
+                'min_profit': stats['min_peak_profit'],
+                'unique_markets': stats['unique_markets'],
+                'avg_duration': stats['avg_duration'],
+                'max_duration': stats['max_duration'],
+                'avg_depth_at_peak': stats['avg_depth_at_peak'],
                 'hours': hours
             }
         else:
@@ -215,5 +582,8 @@ class DataLogger:
                 'max_profit': 0,
                 'min_profit': 0,
                 'unique_markets': 0,
+                'avg_duration': 0,
+                'max_duration': 0,
+                'avg_depth_at_peak': None,
                 'hours': hours
             }
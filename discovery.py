@@ -0,0 +1,369 @@
+"""
+Polymarket Market Discovery
+Pages through all active Gamma markets concurrently and keeps the scan universe current
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
+
+from config import (
+    MAX_MARKETS_TO_MONITOR,
+    DISCOVERY_INTERVAL,
+    DISCOVERY_PAGE_SIZE,
+    DISCOVERY_CONCURRENCY,
+    DISCOVERY_MIN_VOLUME,
+    DISCOVERY_MIN_LIQUIDITY,
+    DISCOVERY_MIN_HOURS_TO_END,
+    DISCOVERY_MAX_DAYS_TO_END
+)
+from scheduler import parse_end_date
+from market_cache import MarketCache
+
+
+# End-date filters are rounded so listing URLs (and their ETags) stay stable between walks
+END_DATE_ROUNDING = 3600
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _number(market: Dict[str, Any], *keys: str) -> float:
+    """First numeric field present (Gamma sends volumeNum and a string volume)"""
+    for key in keys:
+        try:
+            value = market.get(key)
+            if value not in (None, ''):
+                return float(value)
+        except (TypeError, ValueError):
+            continue
+    return 0.0
+
+
+class MarketDiscovery:
+    """Full active-market listing with filters and a background refresh
+
+    Listing pages are fetched `concurrency` at a time until a short page
+    marks the end. Markets are filtered by volume, liquidity and end date,
+    ranked by volume and capped at max_markets. refresh() compares the
+    result with the current universe and hands additions and removals to
+    bot.queue_universe_update(), which the scan loops apply between sweeps.
+    A listing with a failed page is discarded so an API error never
+    removes markets.
+
+    Complete listings are saved to a MarketCache. A restart within the
+    cache TTL takes its universe from the cache without any listing request
+    and revalidates right away in the background; every walk sends the
+    cached ETag/Last-Modified per page, and a 304 page is reused as cached.
+    """
+
+    def __init__(
+        self,
+        bot,
+        max_markets: int = MAX_MARKETS_TO_MONITOR,
+        page_size: int = DISCOVERY_PAGE_SIZE,
+        concurrency: int = DISCOVERY_CONCURRENCY,
+        min_volume: float = DISCOVERY_MIN_VOLUME,
+        min_liquidity: float = DISCOVERY_MIN_LIQUIDITY,
+        min_hours_to_end: float = DISCOVERY_MIN_HOURS_TO_END,
+        max_days_to_end: float = DISCOVERY_MAX_DAYS_TO_END,
+        interval: float = DISCOVERY_INTERVAL,
+        cache: Optional[MarketCache] = None
+    ):
+        """
+        Args:
+            bot: PolyArbitrageBot whose HTTP client and Gamma URL are used
+            max_markets: Universe size cap (highest volume markets are kept)
+            page_size: Markets per listing request
+            concurrency: Listing requests in flight
+            min_volume: Minimum total volume (USDC)
+            min_liquidity: Minimum current liquidity (USDC)
+            min_hours_to_end: Skip markets resolving sooner than this (0 = only skip ended markets)
+            max_days_to_end: Skip markets resolving later than this (0 = no limit)
+            interval: Seconds between background refreshes (0 = disabled)
+            cache: Listing cache for warm restarts (defaults to MARKET_CACHE_FILE)
+        """
+        self.bot = bot
+        self.max_markets = max_markets
+        self.page_size = max(1, page_size)
+        self.concurrency = max(1, concurrency)
+        self.min_volume = min_volume
+        self.min_liquidity = min_liquidity
+        self.min_hours_to_end = min_hours_to_end
+        self.max_days_to_end = max_days_to_end
+        self.interval = interval
+        self.cache = cache if cache is not None else MarketCache()
+        # The current universe came from the cache and has not been revalidated yet
+        self.warm_start = False
+
+        # market_id -> normalized market in the current universe
+        self.universe: Dict[str, Dict[str, Any]] = {}
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'refreshes': 0,
+            'failed_refreshes': 0,
+            'pages': 0,
+            'not_modified': 0,
+            'warm_starts': 0,
+            'listed': 0,
+            'selected': 0,
+            'added': 0,
+            'removed': 0,
+            'last_duration': 0.0
+        }
+
+    def _params(self, offset: int) -> Dict[str, Any]:
+        params = {
+            'active': 'true',
+            'closed': 'false',
+            'limit': self.page_size,
+            'offset': offset
+        }
+        # Server-side filters shrink the listing; select() re-checks them.
+        # End dates are widened to whole hours (min floored, max ceiled)
+        if self.min_volume > 0:
+            params['volume_num_min'] = self.min_volume
+        if self.min_liquidity > 0:
+            params['liquidity_num_min'] = self.min_liquidity
+        now = time.time()
+        end_min = now + self.min_hours_to_end * 3600
+        params['end_date_min'] = _iso(end_min - end_min % END_DATE_ROUNDING)
+        if self.max_days_to_end > 0:
+            end_max = now + self.max_days_to_end * 86400
+            params['end_date_max'] = _iso(-(-end_max // END_DATE_ROUNDING) * END_DATE_ROUNDING)
+        return params
+
+    def _cache_params(self) -> Dict[str, Any]:
+        """Listing settings a cached page depends on"""
+        return {
+            'url': self.bot.gamma_url,
+            'page_size': self.page_size,
+            'min_volume': self.min_volume,
+            'min_liquidity': self.min_liquidity,
+            'min_hours_to_end': self.min_hours_to_end,
+            'max_days_to_end': self.max_days_to_end
+        }
+
+    def fetch_page(self, offset: int) -> Optional[Dict[str, Any]]:
+        """
+        One Gamma listing page, revalidated against the cached copy
+
+        Returns:
+            {'count': raw markets, 'etag', 'last_modified', 'markets': normalized markets},
+            or None if the request failed
+        """
+        bot = self.bot
+        cached = self.cache.page(offset)
+        params = self._params(offset)
+        try:
+            with bot.metrics.stage('http_listing'):
+                response = bot.http.get(
+                    f"{bot.gamma_url}/markets",
+                    params=params,
+                    timeout=10,
+                    endpoint='gamma',
+                    headers=MarketCache.page_validators(cached)
+                )
+                if response.status_code == 304:
+                    if cached is not None:
+                        self.stats['not_modified'] += 1
+                        return cached
+                    # Nothing to reuse (the cache was replaced meanwhile): fetch the page outright
+                    response = bot.http.get(
+                        f"{bot.gamma_url}/markets",
+                        params=params,
+                        timeout=10,
+                        endpoint='gamma',
+                        headers={'Cache-Control': 'no-cache'}
+                    )
+                    if response.status_code == 304:
+                        raise ValueError("304 Not Modified without a cached page")
+                response.raise_for_status()
+            with bot.metrics.stage('json'):
+                data = response.json()
+            listings = data.get('data', []) if isinstance(data, dict) else data
+            return {
+                'count': len(listings),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'markets': [m for m in map(self.normalize, listings) if m is not None]
+            }
+
+        except Exception as e:
+            bot.metrics.error('discovery')
+            print(f"[✗] Failed to query market listing (offset {offset}): {e}")
+            return None
+
+    def fetch_all(self) -> Optional[Dict[int, Dict[str, Any]]]:
+        """
+        Every active market, paging `concurrency` requests at a time
+
+        Returns:
+            offset -> page (see fetch_page), or None if any page failed
+        """
+        pages = {}
+        offset = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="discovery") as pool:
+            while True:
+                offsets = [offset + i * self.page_size for i in range(self.concurrency)]
+                wave = list(pool.map(self.fetch_page, offsets))
+                self.stats['pages'] += len(wave)
+                if any(page is None for page in wave):
+                    return None
+                # A short page is the end of the listing
+                for page_offset, page in zip(offsets, wave):
+                    pages[page_offset] = page
+                    if page['count'] < self.page_size:
+                        return pages
+                offset = offsets[-1] + self.page_size
+
+    def normalize(self, market: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Metadata kept for a raw Gamma market (None if it is inactive or has no ID)"""
+        market_id = str(market.get('id', ''))
+        if not market_id:
+            return None
+        # Handle default values if active and closed fields are missing
+        if not market.get('active', True) or market.get('closed', False):
+            return None
+
+        outcomes = market.get('outcomes') or []
+        if isinstance(outcomes, str):
+            try:
+                outcomes = json.loads(outcomes)
+            except ValueError:
+                outcomes = []
+
+        return {
+            'id': market_id,
+            'question': market.get('question', ''),
+            'slug': market.get('slug', ''),
+            'end_date': market.get('endDate', ''),
+            'volume': _number(market, 'volumeNum', 'volume'),
+            'liquidity': _number(market, 'liquidityNum', 'liquidity'),
+            'outcomes': outcomes,
+            'neg_risk': bool(market.get('negRisk', False)),
+            'tokens': self.bot.parse_token_ids(market)
+        }
+
+    def select(self, markets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Filter and rank normalized markets (highest volume first, capped at max_markets)"""
+        now = time.time()
+        selected = {}
+        for market in markets:
+            if market['id'] in selected:
+                continue
+            if market['volume'] < self.min_volume or market['liquidity'] < self.min_liquidity:
+                continue
+
+            end_ts = parse_end_date(market['end_date'])
+            if end_ts is not None:
+                hours_left = (end_ts - now) / 3600
+                if hours_left < self.min_hours_to_end:
+                    continue
+                if self.max_days_to_end > 0 and hours_left > self.max_days_to_end * 24:
+                    continue
+
+            selected[market['id']] = market
+
+        ranked = sorted(selected.values(), key=lambda m: m['volume'], reverse=True)
+        return ranked[:self.max_markets] if self.max_markets > 0 else ranked
+
+    def _walk(self) -> Optional[List[Dict[str, Any]]]:
+        """Full listing walk; a complete walk replaces the cache"""
+        pages = self.fetch_all()
+        if pages is None:
+            return None
+        self.cache.save(pages)
+        self.warm_start = False
+        return self.cache.markets()
+
+    def discover(self) -> List[Dict[str, Any]]:
+        """
+        Initial universe (becomes the baseline for later refreshes)
+
+        A fresh cache is used without contacting the API.
+
+        Returns:
+            Selected markets, or [] if the listing failed
+        """
+        start = time.perf_counter()
+        self.cache.load(self._cache_params())
+        if self.cache.is_fresh():
+            listed = self.cache.markets()
+            self.warm_start = True
+            self.stats['warm_starts'] += 1
+        else:
+            listed = self._walk()
+            if listed is None:
+                self.stats['failed_refreshes'] += 1
+                return []
+        markets = self.select(listed)
+        self.universe = {m['id']: m for m in markets}
+        self._record(len(listed), len(markets), time.perf_counter() - start)
+        return markets
+
+    def refresh(self) -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+        """
+        Re-list markets and queue the difference with the current universe
+
+        Returns:
+            (added markets, removed market IDs), or None if the listing failed
+        """
+        start = time.perf_counter()
+        listed = self._walk()
+        if listed is None:
+            self.stats['failed_refreshes'] += 1
+            print("[!] Market discovery refresh failed. Keeping the current universe.")
+            return None
+
+        markets = {m['id']: m for m in self.select(listed)}
+        added = [m for market_id, m in markets.items() if market_id not in self.universe]
+        removed = [market_id for market_id in self.universe if market_id not in markets]
+        self.universe = markets
+        self._record(len(listed), len(markets), time.perf_counter() - start)
+
+        if added or removed:
+            self.stats['added'] += len(added)
+            self.stats['removed'] += len(removed)
+            self.bot.queue_universe_update(added, removed)
+            print(f"[*] Market discovery: +{len(added)} / -{len(removed)} markets ({len(markets)} monitored)")
+        return added, removed
+
+    def _record(self, listed: int, selected: int, duration: float):
+        self.stats['refreshes'] += 1
+        self.stats['listed'] = listed
+        self.stats['selected'] = selected
+        self.stats['last_duration'] = duration
+
+    def start(self):
+        """Refresh every interval seconds on a background thread"""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="market-discovery", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        # A cached universe is revalidated right away, later ones every interval
+        delay = 0.0 if self.warm_start else self.interval
+        while not self._stop.wait(delay):
+            delay = self.interval
+            try:
+                self.refresh()
+            except Exception as e:
+                self.bot.metrics.error('discovery')
+                print(f"[✗] Market discovery error: {e}")
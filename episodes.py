@@ -0,0 +1,281 @@
+"""
+Polymarket Opportunity Episodes
+Per-market opportunity state machine: one record per opportunity instead of one per tick
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import sqlite3
+import threading
+from typing import Optional, List, Dict, Set, Any, Tuple, NamedTuple
+
+from config import EPISODE_MAX_GAP
+
+
+class Episode(NamedTuple):
+    """One arbitrage opportunity on one market, from the first to the last tick it was seen"""
+    start_ms: int                   # First tick with the opportunity (UTC epoch ms)
+    market: int                     # MarketIndex handle (market_pk when rebuilt from a DB)
+    end_ms: int                     # Last tick with the opportunity
+    ticks: int                      # Price updates during the episode
+    peak_ms: int                    # Tick with the highest profit
+    peak_profit: float              # Highest 1 - total_cost seen
+    depth_at_peak: Optional[float]  # Shares fillable each side at the peak (None without orderbooks)
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+
+class EpisodeTracker:
+    """Open and close opportunity episodes per market from price ticks
+
+    A market is idle until a tick shows an opportunity, which opens an
+    episode; further opportunity ticks extend it and raise its peak. The
+    first tick without the opportunity closes it, and so does a gap of more
+    than max_gap seconds without any tick for the market (it stopped being
+    polled, so the real end is unknown). Durations are lower bounds: first to
+    last tick the opportunity was observed.
+
+    Ticks must arrive in time order per market. observe() is thread-safe and
+    returns the episodes it closed so the caller can queue them for writing.
+    """
+
+    def __init__(self, max_gap: float = EPISODE_MAX_GAP):
+        self.max_gap_ms = int(max_gap * 1000)
+        # market -> [start_ms, last_ms, ticks, peak_ms, peak_profit, depth_at_peak]
+        self._open: Dict[int, list] = {}
+        self._lock = threading.Lock()
+        self._next_expiry = 0
+        self.opened = 0
+        self.closed = 0
+
+    def observe(
+        self,
+        market: int,
+        ts_ms: int,
+        opportunity: bool,
+        profit: float,
+        depth: Optional[float] = None
+    ) -> List[Episode]:
+        """
+        Feed one price tick
+
+        Returns:
+            Episodes closed by this tick (usually empty)
+        """
+        closed = []
+        with self._lock:
+            if ts_ms >= self._next_expiry:
+                # Markets that went quiet are swept at most once per gap
+                self._next_expiry = ts_ms + self.max_gap_ms
+                closed.extend(self._expire(ts_ms))
+
+            state = self._open.get(market)
+            if state is not None and ts_ms - state[1] > self.max_gap_ms:
+                closed.append(self._close(market))
+                state = None
+
+            if opportunity:
+                if state is None:
+                    self._open[market] = [ts_ms, ts_ms, 1, ts_ms, profit, depth]
+                    self.opened += 1
+                else:
+                    state[1] = ts_ms
+                    state[2] += 1
+                    if profit > state[4]:
+                        state[3] = ts_ms
+                        state[4] = profit
+                        state[5] = depth
+            elif state is not None:
+                closed.append(self._close(market))
+        return closed
+
+    def _close(self, market: int) -> Episode:
+        start_ms, last_ms, ticks, peak_ms, peak_profit, depth = self._open.pop(market)
+        self.closed += 1
+        return Episode(start_ms, market, last_ms, ticks, peak_ms, peak_profit, depth)
+
+    def _expire(self, now_ms: int) -> List[Episode]:
+        stale = [market for market, state in self._open.items() if now_ms - state[1] > self.max_gap_ms]
+        return [self._close(market) for market in stale]
+
+    def close_all(self) -> List[Episode]:
+        """Close every open episode at its last observed tick (shutdown)"""
+        with self._lock:
+            return [self._close(market) for market in list(self._open)]
+
+    def open_count(self) -> int:
+        return len(self._open)
+
+    def started_at(self, market: int) -> Optional[int]:
+        """Start of the market's open episode (None when idle)"""
+        with self._lock:
+            state = self._open.get(market)
+            return state[0] if state is not None else None
+
+
+SCHEMA_EPISODE_TABLES = (
+    '''
+    CREATE TABLE IF NOT EXISTS opportunity_episodes (
+        id INTEGER PRIMARY KEY,
+        start_ms INTEGER NOT NULL,
+        market_pk INTEGER NOT NULL REFERENCES markets(market_pk),
+        end_ms INTEGER NOT NULL,
+        duration_ms INTEGER NOT NULL,
+        ticks INTEGER NOT NULL,
+        peak_ms INTEGER NOT NULL,
+        peak_profit REAL NOT NULL,
+        depth_at_peak REAL
+    )
+    ''',
+    # Window scans (statistics, hourly distribution, top markets): covering
+    '''
+    CREATE INDEX IF NOT EXISTS idx_episode_start
+    ON opportunity_episodes(start_ms, market_pk, peak_profit, duration_ms)
+    ''',
+    # Per-market episode history
+    '''
+    CREATE INDEX IF NOT EXISTS idx_episode_market
+    ON opportunity_episodes(market_pk, start_ms)
+    '''
+)
+
+INSERT_EPISODES = '''
+    INSERT INTO opportunity_episodes
+    (start_ms, market_pk, end_ms, duration_ms, ticks, peak_ms, peak_profit, depth_at_peak)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def episode_row(episode: Episode, market_pk: int) -> tuple:
+    """opportunity_episodes values for INSERT_EPISODES"""
+    return (
+        episode.start_ms, market_pk, episode.end_ms, episode.duration_ms,
+        episode.ticks, episode.peak_ms, episode.peak_profit, episode.depth_at_peak
+    )
+
+
+def rebuild_episodes(conn: sqlite3.Connection, max_gap: float = EPISODE_MAX_GAP, chunk_size: int = 10000) -> int:
+    """
+    Recompute opportunity_episodes by replaying price_data in time order (caller commits)
+
+    Depth at peak is unknown for replayed episodes and stored as NULL.
+
+    Returns:
+        Number of episodes written
+    """
+    conn.execute('DELETE FROM opportunity_episodes')
+    tracker = EpisodeTracker(max_gap)
+    cursor = conn.execute('''
+        SELECT ts_ms, market_pk, arbitrage_opportunity, potential_profit
+        FROM price_data
+        ORDER BY ts_ms, id
+    ''')
+    written = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        closed = []
+        for ts_ms, market_pk, arbitrage, profit in rows:
+            closed.extend(tracker.observe(market_pk, ts_ms, arbitrage == 1, profit or 0.0))
+        conn.executemany(INSERT_EPISODES, [episode_row(episode, episode.market) for episode in closed])
+        written += len(closed)
+
+    closed = tracker.close_all()
+    conn.executemany(INSERT_EPISODES, [episode_row(episode, episode.market) for episode in closed])
+    return written + len(closed)
+
+
+def has_episodes(conn: sqlite3.Connection) -> bool:
+    """Whether a log DB has the episode table (partitions written before v4 do not)"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'opportunity_episodes'"
+    ).fetchone() is not None
+
+
+def statistics_part(conn: sqlite3.Connection, since_ms: int) -> tuple:
+    """
+    (episodes, sum_peak, min_peak, max_peak, sum_duration_ms, max_duration_ms, sum_depth, depth_count)
+    for episodes starting at or after since_ms
+    """
+    return conn.execute('''
+        SELECT
+            COUNT(*), TOTAL(peak_profit), MIN(peak_profit), MAX(peak_profit),
+            TOTAL(duration_ms), MAX(duration_ms), TOTAL(depth_at_peak), COUNT(depth_at_peak)
+        FROM opportunity_episodes WHERE start_ms >= ?
+    ''', (since_ms,)).fetchone()
+
+
+def episode_markets(conn: sqlite3.Connection, since_ms: int) -> Set[str]:
+    """Market ids with at least one episode starting at or after since_ms"""
+    rows = conn.execute('''
+        SELECT m.market_id FROM markets m
+        WHERE m.market_pk IN (SELECT market_pk FROM opportunity_episodes WHERE start_ms >= ?)
+    ''', (since_ms,))
+    return {row[0] for row in rows}
+
+
+def merge_statistics(parts: List[tuple], unique_markets: int) -> Dict[str, Any]:
+    """Combine statistics_part rows (one per DB) into episode statistics (durations in seconds)"""
+    episodes = depth_count = 0
+    sum_peak = sum_duration = sum_depth = 0.0
+    min_peak = max_peak = max_duration = None
+    for part_episodes, part_sum_peak, part_min, part_max, part_duration, part_max_duration, part_depth, part_depth_count in parts:
+        if not part_episodes:
+            continue
+        episodes += part_episodes
+        sum_peak += part_sum_peak
+        sum_duration += part_duration
+        sum_depth += part_depth
+        depth_count += part_depth_count
+        min_peak = part_min if min_peak is None else min(min_peak, part_min)
+        max_peak = part_max if max_peak is None else max(max_peak, part_max)
+        max_duration = part_max_duration if max_duration is None else max(max_duration, part_max_duration)
+
+    return {
+        'episodes': episodes,
+        'avg_peak_profit': sum_peak / episodes if episodes else None,
+        'max_peak_profit': max_peak,
+        'min_peak_profit': min_peak,
+        'unique_markets': unique_markets,
+        'avg_duration': sum_duration / episodes / 1000 if episodes else None,
+        'max_duration': max_duration / 1000 if max_duration is not None else None,
+        'total_duration': sum_duration / 1000,
+        'avg_depth_at_peak': sum_depth / depth_count if depth_count else None
+    }
+
+
+def hourly_episodes(conn: sqlite3.Connection, since_ms: int) -> List[Tuple[str, int]]:
+    """(local hour 'HH', episodes started) for start_ms >= since_ms"""
+    return conn.execute('''
+        SELECT strftime('%H', start_ms / 1000, 'unixepoch', 'localtime') as hour, COUNT(*)
+        FROM opportunity_episodes WHERE start_ms >= ?
+        GROUP BY hour
+        ORDER BY hour
+    ''', (since_ms,)).fetchall()
+
+
+def market_totals(
+    conn: sqlite3.Connection,
+    since_ms: int,
+    limit: Optional[int] = None
+) -> List[Tuple[str, str, int, float, float, int]]:
+    """(market_id, question, episodes, sum_peak_profit, max_peak_profit, sum_duration_ms) by most episodes"""
+    return conn.execute('''
+        SELECT m.market_id, m.market_question, top.episodes, top.sum_peak, top.max_peak, top.sum_duration
+        FROM (
+            SELECT market_pk, COUNT(*) as episodes, TOTAL(peak_profit) as sum_peak,
+                   MAX(peak_profit) as max_peak, SUM(duration_ms) as sum_duration
+            FROM opportunity_episodes
+            WHERE start_ms >= ?
+            GROUP BY market_pk
+            ORDER BY episodes DESC, market_pk
+            LIMIT ?
+        ) top
+        JOIN markets m ON m.market_pk = top.market_pk
+        ORDER BY top.episodes DESC, top.market_pk
+    ''', (since_ms, -1 if limit is None else limit)).fetchall()
@@ -0,0 +1,345 @@
+"""
+Polymarket Multi-Outcome Event Scanner
+Neg-risk events scanned as baskets: one Yes share of every outcome pays exactly $1
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple, NamedTuple
+
+import numpy as np
+
+from config import (
+    EVENT_SCAN_INTERVAL,
+    EVENT_PAGE_SIZE,
+    EVENT_BATCH_SIZE,
+    EVENT_CONCURRENCY,
+    EVENT_MAX_EVENTS,
+    DISCOVERY_INTERVAL
+)
+from orderbook import OrderBook, BasketSize, size_basket_arbitrage
+
+
+class EventGroup(NamedTuple):
+    """Outcome markets of one neg-risk event"""
+    event_id: str
+    title: str
+    market_ids: Tuple[str, ...]
+    outcomes: Tuple[str, ...]       # Outcome label per market (groupItemTitle or question)
+    token_ids: Tuple[str, ...]      # Yes token per market
+
+
+class EventOpportunity(NamedTuple):
+    """An event whose outcome asks sum below the threshold"""
+    event: EventGroup
+    ask_sum: float                  # Sum of best Yes asks
+    top_size: float                 # Thinnest leg at the best ask (shares)
+    sizing: Optional[BasketSize]    # Depth-aware basket size (None if depth does not clear)
+
+
+def _best_ask(levels: List[Dict[str, Any]]) -> Tuple[float, float]:
+    """Lowest ask and its size from CLOB snapshot levels (NaN if empty)"""
+    best, best_size = float('inf'), 0.0
+    for level in levels:
+        price = float(level['price'])
+        if price < best:
+            size = float(level['size'])
+            if size > 0:
+                best, best_size = price, size
+    return (best, best_size) if best_size > 0 else (np.nan, 0.0)
+
+
+class EventScanner:
+    """Basket arbitrage across the outcome markets of neg-risk events
+
+    In a neg-risk event exactly one outcome resolves Yes, so buying one Yes
+    share of every outcome costs the sum of the asks and pays $1. Events
+    are listed from Gamma /events (only neg-risk events whose every outcome
+    market is active with a Yes token), and their Yes tokens are laid out
+    flat with per-event start offsets. A sweep fetches all books through
+    batched POST /books requests (batch_size books each, concurrency in
+    flight), reduces best asks to per-event sums and thinnest top-of-book
+    sizes with np.add/np.minimum.reduceat in one pass, and only builds
+    order books for the events that clear the threshold, to size the basket
+    against depth.
+    """
+
+    def __init__(
+        self,
+        bot,
+        interval: float = EVENT_SCAN_INTERVAL,
+        page_size: int = EVENT_PAGE_SIZE,
+        batch_size: int = EVENT_BATCH_SIZE,
+        concurrency: int = EVENT_CONCURRENCY,
+        max_events: int = EVENT_MAX_EVENTS,
+        refresh_interval: float = DISCOVERY_INTERVAL
+    ):
+        """
+        Args:
+            bot: PolyArbitrageBot (HTTP client, API URLs, thresholds, metrics)
+            interval: Seconds between event sweeps
+            page_size: Events per Gamma listing request
+            batch_size: Books per POST /books request
+            concurrency: /books requests in flight
+            max_events: Events scanned (0 = all)
+            refresh_interval: Seconds between event list refreshes (0 = list once)
+        """
+        self.bot = bot
+        self.interval = interval
+        self.page_size = max(1, page_size)
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_events = max_events
+        self.refresh_interval = refresh_interval
+
+        self.events: List[EventGroup] = []
+        # Yes tokens of all events back to back; event i owns tokens[starts[i]:starts[i] + counts[i]]
+        self.tokens: List[str] = []
+        self.starts = np.zeros(0, dtype=np.intp)
+        self.counts = np.zeros(0, dtype=np.intp)
+        self.listed_at = 0.0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'sweeps': 0,
+            'events': 0,
+            'books': 0,
+            'requests': 0,
+            'failed_batches': 0,
+            'skipped': 0,
+            'opportunities': 0,
+            'last_sweep_time': 0.0,
+            'last_detect_time': 0.0
+        }
+
+    def parse_event(self, event: Dict[str, Any]) -> Optional[EventGroup]:
+        """EventGroup for a raw Gamma event (None unless every outcome market is tradable)"""
+        if not event.get('negRisk') or not event.get('active', True) or event.get('closed', False):
+            return None
+        markets = event.get('markets') or []
+        if len(markets) < 2:
+            return None
+
+        market_ids, outcomes, token_ids = [], [], []
+        for market in markets:
+            if not market.get('active', True) or market.get('closed', False):
+                # A resolved or paused outcome breaks the basket payout
+                return None
+            tokens = self.bot.parse_token_ids(market)
+            if 'Yes' not in tokens:
+                return None
+            market_ids.append(str(market.get('id', '')))
+            outcomes.append(market.get('groupItemTitle') or market.get('question', ''))
+            token_ids.append(tokens['Yes'])
+
+        return EventGroup(
+            event_id=str(event.get('id', '')),
+            title=event.get('title', ''),
+            market_ids=tuple(market_ids),
+            outcomes=tuple(outcomes),
+            token_ids=tuple(token_ids)
+        )
+
+    def fetch_events(self) -> Optional[List[EventGroup]]:
+        """
+        Every active neg-risk event from Gamma /events
+
+        Returns:
+            Events, or None if a listing page failed
+        """
+        bot = self.bot
+        events = []
+        offset = 0
+        while True:
+            try:
+                with bot.metrics.stage('http_events'):
+                    response = bot.http.get(
+                        f"{bot.gamma_url}/events",
+                        params={'active': 'true', 'closed': 'false', 'limit': self.page_size, 'offset': offset},
+                        timeout=10,
+                        endpoint='gamma'
+                    )
+                    response.raise_for_status()
+                with bot.metrics.stage('json'):
+                    page = response.json()
+            except Exception as e:
+                bot.metrics.error('events')
+                print(f"[✗] Failed to query event listing (offset {offset}): {e}")
+                return None
+
+            page = page.get('data', []) if isinstance(page, dict) else page
+            events.extend(e for e in map(self.parse_event, page) if e is not None)
+            if len(page) < self.page_size:
+                break
+            offset += self.page_size
+        return events
+
+    def set_events(self, events: List[EventGroup]):
+        """Replace the scanned events and rebuild the flat token layout"""
+        if self.max_events > 0:
+            events = events[:self.max_events]
+        counts = np.array([len(e.token_ids) for e in events], dtype=np.intp)
+        starts = np.zeros(len(events), dtype=np.intp)
+        if len(events) > 1:
+            np.cumsum(counts[:-1], out=starts[1:])
+        self.tokens = [token for e in events for token in e.token_ids]
+        self.events, self.starts, self.counts = events, starts, counts
+        self.listed_at = time.time()
+        self.stats['events'] = len(events)
+
+    def refresh_events(self) -> bool:
+        """Re-list events (the current list is kept if the listing fails)"""
+        events = self.fetch_events()
+        if events is None:
+            return False
+        self.set_events(events)
+        return True
+
+    def _fetch_batch(self, tokens: List[str]) -> Optional[List[Dict[str, Any]]]:
+        bot = self.bot
+        try:
+            with bot.metrics.stage('http_books'):
+                response = bot.http.post(
+                    f"{bot.clob_url}/books",
+                    json=[{'token_id': token} for token in tokens],
+                    timeout=10,
+                    endpoint='clob',
+                    cost=len(tokens)
+                )
+                response.raise_for_status()
+            with bot.metrics.stage('json'):
+                return response.json()
+        except Exception as e:
+            bot.metrics.error('http_books')
+            print(f"[✗] Failed to query event books ({len(tokens)} tokens): {e}")
+            return None
+
+    def _batches(self) -> List[List[str]]:
+        """Tokens per /books request (events may span two requests)"""
+        tokens = self.tokens
+        return [tokens[i:i + self.batch_size] for i in range(0, len(tokens), self.batch_size)]
+
+    def fetch_quotes(self) -> Tuple[np.ndarray, np.ndarray, Dict[str, Dict[str, Any]]]:
+        """
+        Best Yes ask and its size for every token, in self.tokens order
+
+        Returns:
+            (asks, sizes, token_id -> raw snapshot); tokens without a book are NaN
+        """
+        tokens = self.tokens
+        batches = self._batches()
+        snapshots: Dict[str, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="event-books") as pool:
+            for result in pool.map(self._fetch_batch, batches):
+                if result is None:
+                    self.stats['failed_batches'] += 1
+                    continue
+                for snapshot in result:
+                    snapshots[str(snapshot.get('asset_id'))] = snapshot
+        self.stats['requests'] += len(batches)
+        self.stats['books'] += len(snapshots)
+
+        asks = np.full(len(tokens), np.nan)
+        sizes = np.zeros(len(tokens))
+        for i, token in enumerate(tokens):
+            snapshot = snapshots.get(token)
+            if snapshot is not None:
+                asks[i], sizes[i] = _best_ask(snapshot.get('asks') or [])
+        return asks, sizes, snapshots
+
+    def candidates(self, asks: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized basket threshold over all events
+
+        Returns:
+            (indices of events that clear the threshold, ask sum per event, thinnest top-of-book size per event)
+        """
+        max_basket_cost = 1.0 - self.bot.min_profit_margin - self.bot.max_slippage
+        # One pass over the flat arrays: a missing leg makes its event's sum NaN
+        ask_sums = np.add.reduceat(asks, self.starts)
+        top_sizes = np.minimum.reduceat(sizes, self.starts)
+        return np.flatnonzero((ask_sums < max_basket_cost) & (top_sizes > 0)), ask_sums, top_sizes
+
+    def detect(
+        self,
+        asks: np.ndarray,
+        sizes: np.ndarray,
+        snapshots: Dict[str, Dict[str, Any]]
+    ) -> List[EventOpportunity]:
+        """
+        Vectorized basket check over all events, depth sizing for the hits
+
+        Returns:
+            Opportunities, most profitable basket first
+        """
+        if not self.events:
+            return []
+        max_basket_cost = 1.0 - self.bot.min_profit_margin - self.bot.max_slippage
+        hits, ask_sums, top_sizes = self.candidates(asks, sizes)
+        self.stats['skipped'] += int(np.isnan(ask_sums).sum())
+
+        opportunities = []
+        for i in hits:
+            event = self.events[i]
+            books = [
+                OrderBook.from_snapshot(
+                    snapshots[token].get('bids') or [],
+                    snapshots[token].get('asks') or [],
+                    int(snapshots[token].get('timestamp') or 0)
+                )
+                for token in event.token_ids
+            ]
+            opportunities.append(EventOpportunity(
+                event=event,
+                ask_sum=float(ask_sums[i]),
+                top_size=float(top_sizes[i]),
+                sizing=size_basket_arbitrage(books, max_basket_cost)
+            ))
+        opportunities.sort(key=lambda o: o.sizing.profit if o.sizing else 0.0, reverse=True)
+        return opportunities
+
+    def sweep(self) -> List[EventOpportunity]:
+        """Fetch every event's books and return the baskets that clear the threshold"""
+        start = time.perf_counter()
+        with self.bot.metrics.stage('event_sweep'):
+            asks, sizes, snapshots = self.fetch_quotes()
+            detect_start = time.perf_counter()
+            with self.bot.metrics.stage('detect_events'):
+                opportunities = self.detect(asks, sizes, snapshots)
+        self.stats['sweeps'] += 1
+        self.stats['opportunities'] += len(opportunities)
+        self.stats['last_detect_time'] = time.perf_counter() - detect_start
+        self.stats['last_sweep_time'] = time.perf_counter() - start
+        return opportunities
+
+    def start(self):
+        """List events and sweep every interval seconds on a background thread"""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-scanner", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        delay = 0.0
+        while not self._stop.wait(delay):
+            delay = self.interval
+            try:
+                stale = self.refresh_interval > 0 and time.time() - self.listed_at >= self.refresh_interval
+                if (not self.events or stale) and self.refresh_events() and self.stats['sweeps'] == 0:
+                    print(f"[✓] Scanning {len(self.events)} neg-risk events ({len(self.tokens)} outcome markets)")
+                for opportunity in self.sweep():
+                    self.bot._handle_event_opportunity(opportunity)
+            except Exception as e:
+                self.bot.metrics.error('events')
+                print(f"[✗] Event scan error: {e}")
@@ -0,0 +1,718 @@
+"""
+Polymarket Two-Leg Order Execution
+Submits the Yes and No legs of a parity arbitrage concurrently and unwinds unmatched fills
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import hmac
+import json
+import time
+import base64
+import hashlib
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, NamedTuple, Tuple, Callable
+
+from eth_utils import keccak
+
+from config import (
+    CLOB_API_KEY,
+    CLOB_API_SECRET,
+    CLOB_API_PASSPHRASE,
+    CLOB_FUNDER,
+    CLOB_SIGNATURE_TYPE,
+    CLOB_NONCE,
+    EXECUTION_ORDER_TYPE,
+    EXECUTION_MAX_SHARES,
+    EXECUTION_UNWIND_SLIPPAGE,
+    EXECUTION_TIMEOUT,
+    EXECUTION_PRESIGN_MARKETS,
+    EXECUTION_PRESIGN_BAND,
+    EXECUTION_PRESIGN_TTL,
+    EXECUTION_PRESIGN_INTERVAL,
+    EXECUTION_PRESIGN_RUNGS
+)
+from orderbook import OrderBook
+
+POLYGON_CHAIN_ID = 137
+CTF_EXCHANGE = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
+NEG_RISK_CTF_EXCHANGE = "0xC5d563A36AE78145C45a50134d48A1215220f80a"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+BUY = 0
+SELL = 1
+SIDE_NAMES = {BUY: 'BUY', SELL: 'SELL'}
+
+TOKEN_DECIMALS = 1_000_000  # USDC and outcome tokens both use 6 decimals
+DEFAULT_TICK_SIZE = 0.01
+
+# GTD orders must stay valid at least this long after they reach the CLOB (seconds)
+GTD_MIN_LIFETIME = 60
+
+# EIP-712 type strings of the CTF Exchange domain and Order struct
+DOMAIN_TYPE_HASH = keccak(text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+ORDER_TYPE_HASH = keccak(text=(
+    "Order(uint256 salt,address maker,address signer,address taker,uint256 tokenId,"
+    "uint256 makerAmount,uint256 takerAmount,uint256 expiration,uint256 nonce,"
+    "uint256 feeRateBps,uint8 side,uint8 signatureType)"
+))
+
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, 'big')
+
+
+def _address_word(address: str) -> bytes:
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+def _domain_separator(exchange: str) -> bytes:
+    return keccak(
+        DOMAIN_TYPE_HASH
+        + keccak(text='Polymarket CTF Exchange')
+        + keccak(text='1')
+        + _word(POLYGON_CHAIN_ID)
+        + _address_word(exchange)
+    )
+
+
+# "\x19\x01" || domain separator, per exchange
+_DIGEST_PREFIX = {exchange: b'\x19\x01' + _domain_separator(exchange) for exchange in (CTF_EXCHANGE, NEG_RISK_CTF_EXCHANGE)}
+
+
+def order_hash(order: Dict[str, Any], exchange: str) -> bytes:
+    """
+    EIP-712 digest of an Order (what the exchange verifies the signature against)
+
+    Same result as eth_account's encode_typed_data, without re-deriving the
+    type encoding and domain separator for every order.
+    """
+    struct_hash = keccak(
+        ORDER_TYPE_HASH
+        + _word(order['salt'])
+        + _address_word(order['maker'])
+        + _address_word(order['signer'])
+        + _address_word(order['taker'])
+        + _word(order['tokenId'])
+        + _word(order['makerAmount'])
+        + _word(order['takerAmount'])
+        + _word(order['expiration'])
+        + _word(order['nonce'])
+        + _word(order['feeRateBps'])
+        + _word(order['side'])
+        + _word(order['signatureType'])
+    )
+    return keccak(_DIGEST_PREFIX[exchange] + struct_hash)
+
+
+def _round_to_tick(price: float, tick: float, up: bool) -> float:
+    steps = price / tick
+    steps = int(steps) + (1 if up and steps - int(steps) > 1e-9 else 0)
+    return round(max(tick, min(1.0 - tick, steps * tick)), 6)
+
+
+class OrderTemplate:
+    """Everything about an order for one token except price, size and salt
+
+    Built once per token when a market is first traded; build() only fills in
+    the amounts.
+    """
+
+    __slots__ = ('token_id', 'maker', 'signer', 'exchange', 'signature_type', 'fee_rate_bps', 'tick_size')
+
+    def __init__(
+        self,
+        token_id: str,
+        maker: str,
+        signer: str,
+        neg_risk: bool = False,
+        signature_type: int = CLOB_SIGNATURE_TYPE,
+        fee_rate_bps: int = 0,
+        tick_size: float = DEFAULT_TICK_SIZE
+    ):
+        self.token_id = token_id
+        self.maker = maker
+        self.signer = signer
+        self.exchange = NEG_RISK_CTF_EXCHANGE if neg_risk else CTF_EXCHANGE
+        self.signature_type = signature_type
+        self.fee_rate_bps = fee_rate_bps
+        self.tick_size = tick_size
+
+    def build(self, side: int, price: float, size: float, nonce: int = 0, expiration: int = 0) -> Dict[str, Any]:
+        """
+        Unsigned order
+
+        Args:
+            side: BUY or SELL
+            price: Limit price per share
+            size: Shares
+            nonce: Exchange nonce
+            expiration: Unix expiry (0 = none; GTD orders only)
+        """
+        shares = int(round(size, 2) * TOKEN_DECIMALS)
+        usdc = int(round(price * round(size, 2), 4) * TOKEN_DECIMALS)
+        return {
+            'salt': secrets.randbits(48),
+            'maker': self.maker,
+            'signer': self.signer,
+            'taker': ZERO_ADDRESS,
+            'tokenId': int(self.token_id),
+            # BUY pays USDC for shares, SELL pays shares for USDC
+            'makerAmount': usdc if side == BUY else shares,
+            'takerAmount': shares if side == BUY else usdc,
+            'expiration': expiration,
+            'nonce': nonce,
+            'feeRateBps': self.fee_rate_bps,
+            'side': side,
+            'signatureType': self.signature_type
+        }
+
+
+class OrderSigner:
+    """EIP-712 order signatures and CLOB L2 (HMAC) request headers"""
+
+    def __init__(
+        self,
+        account,
+        api_key: str = CLOB_API_KEY,
+        api_secret: str = CLOB_API_SECRET,
+        passphrase: str = CLOB_API_PASSPHRASE
+    ):
+        """
+        Args:
+            account: eth_account LocalAccount that signs orders
+            api_key / api_secret / passphrase: CLOB L2 API credentials
+        """
+        self.account = account
+        self.address = account.address
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.passphrase = passphrase
+        # eth-account < 0.13 only has the old name
+        self._sign_hash = getattr(account, 'unsafe_sign_hash', None) or account.signHash
+
+    def sign(self, order: Dict[str, Any], exchange: str) -> str:
+        return '0x' + bytes(self._sign_hash(order_hash(order, exchange)).signature).hex()
+
+    def l2_headers(self, method: str, path: str, body: str = "") -> Dict[str, str]:
+        timestamp = str(int(time.time()))
+        signature = ""
+        if self.api_secret:
+            digest = hmac.new(
+                base64.urlsafe_b64decode(self.api_secret),
+                f"{timestamp}{method}{path}{body}".encode(),
+                hashlib.sha256
+            ).digest()
+            signature = base64.urlsafe_b64encode(digest).decode()
+        return {
+            'POLY_ADDRESS': self.address,
+            'POLY_SIGNATURE': signature,
+            'POLY_TIMESTAMP': timestamp,
+            'POLY_API_KEY': self.api_key,
+            'POLY_PASSPHRASE': self.passphrase,
+            'Content-Type': 'application/json'
+        }
+
+
+class NonceManager:
+    """Exchange nonce and expiries for signed orders
+
+    Every order carries the account's CTF Exchange nonce; raising it on-chain
+    (incrementNonce) cancels all orders signed with the old value, so bump()
+    also retires every pre-signed order. Pre-signed orders are only sent
+    within ttl seconds of signing, and GTD orders are given an expiration
+    that leaves the CLOB's minimum lifetime after that window.
+    """
+
+    def __init__(
+        self,
+        nonce: int = CLOB_NONCE,
+        ttl: float = EXECUTION_PRESIGN_TTL,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            nonce: Current exchange nonce of the maker
+            ttl: Seconds a pre-signed order stays usable
+        """
+        self.nonce = nonce
+        self.ttl = ttl
+        self.clock = clock
+
+    def expiration(self, order_type: str) -> int:
+        """On-chain expiration field for a new order (0 unless GTD)"""
+        if order_type != 'GTD':
+            return 0
+        return int(self.clock() + self.ttl + GTD_MIN_LIFETIME)
+
+    def expires_at(self) -> float:
+        """Time after which an order signed now is no longer sent"""
+        return self.clock() + self.ttl
+
+    def is_valid(self, nonce: int, expires_at: float) -> bool:
+        return nonce == self.nonce and self.clock() < expires_at
+
+    def bump(self, nonce: Optional[int] = None):
+        """Switch to a new exchange nonce (default: current + 1)"""
+        self.nonce = self.nonce + 1 if nonce is None else nonce
+
+
+class PresignedOrder(NamedTuple):
+    """Signed order body waiting to be sent"""
+    limit: float
+    body: str
+    nonce: int
+    expires_at: float
+
+
+class OrderPreparer:
+    """Signed order bodies, pre-signed ahead of the trigger where possible
+
+    ECDSA signing dominates order construction, so warm() signs orders for
+    the markets closest to triggering in the background and take() hands a
+    matching one over without any signing on the trigger path. One order is
+    kept per (token, side, size, order type); it only matches a request at
+    the same limit (a higher pre-signed buy limit would pay more than the
+    trigger priced). Orders are single use (the salt makes each order hash
+    unique).
+    """
+
+    def __init__(self, signer: OrderSigner, nonces: NonceManager):
+        self.signer = signer
+        self.nonces = nonces
+        self._ready: Dict[Tuple[str, int, float, str], PresignedOrder] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'presigned': 0,
+            'hits': 0,
+            'misses': 0,
+            'expired': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+    def sign(self, template: OrderTemplate, side: int, price: float, size: float, order_type: str) -> str:
+        """Build and sign an order now; returns the request body"""
+        order = template.build(side, price, size, self.nonces.nonce, self.nonces.expiration(order_type))
+        signature = self.signer.sign(order, template.exchange)
+        payload = dict(order)
+        payload.update({
+            'tokenId': str(order['tokenId']),
+            'makerAmount': str(order['makerAmount']),
+            'takerAmount': str(order['takerAmount']),
+            'expiration': str(order['expiration']),
+            'nonce': str(order['nonce']),
+            'feeRateBps': str(order['feeRateBps']),
+            'side': SIDE_NAMES[side],
+            'signature': signature
+        })
+        return json.dumps({'order': payload, 'owner': self.signer.api_key, 'orderType': order_type}, separators=(',', ':'))
+
+    def warm(self, template: OrderTemplate, side: int, limit: float, size: float, order_type: str) -> bool:
+        """
+        Make sure a usable pre-signed order exists
+
+        Returns:
+            True if a new order was signed
+        """
+        key = (template.token_id, side, size, order_type)
+        ready = self._ready.get(key)
+        if ready is not None and ready.limit == limit and self.nonces.is_valid(ready.nonce, ready.expires_at - self.nonces.ttl / 2):
+            return False
+        nonce, expires_at = self.nonces.nonce, self.nonces.expires_at()
+        body = self.sign(template, side, limit, size, order_type)
+        with self._lock:
+            self._ready[key] = PresignedOrder(limit, body, nonce, expires_at)
+            self.stats['presigned'] += 1
+        return True
+
+    def take(self, template: OrderTemplate, side: int, limit: float, size: float, order_type: str) -> Optional[str]:
+        """Remove and return a pre-signed body usable for this order, if any"""
+        key = (template.token_id, side, size, order_type)
+        with self._lock:
+            ready = self._ready.get(key)
+            if ready is None:
+                return None
+            if not self.nonces.is_valid(ready.nonce, ready.expires_at):
+                del self._ready[key]
+                self.stats['expired'] += 1
+                return None
+            if abs(ready.limit - limit) > 1e-9:
+                return None
+            del self._ready[key]
+        return ready.body
+
+    def prepare(self, template: OrderTemplate, side: int, limit: float, size: float, order_type: str) -> str:
+        """Pre-signed body if one matches, otherwise sign now"""
+        body = self.take(template, side, limit, size, order_type)
+        if body is not None:
+            self.stats['hits'] += 1
+            return body
+        self.stats['misses'] += 1
+        return self.sign(template, side, limit, size, order_type)
+
+    def hit_rate(self) -> float:
+        """Fraction of prepared orders that were pre-signed"""
+        prepared = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / prepared if prepared else 0.0
+
+    def prune(self):
+        """Drop expired orders and orders signed with a retired nonce"""
+        with self._lock:
+            for key, ready in list(self._ready.items()):
+                if not self.nonces.is_valid(ready.nonce, ready.expires_at):
+                    del self._ready[key]
+                    self.stats['expired'] += 1
+
+
+class LegResult(NamedTuple):
+    """Outcome of one order"""
+    outcome: str        # 'Yes' or 'No'
+    side: str           # 'BUY' or 'SELL'
+    order_id: str
+    status: str         # matched / live / delayed / unmatched / rejected / error
+    requested: float    # Shares
+    filled: float       # Shares
+    avg_price: float    # Average fill price (0 when nothing filled)
+    latency: float      # Submit to response (seconds)
+    error: str
+
+
+class ExecutionResult(NamedTuple):
+    """Outcome of a two-leg arbitrage"""
+    market_id: str
+    success: bool                   # Both legs filled the full size
+    yes: LegResult
+    no: LegResult
+    hedged: float                   # Shares held on both sides after any unwind
+    unwind: Optional[LegResult]     # Sell-back of the excess leg, if one was needed
+    signal_to_submit: float         # Seconds from detection to both orders leaving
+    signal_to_fill: float           # Seconds from detection to the later leg's response
+    leg_skew: float                 # Seconds between the two legs' responses
+
+
+class ExecutionEngine:
+    """Concurrent two-leg order submission against the CLOB order API
+
+    Both orders are built from cached per-token templates, signed, and then
+    posted at the same moment from two dedicated threads over the shared
+    keep-alive HTTP client (outside the CLOB scan rate limiter, so orders
+    never queue behind market data requests). Each leg is limited at the worst ask level its
+    size needs plus half of MAX_SLIPPAGE. If the legs fill different sizes
+    (a rejected leg, or a partial FAK fill), resting remainders are cancelled
+    and the excess shares are sold back at the fill price minus
+    unwind_slippage so the position is left hedged.
+
+    After start(), a background thread keeps both legs pre-signed at every
+    size of a ladder (max_shares in presign_rungs equal steps) for the
+    presign_markets markets closest to the threshold. With pre-signing on, a
+    trade size is rounded down to the nearest rung, so a trigger on one of
+    those markets sends already-signed orders whatever size the depth allows.
+    """
+
+    def __init__(
+        self,
+        bot,
+        signer: OrderSigner,
+        order_type: str = EXECUTION_ORDER_TYPE,
+        max_shares: float = EXECUTION_MAX_SHARES,
+        unwind_slippage: float = EXECUTION_UNWIND_SLIPPAGE,
+        timeout: float = EXECUTION_TIMEOUT,
+        funder: str = CLOB_FUNDER,
+        concurrent: bool = True,
+        nonces: Optional[NonceManager] = None,
+        presign_markets: int = EXECUTION_PRESIGN_MARKETS,
+        presign_band: float = EXECUTION_PRESIGN_BAND,
+        presign_interval: float = EXECUTION_PRESIGN_INTERVAL,
+        presign_rungs: int = EXECUTION_PRESIGN_RUNGS
+    ):
+        """
+        Args:
+            bot: PolyArbitrageBot (HTTP client, CLOB URL, token IDs, orderbooks, metrics)
+            signer: Order signer for the trading wallet
+            order_type: FOK or FAK
+            max_shares: Shares per leg cap (and size for price-only opportunities)
+            unwind_slippage: Price given up when selling back an unmatched leg
+            timeout: Order request timeout (seconds)
+            funder: Address holding the funds (empty = signer address)
+            concurrent: Send both legs at once (False sends Yes then No, for comparison)
+            nonces: Exchange nonce and order expiry manager
+            presign_markets: Markets kept pre-signed (0 = sign on trigger only)
+            presign_band: Pre-sign markets whose ask sum is within this of the threshold
+            presign_interval: Seconds between pre-signing passes
+            presign_rungs: Pre-signed sizes per leg (max_shares in this many equal steps)
+        """
+        self.bot = bot
+        self.signer = signer
+        self.order_type = order_type
+        self.max_shares = max_shares
+        self.unwind_slippage = unwind_slippage
+        self.timeout = timeout
+        self.maker = funder or signer.address
+        self.concurrent = concurrent
+        self.nonces = nonces or NonceManager()
+        self.preparer = OrderPreparer(signer, self.nonces)
+        self.presign_markets = presign_markets
+        self.presign_band = presign_band
+        self.presign_interval = presign_interval
+        rungs = max(1, presign_rungs)
+        # Largest first; the smallest rung is the least a quantised trade can be
+        self.size_ladder = sorted({round(max_shares * k / rungs, 2) for k in range(1, rungs + 1)} - {0.0}, reverse=True)
+
+        self._templates: Dict[str, Dict[str, OrderTemplate]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="order")
+        self._warmer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.stats = {
+            'trades': 0,
+            'filled': 0,
+            'partial': 0,
+            'failed': 0,
+            'unwound': 0,
+            'unhedged': 0
+        }
+
+    def templates(self, market_id: str) -> Optional[Dict[str, OrderTemplate]]:
+        """Yes/No order templates for a market (built on first use)"""
+        templates = self._templates.get(market_id)
+        if templates is None:
+            tokens = self.bot.market_tokens.get(market_id)
+            if not tokens or 'Yes' not in tokens or 'No' not in tokens:
+                return None
+            neg_risk = market_id in self.bot.neg_risk_markets
+            templates = self._templates[market_id] = {
+                outcome: OrderTemplate(tokens[outcome], self.maker, self.signer.address, neg_risk)
+                for outcome in ('Yes', 'No')
+            }
+        return templates
+
+    def trade_size(self, size: Optional[float] = None) -> float:
+        """Shares per leg for a trade: capped at max_shares and, when pre-signing, rounded down to a ladder rung"""
+        size = min(size if size is not None else self.max_shares, self.max_shares)
+        if self.presign_markets > 0:
+            for rung in self.size_ladder:
+                if rung <= size + 1e-9:
+                    return rung
+        return size
+
+    def _limit_price(self, template: OrderTemplate, price: float, size: float, book: Optional[OrderBook]) -> float:
+        """Worst ask level needed for size (or price without a book) plus half the slippage allowance"""
+        worst = price
+        if book is not None:
+            filled = 0.0
+            for level_price, level_size in book.levels('asks'):
+                worst = max(worst, level_price)
+                filled += level_size
+                if filled >= size:
+                    break
+        return _round_to_tick(worst + self.bot.max_slippage / 2, template.tick_size, up=True)
+
+    def _post(self, outcome: str, side: int, size: float, body: str) -> Tuple[LegResult, float]:
+        """
+        Send one signed order
+
+        Returns:
+            (leg result, perf_counter time of the response)
+        """
+        bot = self.bot
+        start = time.perf_counter()
+        try:
+            response = bot.http.post(
+                f"{bot.clob_url}/order",
+                data=body,
+                headers=self.signer.l2_headers('POST', '/order', body),
+                timeout=self.timeout
+            )
+            done = time.perf_counter()
+            data = response.json() if response.content else {}
+        except Exception as e:
+            done = time.perf_counter()
+            return LegResult(outcome, SIDE_NAMES[side], '', 'error', size, 0.0, 0.0, done - start, str(e)), done
+
+        if response.status_code >= 400 or not data.get('success', False):
+            error = data.get('errorMsg') or data.get('error') or f"HTTP {response.status_code}"
+            return LegResult(outcome, SIDE_NAMES[side], data.get('orderID', ''), 'rejected', size, 0.0, 0.0, done - start, error), done
+
+        # BUY: making = USDC paid, taking = shares; SELL: the reverse
+        making = float(data.get('makingAmount') or 0)
+        taking = float(data.get('takingAmount') or 0)
+        shares, usdc = (taking, making) if side == BUY else (making, taking)
+        avg_price = usdc / shares if shares > 0 else 0.0
+        return LegResult(
+            outcome, SIDE_NAMES[side], data.get('orderID', ''), data.get('status', ''),
+            size, shares, avg_price, done - start, data.get('errorMsg', '')
+        ), done
+
+    def _cancel(self, order_id: str):
+        """Cancel an order's resting remainder"""
+        bot = self.bot
+        body = json.dumps({'orderID': order_id}, separators=(',', ':'))
+        try:
+            bot.http.request(
+                'DELETE',
+                f"{bot.clob_url}/order",
+                data=body,
+                headers=self.signer.l2_headers('DELETE', '/order', body),
+                timeout=self.timeout
+            )
+        except Exception as e:
+            print(f"[✗] Failed to cancel order {order_id}: {e}")
+
+    def execute(
+        self,
+        market_id: str,
+        yes_price: float,
+        no_price: float,
+        size: Optional[float] = None,
+        signal_time: Optional[float] = None
+    ) -> Optional[ExecutionResult]:
+        """
+        Buy size shares of Yes and No at once
+
+        Args:
+            yes_price / no_price: Expected (VWAP) prices
+            size: Shares per leg (None = max_shares; see trade_size)
+            signal_time: perf_counter time the opportunity was detected
+
+        Returns:
+            Execution result, or None if the market has no known token IDs
+        """
+        templates = self.templates(market_id)
+        if templates is None:
+            print(f"[✗] No token IDs for market {market_id}. Cannot build orders.")
+            return None
+        signal_time = signal_time if signal_time is not None else time.perf_counter()
+        size = self.trade_size(size)
+        books = self.bot.orderbooks.get(market_id) or {}
+
+        bodies = {}
+        for outcome, price in (('Yes', yes_price), ('No', no_price)):
+            template = templates[outcome]
+            limit = self._limit_price(template, price, size, books.get(outcome))
+            bodies[outcome] = self.preparer.prepare(template, BUY, limit, size, self.order_type)
+
+        submitted = time.perf_counter()
+        if self.concurrent:
+            futures = {
+                outcome: self._executor.submit(self._post, outcome, BUY, size, body)
+                for outcome, body in bodies.items()
+            }
+            (yes, yes_done), (no, no_done) = futures['Yes'].result(), futures['No'].result()
+        else:
+            yes, yes_done = self._post('Yes', BUY, size, bodies['Yes'])
+            no, no_done = self._post('No', BUY, size, bodies['No'])
+
+        for leg in (yes, no):
+            if leg.status in ('live', 'delayed') and leg.order_id:
+                self._cancel(leg.order_id)
+
+        hedged = min(yes.filled, no.filled)
+        unwind = None
+        excess_leg = yes if yes.filled > no.filled else no
+        excess = round(abs(yes.filled - no.filled), 2)
+        if excess > 0:
+            unwind = self._unwind(templates[excess_leg.outcome], excess_leg, excess)
+
+        result = ExecutionResult(
+            market_id=market_id,
+            success=yes.filled >= size - 1e-9 and no.filled >= size - 1e-9,
+            yes=yes,
+            no=no,
+            hedged=hedged,
+            unwind=unwind,
+            signal_to_submit=submitted - signal_time,
+            signal_to_fill=max(yes_done, no_done) - signal_time,
+            leg_skew=abs(yes_done - no_done)
+        )
+        self._record(result)
+        return result
+
+    def _unwind(self, template: OrderTemplate, leg: LegResult, excess: float) -> LegResult:
+        """Sell back shares of the leg that filled more than the other"""
+        price = _round_to_tick(leg.avg_price - self.unwind_slippage, template.tick_size, up=False)
+        body = self.preparer.sign(template, SELL, price, excess, 'FAK')
+        unwind, _ = self._post(leg.outcome, SELL, excess, body)
+        if unwind.filled >= excess - 1e-9:
+            self.stats['unwound'] += 1
+            print(f"[!] Unwound {excess:.2f} unmatched {leg.outcome} shares at ${unwind.avg_price:.4f}")
+        else:
+            self.stats['unhedged'] += 1
+            print(f"[✗] Unwind incomplete: {excess - unwind.filled:.2f} {leg.outcome} shares unhedged "
+                  f"({unwind.error or unwind.status})")
+        return unwind
+
+    def _record(self, result: ExecutionResult):
+        stats = self.stats
+        stats['trades'] += 1
+        if result.success:
+            stats['filled'] += 1
+        elif result.hedged > 0:
+            stats['partial'] += 1
+        else:
+            stats['failed'] += 1
+
+        stage = self.bot.metrics.stage_seconds
+        stage.labels('signal_to_submit').observe(result.signal_to_submit)
+        stage.labels('signal_to_fill').observe(result.signal_to_fill)
+        stage.labels('leg_skew').observe(result.leg_skew)
+
+    def warm_market(self, market_id: str, yes_price: float, no_price: float) -> int:
+        """
+        Pre-sign both legs of a market at every ladder size
+
+        Limits are derived exactly as execute() derives them, from the current
+        books when there are any.
+
+        Returns:
+            Number of orders signed
+        """
+        templates = self.templates(market_id)
+        if templates is None:
+            return 0
+        books = self.bot.orderbooks.get(market_id) or {}
+        signed = 0
+        for size in self.size_ladder:
+            for outcome, price in (('Yes', yes_price), ('No', no_price)):
+                template = templates[outcome]
+                limit = self._limit_price(template, price, size, books.get(outcome))
+                signed += self.preparer.warm(template, BUY, limit, size, self.order_type)
+        return signed
+
+    def warm(self) -> int:
+        """Pre-signing pass over the markets closest to the threshold"""
+        bot = self.bot
+        self.preparer.prune()
+        candidates = bot.price_table.top_opportunities(
+            max_pair_cost=1.0 - bot.min_profit_margin + self.presign_band,
+            max_age=bot.price_max_age,
+            n=self.presign_markets
+        )
+        return sum(self.warm_market(c.market_id, c.yes_ask, c.no_ask) for c in candidates)
+
+    def start(self):
+        """Start the background pre-signing thread"""
+        if self.presign_markets <= 0 or self._warmer is not None:
+            return
+        self._stop.clear()
+        self._warmer = threading.Thread(target=self._warm_loop, name="order-presigner", daemon=True)
+        self._warmer.start()
+
+    def _warm_loop(self):
+        while not self._stop.wait(self.presign_interval):
+            try:
+                self.warm()
+            except Exception as e:
+                print(f"[✗] Order pre-signing error: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._warmer is not None:
+            self._warmer.join(timeout=5)
+            self._warmer = None
+        self._executor.shutdown(wait=False)
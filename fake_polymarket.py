@@ -0,0 +1,862 @@
+"""
+Local Fake Polymarket Servers
+Offline stand-ins for Polymarket APIs used for testing and benchmarking
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import json
+import time
+import hashlib
+import random
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, List, Dict, Any, Tuple
+
+import websockets
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _levels(book: Dict[float, float], reverse: bool) -> List[Dict[str, str]]:
+    return [
+        {'price': f"{price:.2f}", 'size': f"{size:.2f}"}
+        for price, size in sorted(book.items(), reverse=reverse)
+    ]
+
+
+class FakeMarket:
+    """Simulated Yes/No market with two order books that random-walk"""
+
+    def __init__(self, market_id: str, rng: random.Random, fair: Optional[float] = None, group_title: str = ""):
+        self.market_id = market_id
+        self.question = f"Fake market {market_id}?"
+        # Outcome label within a neg-risk event (empty for standalone markets)
+        self.group_title = group_title
+        self.neg_risk = bool(group_title)
+        self.yes_token = f"{market_id}01"
+        self.no_token = f"{market_id}02"
+        self.end_date = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() + rng.uniform(3600, 90 * 86400)))
+        # Log-uniform like real markets: a few large, many small
+        self.volume = round(10 ** rng.uniform(2, 7), 2)
+        self.liquidity = round(self.volume * rng.uniform(0.005, 0.05), 2)
+        self.closed = False
+        self.rng = rng
+        # Books are read by HTTP handler threads while the feed mutates them
+        self.lock = threading.Lock()
+        self.books = {
+            self.yes_token: {'bids': {}, 'asks': {}},
+            self.no_token: {'bids': {}, 'asks': {}}
+        }
+        if fair is None:
+            fair = round(rng.uniform(0.1, 0.9), 2)
+        self._reprice(self.yes_token, fair)
+        self._reprice(self.no_token, round(1.0 - fair, 2))
+
+    def _reprice(self, token_id: str, mid: float, levels: int = 5):
+        book = self.books[token_id]
+        book['bids'] = {}
+        book['asks'] = {}
+        for i in range(levels):
+            bid = round(mid - 0.01 * (i + 1), 2)
+            ask = round(mid + 0.01 * (i + 1), 2)
+            if 0 < bid < 1:
+                book['bids'][bid] = round(self.rng.uniform(10, 500), 2)
+            if 0 < ask < 1:
+                book['asks'][ask] = round(self.rng.uniform(10, 500), 2)
+
+    def snapshot(self, token_id: str) -> Dict[str, Any]:
+        """Book in CLOB REST /book and WS 'book' event format"""
+        with self.lock:
+            book = self.books[token_id]
+            return {
+                'event_type': 'book',
+                'market': self.market_id,
+                'asset_id': token_id,
+                'bids': _levels(book['bids'], reverse=False),
+                'asks': _levels(book['asks'], reverse=True),
+                'timestamp': str(_now_ms())
+            }
+
+    def mid(self, token_id: str) -> float:
+        """Midpoint of the best bid and ask"""
+        with self.lock:
+            book = self.books[token_id]
+            best_bid = max(book['bids']) if book['bids'] else None
+            best_ask = min(book['asks']) if book['asks'] else None
+        if best_bid is None and best_ask is None:
+            return 0.5
+        if best_bid is None or best_ask is None:
+            return best_bid if best_ask is None else best_ask
+        return round((best_bid + best_ask) / 2, 4)
+
+    def listing(self) -> Dict[str, Any]:
+        """Market in Gamma /markets format (list fields are JSON strings)"""
+        return {
+            'id': self.market_id,
+            'question': self.question,
+            'slug': f"fake-market-{self.market_id}",
+            'active': not self.closed,
+            'closed': self.closed,
+            'endDate': self.end_date,
+            'volume': f"{self.volume:.2f}",
+            'volumeNum': self.volume,
+            'liquidity': f"{self.liquidity:.2f}",
+            'liquidityNum': self.liquidity,
+            'outcomes': json.dumps(['Yes', 'No']),
+            'outcomePrices': json.dumps([str(self.mid(self.yes_token)), str(self.mid(self.no_token))]),
+            'clobTokenIds': json.dumps([self.yes_token, self.no_token]),
+            'negRisk': self.neg_risk,
+            'groupItemTitle': self.group_title
+        }
+
+    def match(self, token_id: str, side: str, price: float, size: float, partial: bool) -> Tuple[float, float]:
+        """
+        Take liquidity for an incoming order
+
+        A BUY takes asks at or below price, a SELL takes bids at or above it,
+        best level first. Without partial the order fills completely or not at
+        all (FOK).
+
+        Returns:
+            (shares filled, USDC exchanged)
+        """
+        with self.lock:
+            book = self.books[token_id]['asks' if side == 'BUY' else 'bids']
+            levels = sorted(book, reverse=side == 'SELL')
+            crosses = (lambda level: level <= price + 1e-9) if side == 'BUY' else (lambda level: level >= price - 1e-9)
+            fills = []
+            remaining = size
+            for level in levels:
+                if remaining <= 1e-9 or not crosses(level):
+                    break
+                take = min(book[level], remaining)
+                fills.append((level, take))
+                remaining -= take
+            if remaining > 1e-9 and not partial:
+                return 0.0, 0.0
+            for level, take in fills:
+                left = round(book[level] - take, 2)
+                if left > 0:
+                    book[level] = left
+                else:
+                    del book[level]
+        shares = sum(take for _, take in fills)
+        return round(shares, 2), round(sum(level * take for level, take in fills), 4)
+
+    def random_change(self) -> Dict[str, Any]:
+        """Change one price level and return it in WS 'price_change' format"""
+        with self.lock:
+            token_id = self.rng.choice((self.yes_token, self.no_token))
+            side = self.rng.choice(('BUY', 'SELL'))
+            book = self.books[token_id]['bids' if side == 'BUY' else 'asks']
+
+            if book and self.rng.random() < 0.3:
+                price = self.rng.choice(list(book))
+                size = 0.0
+                del book[price]
+            else:
+                best = (max(book) if side == 'BUY' else min(book)) if book else 0.5
+                price = round(min(0.99, max(0.01, best + self.rng.choice((-0.01, 0.0, 0.01)))), 2)
+                size = round(self.rng.uniform(10, 500), 2)
+                book[price] = size
+
+            # Top of book after the change, as the market channel reports it (0 = empty side)
+            bids = self.books[token_id]['bids']
+            asks = self.books[token_id]['asks']
+            best_bid = max(bids) if bids else 0.0
+            best_ask = min(asks) if asks else 0.0
+
+        return {
+            'event_type': 'price_change',
+            'market': self.market_id,
+            'price_changes': [{
+                'asset_id': token_id,
+                'price': f"{price:.2f}",
+                'size': f"{size:.2f}",
+                'side': side,
+                'best_bid': f"{best_bid:.2f}",
+                'best_ask': f"{best_ask:.2f}"
+            }],
+            'timestamp': str(_now_ms())
+        }
+
+
+def make_markets(num_markets: int, rng: random.Random) -> Dict[str, FakeMarket]:
+    """market_id -> FakeMarket with IDs 500000, 500001, ..."""
+    markets = {}
+    for i in range(num_markets):
+        market = FakeMarket(str(500000 + i), rng)
+        markets[market.market_id] = market
+    return markets
+
+
+class FakeEvent:
+    """Simulated neg-risk event: exactly one of its outcome markets resolves Yes"""
+
+    def __init__(self, event_id: str, markets: List[FakeMarket]):
+        self.event_id = event_id
+        self.title = f"Fake event {event_id}"
+        self.markets = markets
+
+    @property
+    def closed(self) -> bool:
+        return all(market.closed for market in self.markets)
+
+    def listing(self) -> Dict[str, Any]:
+        """Event in Gamma /events format (outcome markets inline)"""
+        return {
+            'id': self.event_id,
+            'title': self.title,
+            'slug': f"fake-event-{self.event_id}",
+            'active': not self.closed,
+            'closed': self.closed,
+            'negRisk': True,
+            'markets': [market.listing() for market in self.markets]
+        }
+
+
+def make_events(
+    num_events: int,
+    rng: random.Random,
+    first_market_id: int = 600000,
+    outcomes: Tuple[int, int] = (3, 8),
+    mispricing: float = 0.0
+) -> Dict[str, FakeEvent]:
+    """
+    event_id -> FakeEvent with outcome market IDs from first_market_id
+
+    Outcome Yes mids are a random split of $1, so the best asks sum to a bit
+    above 1. A mispricing fraction of events is shaded down so the asks sum
+    clearly below 1 (a basket arbitrage).
+    """
+    events = {}
+    market_id = first_market_id
+    for i in range(num_events):
+        count = rng.randint(*outcomes)
+        weights = [rng.expovariate(1.0) for _ in range(count)]
+        total = sum(weights)
+        # Asks sit one tick above the mid, so shade by more than a tick per outcome
+        shade = 1.0 - (0.01 * count + rng.uniform(0.02, 0.06)) if rng.random() < mispricing else 1.0
+        markets = []
+        for j, weight in enumerate(weights):
+            fair = round(min(0.97, max(0.02, weight / total * shade)), 2)
+            markets.append(FakeMarket(str(market_id), rng, fair=fair, group_title=f"Outcome {j + 1}"))
+            market_id += 1
+        event = FakeEvent(str(i + 1), markets)
+        events[event.event_id] = event
+    return events
+
+
+def _opaque_tag(etag: str) -> str:
+    """ETag without its weak prefix"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def _token_index(markets: Dict[str, FakeMarket]) -> Dict[str, FakeMarket]:
+    index = {}
+    for market in markets.values():
+        index[market.yes_token] = market
+        index[market.no_token] = market
+    return index
+
+
+class FakeMarketChannelServer:
+    """Local WebSocket server speaking the CLOB market channel protocol
+
+    Clients send {"assets_ids": [...], "type": "market"}, receive one 'book'
+    snapshot per subscribed asset, then a stream of 'price_change' events.
+    Later {"assets_ids": [...], "operation": "subscribe" | "unsubscribe"}
+    messages change the subscription. Text "PING" is answered with "PONG".
+    """
+
+    def __init__(
+        self,
+        num_markets: int = 10,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        update_interval: float = 0.01,
+        send_snapshots: bool = True,
+        seed: Optional[int] = None,
+        drop_rate: float = 0.0
+    ):
+        """
+        Args:
+            num_markets: Number of simulated markets
+            update_interval: Delay between price_change events per connection (seconds)
+            send_snapshots: Send 'book' snapshots on subscribe (False forces REST gap recovery)
+            drop_rate: Fraction of price changes applied but never sent (forces gap detection)
+        """
+        self.host = host
+        self.port = port
+        self.update_interval = update_interval
+        self.send_snapshots = send_snapshots
+        self.drop_rate = drop_rate
+        # Stop sending price changes (books stay put so clients can catch up)
+        self.paused = False
+        self.rng = random.Random(seed)
+
+        self.markets = make_markets(num_markets, self.rng)
+        self._token_market = _token_index(self.markets)
+
+        self._server = None
+        self._connections = set()
+        self._handlers = set()
+        self.messages_sent = 0
+        self.messages_dropped = 0
+
+    @property
+    def market_tokens(self) -> Dict[str, Dict[str, str]]:
+        """market_id -> {'Yes': token_id, 'No': token_id}"""
+        return {
+            market_id: {'Yes': market.yes_token, 'No': market.no_token}
+            for market_id, market in self.markets.items()
+        }
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def book_snapshot(self, token_id: str) -> Optional[Dict[str, Any]]:
+        """REST /book equivalent for gap recovery"""
+        market = self._market_for(token_id)
+        return market.snapshot(token_id) if market else None
+
+    def _market_for(self, token_id: str) -> Optional[FakeMarket]:
+        """Market owning a token (re-indexes when markets were added to the shared dict)"""
+        market = self._token_market.get(token_id)
+        if market is None and len(self._token_market) != 2 * len(self.markets):
+            self._token_market = _token_index(self.markets)
+            market = self._token_market.get(token_id)
+        return market
+
+    async def start(self):
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Handlers may be sleeping between updates; wait_closed() waits for them
+            for handler in list(self._handlers):
+                handler.cancel()
+            await self._server.wait_closed()
+
+    async def drop_connections(self):
+        """Close every client connection (to exercise reconnect and resubscribe)"""
+        for connection in list(self._connections):
+            await connection.close()
+
+    async def _handle(self, connection):
+        self._connections.add(connection)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            # market_id -> FakeMarket currently subscribed on this connection
+            markets: Dict[str, FakeMarket] = {}
+            await self._subscribe(connection, markets, json.loads(await connection.recv()))
+
+            reader = asyncio.create_task(self._read_messages(connection, markets))
+            try:
+                while True:
+                    await asyncio.sleep(self.update_interval)
+                    if markets and not self.paused:
+                        market = self.rng.choice(list(markets.values()))
+                        change = market.random_change()
+                        if self.drop_rate and self.rng.random() < self.drop_rate:
+                            self.messages_dropped += 1
+                            continue
+                        await connection.send(json.dumps(change))
+                        self.messages_sent += 1
+            finally:
+                reader.cancel()
+
+        except (websockets.ConnectionClosed, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(handler)
+            self._connections.discard(connection)
+
+    async def _subscribe(self, connection, markets: Dict[str, FakeMarket], message: Dict[str, Any]):
+        assets = [a for a in message.get('assets_ids', []) if self._market_for(a) is not None]
+        if message.get('operation') == 'unsubscribe':
+            for asset in assets:
+                markets.pop(self._market_for(asset).market_id, None)
+            return
+
+        for asset in assets:
+            market = self._market_for(asset)
+            markets[market.market_id] = market
+        if self.send_snapshots and assets:
+            await connection.send(json.dumps([self._market_for(a).snapshot(a) for a in assets]))
+            self.messages_sent += 1
+
+    async def _read_messages(self, connection, markets: Dict[str, FakeMarket]):
+        async for message in connection:
+            if message == "PING":
+                await connection.send("PONG")
+            else:
+                await self._subscribe(connection, markets, json.loads(message))
+
+
+
+class _FakeAPIHandler(BaseHTTPRequestHandler):
+    """Request handler for FakePolymarketHTTPServer (keep-alive HTTP/1.1)"""
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment (avoids Nagle/delayed-ACK stalls on keep-alive)
+    wbufsize = 1 << 16
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.fake.handle(self, 'GET')
+
+    def do_POST(self):
+        self.server.fake.handle(self, 'POST')
+
+    def do_DELETE(self):
+        self.server.fake.handle(self, 'DELETE')
+
+    def send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_not_modified(self, headers: Dict[str, str]):
+        self.send_response(304)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def read_json(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakePolymarketHTTPServer:
+    """Local HTTP server standing in for the Gamma and CLOB REST APIs
+
+    Serves GET /markets (active/closed/limit/offset and repeated id filters),
+    GET /markets/{id}, GET /book?token_id= and POST /books from one port, so
+    both GAMMA_API_URL and CLOB_API_URL can point at url. Every request waits
+    latency (+ up to jitter) seconds in its handler thread, and error_rate of
+    requests answer 503. With rate_limit set, requests beyond that many per
+    second (1 second burst) answer 429 with Retry-After right away. Each
+    market request moves that market's books with probability volatility.
+    Listing pages carry a weak ETag over their market metadata (prices
+    excluded) and a Last-Modified of the last market listed or closed, and
+    answer 304 to a matching If-None-Match or If-Modified-Since.
+
+    POST /order is a matching engine for signed CLOB orders: the order takes
+    liquidity from the book at or better than its limit price (makerAmount /
+    takerAmount), FOK orders fill completely or are rejected, FAK orders fill
+    what is available, and GTC/GTD remainders rest until DELETE /order
+    cancels them. order_error_rate of orders are rejected outright.
+
+    With num_events, GET /events lists neg-risk events (limit/offset,
+    closed filter) whose outcome markets are also served as markets and
+    books; event_mispricing of them are priced as basket arbitrages.
+    """
+
+    def __init__(
+        self,
+        num_markets: int = 100,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        volatility: float = 0.5,
+        seed: Optional[int] = None,
+        markets: Optional[Dict[str, FakeMarket]] = None,
+        rate_limit: float = 0.0,
+        retry_after: float = 1.0,
+        order_error_rate: float = 0.0,
+        num_events: int = 0,
+        event_mispricing: float = 0.0
+    ):
+        """
+        Args:
+            num_markets: Number of simulated markets (ignored when markets is given)
+            latency: Fixed server-side delay per request (seconds)
+            jitter: Additional uniform random delay per request (seconds)
+            error_rate: Fraction of requests answered with HTTP 503
+            rate_limit: Requests per second before HTTP 429 (0 = unlimited)
+            retry_after: Retry-After seconds sent with a 429
+            volatility: Probability that a market request moves the market
+            markets: Share markets with a FakeMarketChannelServer
+            order_error_rate: Fraction of POST /order requests rejected (success false)
+            num_events: Number of simulated neg-risk events (3-8 outcome markets each)
+            event_mispricing: Fraction of events whose outcome asks sum below $1
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.volatility = volatility
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.order_error_rate = order_error_rate
+        self.rng = random.Random(seed)
+
+        self.markets = markets if markets is not None else make_markets(num_markets, self.rng)
+        first_event_market = max((int(m) for m in self.markets), default=499999) + 1
+        self.events = make_events(num_events, self.rng, max(600000, first_event_market), mispricing=event_mispricing)
+        for event in self.events.values():
+            for market in event.markets:
+                self.markets[market.market_id] = market
+        self._token_market = _token_index(self.markets)
+
+        self._server = None
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self.throttled = 0
+        self.not_modified = 0
+        self.orders = 0
+        self.filled_orders = 0
+        self.rejected_orders = 0
+        self.canceled_orders = 0
+        # order ID -> unfilled shares of resting GTC/GTD orders
+        self.open_orders: Dict[str, float] = {}
+        self._order_seq = 0
+        self._listing_modified = time.time()
+        self._allowance = rate_limit
+        self._allowance_at = time.monotonic()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Listen on a background thread"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _FakeAPIHandler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-polymarket-http", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'requests': dict(self.requests),
+                'total_requests': sum(self.requests.values()),
+                'errors': self.errors,
+                'throttled': self.throttled,
+                'not_modified': self.not_modified,
+                'orders': self.orders,
+                'filled_orders': self.filled_orders,
+                'rejected_orders': self.rejected_orders,
+                'canceled_orders': self.canceled_orders
+            }
+
+    def add_market(self) -> FakeMarket:
+        """List a new market (IDs continue after the highest existing one)"""
+        with self._stats_lock:
+            market_id = str(max((int(m) for m in self.markets), default=499999) + 1)
+            market = FakeMarket(market_id, self.rng)
+            self.markets[market_id] = market
+            self._token_market[market.yes_token] = market
+            self._token_market[market.no_token] = market
+            self._listing_modified = time.time()
+        return market
+
+    def close_market(self, market_id: str):
+        """Resolve a market: it drops out of active listings"""
+        market = self.markets.get(market_id)
+        if market is not None:
+            market.closed = True
+            with self._stats_lock:
+                self._listing_modified = time.time()
+
+    def _touch(self, market: FakeMarket):
+        if self.rng.random() < self.volatility:
+            market.random_change()
+
+    def handle(self, request: _FakeAPIHandler, method: str):
+        parts = urlsplit(request.path)
+        path = parts.path.rstrip('/')
+        query = parse_qs(parts.query)
+
+        if method == 'GET' and path == '/markets':
+            endpoint = 'GET /markets'
+        elif method == 'GET' and path.startswith('/markets/'):
+            endpoint = 'GET /markets/{id}'
+        elif method == 'GET' and path == '/book':
+            endpoint = 'GET /book'
+        elif method == 'GET' and path == '/events':
+            endpoint = 'GET /events'
+        elif method == 'POST' and path == '/books':
+            endpoint = 'POST /books'
+        elif method in ('POST', 'DELETE') and path == '/order':
+            endpoint = f"{method} /order"
+        else:
+            request.send_json(404, {'error': 'not found'})
+            return
+
+        with self._stats_lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            throttle = self._throttle()
+            fail = not throttle and self.rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+        # Always consume the body so the keep-alive connection stays usable
+        body = request.read_json() if method in ('POST', 'DELETE') else None
+        if throttle:
+            request.send_json(429, {'error': 'rate limit exceeded'}, {'Retry-After': f"{self.retry_after:g}"})
+            return
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            request.send_json(503, {'error': 'injected failure'})
+            return
+
+        if endpoint == 'GET /markets':
+            markets = self._list_markets(query)
+            validators = self._validators(markets)
+            if self._not_modified(request, validators):
+                with self._stats_lock:
+                    self.not_modified += 1
+                request.send_not_modified(validators)
+            else:
+                request.send_json(200, [market.listing() for market in markets], validators)
+        elif endpoint == 'GET /markets/{id}':
+            market = self.markets.get(path.rsplit('/', 1)[1])
+            if market is None:
+                request.send_json(404, {'error': 'market not found'})
+                return
+            self._touch(market)
+            request.send_json(200, market.listing())
+        elif endpoint == 'GET /book':
+            token_id = (query.get('token_id') or [''])[0]
+            market = self._token_market.get(token_id)
+            if market is None:
+                request.send_json(404, {'error': 'No orderbook exists for the requested token id'})
+                return
+            request.send_json(200, market.snapshot(token_id))
+        elif endpoint == 'GET /events':
+            request.send_json(200, [event.listing() for event in self._list_events(query)])
+        elif endpoint == 'POST /order':
+            status, payload = self._place_order(body or {})
+            request.send_json(status, payload)
+        elif endpoint == 'DELETE /order':
+            order_id = str((body or {}).get('orderID', ''))
+            with self._stats_lock:
+                canceled = self.open_orders.pop(order_id, None) is not None
+                if canceled:
+                    self.canceled_orders += 1
+            if canceled:
+                request.send_json(200, {'canceled': [order_id], 'not_canceled': {}})
+            else:
+                request.send_json(200, {'canceled': [], 'not_canceled': {order_id: 'order not found'}})
+        else:
+            snapshots = []
+            for item in body or []:
+                market = self._token_market.get(str(item.get('token_id')))
+                if market is not None:
+                    snapshots.append(market.snapshot(str(item['token_id'])))
+            request.send_json(200, snapshots)
+
+    def _place_order(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Match a signed order against the book (status code, response)"""
+        order = body.get('order') or {}
+        order_type = str(body.get('orderType', 'GTC')).upper()
+        with self._stats_lock:
+            self.orders += 1
+            self._order_seq += 1
+            order_id = f"0x{self._order_seq:064x}"
+            injected = self.rng.random() < self.order_error_rate
+
+        def reject(message: str) -> Tuple[int, Dict[str, Any]]:
+            with self._stats_lock:
+                self.rejected_orders += 1
+            return 400, {'success': False, 'errorMsg': message, 'orderID': order_id, 'status': 'unmatched',
+                         'makingAmount': '0', 'takingAmount': '0'}
+
+        if injected:
+            return reject('injected order failure')
+        token_id = str(order.get('tokenId', ''))
+        market = self._token_market.get(token_id)
+        if market is None or market.closed:
+            return reject('invalid order: market not tradable')
+        side = order.get('side')
+        try:
+            maker_amount = int(order['makerAmount']) / 1_000_000
+            taker_amount = int(order['takerAmount']) / 1_000_000
+        except (KeyError, TypeError, ValueError):
+            return reject('invalid order payload')
+        if side not in ('BUY', 'SELL') or maker_amount <= 0 or taker_amount <= 0 or not order.get('signature'):
+            return reject('invalid order payload')
+
+        # BUY pays maker USDC for taker shares, SELL pays maker shares for taker USDC
+        size, price = (taker_amount, maker_amount / taker_amount) if side == 'BUY' else (maker_amount, taker_amount / maker_amount)
+        shares, usdc = market.match(token_id, side, price, size, partial=order_type != 'FOK')
+        if shares <= 0:
+            if order_type == 'FOK':
+                return reject("order couldn't be fully filled. FOK orders are fully filled or killed.")
+            if order_type == 'FAK':
+                return reject('no orders found to match with FAK order. FAK orders are partially filled or killed if no match is found.')
+
+        status = 'matched'
+        if shares < size - 1e-9 and order_type in ('GTC', 'GTD'):
+            status = 'live'
+            with self._stats_lock:
+                self.open_orders[order_id] = round(size - shares, 2)
+        with self._stats_lock:
+            if shares > 0:
+                self.filled_orders += 1
+        making, taking = (usdc, shares) if side == 'BUY' else (shares, usdc)
+        return 200, {
+            'success': True,
+            'errorMsg': '',
+            'orderID': order_id,
+            'status': status,
+            'makingAmount': f"{making:.4f}",
+            'takingAmount': f"{taking:.4f}"
+        }
+
+    def _throttle(self) -> bool:
+        """Server-side token bucket (call with _stats_lock held)"""
+        if self.rate_limit <= 0:
+            return False
+        now = time.monotonic()
+        self._allowance = min(self.rate_limit, self._allowance + (now - self._allowance_at) * self.rate_limit)
+        self._allowance_at = now
+        if self._allowance < 1.0:
+            self.throttled += 1
+            return True
+        self._allowance -= 1.0
+        return False
+
+    def _validators(self, markets: List[FakeMarket]) -> Dict[str, str]:
+        """ETag and Last-Modified for a listing page"""
+        digest = hashlib.sha1()
+        for market in markets:
+            digest.update(f"{market.market_id}|{market.question}|{market.end_date}|{market.closed}|"
+                          f"{market.yes_token}|{market.no_token};".encode())
+        return {
+            'ETag': f'W/"{digest.hexdigest()[:16]}"',
+            'Last-Modified': formatdate(self._listing_modified, usegmt=True)
+        }
+
+    @staticmethod
+    def _not_modified(request: _FakeAPIHandler, validators: Dict[str, str]) -> bool:
+        """Conditional request check (If-None-Match takes precedence, weak comparison)"""
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            etag = _opaque_tag(validators['ETag'])
+            return any(_opaque_tag(tag) in (etag, '*') for tag in if_none_match.split(','))
+        if_modified_since = request.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return parsedate_to_datetime(validators['Last-Modified']) <= since
+        return False
+
+    def _list_events(self, query: Dict[str, List[str]]) -> List[FakeEvent]:
+        events = list(self.events.values())
+        closed = (query.get('closed') or [None])[0]
+        if closed is not None:
+            events = [e for e in events if e.closed == (closed == 'true')]
+        offset = int((query.get('offset') or ['0'])[0])
+        limit = int((query.get('limit') or [str(len(events))])[0])
+        return events[offset:offset + limit]
+
+    def _list_markets(self, query: Dict[str, List[str]]) -> List[FakeMarket]:
+        ids = query.get('id')
+        if ids:
+            markets = [self.markets[i] for i in ids if i in self.markets]
+        else:
+            markets = list(self.markets.values())
+
+        # Closed markets are excluded unless closed=true is requested
+        closed = (query.get('closed') or [None])[0]
+        if closed is not None:
+            markets = [m for m in markets if m.closed == (closed == 'true')]
+        if (query.get('active') or [None])[0] == 'false':
+            markets = [m for m in markets if m.closed]
+
+        offset = int((query.get('offset') or ['0'])[0])
+        limit = int((query.get('limit') or [str(len(markets))])[0])
+        page = markets[offset:offset + limit]
+        for market in page:
+            self._touch(market)
+        return page
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve fake Polymarket market channel and REST APIs")
+    parser.add_argument('markets', nargs='?', type=int, default=10, help='Number of simulated markets')
+    parser.add_argument('ws_port', nargs='?', type=int, default=8765, help='WebSocket market channel port')
+    parser.add_argument('--http-port', type=int, default=8766, help='Gamma/CLOB REST port (default: 8766)')
+    parser.add_argument('--latency', type=float, default=0.0, help='REST delay per request in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Additional random REST delay in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of REST requests answered with 503')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='REST requests per second before HTTP 429 (0 = unlimited)')
+    parser.add_argument('--order-error-rate', type=float, default=0.0, help='Fraction of POST /order requests rejected')
+    parser.add_argument('--events', type=int, default=0, help='Simulated neg-risk multi-outcome events')
+    parser.add_argument('--event-mispricing', type=float, default=0.0, help='Fraction of events priced as basket arbitrages')
+    parser.add_argument('--seed', type=int, help='Random seed for markets and price moves')
+    args = parser.parse_args()
+
+    async def serve():
+        server = FakeMarketChannelServer(num_markets=args.markets, port=args.ws_port, seed=args.seed)
+        api = FakePolymarketHTTPServer(
+            port=args.http_port,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            seed=args.seed,
+            markets=server.markets,
+            rate_limit=args.rate_limit,
+            order_error_rate=args.order_error_rate,
+            num_events=args.events,
+            event_mispricing=args.event_mispricing
+        )
+        await server.start()
+        api.start()
+        print(f"[✓] Fake market channel listening on {server.url} ({args.markets} markets)")
+        print(f"[✓] Fake Gamma/CLOB API listening on {api.url}")
+        print(f"[*] GAMMA_API_URL={api.url} CLOB_API_URL={api.url} WS_CLOB_URL={server.url}")
+        try:
+            await asyncio.Future()
+        finally:
+            api.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
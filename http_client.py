@@ -0,0 +1,312 @@
+"""
+Polymarket HTTP Client
+Shared keep-alive connection pools for all Gamma/CLOB API calls
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import threading
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP2_ENABLED,
+    GAMMA_RATE_LIMIT,
+    CLOB_RATE_LIMIT
+)
+from rate_limiter import AdaptiveRateLimiter
+
+
+class ConnectionStats:
+    """Thread-safe per-host request and connection (handshake) counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.connections: Dict[str, int] = {}
+
+    def record_request(self, host: str):
+        with self._lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+
+    def record_connection(self, host: str):
+        with self._lock:
+            self.connections[host] = self.connections.get(host, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals and per-host breakdown with connection reuse rate"""
+        with self._lock:
+            hosts = {}
+            for host in sorted(set(self.requests) | set(self.connections)):
+                hosts[host] = _summarize(self.requests.get(host, 0), self.connections.get(host, 0))
+            summary = _summarize(sum(self.requests.values()), sum(self.connections.values()))
+
+        summary['hosts'] = hosts
+        return summary
+
+
+def _summarize(requests_sent: int, connections_opened: int) -> Dict[str, Any]:
+    """Every request that did not open a new connection reused a pooled one"""
+    reused = max(0, requests_sent - connections_opened)
+    return {
+        'requests': requests_sent,
+        'handshakes': connections_opened,
+        'reused': reused,
+        'reuse_rate': reused / requests_sent if requests_sent else 0.0
+    }
+
+
+def _counting_pool_class(base: type, stats: ConnectionStats) -> type:
+    """urllib3 pool class that reports every new TCP/TLS connection"""
+
+    class CountingPool(base):
+        def _new_conn(self):
+            stats.record_connection(self.host)
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """requests adapter whose per-host pools count opened connections"""
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        # Must be set before HTTPAdapter.__init__ builds the pool manager
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self._stats),
+            'https': _counting_pool_class(HTTPSConnectionPool, self._stats)
+        }
+
+
+class HttpClient:
+    """Keep-alive HTTP client shared by every bot API call
+
+    Uses requests with per-host urllib3 pools by default. With http2=True and
+    httpx[http2] installed, requests are multiplexed over HTTP/2 instead.
+    Requests tagged with an endpoint ('gamma', 'clob') wait for that API's
+    rate limiter, and their responses adapt it.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        http2: bool = HTTP2_ENABLED,
+        rate_limits: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            pool_connections: Number of per-host pools to keep
+            pool_maxsize: Maximum keep-alive connections per host
+            connect_timeout: TCP/TLS connect timeout (seconds)
+            read_timeout: Default response read timeout (seconds)
+            http2: Use HTTP/2 (requires httpx[http2])
+            rate_limits: endpoint -> cost units per second (0 = unlimited; defaults to config)
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.stats = ConnectionStats()
+        self.http2 = False
+
+        if rate_limits is None:
+            rate_limits = {'gamma': GAMMA_RATE_LIMIT, 'clob': CLOB_RATE_LIMIT}
+        self.limiters: Dict[str, AdaptiveRateLimiter] = {
+            name: AdaptiveRateLimiter(name, rate) for name, rate in rate_limits.items() if rate > 0
+        }
+        # Per worker thread: did a request since clear_failure() hit a throttle, 5xx or transport error
+        self._local = threading.local()
+
+        self._session = None
+        self._httpx_client = None
+        # requests session for libraries that need one when the API pools use httpx
+        self._extra_session = None
+
+        if http2:
+            try:
+                import httpx
+                import h2  # noqa: F401  (required by httpx for HTTP/2)
+
+                self._httpx_client = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=pool_maxsize * pool_connections,
+                        max_keepalive_connections=pool_maxsize * pool_connections,
+                        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+                    ),
+                    timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+                )
+                self.http2 = True
+            except ImportError:
+                print("[!] HTTP/2 requested but httpx[http2] is not installed. Using HTTP/1.1 pools.")
+
+        if self._httpx_client is None:
+            adapter = _CountingHTTPAdapter(
+                self.stats,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=0
+            )
+            self._session = requests.Session()
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+        endpoint: Optional[str] = None,
+        cost: float = 1.0,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[str] = None
+    ):
+        """
+        Send a request over the shared pools
+
+        Args:
+            endpoint: Rate limiter to wait for ('gamma', 'clob'; None = unlimited)
+            cost: Rate limit units this request uses
+            headers: Extra request headers (e.g. If-None-Match)
+            data: Pre-serialized body, sent byte-for-byte (e.g. when the body is signed)
+
+        Returns:
+            Response object (requests.Response or httpx.Response)
+        """
+        limiter = self.limiters.get(endpoint) if endpoint else None
+        if limiter is not None:
+            limiter.acquire(cost)
+
+        host = urlsplit(url).hostname or ''
+        self.stats.record_request(host)
+        read_timeout = timeout if timeout is not None else self.read_timeout
+
+        try:
+            if self._httpx_client is not None:
+                response = self._httpx_client.request(
+                    method,
+                    url,
+                    params=params,
+                    json=json,
+                    content=data,
+                    headers=headers,
+                    timeout=read_timeout,
+                    extensions={'trace': self._trace_callback(host)}
+                )
+            else:
+                response = self._session.request(
+                    method,
+                    url,
+                    params=params,
+                    json=json,
+                    data=data,
+                    headers=headers,
+                    timeout=(self.connect_timeout, read_timeout)
+                )
+        except Exception:
+            self._local.retryable = True
+            raise
+
+        status = response.status_code
+        if limiter is not None:
+            limiter.record(status, response.headers.get('Retry-After'), cost)
+        if status == 429 or status >= 500:
+            self._local.retryable = True
+        return response
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        endpoint: Optional[str] = None,
+        cost: float = 1.0,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """Send a GET request"""
+        return self.request('GET', url, params=params, timeout=timeout, endpoint=endpoint, cost=cost, headers=headers)
+
+    def post(
+        self,
+        url: str,
+        json: Any = None,
+        timeout: Optional[float] = None,
+        endpoint: Optional[str] = None,
+        cost: float = 1.0,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[str] = None
+    ):
+        """Send a POST request with a JSON body"""
+        return self.request(
+            'POST', url, json=json, timeout=timeout, endpoint=endpoint, cost=cost, headers=headers, data=data
+        )
+
+    def clear_failure(self):
+        """Reset the calling thread's retryable failure flag"""
+        self._local.retryable = False
+
+    def retryable_failure(self) -> bool:
+        """Whether a request on the calling thread was throttled or failed in transit since clear_failure()"""
+        return getattr(self._local, 'retryable', False)
+
+    def retry_after(self) -> float:
+        """Longest remaining throttle pause across the rate limiters (seconds)"""
+        return max((limiter.retry_after() for limiter in self.limiters.values()), default=0.0)
+
+    def _trace_callback(self, host: str):
+        """httpx trace hook counting new TCP connections for a host"""
+        def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == 'connection.connect_tcp.complete':
+                self.stats.record_connection(host)
+        return trace
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection reuse statistics (totals plus per-host breakdown)"""
+        stats = self.stats.snapshot()
+        stats['http2'] = self.http2
+        stats['rate_limits'] = {name: limiter.get_stats() for name, limiter in self.limiters.items()}
+        return stats
+
+    def requests_session(self) -> requests.Session:
+        """
+        Keep-alive requests.Session for libraries that take one (e.g. the Web3 HTTP provider)
+
+        This is the API session itself on HTTP/1.1; with HTTP/2 a separate
+        pooled session is created once and reused.
+        """
+        if self._session is not None:
+            return self._session
+        if self._extra_session is None:
+            adapter = _CountingHTTPAdapter(self.stats, pool_connections=1, pool_maxsize=2, max_retries=0)
+            self._extra_session = requests.Session()
+            self._extra_session.mount('https://', adapter)
+            self._extra_session.mount('http://', adapter)
+        return self._extra_session
+
+    def close(self):
+        """Close all pooled connections"""
+        if self._httpx_client is not None:
+            self._httpx_client.close()
+        if self._session is not None:
+            self._session.close()
+        if self._extra_session is not None:
+            self._extra_session.close()
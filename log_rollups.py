@@ -0,0 +1,298 @@
+"""
+Polymarket Price Log Rollups
+Per-minute and per-hour aggregates of price_data, maintained on ingestion
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import time
+import sqlite3
+from typing import Optional, List, Dict, Set, Any, Iterable, Tuple
+
+MINUTE_MS = 60 * 1000
+HOUR_MS = 60 * MINUTE_MS
+
+ROLLUP_TABLES = {
+    'price_rollup_minute': MINUTE_MS,
+    'price_rollup_hour': HOUR_MS
+}
+
+# Profit columns aggregate opportunity rows only (NULL min/max when there were none)
+SCHEMA_ROLLUP_TABLES = tuple(
+    f'''
+    CREATE TABLE IF NOT EXISTS {table} (
+        bucket_ms INTEGER NOT NULL,
+        market_pk INTEGER NOT NULL,
+        records INTEGER NOT NULL,
+        opportunities INTEGER NOT NULL,
+        sum_total_cost REAL NOT NULL,
+        min_total_cost REAL,
+        sum_profit REAL NOT NULL,
+        min_profit REAL,
+        max_profit REAL,
+        PRIMARY KEY (bucket_ms, market_pk)
+    ) WITHOUT ROWID
+    '''
+    for table in ROLLUP_TABLES
+)
+
+
+def _upsert_sql(table: str) -> str:
+    # Scalar MIN/MAX return NULL if either side is NULL, hence the COALESCE fallbacks
+    return f'''
+        INSERT INTO {table}
+        (bucket_ms, market_pk, records, opportunities, sum_total_cost,
+         min_total_cost, sum_profit, min_profit, max_profit)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(bucket_ms, market_pk) DO UPDATE SET
+            records = records + excluded.records,
+            opportunities = opportunities + excluded.opportunities,
+            sum_total_cost = sum_total_cost + excluded.sum_total_cost,
+            min_total_cost = COALESCE(MIN(min_total_cost, excluded.min_total_cost), min_total_cost, excluded.min_total_cost),
+            sum_profit = sum_profit + excluded.sum_profit,
+            min_profit = COALESCE(MIN(min_profit, excluded.min_profit), min_profit, excluded.min_profit),
+            max_profit = COALESCE(MAX(max_profit, excluded.max_profit), max_profit, excluded.max_profit)
+    '''
+
+
+def aggregate_rows(db_rows: Iterable[tuple], bucket_size_ms: int) -> List[tuple]:
+    """
+    Aggregate price_data rows (ts_ms, market_pk, yes, no, total_cost, arbitrage, profit, ...)
+    into (bucket_ms, market_pk, ...) rollup deltas
+    """
+    buckets: Dict[Tuple[int, int], list] = {}
+    for row in db_rows:
+        ts_ms, market_pk, total_cost, arbitrage, profit = row[0], row[1], row[4], row[5], row[6]
+        key = (ts_ms - ts_ms % bucket_size_ms, market_pk)
+        agg = buckets.get(key)
+        if agg is None:
+            agg = buckets[key] = [0, 0, 0.0, total_cost, 0.0, None, None]
+        agg[0] += 1
+        agg[2] += total_cost
+        if total_cost < agg[3]:
+            agg[3] = total_cost
+        if arbitrage == 1:
+            agg[1] += 1
+            agg[4] += profit
+            if agg[5] is None or profit < agg[5]:
+                agg[5] = profit
+            if agg[6] is None or profit > agg[6]:
+                agg[6] = profit
+
+    return [key + tuple(agg) for key, agg in buckets.items()]
+
+
+def update_rollups(conn: sqlite3.Connection, db_rows: List[tuple]):
+    """Fold newly inserted price_data rows into every rollup table (caller commits)"""
+    for table, bucket_size_ms in ROLLUP_TABLES.items():
+        conn.executemany(_upsert_sql(table), aggregate_rows(db_rows, bucket_size_ms))
+
+
+def rebuild_rollups(conn: sqlite3.Connection):
+    """Recompute every rollup table from price_data (caller commits)"""
+    for table, bucket_size_ms in ROLLUP_TABLES.items():
+        conn.execute(f'DELETE FROM {table}')
+        conn.execute(f'''
+            INSERT INTO {table}
+            SELECT
+                ts_ms - ts_ms % {bucket_size_ms},
+                market_pk,
+                COUNT(*),
+                SUM(arbitrage_opportunity = 1),
+                TOTAL(total_cost),
+                MIN(total_cost),
+                TOTAL(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit END),
+                MIN(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit END),
+                MAX(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit END)
+            FROM price_data
+            GROUP BY 1, 2
+        ''')
+
+
+def _window_parts(since_ms: int) -> Tuple[int, int]:
+    """Split [since_ms, now) into raw rows, whole minutes, then whole hours
+
+    Returns:
+        (minute_start, hour_start): raw rows cover [since_ms, minute_start),
+        minute buckets [minute_start, hour_start), hour buckets from hour_start
+    """
+    minute_start = -(-since_ms // MINUTE_MS) * MINUTE_MS
+    hour_start = -(-since_ms // HOUR_MS) * HOUR_MS
+    return minute_start, hour_start
+
+
+def statistics_parts(conn: sqlite3.Connection, since_ms: int) -> List[tuple]:
+    """
+    Partial (records, opportunities, sum_cost, min_cost, sum_profit, min_profit, max_profit)
+    rows for ts_ms >= since_ms: raw edge rows, whole minutes, whole hours
+    """
+    minute_start, hour_start = _window_parts(since_ms)
+    rollup_columns = '''
+        SUM(records), SUM(opportunities), TOTAL(sum_total_cost), MIN(min_total_cost),
+        TOTAL(sum_profit), MIN(min_profit), MAX(max_profit)
+    '''
+    return conn.execute(f'''
+        SELECT
+            COUNT(*), SUM(arbitrage_opportunity = 1), TOTAL(total_cost), MIN(total_cost),
+            TOTAL(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit END),
+            MIN(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit END),
+            MAX(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit END)
+        FROM price_data WHERE ts_ms >= ? AND ts_ms < ?
+        UNION ALL
+        SELECT {rollup_columns} FROM price_rollup_minute WHERE bucket_ms >= ? AND bucket_ms < ?
+        UNION ALL
+        SELECT {rollup_columns} FROM price_rollup_hour WHERE bucket_ms >= ?
+    ''', (since_ms, minute_start, minute_start, hour_start, hour_start)).fetchall()
+
+
+_OPPORTUNITY_MARKET_PKS = '''
+    SELECT market_pk FROM price_data
+    WHERE arbitrage_opportunity = 1 AND ts_ms >= ? AND ts_ms < ?
+    UNION
+    SELECT market_pk FROM price_rollup_minute
+    WHERE opportunities > 0 AND bucket_ms >= ? AND bucket_ms < ?
+    UNION
+    SELECT market_pk FROM price_rollup_hour
+    WHERE opportunities > 0 AND bucket_ms >= ?
+'''
+
+
+def opportunity_markets(conn: sqlite3.Connection, since_ms: int) -> Set[str]:
+    """Market ids with at least one opportunity at ts_ms >= since_ms"""
+    minute_start, hour_start = _window_parts(since_ms)
+    rows = conn.execute(f'''
+        SELECT m.market_id FROM markets m
+        WHERE m.market_pk IN ({_OPPORTUNITY_MARKET_PKS})
+    ''', (since_ms, minute_start, minute_start, hour_start, hour_start))
+    return {row[0] for row in rows}
+
+
+def window_statistics(conn: sqlite3.Connection, since_ms: int) -> Dict[str, Any]:
+    """
+    Overall statistics for ts_ms >= since_ms, answered from rollups
+
+    Counts, minimums, maximums and distinct markets equal the raw-table
+    result exactly; averages are sums over counts.
+    """
+    minute_start, hour_start = _window_parts(since_ms)
+    unique_markets = conn.execute(
+        f'SELECT COUNT(*) FROM ({_OPPORTUNITY_MARKET_PKS})',
+        (since_ms, minute_start, minute_start, hour_start, hour_start)
+    ).fetchone()[0]
+    return merge_statistics(statistics_parts(conn, since_ms), unique_markets)
+
+
+def merge_statistics(parts: Iterable[tuple], unique_markets: int) -> Dict[str, Any]:
+    """Combine partial (records, opportunities, sum_cost, min_cost, sum_profit, min_profit, max_profit) rows"""
+    records = opportunities = 0
+    sum_cost = sum_profit = 0.0
+    min_cost = min_profit = max_profit = None
+    for part_records, part_opps, part_sum_cost, part_min_cost, part_sum_profit, part_min_profit, part_max_profit in parts:
+        if not part_records:
+            continue
+        records += part_records
+        opportunities += part_opps or 0
+        sum_cost += part_sum_cost
+        sum_profit += part_sum_profit
+        if part_min_cost is not None and (min_cost is None or part_min_cost < min_cost):
+            min_cost = part_min_cost
+        if part_min_profit is not None and (min_profit is None or part_min_profit < min_profit):
+            min_profit = part_min_profit
+        if part_max_profit is not None and (max_profit is None or part_max_profit > max_profit):
+            max_profit = part_max_profit
+
+    return {
+        'total_records': records,
+        'opportunities': opportunities,
+        'avg_profit': sum_profit / opportunities if opportunities else None,
+        'max_profit': max_profit,
+        'min_profit': min_profit,
+        'unique_markets': unique_markets,
+        'avg_total_cost': sum_cost / records if records else None,
+        'min_total_cost': min_cost
+    }
+
+
+def _hour_aligned_timezone() -> bool:
+    """Whether local time differs from UTC by whole hours (UTC hour buckets map to local hours)"""
+    return time.localtime().tm_gmtoff % 3600 == 0
+
+
+def hourly_distribution(conn: sqlite3.Connection, since_ms: int) -> List[Tuple[str, int, int]]:
+    """(local hour 'HH', records, opportunities) for ts_ms >= since_ms"""
+    minute_start, hour_start = _window_parts(since_ms)
+    local_hour = "strftime('%H', {} / 1000, 'unixepoch', 'localtime')"
+
+    if _hour_aligned_timezone():
+        coarse = f'''
+            SELECT {local_hour.format('bucket_ms')} as hour, SUM(records) as records, SUM(opportunities) as opportunities
+            FROM price_rollup_hour WHERE bucket_ms >= ?
+            GROUP BY hour
+        '''
+    else:
+        # Half-hour offsets: UTC hour buckets straddle local hours, use minutes instead
+        coarse = f'''
+            SELECT {local_hour.format('bucket_ms')} as hour, SUM(records) as records, SUM(opportunities) as opportunities
+            FROM price_rollup_minute WHERE bucket_ms >= ?
+            GROUP BY hour
+        '''
+
+    return conn.execute(f'''
+        SELECT hour, SUM(records), SUM(opportunities) FROM (
+            SELECT {local_hour.format('ts_ms')} as hour, COUNT(*) as records, SUM(arbitrage_opportunity = 1) as opportunities
+            FROM price_data WHERE ts_ms >= ? AND ts_ms < ?
+            GROUP BY hour
+            UNION ALL
+            SELECT {local_hour.format('bucket_ms')} as hour, SUM(records) as records, SUM(opportunities) as opportunities
+            FROM price_rollup_minute WHERE bucket_ms >= ? AND bucket_ms < ?
+            GROUP BY hour
+            UNION ALL
+            {coarse}
+        )
+        GROUP BY hour
+        ORDER BY hour
+    ''', (since_ms, minute_start, minute_start, hour_start, hour_start)).fetchall()
+
+
+def market_totals(
+    conn: sqlite3.Connection,
+    since_ms: int,
+    limit: Optional[int] = None
+) -> List[Tuple[str, str, int, float, float]]:
+    """(market_id, question, opportunities, sum_profit, max_profit) by most opportunities"""
+    minute_start, hour_start = _window_parts(since_ms)
+    return conn.execute('''
+        SELECT m.market_id, m.market_question, top.opportunities, top.sum_profit, top.max_profit
+        FROM (
+            SELECT market_pk, SUM(opportunities) as opportunities, TOTAL(sum_profit) as sum_profit, MAX(max_profit) as max_profit
+            FROM (
+                SELECT market_pk, COUNT(*) as opportunities, TOTAL(potential_profit) as sum_profit, MAX(potential_profit) as max_profit
+                FROM price_data
+                WHERE arbitrage_opportunity = 1 AND ts_ms >= ? AND ts_ms < ?
+                GROUP BY market_pk
+                UNION ALL
+                SELECT market_pk, opportunities, sum_profit, max_profit
+                FROM price_rollup_minute
+                WHERE opportunities > 0 AND bucket_ms >= ? AND bucket_ms < ?
+                UNION ALL
+                SELECT market_pk, opportunities, sum_profit, max_profit
+                FROM price_rollup_hour
+                WHERE opportunities > 0 AND bucket_ms >= ?
+            )
+            GROUP BY market_pk
+            ORDER BY opportunities DESC, market_pk
+            LIMIT ?
+        ) top
+        JOIN markets m ON m.market_pk = top.market_pk
+        ORDER BY top.opportunities DESC, top.market_pk
+    ''', (since_ms, minute_start, minute_start, hour_start, hour_start, -1 if limit is None else limit)).fetchall()
+
+
+def top_markets(conn: sqlite3.Connection, since_ms: int, limit: int = 10) -> List[Tuple[str, str, int, float, float]]:
+    """(market_id, question, opportunities, avg_profit, max_profit) for the markets with most opportunities"""
+    return [
+        (market_id, question, opps, sum_profit / opps, max_profit)
+        for market_id, question, opps, sum_profit, max_profit in market_totals(conn, since_ms, limit)
+    ]
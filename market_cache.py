@@ -0,0 +1,174 @@
+"""
+Polymarket Market Metadata Cache
+Integer market handles and an on-disk listing cache for warm restarts
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import os
+import json
+import time
+import threading
+from typing import Optional, List, Dict, Any, Callable
+
+from config import MARKET_CACHE_FILE, MARKET_CACHE_TTL
+
+CACHE_VERSION = 1
+
+
+class MarketIndex:
+    """market_id <-> compact integer handle
+
+    Handles are assigned on first sight and never reused, so a handle stays
+    valid for the life of the process and other threads can read ids and
+    questions by handle without locking.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.questions: List[str] = []
+        self._handles: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def handle(self, market_id: str, question: str = "") -> int:
+        """Handle for a market (assigned on first call); a non-empty question is remembered"""
+        handle = self._handles.get(market_id)
+        if handle is None:
+            with self._lock:
+                handle = self._handles.get(market_id)
+                if handle is None:
+                    handle = len(self.ids)
+                    self.ids.append(market_id)
+                    self.questions.append(question)
+                    self._handles[market_id] = handle
+                    return handle
+        if question and not self.questions[handle]:
+            self.questions[handle] = question
+        return handle
+
+    def get(self, market_id: str) -> Optional[int]:
+        return self._handles.get(market_id)
+
+    def market_id(self, handle: int) -> str:
+        return self.ids[handle]
+
+    def question(self, handle: int) -> str:
+        return self.questions[handle]
+
+
+class MarketCache:
+    """Discovery listing pages on disk with their HTTP validators
+
+    Each listing page is stored as its normalized markets (id, question, slug,
+    token IDs, outcomes, end date, neg-risk flag, volume, liquidity) together
+    with the page's raw market count and the ETag/Last-Modified it was served
+    with. Within ttl seconds of the last save a restart uses the pages as-is;
+    afterwards they are only used to answer 304 Not Modified revalidations.
+    The file is replaced atomically so a crash never leaves a partial cache.
+    """
+
+    def __init__(
+        self,
+        path: str = MARKET_CACHE_FILE,
+        ttl: float = MARKET_CACHE_TTL,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            path: Cache file (JSON)
+            ttl: Seconds a saved listing is used without revalidation (0 = cache disabled)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.enabled = ttl > 0 and bool(path)
+
+        # Listing filter parameters the pages were fetched with
+        self.params: Dict[str, Any] = {}
+        # offset -> {'count', 'etag', 'last_modified', 'markets'}
+        self.pages: Dict[int, Dict[str, Any]] = {}
+        self.saved_at = 0.0
+
+    def load(self, params: Dict[str, Any]) -> bool:
+        """
+        Read the cache file
+
+        Args:
+            params: Current listing filters (a cache written with other filters is discarded)
+
+        Returns:
+            True if pages were loaded
+        """
+        self.params = params
+        self.pages = {}
+        self.saved_at = 0.0
+        if not self.enabled or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION or data.get('params') != params:
+                return False
+            self.pages = {int(offset): page for offset, page in data['pages'].items()}
+            self.saved_at = float(data['saved_at'])
+            return True
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"[!] Ignoring unreadable market cache {self.path}: {e}")
+            self.pages = {}
+            return False
+
+    def age(self) -> float:
+        """Seconds since the cached listing was saved"""
+        return self.clock() - self.saved_at if self.saved_at else float('inf')
+
+    def is_fresh(self) -> bool:
+        return bool(self.pages) and self.age() < self.ttl
+
+    def markets(self) -> List[Dict[str, Any]]:
+        """Every cached market in listing order"""
+        return [market for offset in sorted(self.pages) for market in self.pages[offset]['markets']]
+
+    def validators(self, offset: int) -> Dict[str, str]:
+        """Conditional request headers for a cached page"""
+        return self.page_validators(self.pages.get(offset))
+
+    @staticmethod
+    def page_validators(page: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a page (empty without one)"""
+        if not page:
+            return {}
+        headers = {}
+        if page.get('etag'):
+            headers['If-None-Match'] = page['etag']
+        if page.get('last_modified'):
+            headers['If-Modified-Since'] = page['last_modified']
+        return headers
+
+    def page(self, offset: int) -> Optional[Dict[str, Any]]:
+        return self.pages.get(offset)
+
+    def save(self, pages: Dict[int, Dict[str, Any]]):
+        """Replace the cached listing with a complete walk's pages"""
+        self.pages = pages
+        self.saved_at = self.clock()
+        if not self.enabled:
+            return
+        data = {
+            'version': CACHE_VERSION,
+            'saved_at': self.saved_at,
+            'params': self.params,
+            'pages': {str(offset): page for offset, page in pages.items()}
+        }
+        tmp = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[!] Failed to save market cache {self.path}: {e}")
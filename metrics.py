@@ -0,0 +1,344 @@
+"""
+Polymarket Bot Metrics
+Low-overhead histograms, counters and gauges with a Prometheus text endpoint
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import time
+import bisect
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, List, Dict, Any, Callable, Sequence, Tuple
+
+# 1-2.5-5 steps from 50us to 30s (seconds)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0,
+    10.0, 30.0
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe is one bisect and one locked increment"""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum', '_lock')
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def time(self) -> '_Timer':
+        """Context manager observing the elapsed wall time in seconds"""
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-th percentile (0-100) by interpolating inside its bucket
+
+        Returns:
+            Estimated value, or None before the first observation
+        """
+        counts, count, _ = self.snapshot()
+        if count == 0:
+            return None
+        rank = q / 100 * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                if i >= len(self.bounds):
+                    return lower  # Beyond the last bound
+                upper = self.bounds[i]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Counter:
+    """Monotonic counter"""
+
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value set directly or read from a callback at scrape time"""
+
+    __slots__ = ('value', 'callback')
+
+    def __init__(self, callback: Optional[Callable[[], float]] = None):
+        self.value = 0.0
+        self.callback = callback
+
+    def set(self, value: float):
+        self.value = value
+
+    def get(self) -> float:
+        return float(self.callback()) if self.callback else self.value
+
+
+class MetricFamily:
+    """One named metric with a child per label value combination"""
+
+    def __init__(self, kind: str, name: str, help_text: str, labelnames: Sequence[str], factory: Callable[[], Any]):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._lock = threading.Lock()
+        self.children: Dict[Tuple[str, ...], Any] = {}
+        # Series computed at scrape time: () -> {label values: value}
+        self.collector: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def labels(self, *values: str):
+        """Child metric for these label values (created on first use)"""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self.children.setdefault(values, self._factory())
+        return child
+
+    def series(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        if self.collector is not None:
+            return sorted(self.collector().items())
+        with self._lock:
+            return sorted(self.children.items())
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.families: Dict[str, MetricFamily] = {}
+
+    def _family(self, kind: str, name: str, help_text: str, labelnames: Sequence[str], factory: Callable[[], Any]) -> MetricFamily:
+        with self._lock:
+            family = self.families.get(name)
+            if family is None:
+                family = self.families[name] = MetricFamily(kind, name, help_text, labelnames, factory)
+            return family
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._family('counter', name, help_text, labelnames, Counter)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._family('gauge', name, help_text, labelnames, Gauge)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> MetricFamily:
+        return self._family('histogram', name, help_text, labelnames, lambda: Histogram(buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            families = list(self.families.values())
+
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in family.series():
+                labels = _label_text(family.labelnames, values)
+                if family.kind == 'histogram':
+                    counts, count, total = child.snapshot()
+                    cumulative = 0
+                    for bound, bucket_count in zip(child.bounds + (float('inf'),), counts):
+                        cumulative += bucket_count
+                        le = _label_text(family.labelnames, values, f'le="{_number(bound)}"')
+                        lines.append(f"{family.name}_bucket{le} {cumulative}")
+                    lines.append(f"{family.name}_sum{labels} {_number(total)}")
+                    lines.append(f"{family.name}_count{labels} {count}")
+                elif family.collector is not None:
+                    lines.append(f"{family.name}{labels} {_number(child)}")
+                elif family.kind == 'gauge':
+                    lines.append(f"{family.name}{labels} {_number(child.get())}")
+                else:
+                    lines.append(f"{family.name}{labels} {_number(child.value)}")
+        return "\n".join(lines) + "\n"
+
+
+class BotMetrics:
+    """Scan-stage latency histograms, error/opportunity/trade counters and update ages"""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        self.stage_seconds = self.registry.histogram(
+            'polymarket_stage_seconds', 'Time spent in each scan stage', ('stage',)
+        )
+        self.errors = self.registry.counter('polymarket_errors_total', 'Errors by scan stage', ('stage',))
+        self.opportunities = self.registry.counter(
+            'polymarket_opportunities_total', 'Arbitrage opportunities detected'
+        ).labels()
+        self.trades = self.registry.counter('polymarket_trades_total', 'Trade attempts by result', ('result',))
+        self.price_updates = self.registry.counter(
+            'polymarket_price_updates_total', 'Market price updates recorded'
+        ).labels()
+        self.update_age = self.registry.gauge(
+            'polymarket_market_update_age_seconds', "Seconds since each market's last price update", ('market_id',)
+        )
+
+    def stage(self, name: str) -> _Timer:
+        """with metrics.stage('http_market'): ..."""
+        return self.stage_seconds.labels(name).time()
+
+    def error(self, stage: str):
+        self.errors.labels(stage).inc()
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], float]):
+        """Register an unlabeled gauge read at scrape time"""
+        self.registry.gauge(name, help_text).labels().callback = callback
+
+    def stage_percentiles(self) -> Dict[str, Dict[str, Any]]:
+        """stage -> {'count', 'p50', 'p90', 'p99'} (seconds)"""
+        return {
+            values[0]: {
+                'count': histogram.count,
+                'p50': histogram.percentile(50),
+                'p90': histogram.percentile(90),
+                'p99': histogram.percentile(99)
+            }
+            for values, histogram in self.stage_seconds.series()
+        }
+
+    def error_counts(self) -> Dict[str, int]:
+        return {values[0]: int(counter.value) for values, counter in self.errors.series()}
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """Serves GET /metrics from a background thread"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+
+class PeriodicReporter:
+    """Calls report() every interval seconds on a background thread"""
+
+    def __init__(self, report: Callable[[], None], interval: float):
+        self.report = report
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stats-reporter", daemon=True)
+
+    def start(self):
+        if self.interval > 0:
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                print(f"[✗] Statistics report failed: {e}")
@@ -0,0 +1,380 @@
+"""
+Log DB migration tool
+Upgrades a v1/v2/v3 price_data.db to the current schema in place and reports size and query times
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import os
+import sys
+import time
+import sqlite3
+from typing import Dict, Tuple
+
+from config import DB_LOG_FILE
+from data_logger import (
+    SCHEMA_VERSION,
+    SCHEMA_V2_TABLES,
+    SCHEMA_V2_INDEXES,
+    schema_version,
+    window_start_ms
+)
+from log_rollups import (
+    SCHEMA_ROLLUP_TABLES,
+    rebuild_rollups,
+    window_statistics,
+    hourly_distribution,
+    top_markets
+)
+from episodes import SCHEMA_EPISODE_TABLES, rebuild_episodes
+
+BENCHMARK_HOURS = 24
+
+# Report queries as they were run against the v1 schema
+V1_QUERIES = {
+    'statistics': '''
+        SELECT COUNT(*), AVG(potential_profit), MAX(potential_profit),
+               MIN(potential_profit), COUNT(DISTINCT market_id)
+        FROM price_data
+        WHERE arbitrage_opportunity = 1
+        AND timestamp >= datetime('now', '-' || ? || ' hours')
+    ''',
+    'overall': '''
+        SELECT COUNT(*), SUM(CASE WHEN arbitrage_opportunity = 1 THEN 1 ELSE 0 END),
+               AVG(total_cost), MIN(total_cost)
+        FROM price_data
+        WHERE timestamp >= datetime('now', '-' || ? || ' hours')
+    ''',
+    'hourly': '''
+        SELECT strftime('%H', timestamp) as hour, COUNT(*)
+        FROM price_data
+        WHERE timestamp >= datetime('now', '-' || ? || ' hours')
+        GROUP BY hour
+    ''',
+    'top_markets': '''
+        SELECT market_id, market_question, COUNT(*) as opportunities
+        FROM price_data
+        WHERE arbitrage_opportunity = 1
+        AND timestamp >= datetime('now', '-' || ? || ' hours')
+        GROUP BY market_id, market_question
+        ORDER BY opportunities DESC
+        LIMIT 10
+    '''
+}
+
+# The same queries against the v2 schema (parameter is the window start in epoch ms)
+V2_QUERIES = {
+    'statistics': '''
+        SELECT COUNT(*), AVG(potential_profit), MAX(potential_profit),
+               MIN(potential_profit), COUNT(DISTINCT market_pk)
+        FROM price_data
+        WHERE arbitrage_opportunity = 1
+        AND ts_ms >= ?
+    ''',
+    'overall': '''
+        SELECT COUNT(*), SUM(CASE WHEN arbitrage_opportunity = 1 THEN 1 ELSE 0 END),
+               AVG(total_cost), MIN(total_cost)
+        FROM price_data
+        WHERE ts_ms >= ?
+    ''',
+    'hourly': '''
+        SELECT strftime('%H', ts_ms / 1000, 'unixepoch', 'localtime') as hour, COUNT(*)
+        FROM price_data
+        WHERE ts_ms >= ?
+        GROUP BY hour
+    ''',
+    'top_markets': '''
+        SELECT m.market_id, m.market_question, top.opportunities
+        FROM (
+            SELECT market_pk, COUNT(*) as opportunities
+            FROM price_data
+            WHERE arbitrage_opportunity = 1
+            AND ts_ms >= ?
+            GROUP BY market_pk
+            ORDER BY opportunities DESC
+            LIMIT 10
+        ) top
+        JOIN markets m ON m.market_pk = top.market_pk
+    '''
+}
+
+
+def db_size(db_file: str) -> int:
+    """DB file size including any WAL file"""
+    return sum(
+        os.path.getsize(path)
+        for path in (db_file, db_file + '-wal')
+        if os.path.exists(path)
+    )
+
+
+def time_queries(conn: sqlite3.Connection, queries: Dict[str, str], param, repeat: int = 3) -> Dict[str, float]:
+    """Best-of-N wall time per query in milliseconds"""
+    timings = {}
+    for name, sql in queries.items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, (param,)).fetchall()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best * 1000
+    return timings
+
+
+def migrate_v1_to_v2(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """
+    Rewrite a v1 price_data table into the v2 schema inside one transaction
+
+    Returns:
+        (markets, rows) copied
+    """
+    conn.isolation_level = None
+    conn.execute('BEGIN')
+    try:
+        conn.execute('ALTER TABLE price_data RENAME TO price_data_v1')
+        conn.execute('DROP INDEX IF EXISTS idx_market_timestamp')
+        conn.execute('DROP INDEX IF EXISTS idx_arbitrage')
+        for statement in SCHEMA_V2_TABLES:
+            conn.execute(statement)
+
+        # Non-empty questions sort after '' so MAX keeps a real question when one exists
+        conn.execute('''
+            INSERT INTO markets (market_id, market_question)
+            SELECT market_id, MAX(COALESCE(market_question, ''))
+            FROM price_data_v1
+            GROUP BY market_id
+        ''')
+
+        # v1 timestamps are local-time ISO strings; 'utc' converts them before taking epoch ms
+        conn.execute('''
+            INSERT INTO price_data
+            (ts_ms, market_pk, yes_price, no_price, total_cost,
+             arbitrage_opportunity, potential_profit,
+             yes_ask_price, no_ask_price, yes_bid_price, no_bid_price)
+            SELECT
+                CAST(ROUND((julianday(v.timestamp, 'utc') - 2440587.5) * 86400000.0) AS INTEGER),
+                m.market_pk, v.yes_price, v.no_price, v.total_cost,
+                COALESCE(v.arbitrage_opportunity, 0), v.potential_profit,
+                v.yes_ask_price, v.no_ask_price, v.yes_bid_price, v.no_bid_price
+            FROM price_data_v1 v
+            JOIN markets m ON m.market_id = v.market_id
+            ORDER BY v.id
+        ''')
+
+        conn.execute('DROP TABLE price_data_v1')
+        for statement in SCHEMA_V2_INDEXES:
+            conn.execute(statement)
+        conn.execute('PRAGMA user_version = 2')
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+    markets = conn.execute('SELECT COUNT(*) FROM markets').fetchone()[0]
+    rows = conn.execute('SELECT COUNT(*) FROM price_data').fetchone()[0]
+    return markets, rows
+
+
+def migrate_v2_to_v3(conn: sqlite3.Connection) -> int:
+    """
+    Build the per-minute and per-hour rollup tables from price_data
+
+    Returns:
+        Number of hour buckets written
+    """
+    conn.isolation_level = None
+    conn.execute('BEGIN')
+    try:
+        for statement in SCHEMA_ROLLUP_TABLES:
+            conn.execute(statement)
+        rebuild_rollups(conn)
+        conn.execute('PRAGMA user_version = 3')
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+    return conn.execute('SELECT COUNT(*) FROM price_rollup_hour').fetchone()[0]
+
+
+def migrate_v3_to_v4(conn: sqlite3.Connection) -> int:
+    """
+    Build the opportunity episode table by replaying price_data
+
+    Returns:
+        Number of episodes written
+    """
+    conn.isolation_level = None
+    conn.execute('BEGIN')
+    try:
+        for statement in SCHEMA_EPISODE_TABLES:
+            conn.execute(statement)
+        episodes = rebuild_episodes(conn)
+        conn.execute('PRAGMA user_version = 4')
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+    return episodes
+
+
+def time_rollup_queries(conn: sqlite3.Connection, since_ms: int, repeat: int = 3) -> Dict[str, float]:
+    """Best-of-N wall time of the rollup-backed report queries in milliseconds"""
+    queries = {
+        'statistics': window_statistics,
+        'overall': window_statistics,
+        'hourly': hourly_distribution,
+        'top_markets': top_markets
+    }
+    timings = {}
+    for name, query in queries.items():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query(conn, since_ms)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best * 1000
+    return timings
+
+
+def verify_rollups(conn: sqlite3.Connection, hours_list=(1, 6, 24, 24 * 7)) -> bool:
+    """Compare rollup-backed report results with the raw price_data queries"""
+    ok = True
+    now_ms = int(time.time() * 1000)
+    for hours in hours_list:
+        since_ms = window_start_ms(hours, now_ms)
+        raw = conn.execute('''
+            SELECT
+                COUNT(*),
+                SUM(CASE WHEN arbitrage_opportunity = 1 THEN 1 ELSE 0 END),
+                AVG(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit ELSE NULL END),
+                MAX(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit ELSE NULL END),
+                MIN(CASE WHEN arbitrage_opportunity = 1 THEN potential_profit ELSE NULL END),
+                COUNT(DISTINCT CASE WHEN arbitrage_opportunity = 1 THEN market_pk ELSE NULL END),
+                AVG(total_cost),
+                MIN(total_cost)
+            FROM price_data
+            WHERE ts_ms >= ?
+        ''', (since_ms,)).fetchone()
+        rollup = window_statistics(conn, since_ms)
+        rollup_row = (
+            rollup['total_records'], rollup['opportunities'] if rollup['total_records'] else None,
+            rollup['avg_profit'], rollup['max_profit'], rollup['min_profit'],
+            rollup['unique_markets'], rollup['avg_total_cost'], rollup['min_total_cost']
+        )
+
+        raw_hourly = conn.execute('''
+            SELECT strftime('%H', ts_ms / 1000, 'unixepoch', 'localtime') as hour, COUNT(*),
+                   SUM(CASE WHEN arbitrage_opportunity = 1 THEN 1 ELSE 0 END)
+            FROM price_data
+            WHERE ts_ms >= ?
+            GROUP BY hour
+            ORDER BY hour
+        ''', (since_ms,)).fetchall()
+
+        raw_top = conn.execute('''
+            SELECT m.market_id, COUNT(*) as opportunities, MAX(p.potential_profit)
+            FROM price_data p
+            JOIN markets m ON m.market_pk = p.market_pk
+            WHERE p.arbitrage_opportunity = 1 AND p.ts_ms >= ?
+            GROUP BY p.market_pk
+            ORDER BY opportunities DESC, p.market_pk
+            LIMIT 10
+        ''', (since_ms,)).fetchall()
+        rollup_top = [(market_id, opps, max_p) for market_id, _, opps, _, max_p in top_markets(conn, since_ms)]
+
+        # Averages are sums over counts on both sides; allow float summation-order noise only
+        matches = (
+            all(
+                a == b or (isinstance(a, float) and isinstance(b, float) and abs(a - b) <= 1e-12 * max(1.0, abs(a)))
+                for a, b in zip(raw, rollup_row)
+            )
+            and raw_hourly == hourly_distribution(conn, since_ms)
+            and raw_top == rollup_top
+        )
+        ok &= matches
+        print(f"    {'[✓]' if matches else '[✗]'} last {hours:>3}h: {raw[0]:,} records, {raw[1] or 0:,} opportunity ticks")
+    return ok
+
+
+def migrate(db_file: str = DB_LOG_FILE, vacuum: bool = True, benchmark: bool = True, verify: bool = False) -> bool:
+    """Upgrade a log DB in place, printing before/after size and query times"""
+    if not os.path.exists(db_file):
+        print(f"[✗] Database file not found: {db_file}")
+        return False
+
+    conn = sqlite3.connect(db_file)
+    version = schema_version(conn)
+    if version in (0, SCHEMA_VERSION):
+        print(f"[*] {db_file} is already at schema v{version or SCHEMA_VERSION}. Nothing to migrate.")
+        ok = True
+        if verify and version:
+            print("[*] Verifying rollups against price_data:")
+            ok = verify_rollups(conn)
+        conn.close()
+        return ok
+
+    print("=" * 60)
+    print(f"🛠️  Migrating {db_file} (v{version} → v{SCHEMA_VERSION})")
+    print("=" * 60)
+
+    # Fold any WAL content into the main file so sizes are comparable
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    size_before = db_size(db_file)
+    if not benchmark:
+        before = {}
+    elif version == 1:
+        before = time_queries(conn, V1_QUERIES, BENCHMARK_HOURS)
+    else:
+        before = time_queries(conn, V2_QUERIES, window_start_ms(BENCHMARK_HOURS))
+
+    if version == 1:
+        start = time.perf_counter()
+        markets, rows = migrate_v1_to_v2(conn)
+        print(f"[✓] Copied {rows:,} rows across {markets:,} markets in {time.perf_counter() - start:.1f}s")
+
+    if version <= 2:
+        start = time.perf_counter()
+        hour_buckets = migrate_v2_to_v3(conn)
+        print(f"[✓] Built rollups ({hour_buckets:,} market-hours) in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    episodes = migrate_v3_to_v4(conn)
+    print(f"[✓] Built opportunity episodes ({episodes:,} episodes) in {time.perf_counter() - start:.1f}s")
+
+    if vacuum:
+        print("[*] Reclaiming space (VACUUM)...")
+        conn.execute('VACUUM')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    size_after = db_size(db_file)
+    after = time_rollup_queries(conn, window_start_ms(BENCHMARK_HOURS)) if benchmark else {}
+    ok = True
+    if verify:
+        print("[*] Verifying rollups against price_data:")
+        ok = verify_rollups(conn)
+    conn.close()
+
+    change = (size_after / size_before - 1) * 100 if size_before else 0.0
+    print(f"\n💾 Size: {size_before / 1e6:,.1f} MB → {size_after / 1e6:,.1f} MB "
+          f"({abs(change):.1f}% {'larger' if change > 0 else 'smaller'})")
+    if benchmark:
+        print(f"\n⏱️  Query time (last {BENCHMARK_HOURS} hours, best of 3):")
+        for name in V1_QUERIES:
+            print(f"    {name:<12} {before[name]:>9.2f} ms → {after[name]:>9.2f} ms")
+    print("\n" + "=" * 60)
+    return ok
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    ok = migrate(
+        args[0] if args else DB_LOG_FILE,
+        vacuum='--no-vacuum' not in sys.argv,
+        benchmark='--no-benchmark' not in sys.argv,
+        verify='--verify' in sys.argv
+    )
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,287 @@
+"""
+Polymarket L2 Order Book
+Compact per-token order book built from snapshots and updated from deltas
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+from array import array
+from bisect import bisect_left
+from typing import Optional, List, Dict, Any, Iterator, Tuple, NamedTuple, Sequence
+
+BID = 'BUY'
+ASK = 'SELL'
+
+
+def _is_bid(side: str) -> bool:
+    return side.upper() in ('BUY', 'BID', 'BIDS')
+
+
+class OrderBook:
+    """L2 order book for one outcome token
+
+    Each side is a pair of parallel float arrays sorted so the best level is
+    at the end: bids by ascending price, asks by ascending negated price.
+    Top-of-book is a constant-time read of the last element and a level
+    update is a binary search plus a short memmove.
+    """
+
+    __slots__ = ('_bid_keys', '_bid_sizes', '_ask_keys', '_ask_sizes', 'timestamp')
+
+    def __init__(self):
+        self._bid_keys = array('d')
+        self._bid_sizes = array('d')
+        self._ask_keys = array('d')
+        self._ask_sizes = array('d')
+        self.timestamp = 0
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        bids: List[Dict[str, Any]],
+        asks: List[Dict[str, Any]],
+        timestamp: int = 0
+    ) -> 'OrderBook':
+        """Build a book from CLOB snapshot levels ([{'price': ..., 'size': ...}])"""
+        book = cls()
+        book.load_snapshot(bids, asks, timestamp)
+        return book
+
+    def load_snapshot(self, bids: List[Dict[str, Any]], asks: List[Dict[str, Any]], timestamp: int = 0):
+        """Replace both sides with a full snapshot"""
+        bid_levels = sorted(
+            (float(level['price']), float(level['size'])) for level in bids if float(level['size']) > 0
+        )
+        ask_levels = sorted(
+            (-float(level['price']), float(level['size'])) for level in asks if float(level['size']) > 0
+        )
+        self._bid_keys = array('d', (price for price, _ in bid_levels))
+        self._bid_sizes = array('d', (size for _, size in bid_levels))
+        self._ask_keys = array('d', (key for key, _ in ask_levels))
+        self._ask_sizes = array('d', (size for _, size in ask_levels))
+        self.timestamp = timestamp
+
+    def update(self, side: str, price: float, size: float, timestamp: int = 0):
+        """Set the size at a price level (size 0 removes the level)"""
+        if _is_bid(side):
+            keys, sizes, key = self._bid_keys, self._bid_sizes, price
+        else:
+            keys, sizes, key = self._ask_keys, self._ask_sizes, -price
+
+        i = bisect_left(keys, key)
+        exists = i < len(keys) and keys[i] == key
+        if size > 0:
+            if exists:
+                sizes[i] = size
+            else:
+                keys.insert(i, key)
+                sizes.insert(i, size)
+        elif exists:
+            del keys[i]
+            del sizes[i]
+
+        if timestamp > self.timestamp:
+            self.timestamp = timestamp
+
+    def best_bid(self) -> Optional[float]:
+        return self._bid_keys[-1] if self._bid_keys else None
+
+    def best_ask(self) -> Optional[float]:
+        return -self._ask_keys[-1] if self._ask_keys else None
+
+    def best_bid_size(self) -> float:
+        return self._bid_sizes[-1] if self._bid_sizes else 0.0
+
+    def best_ask_size(self) -> float:
+        return self._ask_sizes[-1] if self._ask_sizes else 0.0
+
+    def levels(self, side: str) -> Iterator[Tuple[float, float]]:
+        """Iterate (price, size) from the best level outward"""
+        if _is_bid(side):
+            keys, sizes, sign = self._bid_keys, self._bid_sizes, 1.0
+        else:
+            keys, sizes, sign = self._ask_keys, self._ask_sizes, -1.0
+        for i in range(len(keys) - 1, -1, -1):
+            yield sign * keys[i], sizes[i]
+
+    def depth(self, side: str, levels: int) -> float:
+        """Cumulative size of the best N levels"""
+        sizes = self._bid_sizes if _is_bid(side) else self._ask_sizes
+        return sum(sizes[max(0, len(sizes) - levels):])
+
+    def depth_at_price(self, side: str, limit_price: float) -> float:
+        """Cumulative size available at or better than limit_price
+
+        For asks this is the size that can be bought at <= limit_price, for
+        bids the size that can be sold at >= limit_price.
+        """
+        if _is_bid(side):
+            start = bisect_left(self._bid_keys, limit_price)
+            return sum(self._bid_sizes[start:])
+        start = bisect_left(self._ask_keys, -limit_price)
+        return sum(self._ask_sizes[start:])
+
+    def __len__(self) -> int:
+        return len(self._bid_keys) + len(self._ask_keys)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the price level arrays"""
+        return sum(
+            a.buffer_info()[1] * a.itemsize
+            for a in (self._bid_keys, self._bid_sizes, self._ask_keys, self._ask_sizes)
+        )
+
+
+class ArbitrageSize(NamedTuple):
+    """Executable size of a Yes+No parity arbitrage"""
+    size: float         # Shares bought on each side
+    yes_vwap: float     # Average Yes fill price
+    no_vwap: float      # Average No fill price
+    cost: float         # Total dollars spent on both legs
+    profit: float       # Payout (size * $1) minus cost
+    marginal_cost: float  # Yes + No ask of the last levels used
+
+
+def size_parity_arbitrage(
+    yes_book: OrderBook,
+    no_book: OrderBook,
+    max_pair_cost: float,
+    max_size: Optional[float] = None
+) -> Optional[ArbitrageSize]:
+    """Walk both ask ladders together while yes_ask + no_ask < max_pair_cost
+
+    Returns:
+        Fillable size with VWAPs and dollar profit, or None if even the best
+        asks do not clear the threshold
+    """
+    yes_keys, yes_sizes = yes_book._ask_keys, yes_book._ask_sizes
+    no_keys, no_sizes = no_book._ask_keys, no_book._ask_sizes
+    i = len(yes_keys) - 1
+    j = len(no_keys) - 1
+    if i < 0 or j < 0:
+        return None
+
+    yes_left = yes_sizes[i]
+    no_left = no_sizes[j]
+    size = yes_cost = no_cost = 0.0
+    marginal_cost = 0.0
+
+    while True:
+        yes_price = -yes_keys[i]
+        no_price = -no_keys[j]
+        pair_cost = yes_price + no_price
+        if pair_cost >= max_pair_cost:
+            break
+
+        qty = yes_left if yes_left < no_left else no_left
+        if max_size is not None and size + qty >= max_size:
+            qty = max_size - size
+        size += qty
+        yes_cost += qty * yes_price
+        no_cost += qty * no_price
+        marginal_cost = pair_cost
+        if max_size is not None and size >= max_size:
+            break
+
+        yes_left -= qty
+        no_left -= qty
+        if yes_left <= 0:
+            i -= 1
+            if i < 0:
+                break
+            yes_left = yes_sizes[i]
+        if no_left <= 0:
+            j -= 1
+            if j < 0:
+                break
+            no_left = no_sizes[j]
+
+    if size <= 0:
+        return None
+
+    cost = yes_cost + no_cost
+    return ArbitrageSize(
+        size=size,
+        yes_vwap=yes_cost / size,
+        no_vwap=no_cost / size,
+        cost=cost,
+        profit=size - cost,
+        marginal_cost=marginal_cost
+    )
+
+
+class BasketSize(NamedTuple):
+    """Executable size of a multi-outcome (neg-risk) basket arbitrage"""
+    size: float                 # Shares bought of every outcome
+    vwaps: Tuple[float, ...]    # Average fill price per outcome
+    cost: float                 # Total dollars spent on all legs
+    profit: float               # Payout (size * $1) minus cost
+    marginal_cost: float        # Sum of the asks of the last levels used
+
+
+def size_basket_arbitrage(
+    books: Sequence[OrderBook],
+    max_basket_cost: float,
+    max_size: Optional[float] = None
+) -> Optional[BasketSize]:
+    """Walk every outcome's ask ladder together while the sum of asks < max_basket_cost
+
+    Exactly one outcome of a neg-risk event pays $1, so a basket of one
+    share of each costs the ask sum. Each step takes the size of the
+    thinnest current level, so the basket is sized by its thinnest leg.
+
+    Returns:
+        Fillable size with per-leg VWAPs and dollar profit, or None if even
+        the best asks do not clear the threshold
+    """
+    keys = [book._ask_keys for book in books]
+    sizes = [book._ask_sizes for book in books]
+    levels = [len(k) - 1 for k in keys]
+    if not books or min(levels) < 0:
+        return None
+
+    left = [s[i] for s, i in zip(sizes, levels)]
+    costs = [0.0] * len(books)
+    size = marginal_cost = 0.0
+
+    while True:
+        prices = [-k[i] for k, i in zip(keys, levels)]
+        basket_cost = sum(prices)
+        if basket_cost >= max_basket_cost:
+            break
+
+        qty = min(left)
+        if max_size is not None and size + qty >= max_size:
+            qty = max_size - size
+        size += qty
+        for leg, price in enumerate(prices):
+            costs[leg] += qty * price
+        marginal_cost = basket_cost
+        if max_size is not None and size >= max_size:
+            break
+
+        exhausted = False
+        for leg in range(len(books)):
+            left[leg] -= qty
+            if left[leg] <= 0:
+                levels[leg] -= 1
+                if levels[leg] < 0:
+                    exhausted = True
+                    break
+                left[leg] = sizes[leg][levels[leg]]
+        if exhausted:
+            break
+
+    if size <= 0:
+        return None
+
+    cost = sum(costs)
+    return BasketSize(
+        size=size,
+        vwaps=tuple(c / size for c in costs),
+        cost=cost,
+        profit=size - cost,
+        marginal_cost=marginal_cost
+    )
@@ -0,0 +1,377 @@
+"""
+Polymarket Log Partitions
+Time-partitioned price log files with window queries, retention and compaction
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import os
+import re
+import glob
+import gzip
+import time
+import shutil
+import sqlite3
+import calendar
+import threading
+from typing import Optional, List, Dict, Set, Any, Sequence, Tuple, NamedTuple
+
+from log_rollups import (
+    statistics_parts,
+    opportunity_markets,
+    merge_statistics,
+    hourly_distribution as _hourly_distribution,
+    market_totals
+)
+from episodes import (
+    has_episodes,
+    episode_markets,
+    statistics_part as episode_statistics_part,
+    merge_statistics as merge_episode_statistics,
+    hourly_episodes as _hourly_episodes,
+    market_totals as episode_market_totals
+)
+
+PARTITION_FORMATS = {
+    'daily': ('%Y%m%d', 24 * 3600 * 1000),
+    'hourly': ('%Y%m%d_%H', 3600 * 1000)
+}
+
+# Compacted partitions are read-only copies: <prefix>_<key>.ro.db
+_FILE_PATTERN = re.compile(r'^(?P<prefix>.+)_(?P<key>\d{8}(?:_\d{2})?)(?P<ro>\.ro)?\.db$')
+
+
+class Partition(NamedTuple):
+    """One partition DB file covering [start_ms, end_ms)"""
+    start_ms: int
+    end_ms: int
+    db_file: str
+    compacted: bool
+
+
+class PartitionStore:
+    """Daily or hourly (UTC) partition files under <log_dir>/partitions
+
+    Live partitions are regular WAL-mode DBs written by DataLogger
+    (<prefix>_YYYYMMDD[_HH].db plus a matching .csv). Compaction replaces a
+    closed partition with a vacuumed, analyzed <prefix>_<key>.ro.db that is
+    opened immutable, and gzips its CSV.
+    """
+
+    def __init__(self, log_dir: str, granularity: str = 'daily', prefix: str = 'price_data'):
+        if granularity not in PARTITION_FORMATS:
+            raise ValueError(f"Unknown log partition '{granularity}' (expected one of {', '.join(PARTITION_FORMATS)})")
+        self.granularity = granularity
+        self.key_format, self.span_ms = PARTITION_FORMATS[granularity]
+        self.prefix = prefix
+        self.directory = os.path.join(log_dir, 'partitions')
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Partitions the writer currently holds open; the compactor leaves these alone
+        self.lock = threading.Lock()
+        self.open_partitions: Set[int] = set()
+
+    def partition_start(self, ts_ms: int) -> int:
+        return ts_ms - ts_ms % self.span_ms
+
+    def key(self, start_ms: int) -> str:
+        return time.strftime(self.key_format, time.gmtime(start_ms / 1000))
+
+    def _start_from_key(self, key: str) -> Optional[int]:
+        try:
+            return calendar.timegm(time.strptime(key, self.key_format)) * 1000
+        except ValueError:
+            return None
+
+    def db_file(self, start_ms: int) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{self.key(start_ms)}.db")
+
+    def compacted_file(self, start_ms: int) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{self.key(start_ms)}.ro.db")
+
+    def csv_file(self, start_ms: int) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{self.key(start_ms)}.csv")
+
+    def partitions(self) -> List[Partition]:
+        """Every partition file on disk, oldest first"""
+        found = []
+        for path in glob.glob(os.path.join(self.directory, f"{self.prefix}_*.db")):
+            match = _FILE_PATTERN.match(os.path.basename(path))
+            if not match or match.group('prefix') != self.prefix:
+                continue
+            start_ms = self._start_from_key(match.group('key'))
+            if start_ms is None:
+                continue
+            found.append(Partition(start_ms, start_ms + self.span_ms, path, bool(match.group('ro'))))
+        return sorted(found)
+
+    def overlapping(self, since_ms: int, until_ms: Optional[int] = None) -> List[Partition]:
+        """Partitions that overlap [since_ms, until_ms)"""
+        return [
+            p for p in self.partitions()
+            if p.end_ms > since_ms and (until_ms is None or p.start_ms < until_ms)
+        ]
+
+    def connect(self, partition: Partition) -> sqlite3.Connection:
+        """Open a partition for reading (compacted files are immutable)"""
+        if partition.compacted:
+            return sqlite3.connect(f"file:{partition.db_file}?mode=ro&immutable=1", uri=True)
+        return sqlite3.connect(f"file:{partition.db_file}?mode=ro", uri=True)
+
+    def open_window(self, since_ms: int, until_ms: Optional[int] = None) -> List[sqlite3.Connection]:
+        """Read connections to the partitions a window overlaps, newest first"""
+        return [self.connect(p) for p in reversed(self.overlapping(since_ms, until_ms))]
+
+    def apply_retention(self, retention_days: float, now_ms: Optional[int] = None) -> int:
+        """
+        Delete partitions that ended more than retention_days ago
+
+        Returns:
+            Number of partition DB files removed
+        """
+        if retention_days <= 0:
+            return 0
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        cutoff = now_ms - int(retention_days * 24 * 3600 * 1000)
+
+        removed = 0
+        for partition in self.partitions():
+            if partition.end_ms > cutoff:
+                continue
+            with self.lock:
+                if partition.start_ms in self.open_partitions:
+                    continue
+                for path in (partition.db_file, partition.db_file + '-wal', partition.db_file + '-shm'):
+                    if os.path.exists(path):
+                        os.remove(path)
+            removed += 1
+            for path in (self.csv_file(partition.start_ms), self.csv_file(partition.start_ms) + '.gz'):
+                if os.path.exists(path) and not self.overlapping(partition.start_ms, partition.end_ms):
+                    os.remove(path)
+        return removed
+
+    def compact(self, partition: Partition) -> bool:
+        """
+        Rewrite a closed live partition as a read-optimized .ro.db and gzip its CSV
+
+        Returns:
+            True if the partition was compacted
+        """
+        if partition.compacted:
+            return False
+        target = self.compacted_file(partition.start_ms)
+        if os.path.exists(target):
+            # Rows arrived after compaction; both files are queried until retention removes them
+            return False
+
+        tmp = target + '.tmp'
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+        with self.lock:
+            if partition.start_ms in self.open_partitions:
+                return False
+            source = sqlite3.connect(partition.db_file)
+            try:
+                source.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                source.execute('VACUUM INTO ?', (tmp,))
+            finally:
+                source.close()
+
+            compacted = sqlite3.connect(tmp)
+            try:
+                compacted.execute('PRAGMA journal_mode=DELETE')
+                compacted.execute('ANALYZE')
+                compacted.commit()
+            finally:
+                compacted.close()
+
+            os.replace(tmp, target)
+            for path in (partition.db_file, partition.db_file + '-wal', partition.db_file + '-shm'):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        csv_file = self.csv_file(partition.start_ms)
+        if os.path.exists(csv_file):
+            with open(csv_file, 'rb') as src, gzip.open(csv_file + '.gz', 'ab') as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.remove(csv_file)
+        return True
+
+    def closed_partitions(self, grace_ms: int, now_ms: Optional[int] = None) -> List[Partition]:
+        """Live partitions whose time range ended at least grace_ms ago"""
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        return [
+            p for p in self.partitions()
+            if not p.compacted and p.end_ms + grace_ms <= now_ms
+        ]
+
+
+class PartitionCompactor:
+    """Background thread applying retention and compacting closed partitions"""
+
+    def __init__(self, store: PartitionStore, retention_days: float, interval: float, grace: float = 60.0):
+        self.store = store
+        self.retention_days = retention_days
+        self.interval = interval
+        self.grace_ms = int(grace * 1000)
+        self.compacted = 0
+        self.removed = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-compactor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def run_once(self):
+        """One retention + compaction pass"""
+        self.removed += self.store.apply_retention(self.retention_days)
+        for partition in self.store.closed_partitions(self.grace_ms):
+            if self._stop.is_set():
+                return
+            try:
+                if self.store.compact(partition):
+                    self.compacted += 1
+                    print(f"[✓] Compacted log partition {os.path.basename(partition.db_file)}")
+            except sqlite3.Error as e:
+                print(f"[✗] Log partition compaction failed ({partition.db_file}): {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+def partition_store(db_file: str, partition: str) -> Optional[PartitionStore]:
+    """Partition store next to db_file, or None when partitioning is off"""
+    if not partition or partition == 'none':
+        return None
+    return PartitionStore(
+        os.path.dirname(db_file),
+        partition,
+        prefix=os.path.splitext(os.path.basename(db_file))[0]
+    )
+
+
+def window_files(db_file: str, partition: str, since_ms: int, until_ms: Optional[int] = None) -> List[str]:
+    """DB files holding rows of [since_ms, until_ms), oldest first"""
+    store = partition_store(db_file, partition)
+    if store is None:
+        return [db_file] if os.path.exists(db_file) else []
+    return [p.db_file for p in store.overlapping(since_ms, until_ms)]
+
+
+# Window queries across partition connections (also valid for a single DB)
+
+def window_statistics(conns: Sequence[sqlite3.Connection], since_ms: int) -> Dict[str, Any]:
+    """Overall statistics for ts_ms >= since_ms across every connection"""
+    parts = []
+    markets: Set[str] = set()
+    for conn in conns:
+        parts.extend(statistics_parts(conn, since_ms))
+        markets |= opportunity_markets(conn, since_ms)
+    return merge_statistics(parts, len(markets))
+
+
+def hourly_distribution(conns: Sequence[sqlite3.Connection], since_ms: int) -> List[Tuple[str, int, int]]:
+    """(local hour 'HH', records, opportunities) across every connection"""
+    hours: Dict[str, List[int]] = {}
+    for conn in conns:
+        for hour, records, opportunities in _hourly_distribution(conn, since_ms):
+            totals = hours.setdefault(hour, [0, 0])
+            totals[0] += records
+            totals[1] += opportunities or 0
+    return [(hour, records, opps) for hour, (records, opps) in sorted(hours.items())]
+
+
+def top_markets(conns: Sequence[sqlite3.Connection], since_ms: int, limit: int = 10) -> List[Tuple[str, str, int, float, float]]:
+    """(market_id, question, opportunities, avg_profit, max_profit) across every connection"""
+    if len(conns) == 1:
+        totals = market_totals(conns[0], since_ms, limit)
+    else:
+        # market_pk is per file, so merge on market_id
+        merged: Dict[str, list] = {}
+        for conn in conns:
+            for market_id, question, opps, sum_profit, max_profit in market_totals(conn, since_ms):
+                entry = merged.get(market_id)
+                if entry is None:
+                    merged[market_id] = [question, opps, sum_profit, max_profit]
+                    continue
+                if question and not entry[0]:
+                    entry[0] = question
+                entry[1] += opps
+                entry[2] += sum_profit
+                entry[3] = max(entry[3], max_profit)
+        totals = sorted(
+            ((market_id,) + tuple(entry) for market_id, entry in merged.items()),
+            key=lambda row: (-row[2], row[0])
+        )[:limit]
+
+    return [
+        (market_id, question, opps, sum_profit / opps, max_profit)
+        for market_id, question, opps, sum_profit, max_profit in totals
+    ]
+
+
+def episode_statistics(conns: Sequence[sqlite3.Connection], since_ms: int) -> Dict[str, Any]:
+    """Opportunity episode statistics for episodes starting at or after since_ms across every connection"""
+    parts = []
+    markets: Set[str] = set()
+    for conn in conns:
+        if not has_episodes(conn):
+            continue
+        parts.append(episode_statistics_part(conn, since_ms))
+        markets |= episode_markets(conn, since_ms)
+    return merge_episode_statistics(parts, len(markets))
+
+
+def hourly_episodes(conns: Sequence[sqlite3.Connection], since_ms: int) -> Dict[str, int]:
+    """Local hour 'HH' -> episodes started in that hour across every connection"""
+    hours: Dict[str, int] = {}
+    for conn in conns:
+        if not has_episodes(conn):
+            continue
+        for hour, count in _hourly_episodes(conn, since_ms):
+            hours[hour] = hours.get(hour, 0) + count
+    return hours
+
+
+def top_episode_markets(
+    conns: Sequence[sqlite3.Connection],
+    since_ms: int,
+    limit: int = 10
+) -> List[Tuple[str, str, int, float, float, float]]:
+    """(market_id, question, episodes, avg_peak_profit, max_peak_profit, total_duration_s) by most episodes"""
+    conns = [conn for conn in conns if has_episodes(conn)]
+    if len(conns) == 1:
+        totals = episode_market_totals(conns[0], since_ms, limit)
+    else:
+        # market_pk is per file, so merge on market_id
+        merged: Dict[str, list] = {}
+        for conn in conns:
+            for market_id, question, count, sum_peak, max_peak, sum_duration in episode_market_totals(conn, since_ms):
+                entry = merged.get(market_id)
+                if entry is None:
+                    merged[market_id] = [question, count, sum_peak, max_peak, sum_duration]
+                    continue
+                if question and not entry[0]:
+                    entry[0] = question
+                entry[1] += count
+                entry[2] += sum_peak
+                entry[3] = max(entry[3], max_peak)
+                entry[4] += sum_duration
+        totals = sorted(
+            ((market_id,) + tuple(entry) for market_id, entry in merged.items()),
+            key=lambda row: (-row[2], row[0])
+        )[:limit]
+
+    return [
+        (market_id, question, count, sum_peak / count, max_peak, sum_duration / 1000)
+        for market_id, question, count, sum_peak, max_peak, sum_duration in totals
+    ]
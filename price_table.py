@@ -0,0 +1,196 @@
+"""
+Polymarket Price Table
+Struct-of-arrays price store with vectorized opportunity scanning
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import time
+from typing import Optional, List, Dict, Callable, Iterable, NamedTuple
+
+import numpy as np
+
+
+class Opportunity(NamedTuple):
+    """One row selected by a vectorized scan"""
+    market_id: str
+    yes_ask: float
+    no_ask: float
+    total_cost: float
+    profit: float
+    age: float
+
+
+class PriceTable:
+    """Latest Yes/No bid/ask per market held in contiguous NumPy columns
+
+    Row i of every column belongs to market_ids[i]. Rows are appended on first
+    update and removed by moving the last row into the hole, so the live data
+    is always the prefix [:size].
+
+    Timestamps and ages come from clock (time.time by default), so a replay
+    can drive the table with simulated time.
+
+    handled_at holds the updated_at value detection last acted on, so a scan
+    with unhandled_only=True skips prices that were already handled and not
+    refreshed since (e.g. a market whose refresh failed this sweep).
+    """
+
+    COLUMNS = ('yes_bid', 'yes_ask', 'no_bid', 'no_ask', 'updated_at', 'handled_at')
+
+    def __init__(self, capacity: int = 1024, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.size = 0
+        self.market_ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int):
+        for name in self.COLUMNS:
+            column = np.full(capacity, np.nan, dtype=np.float64)
+            old = getattr(self, name, None)
+            if old is not None:
+                column[:self.size] = old[:self.size]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, market_id: str) -> bool:
+        return market_id in self._index
+
+    def row(self, market_id: str) -> int:
+        """Row index for a market, appending a new row if needed"""
+        i = self._index.get(market_id)
+        if i is None:
+            if self.size == self.capacity:
+                self._allocate(self.capacity * 2)
+            i = self.size
+            self._index[market_id] = i
+            self.market_ids.append(market_id)
+            self.size += 1
+        return i
+
+    def update(
+        self,
+        market_id: str,
+        yes_bid: Optional[float],
+        yes_ask: Optional[float],
+        no_bid: Optional[float],
+        no_ask: Optional[float],
+        timestamp: Optional[float] = None
+    ):
+        """Store the latest prices for a market (None is stored as NaN)"""
+        i = self.row(market_id)
+        self.yes_bid[i] = np.nan if yes_bid is None else yes_bid
+        self.yes_ask[i] = np.nan if yes_ask is None else yes_ask
+        self.no_bid[i] = np.nan if no_bid is None else no_bid
+        self.no_ask[i] = np.nan if no_ask is None else no_ask
+        self.updated_at[i] = self.clock() if timestamp is None else timestamp
+
+    def remove(self, market_id: str):
+        """Drop a market, moving the last row into its slot"""
+        i = self._index.pop(market_id, None)
+        if i is None:
+            return
+        last = self.size - 1
+        if i != last:
+            moved = self.market_ids[last]
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[i] = column[last]
+            self.market_ids[i] = moved
+            self._index[moved] = i
+        for name in self.COLUMNS:
+            getattr(self, name)[last] = np.nan
+        self.market_ids.pop()
+        self.size = last
+
+    def mark_handled(self, market_id: str):
+        """Record that detection acted on a market's current prices"""
+        i = self._index.get(market_id)
+        if i is not None:
+            self.handled_at[i] = self.updated_at[i]
+
+    def scan(
+        self,
+        max_pair_cost: float,
+        max_age: Optional[float] = None,
+        now: Optional[float] = None,
+        unhandled_only: bool = False,
+        market_ids: Optional[Iterable[str]] = None
+    ) -> np.ndarray:
+        """
+        Vectorized threshold and staleness filter over the whole universe (or market_ids only)
+
+        Returns:
+            Row indices where yes_ask + no_ask < max_pair_cost and the prices
+            are no older than max_age seconds (and, with unhandled_only, were
+            updated since detection last acted on them)
+        """
+        if market_ids is None:
+            rows = None
+            n = self.size
+            yes_ask, no_ask = self.yes_ask[:n], self.no_ask[:n]
+            updated_at, handled_at = self.updated_at[:n], self.handled_at[:n]
+        else:
+            rows = np.fromiter(
+                (i for i in map(self._index.get, market_ids) if i is not None), dtype=np.intp
+            )
+            yes_ask, no_ask = self.yes_ask[rows], self.no_ask[rows]
+            updated_at, handled_at = self.updated_at[rows], self.handled_at[rows]
+
+        total_cost = yes_ask + no_ask
+        # NaN compares False, so markets with a missing side drop out here
+        mask = total_cost < max_pair_cost
+        if max_age is not None:
+            now = self.clock() if now is None else now
+            mask &= (now - updated_at) <= max_age
+        if unhandled_only:
+            # NaN (never handled) compares unequal
+            mask &= updated_at != handled_at
+        hits = np.flatnonzero(mask)
+        return hits if rows is None else rows[hits]
+
+    def top_opportunities(
+        self,
+        max_pair_cost: float,
+        max_age: Optional[float] = None,
+        n: Optional[int] = None,
+        now: Optional[float] = None,
+        unhandled_only: bool = False,
+        market_ids: Optional[Iterable[str]] = None
+    ) -> List[Opportunity]:
+        """Current opportunities ranked by profit per share (best first), optionally top N only"""
+        now = self.clock() if now is None else now
+        rows = self.scan(max_pair_cost, max_age, now, unhandled_only, market_ids)
+        if rows.size == 0:
+            return []
+
+        total_cost = self.yes_ask[rows] + self.no_ask[rows]
+        if n is not None and n < rows.size:
+            # Partial selection first: O(N) instead of a full sort
+            keep = np.argpartition(total_cost, n - 1)[:n]
+            rows, total_cost = rows[keep], total_cost[keep]
+        order = np.argsort(total_cost, kind='stable')
+
+        return [
+            Opportunity(
+                market_id=self.market_ids[i],
+                yes_ask=float(self.yes_ask[i]),
+                no_ask=float(self.no_ask[i]),
+                total_cost=float(cost),
+                profit=float(1.0 - cost),
+                age=float(now - self.updated_at[i])
+            )
+            for i, cost in zip(rows[order], total_cost[order])
+        ]
+
+    def ages(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Seconds since each market's last update"""
+        now = self.clock() if now is None else now
+        age = now - self.updated_at[:self.size]
+        return dict(zip(self.market_ids, age.tolist()))
@@ -0,0 +1,285 @@
+"""
+Polymarket API Rate Limiter
+Per-endpoint token buckets that back off on HTTP 429 and retry throttled markets
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Optional, List, Dict, Any, Callable, Hashable
+
+from config import (
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_ADAPTIVE,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY
+)
+
+# AIMD constants
+DECREASE_FACTOR = 0.5      # Rate multiplier on throttling
+INCREASE_FRACTION = 0.05   # Rate regained per second of clean traffic (fraction of the ceiling)
+MIN_RATE_FRACTION = 0.05   # Floor as a fraction of the ceiling
+DEFAULT_RETRY_AFTER = 1.0  # Pause when a 429 carries no Retry-After (seconds)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header (delay seconds or HTTP date) as seconds from now"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket
+
+    reserve() takes tokens immediately, letting the balance go negative, and
+    returns how long the caller must wait. Callers sleep outside the lock and
+    are served in reservation order.
+    """
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (tokens)
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """
+        Take cost tokens
+
+        Returns:
+            Seconds to wait before sending
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._tokens -= cost
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def set_rate(self, rate: float, burst: float):
+        with self._lock:
+            self._refill(self.clock())
+            self.rate = rate
+            self.burst = max(1.0, burst)
+            self._tokens = min(self._tokens, self.burst)
+
+    def pause(self, seconds: float):
+        """Hold every reservation until seconds from now and drop saved-up tokens"""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def paused_for(self) -> float:
+        with self._lock:
+            return max(0.0, self._paused_until - self.clock())
+
+
+class AdaptiveRateLimiter:
+    """Request limiter for one API with AIMD adaptation to throttling
+
+    The rate starts at the configured ceiling. Each throttled response
+    (HTTP 429, or 503 with Retry-After) pauses the bucket for Retry-After and
+    halves the rate; clean responses add the rate back linearly until the
+    ceiling. Throttles arriving within one pause of the last decrease come
+    from requests already in flight and do not cut the rate again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: float = RATE_LIMIT_BURST,
+        adaptive: bool = RATE_LIMIT_ADAPTIVE,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            name: Endpoint name used in statistics ('gamma', 'clob')
+            rate: Ceiling in cost units per second
+            burst: Bucket capacity in seconds of the current rate
+            adaptive: Lower the rate on throttling (False keeps it fixed)
+        """
+        self.name = name
+        self.ceiling = rate
+        self.min_rate = rate * MIN_RATE_FRACTION
+        self.burst_seconds = burst
+        self.adaptive = adaptive
+        self.clock = clock
+        self.sleep = sleep
+
+        self.rate = rate
+        self.bucket = TokenBucket(rate, rate * burst, clock)
+        self._lock = threading.Lock()
+        self._hold_until = 0.0
+
+        # Statistics
+        self.requests = 0
+        self.throttled = 0
+        self.decreases = 0
+        self.wait_time = 0.0
+
+    def acquire(self, cost: float = 1.0) -> float:
+        """
+        Block until a request of this cost may be sent
+
+        Returns:
+            Seconds waited
+        """
+        wait = self.bucket.reserve(cost)
+        if wait > 0:
+            self.sleep(wait)
+        with self._lock:
+            self.requests += 1
+            self.wait_time += wait
+        return wait
+
+    def record(self, status: int, retry_after: Optional[str] = None, cost: float = 1.0):
+        """Adapt to a response status (call once per sent request)"""
+        if status == 429 or (status == 503 and retry_after):
+            self.on_throttled(parse_retry_after(retry_after))
+        elif status < 500:
+            self.on_success(cost)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        pause = DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+        now = self.clock()
+        with self._lock:
+            self.throttled += 1
+            if self.adaptive and now >= self._hold_until:
+                self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+                self.decreases += 1
+                self._hold_until = now + max(pause, 1.0)
+                self.bucket.set_rate(self.rate, self.rate * self.burst_seconds)
+        self.bucket.pause(pause)
+
+    def on_success(self, cost: float = 1.0):
+        if not self.adaptive or self.rate >= self.ceiling:
+            return
+        with self._lock:
+            # cost/rate seconds of traffic earned INCREASE_FRACTION of the ceiling per second
+            self.rate = min(self.ceiling, self.rate + INCREASE_FRACTION * self.ceiling * cost / self.rate)
+            self.bucket.set_rate(self.rate, self.rate * self.burst_seconds)
+
+    def retry_after(self) -> float:
+        """Seconds until the limiter sends again after a throttle"""
+        return self.bucket.paused_for()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'ceiling': self.ceiling,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'decreases': self.decreases,
+                'wait_time': self.wait_time
+            }
+
+
+class RetryQueue:
+    """Markets whose refresh was throttled or failed in transit, retried with exponential backoff"""
+
+    def __init__(
+        self,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_attempts: Retries per key before it is dropped
+            base_delay: First retry delay (seconds, doubles per attempt)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.clock = clock
+        self._due: Dict[Hashable, float] = {}
+        self._attempts: Dict[Hashable, int] = {}
+
+        # Statistics
+        self.retried = 0
+        self.recovered = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def add(self, key: Hashable, min_delay: float = 0.0) -> bool:
+        """
+        Schedule a retry
+
+        Args:
+            min_delay: Earliest retry (e.g. the limiter's Retry-After pause)
+
+        Returns:
+            False once the key has used all its attempts (it is dropped)
+        """
+        attempts = self._attempts.get(key, 0) + 1
+        if attempts > self.max_attempts:
+            self._attempts.pop(key, None)
+            self._due.pop(key, None)
+            self.dropped += 1
+            return False
+        self._attempts[key] = attempts
+        self._due[key] = self.clock() + max(min_delay, self.base_delay * 2 ** (attempts - 1))
+        return True
+
+    def next_delay(self) -> Optional[float]:
+        """Seconds until the earliest retry (None when empty)"""
+        if not self._due:
+            return None
+        return max(0.0, min(self._due.values()) - self.clock())
+
+    def pop_due(self) -> List[Hashable]:
+        now = self.clock()
+        due = [key for key, when in self._due.items() if when <= now]
+        for key in due:
+            del self._due[key]
+        self.retried += len(due)
+        return due
+
+    def done(self, key: Hashable):
+        """A retried key succeeded"""
+        if self._attempts.pop(key, None) is not None:
+            self.recovered += 1
+
+    def drop(self, key: Hashable):
+        """Give up on a key (e.g. its retry failed for a reason retrying will not fix)"""
+        self._due.pop(key, None)
+        if self._attempts.pop(key, None) is not None:
+            self.dropped += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'pending': len(self._due),
+            'retried': self.retried,
+            'recovered': self.recovered,
+            'dropped': self.dropped
+        }
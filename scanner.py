@@ -0,0 +1,212 @@
+"""
+Polymarket Concurrent Scan Engine
+Fetches prices for all monitored markets concurrently on an asyncio event loop
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Callable, Tuple, Awaitable, Hashable
+
+from orderbook import OrderBook
+from config import MAX_CONCURRENT_REQUESTS
+
+
+class AsyncScanner:
+    """Runs one sweep over the monitored markets with a bounded number of requests in flight"""
+
+    def __init__(self, bot, max_concurrency: int = MAX_CONCURRENT_REQUESTS):
+        """
+        Args:
+            bot: PolyArbitrageBot whose fetch/handle methods are used
+            max_concurrency: Maximum number of HTTP requests in flight at once
+        """
+        self.bot = bot
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="scan"
+        )
+
+        # Keys whose last attempt was throttled or failed in transit (worth retrying)
+        self._retryable = set()
+
+        # Last sweep statistics
+        self.last_sweep_time = 0.0
+        self.last_sweep_markets = 0
+
+    async def _request(self, func: Callable, *args, key: Optional[Hashable] = None) -> Any:
+        """Run a blocking API call on the worker pool (pool size caps requests in flight)"""
+        loop = asyncio.get_running_loop()
+        if key is None:
+            return await loop.run_in_executor(self._executor, func, *args)
+        return await loop.run_in_executor(self._executor, self._tracked, key, func, *args)
+
+    def _tracked(self, key: Hashable, func: Callable, *args) -> Any:
+        """Worker-thread call that marks key retryable if one of its requests was throttled"""
+        http = self.bot.http
+        http.clear_failure()
+        try:
+            return func(*args)
+        finally:
+            if http.retryable_failure():
+                self._retryable.add(key)
+
+    async def _retry(self, failed: List[Hashable], attempt: Callable[[Hashable], Awaitable[bool]]):
+        """
+        Re-run failed keys from the bot's retry queue until they succeed or run out of attempts
+
+        Only keys that were throttled or failed in transit are retried; the
+        first retry waits at least as long as the rate limiter's pause.
+        """
+        queue = self.bot.retry_queue
+        for key in failed:
+            if key in self._retryable:
+                queue.add(key, self.bot.http.retry_after())
+        self._retryable.clear()
+
+        while len(queue):
+            await asyncio.sleep(queue.next_delay())
+            due = queue.pop_due()
+            results = await asyncio.gather(*(attempt(key) for key in due))
+            for key, ok in zip(due, results):
+                if ok:
+                    queue.done(key)
+                elif key in self._retryable:
+                    queue.add(key, self.bot.http.retry_after())
+                else:
+                    queue.drop(key)
+            self._retryable.clear()
+
+    async def get_market_snapshot(
+        self,
+        market_id: str
+    ) -> Tuple[Optional[Dict[str, float]], Optional[Dict[str, OrderBook]]]:
+        """Query Gamma market data and CLOB orderbooks in parallel"""
+        if market_id in self.bot.market_tokens:
+            market_data, orderbook = await asyncio.gather(
+                self._request(self.bot.get_market_data, market_id, key=market_id),
+                self._request(self.bot.get_market_orderbook, market_id, key=market_id)
+            )
+        else:
+            # First sweep: token IDs are needed before the orderbooks can be queried
+            market_data = await self._request(self.bot.get_market_data, market_id, key=market_id)
+            if market_data is None:
+                return None, None
+            orderbook = await self._request(
+                self.bot.get_market_orderbook, market_id, self.bot.parse_token_ids(market_data), key=market_id
+            )
+
+        if market_data is None:
+            return None, None
+
+        with self.bot.metrics.stage('parse'):
+            return self.bot.parse_market_prices(market_id, market_data, orderbook), orderbook
+
+    async def update_market(self, market_id: str, market_question: str = "") -> bool:
+        """Fetch and record one market's prices (detection runs once per sweep)"""
+        try:
+            prices, orderbook = await self.get_market_snapshot(market_id)
+            if not prices:
+                return False
+            self.bot.record_prices(market_id, prices, market_question, orderbook)
+            return True
+
+        except Exception as e:
+            self.bot.metrics.error('monitor')
+            print(f"[✗] Market monitoring error ({market_id}): {e}")
+            return False
+
+    async def sweep(
+        self,
+        market_ids: List[str],
+        market_questions: Dict[str, str],
+        detect_all: bool = True
+    ) -> int:
+        """
+        Scan all markets once
+
+        Args:
+            detect_all: Run detection over the whole price table; False limits it
+                to market_ids (priority batches, where only those were refreshed)
+
+        Returns:
+            Number of arbitrage opportunities found
+        """
+        start = time.perf_counter()
+
+        async def update(market_id: str) -> bool:
+            return await self.update_market(market_id, market_questions.get(market_id, ""))
+
+        results = await asyncio.gather(*(update(market_id) for market_id in market_ids))
+        await self._retry([market_id for market_id, ok in zip(market_ids, results) if not ok], update)
+        opportunities_found = self.bot.detect_opportunities(None if detect_all else market_ids)
+
+        self.last_sweep_time = time.perf_counter() - start
+        self.last_sweep_markets = len(market_ids)
+        return opportunities_found
+
+    async def bulk_sweep(self, market_ids: List[str], market_questions: Dict[str, str]) -> int:
+        """
+        Scan all markets from paged Gamma listings
+
+        Prices for the whole universe come from a few listing requests. Only
+        markets near the arbitrage threshold are re-queried per market so the
+        decision uses orderbook data.
+
+        Returns:
+            Number of arbitrage opportunities found
+        """
+        start = time.perf_counter()
+        page_size = max(1, self.bot.bulk_page_size)
+
+        near_threshold = []
+
+        async def fetch_page(page_ids: Tuple[str, ...]) -> bool:
+            page = await self._request(self.bot.get_markets_by_ids, list(page_ids), key=page_ids)
+            self._record_page(page, market_questions, near_threshold)
+            return bool(page)
+
+        page_keys = [tuple(market_ids[i:i + page_size]) for i in range(0, len(market_ids), page_size)]
+        results = await asyncio.gather(*(fetch_page(page_ids) for page_ids in page_keys))
+        await self._retry([page_ids for page_ids, ok in zip(page_keys, results) if not ok], fetch_page)
+
+        questions = dict(near_threshold)
+
+        async def update(market_id: str) -> bool:
+            return await self.update_market(market_id, questions[market_id])
+
+        results = await asyncio.gather(*(update(market_id) for market_id in questions))
+        await self._retry([market_id for market_id, ok in zip(questions, results) if not ok], update)
+        opportunities_found = self.bot.detect_opportunities()
+
+        self.last_sweep_time = time.perf_counter() - start
+        self.last_sweep_markets = len(market_ids)
+        return opportunities_found
+
+    def _record_page(self, page: List[Dict[str, Any]], market_questions: Dict[str, str], near_threshold: List[tuple]):
+        """Record listing prices; collect markets near the threshold for an orderbook check"""
+        for market in page:
+            market_id = str(market.get('id', ''))
+            prices = self.bot.parse_market_prices(market_id, market)
+            if not prices:
+                continue
+
+            question = market_questions.get(market_id) or market.get('question', '')
+            if self.bot.is_near_threshold(prices):
+                near_threshold.append((market_id, question))
+                continue
+
+            try:
+                self.bot.record_prices(market_id, prices, question)
+            except Exception as e:
+                self.bot.metrics.error('monitor')
+                print(f"[✗] Market monitoring error ({market_id}): {e}")
+
+    def close(self):
+        """Release worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,270 @@
+"""
+Polymarket Poll Scheduler
+Spends a fixed market refresh budget where arbitrage opportunities are likely
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import math
+import time
+import heapq
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Callable
+
+from config import (
+    POLL_BUDGET,
+    POLL_MIN_INTERVAL,
+    POLL_MAX_INTERVAL,
+    NEAR_THRESHOLD_BAND
+)
+
+# Priority weight components
+PROXIMITY_SCALE = 0.01     # Gap above the threshold at which proximity falls to 1/e
+PROXIMITY_FLOOR = 0.1      # Weight kept by markets far from the threshold
+VOLATILITY_SCALE = 0.005   # |change in total cost| per sqrt(second) that doubles the weight
+VOLATILITY_DECAY = 0.2     # EWMA weight of the newest volatility sample
+RESOLVED_WEIGHT = 0.25     # Multiplier once the end date has passed
+
+REBALANCE_INTERVAL = 1.0   # Seconds between refresh rate recomputations
+TICK_INTERVAL = 0.05       # Seconds between take() calls in the polling loop
+
+TIERS = ('hot', 'warm', 'cold')
+
+
+def parse_end_date(value: Any) -> Optional[float]:
+    """Gamma endDate ('2024-11-05T12:00:00Z') as a UNIX timestamp"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class _MarketSchedule:
+    __slots__ = (
+        'market_id', 'total_cost', 'observed_at', 'volatility', 'end_ts',
+        'weight', 'interval', 'next_due', 'polls', 'window_polls', 'tier'
+    )
+
+    def __init__(self, market_id: str, end_ts: Optional[float], now: float):
+        self.market_id = market_id
+        self.total_cost: Optional[float] = None
+        self.observed_at = 0.0
+        self.volatility = 0.0
+        self.end_ts = end_ts
+        self.weight = 1.0
+        self.interval = POLL_MIN_INTERVAL
+        self.next_due = now  # Unpriced markets are polled right away
+        self.polls = 0
+        self.window_polls = 0
+        self.tier = 'hot'
+
+
+class PollScheduler:
+    """Per-market refresh intervals under a fixed refresh budget
+
+    Each market gets a weight from how close its ask total is to the
+    1 - min_profit_margin threshold, its recent volatility and its time to
+    resolution. The budget (market refreshes per second) is split in
+    proportion to the weights, within [min_interval, max_interval] per
+    market. take() returns the markets that are due, capped by a token
+    bucket so the budget holds even when many markets fall due together.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        budget: float = POLL_BUDGET,
+        min_interval: float = POLL_MIN_INTERVAL,
+        max_interval: float = POLL_MAX_INTERVAL,
+        near_band: float = NEAR_THRESHOLD_BAND,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            threshold: Ask total below which a market is an opportunity (1 - min_profit_margin)
+            budget: Market refreshes per second across all markets
+            min_interval: Shortest refresh interval per market (seconds)
+            max_interval: Longest refresh interval per market (seconds)
+            near_band: Markets within this gap of the threshold are 'hot', within 5x 'warm'
+        """
+        self.threshold = threshold
+        self.budget = max(0.1, budget)
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.near_band = near_band
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self.markets: Dict[str, _MarketSchedule] = {}
+        self._heap: List[tuple] = []
+        self._allowance = self.budget
+        self._last_take = clock()
+        self._last_rebalance = 0.0
+
+        # Tier statistics cover polls since the last reset
+        self._window_start = clock()
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def add(self, market_id: str, end_ts: Optional[float] = None):
+        with self._lock:
+            if market_id in self.markets:
+                return
+            state = self.markets[market_id] = _MarketSchedule(market_id, end_ts, self.clock())
+            heapq.heappush(self._heap, (state.next_due, market_id))
+            self._last_rebalance = 0.0
+
+    def remove(self, market_id: str):
+        """Stop scheduling a market (its heap entry is dropped lazily)"""
+        with self._lock:
+            self.markets.pop(market_id, None)
+
+    def set_end_date(self, market_id: str, end_ts: Optional[float]):
+        state = self.markets.get(market_id)
+        if state is not None and state.end_ts is None and end_ts is not None:
+            state.end_ts = end_ts
+
+    def observe(self, market_id: str, total_cost: float):
+        """Record a fresh Yes+No ask total for a market"""
+        state = self.markets.get(market_id)
+        if state is None or total_cost != total_cost:  # NaN
+            return
+        now = self.clock()
+        if state.total_cost is not None:
+            # Random-walk scaling keeps volatility comparable across refresh intervals
+            dt = max(now - state.observed_at, 1e-3)
+            sample = abs(total_cost - state.total_cost) / math.sqrt(dt)
+            state.volatility += VOLATILITY_DECAY * (sample - state.volatility)
+        state.total_cost = total_cost
+        state.observed_at = now
+
+    def _weight(self, state: _MarketSchedule, now: float) -> float:
+        if state.total_cost is None:
+            proximity = 1.0
+        else:
+            gap = max(0.0, state.total_cost - self.threshold)
+            proximity = math.exp(-gap / PROXIMITY_SCALE)
+
+        weight = (PROXIMITY_FLOOR + proximity) * (1.0 + state.volatility / VOLATILITY_SCALE)
+
+        if state.end_ts is not None:
+            days_left = (state.end_ts - now) / 86400
+            weight *= RESOLVED_WEIGHT if days_left < 0 else 1.0 + 2.0 / (1.0 + days_left)
+        return weight
+
+    def _tier(self, state: _MarketSchedule) -> str:
+        if state.total_cost is None:
+            return 'hot'
+        gap = state.total_cost - self.threshold
+        if gap <= self.near_band:
+            return 'hot'
+        if gap <= 5 * self.near_band:
+            return 'warm'
+        return 'cold'
+
+    def rebalance(self, now: Optional[float] = None):
+        """Recompute weights, split the budget into per-market intervals and rebuild the due heap"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            states = list(self.markets.values())
+            if not states:
+                self._heap = []
+                return
+
+            for state in states:
+                state.weight = self._weight(state, now)
+                state.tier = self._tier(state)
+
+            # Water-filling: markets pinned at a rate bound free budget for the rest
+            min_rate = 1.0 / self.max_interval
+            max_rate = 1.0 / self.min_interval
+            rates: Dict[str, float] = {}
+            free = states
+            budget = self.budget
+            while free:
+                total_weight = sum(s.weight for s in free) or 1.0
+                provisional = {}
+                pinned = {}
+                for state in free:
+                    rate = budget * state.weight / total_weight if budget > 0 else min_rate
+                    if min_rate <= rate <= max_rate:
+                        provisional[state.market_id] = rate
+                    else:
+                        pinned[state.market_id] = min(max_rate, max(min_rate, rate))
+                if not pinned:
+                    rates.update(provisional)
+                    break
+                rates.update(pinned)
+                budget -= sum(pinned.values())
+                free = [s for s in free if s.market_id not in pinned]
+
+            heap = []
+            for state in states:
+                state.interval = 1.0 / rates[state.market_id]
+                if state.polls:
+                    # Keep the phase: next poll is one new interval after the last one
+                    state.next_due = min(state.next_due, now + state.interval)
+                heap.append((state.next_due, state.market_id))
+            heapq.heapify(heap)
+            self._heap = heap
+            self._last_rebalance = now
+
+    def take(self, now: Optional[float] = None) -> List[str]:
+        """
+        Markets due for a refresh, most overdue first
+
+        Returns:
+            Market IDs to poll now (each is rescheduled one interval ahead)
+        """
+        now = self.clock() if now is None else now
+        if now - self._last_rebalance >= REBALANCE_INTERVAL:
+            self.rebalance(now)
+
+        with self._lock:
+            self._allowance = min(self.budget, self._allowance + (now - self._last_take) * self.budget)
+            self._last_take = now
+
+            due = []
+            while self._heap and self._heap[0][0] <= now and self._allowance >= 1.0:
+                next_due, market_id = heapq.heappop(self._heap)
+                state = self.markets.get(market_id)
+                if state is None or state.next_due != next_due:
+                    continue  # Removed or rescheduled
+                state.next_due = now + state.interval
+                state.polls += 1
+                state.window_polls += 1
+                heapq.heappush(self._heap, (state.next_due, market_id))
+                self._allowance -= 1.0
+                due.append(market_id)
+            return due
+
+    def tier_stats(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """
+        Per tier: markets, target and effective refreshes per second per market
+
+        Effective rates cover the time since the last reset.
+        """
+        now = self.clock()
+        with self._lock:
+            elapsed = max(now - self._window_start, 1e-9)
+            stats = {}
+            for tier in TIERS:
+                members = [s for s in self.markets.values() if s.tier == tier]
+                count = len(members)
+                stats[tier] = {
+                    'markets': count,
+                    'target_rate': sum(1.0 / s.interval for s in members) / count if count else 0.0,
+                    'effective_rate': sum(s.window_polls for s in members) / elapsed / count if count else 0.0,
+                    'budget_share': sum(1.0 / s.interval for s in members) / self.budget
+                }
+            if reset:
+                self._window_start = now
+                for state in self.markets.values():
+                    state.window_polls = 0
+            return stats
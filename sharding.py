@@ -0,0 +1,568 @@
+"""
+Polymarket Sharded Scanning
+Splits the market universe across worker processes and aggregates their opportunities
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import os
+import time
+import bisect
+import asyncio
+import hashlib
+import threading
+import multiprocessing
+from queue import Queue, Empty
+from multiprocessing.connection import Listener, Client, Connection
+from typing import Optional, List, Dict, Any, Tuple, Iterable
+
+from config import (
+    SCAN_INTERVAL,
+    MAX_CONCURRENT_REQUESTS,
+    GAMMA_RATE_LIMIT,
+    CLOB_RATE_LIMIT,
+    SHARD_WORKERS,
+    SHARD_LISTEN,
+    SHARD_AUTHKEY,
+    SHARD_REPLICAS
+)
+from orderbook import OrderBook
+from scanner import AsyncScanner
+from http_client import HttpClient
+from bot import PolyArbitrageBot
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """'host:port' as a (host, port) tuple"""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes
+
+    Each node is placed on the ring `replicas` times. A key belongs to the
+    first node clockwise from its hash, so adding or removing one of N nodes
+    moves only about 1/N of the keys.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = SHARD_REPLICAS):
+        self.replicas = max(1, replicas)
+        self.nodes: List[str] = []
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        self._rebuild()
+
+    def remove(self, node: str):
+        if node in self.nodes:
+            self.nodes.remove(node)
+            self._rebuild()
+
+    def _rebuild(self):
+        points = sorted(
+            (self._hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(self.replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> Optional[str]:
+        """Node that owns a key (None when the ring is empty)"""
+        if not self._points:
+            return None
+        i = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[i]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """node -> owned keys (every node is present, possibly with no keys)"""
+        assignment: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            node = self.node_for(key)
+            if node is not None:
+                assignment[node].append(key)
+        return assignment
+
+
+class ShardBot(PolyArbitrageBot):
+    """Worker-side bot: keeps prices locally and collects rows and opportunities for the coordinator"""
+
+    def __init__(self, rate_share: float = 1.0):
+        """
+        Args:
+            rate_share: Fraction of the configured API rate limits this worker may use
+        """
+        super().__init__(enable_logging=False, connect_wallet=False)
+        self.http.close()
+        self.http = HttpClient(rate_limits={'gamma': GAMMA_RATE_LIMIT * rate_share, 'clob': CLOB_RATE_LIMIT * rate_share})
+        self.rows: List[Tuple[str, Dict[str, float]]] = []
+        self.found: List[Dict[str, Any]] = []
+
+    def record_prices(
+        self,
+        market_id: str,
+        prices: Dict[str, float],
+        market_question: str = "",
+        orderbook: Optional[Dict[str, OrderBook]] = None
+    ):
+        super().record_prices(market_id, prices, market_question, orderbook)
+        self.rows.append((market_id, prices))
+
+    def _handle_price_opportunity(
+        self,
+        market_id: str,
+        yes_price: float,
+        no_price: float,
+        market_question: str = ""
+    ) -> bool:
+        has_opportunity, profit = self.check_arbitrage(yes_price, no_price)
+        if has_opportunity:
+            self.found.append({
+                'market_id': market_id,
+                'yes_price': yes_price,
+                'no_price': no_price,
+                'profit': profit,
+                'orderbook': None
+            })
+        return has_opportunity
+
+    def _handle_orderbook_opportunity(
+        self,
+        market_id: str,
+        orderbook: Dict[str, OrderBook],
+        market_question: str = ""
+    ) -> bool:
+        sizing = self.check_executable_arbitrage(orderbook)
+        if sizing is None:
+            return False
+        self.found.append({
+            'market_id': market_id,
+            'yes_price': sizing.yes_vwap,
+            'no_price': sizing.no_vwap,
+            'profit': sizing.profit,
+            'orderbook': orderbook
+        })
+        return True
+
+
+class ShardWorker:
+    """Fetch-and-detect loop over the markets the coordinator assigns
+
+    After each sweep the worker sends one message with every recorded price
+    row and every opportunity found; assignments are picked up between
+    sweeps. The worker exits when the coordinator closes the connection.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: Optional[bytes],
+        name: str,
+        rate_share: float = 1.0,
+        scan_interval: float = SCAN_INTERVAL,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS
+    ):
+        """
+        Args:
+            address: Coordinator host:port
+            authkey: Shared secret (SHARD_AUTHKEY)
+            name: Worker name (unique per coordinator)
+            rate_share: Fraction of the API rate limits for this worker
+            scan_interval: Seconds between sweep starts
+            max_concurrency: HTTP requests in flight per sweep
+        """
+        self.address = address
+        self.authkey = authkey
+        self.name = name
+        self.rate_share = rate_share
+        self.scan_interval = scan_interval
+        self.max_concurrency = max_concurrency
+        self.bot: Optional[ShardBot] = None
+        self.conn: Optional[Connection] = None
+
+    def run(self):
+        """Connect and sweep until the coordinator goes away"""
+        self.bot = ShardBot(self.rate_share)
+        self.conn = Client(parse_address(self.address), authkey=self.authkey)
+        self.conn.send({'type': 'hello', 'worker': self.name, 'pid': os.getpid()})
+        try:
+            asyncio.run(self._loop())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.conn.close()
+            self.bot.http.close()
+
+    def _receive(self) -> bool:
+        """
+        Apply pending coordinator messages
+
+        Returns:
+            False once the coordinator asked the worker to stop or disconnected
+        """
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message['type'] == 'stop':
+                    return False
+                if message['type'] == 'assign':
+                    self._assign(message['markets'])
+        except (EOFError, OSError):
+            return False
+        return True
+
+    def _assign(self, markets: List[Dict[str, Any]]):
+        bot = self.bot
+        assigned = {m['id']: m for m in markets}
+        current = set(bot.market_ids)
+        added = [m for market_id, m in assigned.items() if market_id not in current]
+        removed = [market_id for market_id in bot.market_ids if market_id not in assigned]
+        bot.queue_universe_update(added, removed)
+        bot.apply_universe_updates()
+
+    async def _loop(self):
+        bot = self.bot
+        scanner = AsyncScanner(bot, max_concurrency=self.max_concurrency)
+        try:
+            while self._receive():
+                start = time.monotonic()
+                if bot.market_ids:
+                    await scanner.sweep(bot.market_ids, bot.market_questions)
+                    self.conn.send({
+                        'type': 'sweep',
+                        'rows': bot.rows,
+                        'opportunities': bot.found,
+                        'markets': len(bot.market_ids),
+                        'sweep_time': scanner.last_sweep_time
+                    })
+                    bot.rows = []
+                    bot.found = []
+                await asyncio.sleep(max(0.0, self.scan_interval - (time.monotonic() - start)))
+        except (EOFError, OSError):
+            pass
+        finally:
+            scanner.close()
+
+
+def run_worker(address: str, authkey: Optional[bytes], name: str, rate_share: float = 1.0):
+    """Worker process entry point"""
+    ShardWorker(address, authkey, name, rate_share).run()
+
+
+class _WorkerLink:
+    """Coordinator-side state of one connected worker"""
+
+    def __init__(self, name: str, conn: Connection, pid: int):
+        self.name = name
+        self.conn = conn
+        self.pid = pid
+        self.markets: List[str] = []
+        self.sweeps = 0
+        self.rows = 0
+        self.opportunities = 0
+        self.last_sweep_time = 0.0
+
+
+class ShardCoordinator:
+    """Central side of SCAN_MODE=sharded
+
+    Workers (local processes or remote `python3 sharding.py` instances)
+    connect over multiprocessing.connection and get a consistent-hash share
+    of bot.market_ids. Joins, leaves and discovery changes rebalance the
+    ring, moving only the affected markets. Price rows from every worker go
+    through bot.record_prices (logging, price table, metrics). Opportunities
+    are deduplicated per market, reports from a worker that no longer owns
+    the market are dropped, and the rest are handled best first through the
+    bot's own handlers, which re-check and execute.
+    """
+
+    def __init__(
+        self,
+        bot: PolyArbitrageBot,
+        address: str = SHARD_LISTEN,
+        authkey: str = SHARD_AUTHKEY,
+        replicas: int = SHARD_REPLICAS
+    ):
+        """
+        Args:
+            bot: Coordinator bot (logger, metrics, wallet, market universe)
+            address: host:port to listen on
+            authkey: Shared secret for worker connections (random when empty, local workers only)
+            replicas: Virtual nodes per worker on the ring
+        """
+        self.bot = bot
+        self.address = address
+        self.authkey = authkey.encode() if authkey else os.urandom(16)
+        self.remote_workers = bool(authkey)
+        self.ring = HashRing(replicas=replicas)
+        self.workers: Dict[str, _WorkerLink] = {}
+        # Connection -> name assigned at join (a duplicate hello name is suffixed)
+        self._names: Dict[Connection, str] = {}
+        # market_id -> worker that currently owns it
+        self.owner: Dict[str, str] = {}
+
+        self._inbox: Queue = Queue()
+        self._listener: Optional[Listener] = None
+        self._closing = False
+        self._processes: List[multiprocessing.Process] = []
+
+        self.stats = {
+            'joins': 0,
+            'leaves': 0,
+            'rebalances': 0,
+            'moved': 0,
+            'rows': 0,
+            'reported': 0,
+            'duplicates': 0,
+            'stale': 0,
+            'handled': 0
+        }
+
+    def start(self):
+        """Listen for workers on a background thread"""
+        self._listener = Listener(parse_address(self.address), authkey=self.authkey)
+        self.address = f"{self._listener.address[0]}:{self._listener.address[1]}"
+        threading.Thread(target=self._accept_loop, name="shard-accept", daemon=True).start()
+
+    def spawn(self, count: int = SHARD_WORKERS):
+        """Start local worker processes (the API rate limits are split between them)"""
+        context = multiprocessing.get_context('spawn')
+        for i in range(count):
+            process = context.Process(
+                target=run_worker,
+                args=(self.address, self.authkey, f"local-{len(self._processes)}", 1.0 / count),
+                name=f"shard-worker-{i}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+    def stop(self):
+        """Ask workers to exit and close the listener"""
+        for link in list(self.workers.values()):
+            try:
+                link.conn.send({'type': 'stop'})
+            except OSError:
+                pass
+        self._closing = True
+        if self._listener is not None:
+            self._listener.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+                if self._closing:
+                    return
+                print(f"[!] Rejected shard worker connection: {e}")
+                continue
+            threading.Thread(target=self._read_loop, args=(conn,), name="shard-reader", daemon=True).start()
+
+    def _read_loop(self, conn: Connection):
+        """Forward one worker's messages to the coordinator loop (keyed by connection)"""
+        joined = False
+        try:
+            hello = conn.recv()
+            self._inbox.put(('join', conn, (hello['worker'], hello.get('pid', 0))))
+            joined = True
+            while True:
+                self._inbox.put(('message', conn, conn.recv()))
+        except (EOFError, OSError, KeyError, TypeError):
+            if joined:
+                self._inbox.put(('leave', conn, None))
+            conn.close()
+
+    def _join(self, name: str, conn: Connection, pid: int) -> str:
+        """Register a worker under its hello name, suffixed if taken; returns the name used"""
+        base, n = name, 1
+        while name in self.workers:
+            n += 1
+            name = f"{base}#{n}"
+        self.workers[name] = _WorkerLink(name, conn, pid)
+        self._names[conn] = name
+        self.ring.add(name)
+        self.stats['joins'] += 1
+        print(f"[✓] Shard worker joined: {name} (pid {pid}, {len(self.workers)} workers)")
+        return name
+
+    def _leave(self, conn: Connection):
+        name = self._names.pop(conn, None)
+        if name is None:
+            return
+        del self.workers[name]
+        self.ring.remove(name)
+        self.stats['leaves'] += 1
+        print(f"[!] Shard worker left: {name} ({len(self.workers)} workers)")
+
+    def _market(self, market_id: str) -> Dict[str, Any]:
+        bot = self.bot
+        return {
+            'id': market_id,
+            'question': bot.market_questions.get(market_id, ''),
+            'tokens': bot.market_tokens.get(market_id, {}),
+            'end_date': bot.discovery.universe.get(market_id, {}).get('end_date', '')
+        }
+
+    def rebalance(self):
+        """Send every worker whose share changed its new market list"""
+        assignment = self.ring.assign(self.bot.market_ids)
+        owner = {market_id: name for name, market_ids in assignment.items() for market_id in market_ids}
+        moved = sum(1 for market_id, name in owner.items() if self.owner.get(market_id) not in (None, name))
+        self.owner = owner
+        self.stats['rebalances'] += 1
+        self.stats['moved'] += moved
+
+        for name, market_ids in assignment.items():
+            link = self.workers[name]
+            if market_ids == link.markets:
+                continue
+            link.markets = market_ids
+            try:
+                link.conn.send({'type': 'assign', 'markets': [self._market(market_id) for market_id in market_ids]})
+            except OSError:
+                pass
+        if not self.workers and self.bot.market_ids:
+            print(f"[!] No shard workers connected; {len(self.bot.market_ids)} markets unassigned")
+
+    def poll(self, timeout: float = 0.5) -> int:
+        """
+        Handle worker messages for up to timeout seconds (returns once the inbox is drained)
+
+        Returns:
+            Number of opportunities handled
+        """
+        reports: List[Tuple[str, Dict[str, Any]]] = []
+        changed = False
+        try:
+            event = self._inbox.get(timeout=timeout)
+        except Empty:
+            return 0
+        while True:
+            kind, conn, payload = event
+            if kind == 'join':
+                name, pid = payload
+                self._join(name, conn, pid)
+                changed = True
+            elif kind == 'leave':
+                self._leave(conn)
+                changed = True
+            elif conn in self._names:
+                reports.extend(self._record_sweep(self.workers[self._names[conn]], payload))
+            try:
+                event = self._inbox.get_nowait()
+            except Empty:
+                break
+
+        if changed:
+            self.rebalance()
+        return self._handle_reports(reports)
+
+    def _record_sweep(self, link: _WorkerLink, message: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        if message.get('type') != 'sweep':
+            return []
+        bot = self.bot
+        link.sweeps += 1
+        link.rows += len(message['rows'])
+        link.opportunities += len(message['opportunities'])
+        link.last_sweep_time = message['sweep_time']
+        self.stats['rows'] += len(message['rows'])
+        for market_id, prices in message['rows']:
+            bot.record_prices(market_id, prices, bot.market_questions.get(market_id, ""))
+        return [(link.name, item) for item in message['opportunities']]
+
+    def _handle_reports(self, reports: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Dedupe, rank and handle reported opportunities"""
+        self.stats['reported'] += len(reports)
+        best: Dict[str, Dict[str, Any]] = {}
+        for name, item in reports:
+            market_id = item['market_id']
+            if self.owner.get(market_id) != name:
+                # Reported by the previous owner after a rebalance
+                self.stats['stale'] += 1
+                continue
+            current = best.get(market_id)
+            if current is not None:
+                self.stats['duplicates'] += 1
+                if _rank(current) >= _rank(item):
+                    continue
+            best[market_id] = item
+
+        bot = self.bot
+        handled = 0
+        for item in sorted(best.values(), key=_rank, reverse=True):
+            market_id = item['market_id']
+            question = bot.market_questions.get(market_id, "")
+            try:
+                with bot.metrics.stage('detect'):
+                    if item['orderbook']:
+                        found = bot._handle_orderbook_opportunity(market_id, item['orderbook'], question)
+                    else:
+                        found = bot._handle_price_opportunity(market_id, item['yes_price'], item['no_price'], question)
+                if found:
+                    handled += 1
+            except Exception as e:
+                bot.metrics.error('trade')
+                print(f"[✗] Trade handling error ({market_id}): {e}")
+        self.stats['handled'] += handled
+        return handled
+
+    def run(self):
+        """Coordinator loop: apply discovery changes and worker messages until interrupted"""
+        while True:
+            if self.bot.apply_universe_updates():
+                self.rebalance()
+            self.poll()
+
+    def get_worker_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                'markets': len(link.markets),
+                'sweeps': link.sweeps,
+                'rows': link.rows,
+                'opportunities': link.opportunities,
+                'last_sweep_time': link.last_sweep_time
+            }
+            for name, link in self.workers.items()
+        }
+
+
+def _rank(item: Dict[str, Any]) -> Tuple[bool, float]:
+    """Depth-sized opportunities first, then by expected profit"""
+    return item['orderbook'] is not None, item['profit']
+
+
+if __name__ == "__main__":
+    import argparse
+    import socket
+
+    parser = argparse.ArgumentParser(description="Sharded scanning worker (connects to a SCAN_MODE=sharded coordinator)")
+    parser.add_argument('--coordinator', default=SHARD_LISTEN, help=f'Coordinator host:port (default: {SHARD_LISTEN})')
+    parser.add_argument('--name', default=f"{socket.gethostname()}-{os.getpid()}", help='Worker name')
+    parser.add_argument('--rate-share', type=float, default=1.0, help='Fraction of GAMMA/CLOB_RATE_LIMIT for this worker (default: 1.0)')
+    args = parser.parse_args()
+
+    if not SHARD_AUTHKEY:
+        parser.error("set SHARD_AUTHKEY to the coordinator's shared secret")
+    print(f"[*] Shard worker {args.name} connecting to {args.coordinator}")
+    run_worker(args.coordinator, SHARD_AUTHKEY.encode(), args.name, args.rate_share)
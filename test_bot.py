@@ -1,6 +1,10 @@
 """
 Bot Test Script
 Run for a short time to verify operation
+
+Usage:
+    python3 test_bot.py          # live Polymarket APIs
+    python3 test_bot.py --fake   # local fake Gamma/CLOB API (fake_polymarket.py)
 """
 import signal
 import sys
@@ -25,6 +29,15 @@ if __name__ == "__main__":
     # Initialize bot
     bot = PolyArbitrageBot()
     
+    if '--fake' in sys.argv:
+        from fake_polymarket import FakePolymarketHTTPServer
+        
+        fake_api = FakePolymarketHTTPServer(num_markets=20, latency=0.02, seed=42)
+        fake_api.start()
+        bot.gamma_url = fake_api.url
+        bot.clob_url = fake_api.url
+        print(f"[*] Using fake Gamma/CLOB API at {fake_api.url}")
+    
     # Get market list
     print("\n[*] Searching for active markets...")
     markets = bot.get_active_markets(limit=5)  # Only 5 for testing
@@ -56,9 +69,6 @@ if __name__ == "__main__":
                 except Exception as e:
                     print(f"[✗] Market monitoring error ({market['id']}): {e}")
                     continue
-                
-                # Short delay
-                time.sleep(0.5)
             
             scan_count += 1
             elapsed = time.time() - start_time
@@ -83,6 +93,9 @@ if __name__ == "__main__":
     
     # Database statistics
     if bot.logger:
+        # Write out queued rows before counting them
+        bot.logger.close()
+        
         import sqlite3
         import os
         from config import DB_LOG_FILE
@@ -93,12 +106,14 @@ if __name__ == "__main__":
             cursor.execute('SELECT COUNT(*) FROM price_data')
             total_records = cursor.fetchone()[0]
             cursor.execute('SELECT COUNT(*) FROM price_data WHERE arbitrage_opportunity = 1')
+            opportunity_ticks = cursor.fetchone()[0]
+            cursor.execute('SELECT COUNT(*) FROM opportunity_episodes')
             opportunities = cursor.fetchone()[0]
             conn.close()
             
             print(f"\nDatabase Statistics:")
             print(f"  Total records: {total_records}")
-            print(f"  Arbitrage opportunities: {opportunities}")
+            print(f"  Arbitrage opportunities: {opportunities} ({opportunity_ticks} ticks)")
     
     print("\n[✓] Test complete!")
     print("="*60)
@@ -0,0 +1,70 @@
+"""
+DataLogger writer thread tests: sink failures do not stall flush() or close()
+"""
+import sqlite3
+
+import pytest
+
+import data_logger
+from data_logger import DataLogger, _STOP
+
+
+def _logger(tmp_path) -> DataLogger:
+    return DataLogger(
+        str(tmp_path / 'prices.csv'),
+        str(tmp_path / 'prices.db'),
+        flush_interval=0.01,
+        partition='none'
+    )
+
+
+def _log(logger: DataLogger, n: int):
+    for i in range(n):
+        logger.log_price_data(f'm{i}', 'Question?', 0.50, 0.50)
+
+
+def test_sink_open_failure_is_counted_and_retried(tmp_path, monkeypatch):
+    real_sink = data_logger._LogSink
+    attempts = []
+
+    def flaky_sink(*args, **kwargs):
+        attempts.append(args)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+        return real_sink(*args, **kwargs)
+
+    monkeypatch.setattr(data_logger, '_LogSink', flaky_sink)
+    logger = _logger(tmp_path)
+    try:
+        _log(logger, 3)
+        logger.flush()
+        assert logger.write_errors == 1
+        # The failed batch is dropped; the writer keeps going with a new sink
+        written = logger.rows_written
+        assert written < 3
+
+        _log(logger, 3)
+        logger.flush()
+        assert logger.rows_written == written + 3
+        assert len(attempts) == 2
+    finally:
+        logger.close()
+
+    conn = sqlite3.connect(tmp_path / 'prices.db')
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM price_data').fetchone()[0] == logger.rows_written
+    finally:
+        conn.close()
+
+
+def test_dead_writer_raises_instead_of_blocking(tmp_path):
+    logger = _logger(tmp_path)
+    logger._queue.put(_STOP)
+    logger._writer.join(timeout=5)
+    assert not logger._writer.is_alive()
+
+    _log(logger, 1)
+    with pytest.raises(RuntimeError):
+        logger.flush()
+    with pytest.raises(RuntimeError):
+        logger.close()
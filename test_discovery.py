@@ -0,0 +1,102 @@
+"""
+Discovery listing tests: conditional GETs against the page cache
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from bot import PolyArbitrageBot
+from discovery import MarketDiscovery, END_DATE_ROUNDING, _iso
+from market_cache import MarketCache
+
+LISTING = [{
+    'id': '1',
+    'question': 'Will it rain?',
+    'endDate': '2099-01-01T00:00:00Z',
+    'volumeNum': 5000,
+    'liquidityNum': 500,
+    'outcomes': json.dumps(['Yes', 'No']),
+    'clobTokenIds': json.dumps(['101', '102'])
+}]
+
+
+class _Response:
+    def __init__(self, status_code: int, body: Any = None, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("empty body")
+        return self._body
+
+
+class _HTTP:
+    """Answers queued responses and records each request's params and headers"""
+
+    def __init__(self, responses: List[_Response]):
+        self.responses = responses
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None, endpoint=None, headers=None):
+        self.requests.append((dict(params), headers or {}))
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+def _discovery(responses: List[_Response], cache: Optional[MarketCache] = None):
+    bot = PolyArbitrageBot(market_ids=[], enable_logging=False)
+    bot.http.close()
+    bot.http = _HTTP(responses)
+    return MarketDiscovery(bot, page_size=10, concurrency=1, cache=cache or MarketCache(path='', ttl=0)), bot.http
+
+
+def test_not_modified_without_cached_page_refetches():
+    discovery, http = _discovery([
+        _Response(304),
+        _Response(200, LISTING, {'ETag': 'W/"abc"'})
+    ])
+    page = discovery.fetch_page(0)
+    assert page is not None
+    assert [market['id'] for market in page['markets']] == ['1']
+    assert page['etag'] == 'W/"abc"'
+    # The retry carries no validators
+    assert len(http.requests) == 2
+    assert 'If-None-Match' not in http.requests[1][1]
+
+
+def test_not_modified_reuses_cached_page():
+    cache = MarketCache(path='', ttl=0)
+    cached = {'count': 1, 'etag': 'W/"abc"', 'last_modified': None, 'markets': []}
+    cache.pages = {0: cached}
+    discovery, http = _discovery([_Response(304)], cache)
+    assert discovery.fetch_page(0) is cached
+    assert http.requests[0][1] == {'If-None-Match': 'W/"abc"'}
+    assert discovery.stats['not_modified'] == 1
+
+
+def test_repeated_not_modified_without_cache_fails_the_page():
+    discovery, _ = _discovery([_Response(304), _Response(304)])
+    assert discovery.fetch_page(0) is None
+
+
+def test_end_date_filters_are_stable_between_walks(monkeypatch):
+    discovery, _ = _discovery([])
+    discovery.min_hours_to_end = 1
+    discovery.max_days_to_end = 30
+    hour = 472222 * END_DATE_ROUNDING
+
+    params = []
+    for now in (hour + 10, hour + 3000):
+        monkeypatch.setattr('discovery.time.time', lambda now=now: now)
+        params.append(discovery._params(0))
+        # Rounded outward: never narrower than the exact filters
+        assert params[-1]['end_date_min'] <= _iso(now + 3600)
+        assert params[-1]['end_date_max'] >= _iso(now + 30 * 86400)
+    assert params[0] == params[1]
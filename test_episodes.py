@@ -0,0 +1,135 @@
+"""
+Opportunity episode tests: the live tracker, replay rebuilds and mid-episode row suppression
+"""
+import random
+import sqlite3
+
+import data_logger
+from data_logger import DataLogger, init_schema
+from episodes import Episode, EpisodeTracker, rebuild_episodes
+
+
+def test_opportunity_ticks_open_extend_and_close():
+    tracker = EpisodeTracker(max_gap=10)
+    assert tracker.observe(1, 1000, False, 0.0) == []
+    assert tracker.observe(1, 2000, True, 0.02, depth=50) == []
+    assert tracker.started_at(1) == 2000
+    assert tracker.observe(1, 3000, True, 0.04, depth=20) == []
+    assert tracker.observe(1, 4000, True, 0.03, depth=80) == []
+
+    [episode] = tracker.observe(1, 5000, False, 0.0)
+    assert episode == Episode(2000, 1, 4000, 3, 3000, 0.04, 20)
+    assert episode.duration_ms == 2000
+    assert tracker.started_at(1) is None
+    assert (tracker.opened, tracker.closed) == (1, 1)
+
+
+def test_gap_closes_the_episode_at_its_last_tick():
+    tracker = EpisodeTracker(max_gap=10)
+    tracker.observe(1, 0, True, 0.02)
+    tracker.observe(1, 5000, True, 0.02)
+    # The market was not updated for more than max_gap: the old episode ends at 5 s, a new one starts
+    [episode] = tracker.observe(1, 16000, True, 0.03)
+    assert (episode.start_ms, episode.end_ms, episode.ticks) == (0, 5000, 2)
+    assert tracker.started_at(1) == 16000
+
+    # A quiet market is closed by another market's tick once the gap has passed
+    tracker.observe(2, 17000, True, 0.01)
+    closed = tracker.observe(3, 30000, False, 0.0)
+    assert [(e.market, e.end_ms) for e in closed] == [(1, 16000), (2, 17000)]
+    assert tracker.open_count() == 0
+
+
+def test_gap_boundary_keeps_the_episode_open():
+    tracker = EpisodeTracker(max_gap=10)
+    tracker.observe(1, 0, True, 0.02)
+    assert tracker.observe(1, 10000, True, 0.02) == []
+    [episode] = tracker.close_all()
+    assert (episode.start_ms, episode.end_ms, episode.ticks) == (0, 10000, 2)
+
+
+def _ticks(seed: int = 3, n: int = 2000):
+    """(ts_ms, market_pk, total_cost) with runs of opportunities and quiet gaps"""
+    rng = random.Random(seed)
+    ticks = []
+    ts = 0
+    for _ in range(n):
+        ts += rng.choice((100, 700, 3000, 25000))
+        ticks.append((ts, rng.randint(1, 3), rng.choice((0.95, 0.97, 1.0, 1.01))))
+    return ticks
+
+
+def test_rebuild_matches_the_live_tracker():
+    ticks = _ticks()
+    live = EpisodeTracker(max_gap=20)
+    episodes = []
+    conn = sqlite3.connect(':memory:')
+    init_schema(conn)
+    conn.executemany('INSERT INTO markets (market_pk, market_id) VALUES (?, ?)', [(pk, f'm{pk}') for pk in (1, 2, 3)])
+    for ts_ms, market_pk, total_cost in ticks:
+        arbitrage = total_cost < 0.99
+        profit = 1.0 - total_cost if arbitrage else 0.0
+        episodes.extend(live.observe(market_pk, ts_ms, arbitrage, profit))
+        conn.execute('''
+            INSERT INTO price_data (ts_ms, market_pk, total_cost, arbitrage_opportunity, potential_profit)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (ts_ms, market_pk, total_cost, int(arbitrage), profit))
+    episodes.extend(live.close_all())
+
+    assert rebuild_episodes(conn, max_gap=20, chunk_size=97) == len(episodes)
+    rebuilt = conn.execute('''
+        SELECT start_ms, market_pk, end_ms, ticks, peak_ms, peak_profit, depth_at_peak
+        FROM opportunity_episodes ORDER BY start_ms, market_pk
+    ''').fetchall()
+    assert rebuilt == sorted(episodes)
+    assert len(episodes) > 50
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def _log_run(tmp_path, monkeypatch, log_opportunity_ticks: bool):
+    clock = _Clock()
+    monkeypatch.setattr(data_logger.time, 'time', clock.time)
+    logger = DataLogger(
+        str(tmp_path / 'prices.csv'),
+        str(tmp_path / 'prices.db'),
+        flush_interval=0.01,
+        partition='none',
+        episode_max_gap=20,
+        log_opportunity_ticks=log_opportunity_ticks
+    )
+    # Idle, a 4-tick opportunity, idle again
+    for yes_price in (0.50, 0.45, 0.44, 0.46, 0.45, 0.50, 0.51):
+        logger.log_price_data('m1', 'Question?', yes_price, 0.50)
+        clock.now += 1
+    logger.close()
+    conn = sqlite3.connect(tmp_path / 'prices.db')
+    try:
+        rows = conn.execute('SELECT arbitrage_opportunity FROM price_data ORDER BY ts_ms').fetchall()
+        episodes = conn.execute('SELECT ticks, duration_ms, peak_profit FROM opportunity_episodes').fetchall()
+    finally:
+        conn.close()
+    return logger, [row[0] for row in rows], episodes
+
+
+def test_mid_episode_ticks_are_summarized_by_default(tmp_path, monkeypatch):
+    logger, rows, episodes = _log_run(tmp_path, monkeypatch, log_opportunity_ticks=False)
+    # Opening tick and every non-opportunity tick are kept
+    assert rows == [0, 1, 0, 0]
+    assert logger.ticks_summarized == 3
+    [(ticks, duration_ms, peak_profit)] = episodes
+    assert (ticks, duration_ms) == (4, 3000)
+    assert round(peak_profit, 6) == 0.06
+
+
+def test_every_tick_is_logged_when_enabled(tmp_path, monkeypatch):
+    logger, rows, episodes = _log_run(tmp_path, monkeypatch, log_opportunity_ticks=True)
+    assert rows == [0, 1, 1, 1, 1, 0, 0]
+    assert logger.ticks_summarized == 0
+    assert len(episodes) == 1
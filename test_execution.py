@@ -0,0 +1,178 @@
+"""
+Two-leg execution tests against the fake CLOB matching engine (fake_polymarket.FakePolymarketHTTPServer)
+"""
+from eth_account import Account
+
+from bot import PolyArbitrageBot
+from execution import ExecutionEngine, OrderSigner
+from fake_polymarket import FakePolymarketHTTPServer
+
+
+class _Setup:
+    """One fake market with hand-set books and an engine trading it"""
+
+    def __init__(self, order_type: str = 'FOK', presign_markets: int = 0, **server_kwargs):
+        self.server = FakePolymarketHTTPServer(num_markets=1, volatility=0.0, seed=9, **server_kwargs)
+        self.server.start()
+        [self.market] = self.server.markets.values()
+        self.bot = PolyArbitrageBot(market_ids=[self.market.market_id], enable_logging=False, connect_wallet=False)
+        self.bot.clob_url = self.server.url
+        self.bot.max_slippage = 0.0
+        self.bot.market_tokens[self.market.market_id] = {'Yes': self.market.yes_token, 'No': self.market.no_token}
+        self.engine = ExecutionEngine(
+            self.bot,
+            OrderSigner(Account.create()),
+            order_type=order_type,
+            max_shares=20,
+            unwind_slippage=0.02,
+            presign_markets=presign_markets,
+            presign_rungs=4
+        )
+
+    def book(self, outcome: str, bids, asks):
+        token_id = self.market.yes_token if outcome == 'Yes' else self.market.no_token
+        with self.market.lock:
+            self.market.books[token_id] = {'bids': dict(bids), 'asks': dict(asks)}
+
+    def execute(self, size: float = 20):
+        return self.engine.execute(self.market.market_id, 0.48, 0.50, size=size)
+
+    def close(self):
+        self.engine.close()
+        self.bot.http.close()
+        self.server.stop()
+
+
+def test_both_legs_fill():
+    setup = _Setup()
+    try:
+        setup.book('Yes', {0.47: 100}, {0.48: 100})
+        setup.book('No', {0.49: 100}, {0.50: 100})
+        result = setup.execute()
+        assert result.success
+        assert (result.yes.filled, result.no.filled, result.hedged) == (20, 20, 20)
+        assert (round(result.yes.avg_price, 6), round(result.no.avg_price, 6)) == (0.48, 0.50)
+        assert result.unwind is None
+        assert setup.engine.stats['filled'] == 1
+    finally:
+        setup.close()
+
+
+def test_one_leg_fill_is_unwound_with_a_sell_fak():
+    setup = _Setup()
+    try:
+        setup.book('Yes', {0.47: 100}, {0.48: 100})
+        setup.book('No', {0.49: 100}, {})
+        result = setup.execute()
+        assert not result.success
+        assert result.yes.filled == 20
+        assert result.no.status == 'rejected'
+        assert result.hedged == 0
+        # Sold back at the fill price minus unwind_slippage or better
+        assert result.unwind.side == 'SELL'
+        assert result.unwind.filled == 20
+        assert round(result.unwind.avg_price, 6) == 0.47
+        assert setup.engine.stats['unwound'] == 1
+        assert setup.engine.stats['failed'] == 1
+    finally:
+        setup.close()
+
+
+def test_partial_fill_unwinds_the_excess():
+    setup = _Setup(order_type='FAK')
+    try:
+        setup.book('Yes', {0.47: 100}, {0.48: 100})
+        setup.book('No', {0.49: 100}, {0.50: 12})
+        result = setup.execute()
+        assert (result.yes.filled, result.no.filled, result.hedged) == (20, 12, 12)
+        assert result.unwind.outcome == 'Yes'
+        assert result.unwind.requested == 8
+        assert result.unwind.filled == 8
+        assert setup.engine.stats['partial'] == 1
+    finally:
+        setup.close()
+
+
+def test_resting_remainder_is_cancelled():
+    setup = _Setup(order_type='GTC')
+    try:
+        setup.book('Yes', {0.47: 100}, {0.48: 100})
+        setup.book('No', {0.49: 100}, {0.50: 12})
+        result = setup.execute()
+        assert result.no.status == 'live'
+        assert setup.server.canceled_orders == 1
+        assert setup.server.open_orders == {}
+        assert result.unwind.filled == 8
+    finally:
+        setup.close()
+
+
+def test_incomplete_unwind_is_reported_unhedged():
+    setup = _Setup()
+    try:
+        setup.book('Yes', {}, {0.48: 100})
+        setup.book('No', {0.49: 100}, {})
+        result = setup.execute()
+        assert result.unwind.filled == 0
+        assert setup.engine.stats['unhedged'] == 1
+    finally:
+        setup.close()
+
+
+def test_post_errors_leave_no_position():
+    setup = _Setup(order_error_rate=1.0)
+    try:
+        setup.book('Yes', {0.47: 100}, {0.48: 100})
+        setup.book('No', {0.49: 100}, {0.50: 100})
+        result = setup.execute()
+        assert (result.yes.status, result.no.status) == ('rejected', 'rejected')
+        assert result.yes.error == 'injected order failure'
+        assert result.unwind is None
+        assert setup.engine.stats['failed'] == 1
+
+        # Transport errors: nothing listening
+        setup.bot.clob_url = 'http://127.0.0.1:9'
+        result = setup.execute()
+        assert (result.yes.status, result.no.status) == ('error', 'error')
+        assert result.hedged == 0 and result.unwind is None
+    finally:
+        setup.close()
+
+
+def test_depth_sized_trades_use_presigned_ladder_orders():
+    setup = _Setup(presign_markets=5)
+    try:
+        setup.book('Yes', {0.47: 100}, {0.48: 100})
+        setup.book('No', {0.49: 100}, {0.50: 100})
+        engine = setup.engine
+        assert engine.size_ladder == [20, 15, 10, 5]
+        assert (engine.trade_size(17.3), engine.trade_size(None), engine.trade_size(3)) == (15, 20, 3)
+
+        engine.warm_market(setup.market.market_id, 0.48, 0.50)
+        assert engine.preparer.stats['presigned'] == 8
+        result = setup.execute(size=12.4)
+        assert result.success
+        assert result.hedged == 10
+        assert engine.preparer.stats['hits'] == 2
+        assert engine.preparer.hit_rate() == 1.0
+
+        # Below the smallest rung: signed on trigger at the exact size
+        result = setup.execute(size=3)
+        assert result.hedged == 3
+        assert engine.preparer.stats['misses'] == 2
+    finally:
+        setup.close()
+
+
+def test_presigned_order_needs_the_same_limit():
+    setup = _Setup(presign_markets=5)
+    try:
+        engine = setup.engine
+        template = engine.templates(setup.market.market_id)['Yes']
+        engine.preparer.warm(template, 0, 0.49, 20, 'FOK')
+        # A higher pre-signed buy limit would pay more than the trigger priced
+        assert engine.preparer.take(template, 0, 0.48, 20, 'FOK') is None
+        assert engine.preparer.take(template, 0, 0.50, 20, 'FOK') is None
+        assert engine.preparer.take(template, 0, 0.49, 20, 'FOK') is not None
+    finally:
+        setup.close()
@@ -0,0 +1,128 @@
+"""
+Rollup tests: incrementally maintained minute/hour rollups answer like the raw price_data queries
+"""
+import random
+import sqlite3
+import time
+
+from data_logger import init_schema
+from log_rollups import MINUTE_MS, HOUR_MS, ROLLUP_TABLES, update_rollups, rebuild_rollups, window_statistics
+from migrate_db import verify_rollups
+
+INSERT_PRICES = '''
+    INSERT INTO price_data
+    (ts_ms, market_pk, yes_price, no_price, total_cost, arbitrage_opportunity, potential_profit,
+     yes_ask_price, no_ask_price, yes_bid_price, no_bid_price)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _row(ts_ms: int, market_pk: int, yes: float, no: float) -> tuple:
+    total_cost = yes + no
+    arbitrage = 1 if total_cost < 0.99 else 0
+    profit = max(0.0, 1.0 - total_cost) if arbitrage else 0
+    return (ts_ms, market_pk, yes, no, total_cost, arbitrage, profit, yes, no, yes, no)
+
+
+def _db() -> sqlite3.Connection:
+    conn = sqlite3.connect(':memory:')
+    init_schema(conn)
+    conn.executemany(
+        'INSERT INTO markets (market_pk, market_id, market_question) VALUES (?, ?, ?)',
+        [(pk, f'm{pk}', f'Market {pk}?') for pk in range(1, 5)]
+    )
+    return conn
+
+
+def _ingest(conn: sqlite3.Connection, batches):
+    """Insert like the writer thread: raw rows and rollup deltas per batch"""
+    for batch in batches:
+        conn.executemany(INSERT_PRICES, batch)
+        update_rollups(conn, batch)
+    conn.commit()
+
+
+def _rollups(conn: sqlite3.Connection):
+    return {
+        table: conn.execute(f'SELECT * FROM {table} ORDER BY bucket_ms, market_pk').fetchall()
+        for table in ROLLUP_TABLES
+    }
+
+
+def _assert_same_rollups(a, b):
+    for table in ROLLUP_TABLES:
+        assert len(a[table]) == len(b[table]), table
+        for row_a, row_b in zip(a[table], b[table]):
+            for x, y in zip(row_a, row_b):
+                assert x == y or abs(x - y) < 1e-9, (table, row_a, row_b)
+
+
+def test_upserts_merge_null_min_max_across_batches():
+    conn = _db()
+    bucket = 10 * HOUR_MS
+    _ingest(conn, [
+        # No opportunity yet: profit min/max are NULL
+        [_row(bucket + 1000, 1, 0.50, 0.50)],
+        # Same buckets, first opportunities: NULL merges with a value
+        [_row(bucket + 2000, 1, 0.45, 0.50), _row(bucket + 3000, 1, 0.40, 0.50)],
+        # Then a non-opportunity batch must keep the existing min/max
+        [_row(bucket + 4000, 1, 0.55, 0.50)],
+        [_row(bucket + 5000, 1, 0.48, 0.50)]
+    ])
+    for table in ROLLUP_TABLES:
+        records, opportunities, sum_cost, min_cost, sum_profit, min_profit, max_profit = conn.execute(
+            f'SELECT records, opportunities, sum_total_cost, min_total_cost, sum_profit, min_profit, max_profit FROM {table}'
+        ).fetchone()
+        assert (records, opportunities) == (5, 3)
+        assert abs(sum_cost - 4.88) < 1e-9
+        assert min_cost == 0.90
+        assert abs(sum_profit - (0.05 + 0.10 + 0.02)) < 1e-9
+        assert (round(min_profit, 6), round(max_profit, 6)) == (0.02, 0.10)
+
+
+def test_incremental_rollups_match_rebuild_across_boundaries():
+    rng = random.Random(7)
+    base = 100 * HOUR_MS - 90 * 1000   # 90s before an hour boundary
+    rows = []
+    ts = base
+    for _ in range(3000):
+        ts += rng.choice((1, 250, 999, 1001, 30000))
+        yes = rng.uniform(0.40, 0.55)
+        rows.append(_row(ts, rng.randint(1, 4), yes, rng.uniform(0.40, 0.55)))
+    assert rows[-1][0] - base > HOUR_MS
+
+    conn = _db()
+    # Uneven batches so buckets are split across upserts
+    i = 0
+    batches = []
+    while i < len(rows):
+        size = rng.randint(1, 200)
+        batches.append(rows[i:i + size])
+        i += size
+    _ingest(conn, batches)
+    incremental = _rollups(conn)
+
+    rebuild_rollups(conn)
+    _assert_same_rollups(incremental, _rollups(conn))
+    assert len(incremental['price_rollup_hour']) > 4
+
+
+def test_window_queries_match_raw_queries():
+    rng = random.Random(11)
+    now_ms = int(time.time() * 1000)
+    # Three hours of ticks ending now, spanning many minute and hour boundaries
+    start = now_ms - 3 * HOUR_MS
+    rows = [
+        _row(ts, rng.randint(1, 4), rng.uniform(0.40, 0.55), rng.uniform(0.40, 0.55))
+        for ts in sorted(rng.randrange(start, now_ms) for _ in range(5000))
+    ]
+    conn = _db()
+    _ingest(conn, [rows[i:i + 97] for i in range(0, len(rows), 97)])
+
+    # Windows that start mid-minute and mid-hour use raw rows, minutes and hours
+    assert verify_rollups(conn, hours_list=(0.01, 0.5, 1, 1.7, 2.5, 24))
+
+    # A window starting exactly on a minute boundary has no raw edge
+    since_ms = start - start % MINUTE_MS + 5 * MINUTE_MS
+    records = conn.execute('SELECT COUNT(*) FROM price_data WHERE ts_ms >= ?', (since_ms,)).fetchone()[0]
+    assert window_statistics(conn, since_ms)['total_records'] == records
@@ -0,0 +1,93 @@
+"""
+Order book and depth sizing tests
+"""
+import pytest
+
+from bot import PolyArbitrageBot
+from orderbook import OrderBook, size_parity_arbitrage, size_basket_arbitrage
+
+
+def _asks(*levels) -> OrderBook:
+    return OrderBook.from_snapshot([], [{'price': str(p), 'size': str(s)} for p, s in levels])
+
+
+def test_book_keeps_best_levels_on_top():
+    book = OrderBook.from_snapshot(
+        [{'price': '0.40', 'size': '10'}, {'price': '0.42', 'size': '5'}],
+        [{'price': '0.47', 'size': '7'}, {'price': '0.45', 'size': '3'}]
+    )
+    assert (book.best_bid(), book.best_ask()) == (0.42, 0.45)
+    book.update('SELL', 0.44, 2)
+    book.update('BUY', 0.42, 0)
+    assert (book.best_bid(), book.best_ask()) == (0.40, 0.44)
+    assert list(book.levels('SELL')) == [(0.44, 2), (0.45, 3), (0.47, 7)]
+    assert book.depth_at_price('SELL', 0.45) == 5
+
+
+def test_parity_walks_both_ladders_until_threshold():
+    yes = _asks((0.40, 100), (0.45, 100), (0.60, 500))
+    no = _asks((0.50, 50), (0.52, 200))
+    sizing = size_parity_arbitrage(yes, no, max_pair_cost=0.98)
+
+    # 50 @ 0.90, 50 @ 0.92, 100 @ 0.97; 0.60 + 0.52 does not clear
+    assert sizing.size == pytest.approx(200)
+    assert sizing.cost == pytest.approx(50 * 0.90 + 50 * 0.92 + 100 * 0.97)
+    assert sizing.profit == pytest.approx(200 - sizing.cost)
+    assert sizing.yes_vwap == pytest.approx((100 * 0.40 + 100 * 0.45) / 200)
+    assert sizing.no_vwap == pytest.approx((50 * 0.50 + 150 * 0.52) / 200)
+    assert sizing.marginal_cost == pytest.approx(0.97)
+
+
+def test_parity_threshold_is_strict():
+    yes = _asks((0.25, 10))
+    no = _asks((0.5, 10))
+    assert size_parity_arbitrage(yes, no, max_pair_cost=0.75) is None
+    assert size_parity_arbitrage(yes, no, max_pair_cost=0.7500001).size == 10
+
+
+def test_parity_max_size_caps_mid_level():
+    yes = _asks((0.40, 100))
+    no = _asks((0.50, 100))
+    sizing = size_parity_arbitrage(yes, no, max_pair_cost=0.99, max_size=30)
+    assert sizing.size == 30
+    assert sizing.cost == pytest.approx(30 * 0.90)
+
+
+def test_parity_empty_side_is_none():
+    assert size_parity_arbitrage(_asks(), _asks((0.10, 100)), max_pair_cost=0.99) is None
+    assert size_parity_arbitrage(_asks((0.10, 100)), _asks(), max_pair_cost=0.99) is None
+
+
+def test_executable_check_applies_margin_slippage_and_min_trade():
+    bot = PolyArbitrageBot(market_ids=['m1'], enable_logging=False)
+    try:
+        bot.min_profit_margin = 0.01
+        bot.max_slippage = 0.01
+        # 0.985 clears 1 - 0.01 but not 1 - 0.01 - 0.01
+        assert bot.check_executable_arbitrage({'Yes': _asks((0.485, 100)), 'No': _asks((0.50, 100))}) is None
+        sizing = bot.check_executable_arbitrage({'Yes': _asks((0.48, 100)), 'No': _asks((0.49, 100))})
+        assert sizing.size == 100
+
+        # Cost below MIN_TRADE_SIZE dollars is not worth trading
+        assert bot.check_executable_arbitrage({'Yes': _asks((0.01, 0.1)), 'No': _asks((0.01, 0.1))}) is None
+    finally:
+        bot.http.close()
+
+
+def test_basket_sized_by_thinnest_leg():
+    books = [_asks((0.30, 100), (0.31, 100)), _asks((0.30, 20), (0.40, 100)), _asks((0.30, 100))]
+    sizing = size_basket_arbitrage(books, max_basket_cost=0.99)
+
+    # 20 baskets at 0.90; then leg 2 moves to 0.40 (sum 1.00) and stops
+    assert sizing.size == pytest.approx(20)
+    assert sizing.cost == pytest.approx(20 * 0.90)
+    assert sizing.vwaps == pytest.approx((0.30, 0.30, 0.30))
+    assert sizing.marginal_cost == pytest.approx(0.90)
+
+
+def test_basket_runs_out_of_depth_and_caps():
+    books = [_asks((0.20, 10)), _asks((0.30, 50)), _asks((0.40, 50))]
+    assert size_basket_arbitrage(books, max_basket_cost=0.99).size == 10
+    assert size_basket_arbitrage(books, max_basket_cost=0.99, max_size=4).size == 4
+    assert size_basket_arbitrage(books, max_basket_cost=0.90) is None
+    assert size_basket_arbitrage(books + [_asks()], max_basket_cost=0.99) is None
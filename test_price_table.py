@@ -0,0 +1,71 @@
+"""
+PriceTable scan tests: staleness, handled-update dedupe and market filters
+"""
+from bot import PolyArbitrageBot
+from price_table import PriceTable
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _table() -> PriceTable:
+    table = PriceTable(capacity=2, clock=_Clock())
+    table.update('m1', 0.44, 0.45, 0.49, 0.50)
+    table.update('m2', 0.59, 0.60, 0.39, 0.40)
+    table.update('m3', 0.40, 0.42, 0.50, 0.52)
+    return table
+
+
+def test_scan_filters_threshold_and_age():
+    table = _table()
+    assert [c.market_id for c in table.top_opportunities(max_pair_cost=0.99)] == ['m3', 'm1']
+
+    table.clock.now += 10
+    table.update('m1', 0.44, 0.45, 0.49, 0.50)
+    assert [c.market_id for c in table.top_opportunities(max_pair_cost=0.99, max_age=5)] == ['m1']
+
+
+def test_handled_rows_are_skipped_until_updated():
+    table = _table()
+    table.mark_handled('m1')
+    assert [c.market_id for c in table.top_opportunities(max_pair_cost=0.99, unhandled_only=True)] == ['m3']
+    # The plain scan still sees handled rows
+    assert len(table.top_opportunities(max_pair_cost=0.99)) == 2
+
+    table.clock.now += 1
+    table.update('m1', 0.44, 0.45, 0.49, 0.50)
+    assert len(table.top_opportunities(max_pair_cost=0.99, unhandled_only=True)) == 2
+
+
+def test_market_ids_filter():
+    table = _table()
+    found = table.top_opportunities(max_pair_cost=0.99, market_ids=['m1', 'm2', 'unknown'])
+    assert [c.market_id for c in found] == ['m1']
+
+    table.remove('m1')
+    assert table.top_opportunities(max_pair_cost=0.99, market_ids=['m1']) == []
+    assert [c.market_id for c in table.top_opportunities(max_pair_cost=0.99, market_ids=['m3'])] == ['m3']
+
+
+def test_detection_does_not_retrade_stale_prices():
+    bot = PolyArbitrageBot(market_ids=['m1'], enable_logging=False)
+    trades = []
+    bot.trading_enabled = lambda: True
+    bot.execute_trade = lambda market_id, yes_price, no_price, *args, **kwargs: trades.append(market_id) or True
+    try:
+        bot.price_table.update('m1', 0.44, 0.45, 0.49, 0.50)
+        assert bot.detect_opportunities() == 1
+        # The refresh failed, so the row still holds the prices already traded
+        assert bot.detect_opportunities() == 0
+        assert trades == ['m1']
+
+        bot.price_table.update('m1', 0.44, 0.45, 0.49, 0.50, timestamp=bot.price_table.clock() + 1)
+        assert bot.detect_opportunities() == 1
+        assert trades == ['m1', 'm1']
+    finally:
+        bot.http.close()
@@ -0,0 +1,63 @@
+"""
+Price parsing and price table tests: only tradable asks reach detection
+"""
+import json
+
+from bot import PolyArbitrageBot
+from orderbook import OrderBook
+
+LISTING = {
+    'outcomes': json.dumps(['Yes', 'No']),
+    'outcomePrices': json.dumps(['0.40', '0.45']),
+    'clobTokenIds': json.dumps(['501', '502'])
+}
+
+
+def _book(bids, asks) -> OrderBook:
+    return OrderBook.from_snapshot(
+        [{'price': str(p), 'size': str(s)} for p, s in bids],
+        [{'price': str(p), 'size': str(s)} for p, s in asks]
+    )
+
+
+def _bot() -> PolyArbitrageBot:
+    return PolyArbitrageBot(market_ids=['m1'], enable_logging=False)
+
+
+def test_empty_ask_side_is_not_executable():
+    bot = _bot()
+    try:
+        # Listing mids sum to 0.85, but nobody is selling Yes
+        orderbook = {'Yes': _book([(0.39, 5)], []), 'No': _book([], [(0.46, 5)])}
+        prices = bot.parse_market_prices('m1', LISTING, orderbook)
+        assert prices['yes_ask'] is None
+        assert prices['no_ask'] == 0.46
+
+        assert not bot.handle_prices('m1', prices, "", orderbook)
+        assert bot.price_table.top_opportunities(max_pair_cost=0.99) == []
+        assert bot.detect_opportunities() == 0
+    finally:
+        bot.http.close()
+
+
+def test_book_asks_are_used_when_both_sides_quote():
+    bot = _bot()
+    try:
+        orderbook = {'Yes': _book([(0.44, 5)], [(0.45, 5)]), 'No': _book([(0.49, 5)], [(0.50, 5)])}
+        prices = bot.parse_market_prices('m1', LISTING, orderbook)
+        assert (prices['yes_ask'], prices['no_ask']) == (0.45, 0.50)
+
+        bot.record_prices('m1', prices, "", orderbook)
+        [candidate] = bot.price_table.top_opportunities(max_pair_cost=0.99)
+        assert candidate.total_cost == 0.95
+    finally:
+        bot.http.close()
+
+
+def test_listing_only_prices_stand_in_for_asks():
+    bot = _bot()
+    try:
+        prices = bot.parse_market_prices('m1', LISTING)
+        assert (prices['yes_ask'], prices['no_ask']) == (0.40, 0.45)
+    finally:
+        bot.http.close()
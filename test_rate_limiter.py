@@ -0,0 +1,133 @@
+"""
+Rate limiter tests: AIMD backoff on throttling, linear recovery, Retry-After pauses and retry backoff
+"""
+from rate_limiter import (
+    AdaptiveRateLimiter,
+    TokenBucket,
+    RetryQueue,
+    parse_retry_after,
+    DECREASE_FACTOR,
+    MIN_RATE_FRACTION
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def _limiter(rate: float = 100.0, **kwargs) -> AdaptiveRateLimiter:
+    clock = _Clock()
+    return AdaptiveRateLimiter('test', rate, burst=1.0, clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_token_bucket_burst_then_rate():
+    clock = _Clock()
+    bucket = TokenBucket(rate=10.0, burst=5.0, clock=clock)
+    assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+    # Reservations queue up behind each other at 1/rate
+    assert abs(bucket.reserve() - 0.1) < 1e-9
+    assert abs(bucket.reserve() - 0.2) < 1e-9
+    clock.now += 1.0
+    assert bucket.reserve() == 0.0
+
+
+def test_throttle_halves_rate_and_pauses():
+    limiter = _limiter()
+    limiter.record(429, retry_after='2')
+    assert limiter.rate == 100.0 * DECREASE_FACTOR
+    assert limiter.retry_after() == 2.0
+    # The next request waits out the pause
+    assert limiter.acquire() >= 2.0
+    assert limiter.get_stats()['throttled'] == 1
+
+
+def test_in_flight_throttles_do_not_cut_again():
+    limiter = _limiter()
+    limiter.record(429, retry_after='1')
+    limiter.record(429, retry_after='1')
+    limiter.record(503, retry_after='1')
+    assert limiter.decreases == 1
+    assert limiter.throttled == 3
+
+    # After the hold, a new throttle halves the rate again
+    limiter.clock.now += 1.5
+    limiter.record(429)
+    assert limiter.decreases == 2
+    assert limiter.rate == 100.0 * DECREASE_FACTOR ** 2
+
+
+def test_rate_floor():
+    limiter = _limiter()
+    for _ in range(20):
+        limiter.record(429, retry_after='0')
+        limiter.clock.now += 1.1
+    assert limiter.rate == 100.0 * MIN_RATE_FRACTION
+
+
+def test_clean_traffic_recovers_to_ceiling():
+    limiter = _limiter()
+    limiter.record(429, retry_after='0')
+    start = limiter.clock.now
+    rates = []
+    while limiter.rate < limiter.ceiling and len(rates) < 10000:
+        limiter.acquire()
+        limiter.record(200)
+        rates.append(limiter.rate)
+    assert rates == sorted(rates)
+    assert limiter.rate == limiter.ceiling
+    # INCREASE_FRACTION of the ceiling per second: about 10 s from half rate back to the ceiling
+    assert 5.0 < limiter.clock.now - start < 20.0
+
+
+def test_server_errors_neither_cut_nor_raise_rate():
+    limiter = _limiter()
+    limiter.record(429, retry_after='0')
+    rate = limiter.rate
+    limiter.record(500)
+    limiter.record(503)
+    assert limiter.rate == rate
+    assert limiter.decreases == 1
+
+
+def test_fixed_rate_when_not_adaptive():
+    limiter = _limiter(adaptive=False)
+    limiter.record(429, retry_after='1')
+    assert limiter.rate == 100.0
+    assert limiter.retry_after() == 1.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('-1') == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+
+def test_retry_queue_backoff_and_drop():
+    clock = _Clock()
+    retries = RetryQueue(max_attempts=2, base_delay=0.5, clock=clock)
+    assert retries.add('m1')
+    assert retries.next_delay() == 0.5
+    assert retries.pop_due() == []
+
+    clock.now += 0.5
+    assert retries.pop_due() == ['m1']
+    # Second attempt doubles the delay; a Retry-After pause can push it further
+    assert retries.add('m1', min_delay=3.0)
+    assert retries.next_delay() == 3.0
+    clock.now += 3.0
+    assert retries.pop_due() == ['m1']
+    assert not retries.add('m1')
+    assert retries.get_stats() == {'pending': 0, 'retried': 2, 'recovered': 0, 'dropped': 1}
+
+    retries.add('m2')
+    retries.done('m2')
+    assert retries.recovered == 1
@@ -0,0 +1,56 @@
+"""
+AsyncScanner sweep tests: priority batches only detect on the markets they refreshed
+"""
+import asyncio
+
+from bot import PolyArbitrageBot
+from scanner import AsyncScanner
+
+
+def _bot(market_ids):
+    bot = PolyArbitrageBot(market_ids=market_ids, enable_logging=False)
+    bot.handled = []
+    bot.trading_enabled = lambda: False
+    original = bot._handle_price_opportunity
+
+    def handle(market_id, *args, **kwargs):
+        bot.handled.append(market_id)
+        return original(market_id, *args, **kwargs)
+
+    bot._handle_price_opportunity = handle
+    return bot
+
+
+def _sweep(bot, market_ids, **kwargs) -> int:
+    scanner = AsyncScanner(bot)
+
+    async def update_market(market_id, question=""):
+        bot.price_table.update(market_id, 0.44, 0.45, 0.49, 0.50)
+        return True
+
+    scanner.update_market = update_market
+    try:
+        return asyncio.run(scanner.sweep(market_ids, {}, **kwargs))
+    finally:
+        scanner.close()
+
+
+def test_priority_batch_detects_only_due_markets():
+    bot = _bot(['m1', 'm2'])
+    try:
+        # m2 has an unhandled opportunity from earlier, but only m1 is due
+        bot.price_table.update('m2', 0.44, 0.45, 0.49, 0.50)
+        assert _sweep(bot, ['m1'], detect_all=False) == 1
+        assert bot.handled == ['m1']
+    finally:
+        bot.http.close()
+
+
+def test_full_sweep_detects_over_the_whole_table():
+    bot = _bot(['m1', 'm2'])
+    try:
+        bot.price_table.update('m2', 0.44, 0.45, 0.49, 0.50)
+        assert _sweep(bot, ['m1']) == 2
+        assert sorted(bot.handled) == ['m1', 'm2']
+    finally:
+        bot.http.close()
@@ -0,0 +1,84 @@
+"""
+Sharded scanning tests: local worker processes against the fake Gamma/CLOB API
+"""
+import time
+import multiprocessing
+
+from bot import PolyArbitrageBot
+from fake_polymarket import FakePolymarketHTTPServer
+from sharding import HashRing, ShardCoordinator, run_worker
+
+
+def _poll_until(coordinator: ShardCoordinator, condition, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for shard workers"
+        coordinator.poll(timeout=0.2)
+
+
+def _assert_each_market_owned_once(coordinator: ShardCoordinator, market_ids):
+    assigned = [market_id for link in coordinator.workers.values() for market_id in link.markets]
+    assert sorted(assigned) == sorted(market_ids)
+    assert set(coordinator.owner) == set(market_ids)
+    for market_id, name in coordinator.owner.items():
+        assert market_id in coordinator.workers[name].markets
+
+
+def test_hash_ring_moves_only_the_leaving_nodes_keys():
+    keys = [str(i) for i in range(1000)]
+    ring = HashRing(['a', 'b', 'c'], replicas=50)
+    before = {key: ring.node_for(key) for key in keys}
+    ring.remove('b')
+    after = {key: ring.node_for(key) for key in keys}
+    assert all(after[key] == node for key, node in before.items() if node != 'b')
+    assert set(after.values()) == {'a', 'c'}
+
+
+def test_local_workers_share_markets_and_results_are_merged(monkeypatch):
+    server = FakePolymarketHTTPServer(num_markets=12, seed=5)
+    server.start()
+    # Spawned workers read config from the environment
+    monkeypatch.setenv('GAMMA_API_URL', server.url)
+    monkeypatch.setenv('CLOB_API_URL', server.url)
+    monkeypatch.setenv('SCAN_INTERVAL', '0.2')
+
+    market_ids = sorted(server.markets)
+    bot = PolyArbitrageBot(market_ids=market_ids, enable_logging=False, connect_wallet=False)
+    bot.gamma_url = bot.clob_url = server.url
+    coordinator = ShardCoordinator(bot, address='127.0.0.1:0', authkey='', replicas=50)
+    duplicate = None
+    try:
+        coordinator.start()
+        coordinator.spawn(2)
+        _poll_until(coordinator, lambda: len(coordinator.workers) == 2)
+        # A second worker with a name already taken joins as local-0#2
+        duplicate = multiprocessing.get_context('spawn').Process(
+            target=run_worker, args=(coordinator.address, coordinator.authkey, 'local-0', 0.5), daemon=True
+        )
+        duplicate.start()
+
+        def all_reporting():
+            links = coordinator.workers.values()
+            return len(coordinator.workers) == 3 and all(link.sweeps > 1 for link in links)
+
+        _poll_until(coordinator, all_reporting)
+        assert set(coordinator.workers) == {'local-0', 'local-1', 'local-0#2'}
+        _assert_each_market_owned_once(coordinator, market_ids)
+
+        # Every worker's rows were merged into the coordinator's price table
+        _poll_until(coordinator, lambda: all(market_id in bot.price_table for market_id in market_ids))
+        assert coordinator.stats['rows'] >= len(market_ids)
+
+        # The renamed worker leaves under its own name and its markets move to the others
+        duplicate.terminate()
+        duplicate.join(timeout=10)
+        _poll_until(coordinator, lambda: len(coordinator.workers) == 2)
+        assert set(coordinator.workers) == {'local-0', 'local-1'}
+        assert coordinator.stats['leaves'] == 1
+        _assert_each_market_owned_once(coordinator, market_ids)
+    finally:
+        coordinator.stop()
+        if duplicate is not None and duplicate.is_alive():
+            duplicate.terminate()
+        bot.http.close()
+        server.stop()
@@ -0,0 +1,188 @@
+"""
+MarketFeed tests against the local fake market channel (fake_polymarket.FakeMarketChannelServer)
+"""
+import json
+import asyncio
+from typing import Dict, Any, List
+
+from ws_feed import MarketFeed
+from fake_polymarket import FakeMarketChannelServer
+
+
+class _Metrics:
+    def error(self, stage: str):
+        raise AssertionError(f"unexpected {stage} error")
+
+
+class _Bot:
+    """The parts of PolyArbitrageBot MarketFeed calls"""
+
+    def __init__(self):
+        self.metrics = _Metrics()
+        self.checks: List[str] = []
+
+    def get_token_orderbook(self, token_id: str):
+        raise AssertionError("tests pass a snapshot_fetcher")
+
+    def handle_prices(self, market_id: str, prices: Dict[str, float], question: str = "", orderbook=None) -> bool:
+        self.checks.append(market_id)
+        return False
+
+
+def _levels(book, side: str):
+    return [(round(price, 2), round(size, 2)) for price, size in book.levels(side)]
+
+
+def _server_levels(server: FakeMarketChannelServer, token_id: str):
+    snapshot = server.book_snapshot(token_id)
+    bids = sorted(((float(l['price']), float(l['size'])) for l in snapshot['bids']), reverse=True)
+    asks = sorted((float(l['price']), float(l['size'])) for l in snapshot['asks'])
+    return bids, asks
+
+
+def _assert_books_match(feed: MarketFeed, server: FakeMarketChannelServer):
+    for tokens in server.market_tokens.values():
+        for token_id in tokens.values():
+            bids, asks = _server_levels(server, token_id)
+            book = feed.books[token_id]
+            assert _levels(book, 'BUY') == bids, token_id
+            assert _levels(book, 'SELL') == asks, token_id
+
+
+async def _run_feed(server: FakeMarketChannelServer, feed: MarketFeed, duration: float, during=None):
+    """Run the feed; stop the server's updates before the end so the feed can drain"""
+    async def quiesce():
+        if during is not None:
+            await during()
+        await asyncio.sleep(duration * 0.6)
+        server.paused = True
+
+    await asyncio.gather(feed.run(duration=duration), quiesce())
+
+
+def _make_feed(bot: _Bot, server: FakeMarketChannelServer, **kwargs) -> MarketFeed:
+    return MarketFeed(
+        bot,
+        server.market_tokens,
+        url=server.url,
+        snapshot_fetcher=server.book_snapshot,
+        snapshot_timeout=0.1,
+        reconnect_delay=0.05,
+        **kwargs
+    )
+
+
+def test_snapshot_then_deltas_track_server_books():
+    async def scenario():
+        server = FakeMarketChannelServer(num_markets=3, update_interval=0.002, seed=1)
+        await server.start()
+        bot = _Bot()
+        feed = _make_feed(bot, server)
+        try:
+            await _run_feed(server, feed, 1.5)
+        finally:
+            await server.stop()
+        assert server.messages_sent > 50
+        assert feed.stats['gaps_detected'] == 0
+        assert bot.checks
+        _assert_books_match(feed, server)
+
+    asyncio.run(scenario())
+
+
+def test_missing_snapshots_recovered_from_rest():
+    async def scenario():
+        server = FakeMarketChannelServer(num_markets=2, update_interval=0.005, send_snapshots=False, seed=2)
+        await server.start()
+        feed = _make_feed(_Bot(), server)
+        try:
+            await _run_feed(server, feed, 1.5)
+        finally:
+            await server.stop()
+        assert feed.stats['snapshots_recovered'] >= 4
+        _assert_books_match(feed, server)
+
+    asyncio.run(scenario())
+
+
+def test_reconnect_resubscribes_and_resyncs():
+    async def scenario():
+        server = FakeMarketChannelServer(num_markets=3, update_interval=0.002, seed=3)
+        await server.start()
+        feed = _make_feed(_Bot(), server)
+
+        async def disconnect():
+            await asyncio.sleep(0.3)
+            await server.drop_connections()
+
+        try:
+            await _run_feed(server, feed, 2.0, during=disconnect)
+        finally:
+            await server.stop()
+        assert feed.stats['reconnects'] >= 1
+        _assert_books_match(feed, server)
+
+    asyncio.run(scenario())
+
+
+def test_dropped_deltas_detected_and_resnapshotted():
+    async def scenario():
+        server = FakeMarketChannelServer(num_markets=2, update_interval=0.002, seed=4, drop_rate=0.2)
+        await server.start()
+        feed = _make_feed(_Bot(), server)
+        try:
+            await _run_feed(server, feed, 1.5)
+        finally:
+            await server.stop()
+        assert server.messages_dropped > 0
+        assert feed.stats['gaps_detected'] > 0
+        assert feed.stats['snapshots_recovered'] > 0
+
+    asyncio.run(scenario())
+
+
+def _book_event(token_id: str, bids, asks, timestamp: int) -> Dict[str, Any]:
+    return {
+        'event_type': 'book',
+        'asset_id': token_id,
+        'bids': [{'price': str(p), 'size': str(s)} for p, s in bids],
+        'asks': [{'price': str(p), 'size': str(s)} for p, s in asks],
+        'timestamp': str(timestamp)
+    }
+
+
+def test_top_of_book_mismatch_drops_book_until_resnapshot():
+    tokens = {'m1': {'Yes': 'y1', 'No': 'n1'}}
+    fresh = _book_event('y1', [(0.40, 50)], [(0.44, 80)], 3)
+
+    async def scenario():
+        bot = _Bot()
+        feed = MarketFeed(bot, tokens, snapshot_fetcher=lambda token_id: fresh)
+        feed.handle_message(json.dumps([
+            _book_event('y1', [(0.40, 50)], [(0.45, 80)], 1),
+            _book_event('n1', [(0.50, 50)], [(0.52, 80)], 1)
+        ]))
+        # The first book alone cannot be checked; the second completes the pair
+        assert bot.checks == ['m1']
+
+        # Consistent delta: applied and checked
+        feed.handle_message(json.dumps({'event_type': 'price_change', 'timestamp': '2', 'price_changes': [
+            {'asset_id': 'y1', 'side': 'SELL', 'price': '0.46', 'size': '10', 'best_bid': '0.40', 'best_ask': '0.45'}
+        ]}))
+        assert feed.stats['gaps_detected'] == 0
+        assert len(bot.checks) == 2
+
+        # The server's best ask is 0.44 but ours is 0.45: a change was missed
+        feed.handle_message(json.dumps({'event_type': 'price_change', 'timestamp': '3', 'price_changes': [
+            {'asset_id': 'y1', 'side': 'SELL', 'price': '0.47', 'size': '10', 'best_bid': '0.40', 'best_ask': '0.44'}
+        ]}))
+        assert feed.stats['gaps_detected'] == 1
+        assert 'y1' not in feed.books
+        assert len(bot.checks) == 2
+
+        await asyncio.sleep(0.1)
+        assert feed.stats['snapshots_recovered'] == 1
+        assert feed.books['y1'].best_ask() == 0.44
+        assert len(bot.checks) == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,378 @@
+"""
+Polymarket WebSocket Market Feed
+Mirrors CLOB order books from the market channel and checks arbitrage on every update
+
+Author: apemoonspin
+Telegram: @apemoonspin
+GitHub: apemoonspin
+Twitter: @apemoonspin
+"""
+import json
+import time
+import asyncio
+from typing import Optional, List, Dict, Any, Callable, Tuple
+
+import websockets
+
+from orderbook import OrderBook
+from config import (
+    WS_CLOB_URL,
+    WS_PING_INTERVAL,
+    WS_STALE_TIMEOUT,
+    WS_SNAPSHOT_TIMEOUT,
+    WS_RECONNECT_DELAY
+)
+
+MAX_RECONNECT_DELAY = 30.0
+
+
+def _timestamp(message: Dict[str, Any]) -> int:
+    try:
+        return int(message.get('timestamp') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _reported_price(change: Dict[str, Any], key: str) -> Optional[float]:
+    """best_bid / best_ask the server reports after a change (None if absent)"""
+    try:
+        value = change.get(key)
+        return None if value is None or value == '' else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _top_matches(local: Optional[float], reported: Optional[float]) -> bool:
+    # An empty side is reported as 0
+    return reported is None or abs((local or 0.0) - reported) < 1e-9
+
+
+class MarketFeed:
+    """Subscribes to book and price-change events and keeps local books current
+
+    Gap recovery: books that are missing after subscribing, or that receive a
+    price change before any snapshot, are reloaded from the CLOB REST /book
+    endpoint. Each price change carries the server's best bid/ask after the
+    change; if the local book disagrees after applying it, an update was
+    missed, so the book is dropped (no checks run on it) and resnapshotted.
+    A silent connection is treated as dead and resubscribed.
+    """
+
+    def __init__(
+        self,
+        bot,
+        market_tokens: Dict[str, Dict[str, str]],
+        market_questions: Optional[Dict[str, str]] = None,
+        url: str = WS_CLOB_URL,
+        snapshot_fetcher: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+        ping_interval: float = WS_PING_INTERVAL,
+        stale_timeout: float = WS_STALE_TIMEOUT,
+        snapshot_timeout: float = WS_SNAPSHOT_TIMEOUT,
+        reconnect_delay: float = WS_RECONNECT_DELAY
+    ):
+        """
+        Args:
+            bot: PolyArbitrageBot whose handle_prices is called on every update
+            market_tokens: market_id -> {'Yes': token_id, 'No': token_id}
+            market_questions: market_id -> question (for logging)
+            url: Market channel WebSocket URL
+            snapshot_fetcher: token_id -> REST orderbook (defaults to bot.get_token_orderbook)
+        """
+        self.bot = bot
+        self.market_tokens = market_tokens
+        self.market_questions = market_questions or {}
+        self.url = url
+        self.snapshot_fetcher = snapshot_fetcher or bot.get_token_orderbook
+        self.ping_interval = ping_interval
+        self.stale_timeout = stale_timeout
+        self.snapshot_timeout = snapshot_timeout
+        self.reconnect_delay = reconnect_delay
+
+        # token_id -> (market_id, outcome)
+        self.token_index: Dict[str, Tuple[str, str]] = {}
+        for market_id, tokens in market_tokens.items():
+            for outcome, token_id in tokens.items():
+                self.token_index[token_id] = (market_id, outcome)
+
+        self.books: Dict[str, OrderBook] = {}
+        self._recovering: Dict[str, asyncio.Task] = {}
+        self._running = False
+        self._ws = None
+
+        self.stats = {
+            'messages': 0,
+            'book_updates': 0,
+            'checks': 0,
+            'opportunities': 0,
+            'reconnects': 0,
+            'snapshots_recovered': 0,
+            'gaps_detected': 0
+        }
+
+    async def run(self, duration: Optional[float] = None):
+        """Connect, subscribe and process updates; reconnects until stopped"""
+        self._running = True
+        deadline = time.monotonic() + duration if duration else None
+        delay = self.reconnect_delay
+
+        while self._running:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            try:
+                await self._run_connection(deadline)
+                delay = self.reconnect_delay
+
+            except asyncio.TimeoutError:
+                self.stats['reconnects'] += 1
+                print("[!] Market feed silent. Resubscribing...")
+
+            except (websockets.WebSocketException, OSError) as e:
+                self.stats['reconnects'] += 1
+                print(f"[!] Market feed disconnected ({e}). Reconnecting in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+        self._running = False
+
+    def stop(self):
+        """Stop after the current connection ends"""
+        self._running = False
+
+    async def _run_connection(self, deadline: Optional[float] = None):
+        """
+        One subscribed connection; returns at the deadline (monotonic time)
+
+        The deadline bounds each recv instead of wrapping the whole connection
+        in wait_for: a cancellation that lands while the inner recv completes
+        can be lost on Python < 3.12, leaving the connection running forever.
+        """
+        async with websockets.connect(self.url, ping_interval=None) as ws:
+            await ws.send(json.dumps({
+                'assets_ids': list(self.token_index),
+                'type': 'market'
+            }))
+
+            # Books received before a reconnect may have missed updates
+            self.books.clear()
+            self._ws = ws
+
+            tasks = [
+                asyncio.create_task(self._heartbeat(ws)),
+                asyncio.create_task(self._recover_missing_books())
+            ]
+            try:
+                while self._running:
+                    timeout = self.stale_timeout
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return
+                        timeout = min(timeout, remaining)
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        if deadline is not None and time.monotonic() >= deadline:
+                            return
+                        raise  # Feed went silent
+                    self.handle_message(raw)
+            finally:
+                self._ws = None
+                for task in tasks:
+                    task.cancel()
+
+    async def update_markets(self, added: Dict[str, Dict[str, str]], removed: List[str]):
+        """
+        Change the subscribed markets without reconnecting
+
+        Args:
+            added: market_id -> {'Yes': token_id, 'No': token_id} to subscribe
+            removed: Market IDs to unsubscribe
+        """
+        removed_tokens = []
+        for market_id in removed:
+            for token_id in (self.market_tokens.pop(market_id, None) or {}).values():
+                self.token_index.pop(token_id, None)
+                self.books.pop(token_id, None)
+                removed_tokens.append(token_id)
+
+        added_tokens = []
+        for market_id, tokens in added.items():
+            self.market_tokens[market_id] = tokens
+            for outcome, token_id in tokens.items():
+                self.token_index[token_id] = (market_id, outcome)
+                added_tokens.append(token_id)
+
+        # Without a live connection the next (re)subscribe covers token_index
+        ws = self._ws
+        if ws is None:
+            return
+        try:
+            if removed_tokens:
+                await ws.send(json.dumps({'assets_ids': removed_tokens, 'operation': 'unsubscribe'}))
+            if added_tokens:
+                await ws.send(json.dumps({'assets_ids': added_tokens, 'operation': 'subscribe'}))
+                asyncio.get_running_loop().create_task(self._recover_missing_books())
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _heartbeat(self, ws):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send("PING")
+
+    async def _recover_missing_books(self):
+        """Fetch REST snapshots for subscribed books that never arrived"""
+        await asyncio.sleep(self.snapshot_timeout)
+        for token_id in list(self.token_index):
+            if token_id not in self.books:
+                self._schedule_recovery(token_id)
+
+    def _schedule_recovery(self, token_id: str):
+        if token_id not in self._recovering:
+            self._recovering[token_id] = asyncio.get_running_loop().create_task(self._recover_book(token_id))
+
+    async def _recover_book(self, token_id: str):
+        try:
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(None, self.snapshot_fetcher, token_id)
+            if snapshot:
+                self.stats['snapshots_recovered'] += 1
+                self._apply_book(token_id, snapshot)
+        finally:
+            self._recovering.pop(token_id, None)
+
+    def handle_message(self, raw: str):
+        """Process one raw WebSocket message"""
+        if raw == "PONG":
+            return
+        self.stats['messages'] += 1
+
+        try:
+            payload = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+
+        events = payload if isinstance(payload, list) else [payload]
+        for event in events:
+            event_type = event.get('event_type')
+            if event_type == 'book':
+                self._apply_book(event.get('asset_id', ''), event)
+            elif event_type == 'price_change':
+                self._apply_price_change(event)
+
+    def _apply_book(self, token_id: str, snapshot: Dict[str, Any]):
+        if token_id not in self.token_index:
+            return
+
+        timestamp = _timestamp(snapshot)
+        book = self.books.get(token_id)
+        if book is not None and timestamp and timestamp < book.timestamp:
+            return  # Older than what we already have
+
+        if book is None:
+            book = self.books[token_id] = OrderBook()
+        book.load_snapshot(snapshot.get('bids') or [], snapshot.get('asks') or [], timestamp)
+        self._on_book_update(token_id)
+
+    def _apply_price_change(self, event: Dict[str, Any]):
+        timestamp = _timestamp(event)
+
+        # Current format: one event with per-asset price_changes
+        # Legacy format: asset_id at top level with a changes list
+        if 'price_changes' in event:
+            changes = event['price_changes']
+        else:
+            changes = [dict(change, asset_id=event.get('asset_id')) for change in event.get('changes') or []]
+
+        updated = []
+        for change in changes:
+            token_id = change.get('asset_id')
+            if token_id not in self.token_index:
+                continue
+
+            book = self.books.get(token_id)
+            if book is None:
+                # Delta without a base snapshot: recover from REST
+                self._schedule_recovery(token_id)
+                continue
+            if timestamp and timestamp < book.timestamp:
+                continue
+
+            book.update(change.get('side', ''), float(change['price']), float(change['size']), timestamp)
+            if not (
+                _top_matches(book.best_bid(), _reported_price(change, 'best_bid'))
+                and _top_matches(book.best_ask(), _reported_price(change, 'best_ask'))
+            ):
+                # Missed an update: the book is stale until a fresh snapshot arrives
+                self.stats['gaps_detected'] += 1
+                del self.books[token_id]
+                self._schedule_recovery(token_id)
+                if token_id in updated:
+                    updated.remove(token_id)
+                continue
+            if token_id not in updated:
+                updated.append(token_id)
+
+        for token_id in updated:
+            self._on_book_update(token_id)
+
+    def _on_book_update(self, token_id: str):
+        """Check arbitrage for the market the updated book belongs to"""
+        self.stats['book_updates'] += 1
+        market_id, _ = self.token_index[token_id]
+        tokens = self.market_tokens[market_id]
+
+        yes_book = self.books.get(tokens['Yes'])
+        no_book = self.books.get(tokens['No'])
+        if yes_book is None or no_book is None:
+            return
+
+        yes_ask = yes_book.best_ask()
+        no_ask = no_book.best_ask()
+        if yes_ask is None or no_ask is None:
+            return
+
+        # Buying both sides costs the best asks
+        prices = {
+            'yes_price': yes_ask,
+            'no_price': no_ask,
+            'yes_ask': yes_ask,
+            'no_ask': no_ask,
+            'yes_bid': yes_book.best_bid(),
+            'no_bid': no_book.best_bid()
+        }
+
+        self.stats['checks'] += 1
+        try:
+            orderbook = {'Yes': yes_book, 'No': no_book}
+            if self.bot.handle_prices(market_id, prices, self.market_questions.get(market_id, ""), orderbook):
+                self.stats['opportunities'] += 1
+        except Exception as e:
+            self.bot.metrics.error('monitor')
+            print(f"[✗] Market monitoring error ({market_id}): {e}")
+
+
+if __name__ == "__main__":
+    # Offline demo: stream from the local fake market channel
+    import sys
+    from bot import PolyArbitrageBot
+    from fake_polymarket import FakeMarketChannelServer
+
+    async def demo(num_markets: int, duration: float):
+        server = FakeMarketChannelServer(num_markets=num_markets)
+        await server.start()
+        bot = PolyArbitrageBot(market_ids=list(server.market_tokens))
+        bot.logger = None
+        feed = MarketFeed(
+            bot,
+            server.market_tokens,
+            url=server.url,
+            snapshot_fetcher=server.book_snapshot
+        )
+        await feed.run(duration=duration)
+        await server.stop()
+        print(f"[📊] Feed statistics: {feed.stats}")
+
+    markets = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    asyncio.run(demo(markets, seconds))